@@ -3,18 +3,23 @@ PandaDock: Python Molecular Docking Tool Package
 """
 
 # Core protein-ligand handling
-from .protein import Protein
-from .ligand import Ligand
+from .protein import Protein, ProteinAtomTable
+from .ligand import Ligand, LigandPose
+from .ligand_library import LigandLibrary
+from .conformer_store import ConformerStore
 
 # Unified scoring functions
 from .unified_scoring import (
     ScoringFunction,
     CompositeScoringFunction,
     EnhancedScoringFunction,
+    VectorizedScoringFunction,
+    EnhancedVectorizedScoringFunction,
     GPUScoringFunction,
     EnhancedGPUScoringFunction,
     TetheredScoringFunction,
 )
+from .grid_scoring import ReceptorGridMaps, GridScoringFunction
 
 # Physics-based modules
 from .physics import (
@@ -26,6 +31,7 @@ from .physics import (
 
 # Search algorithms
 from .search import RandomSearch, GeneticAlgorithm
+from .pose_optimization import optimize_pose
 
 # Utilities
 from .utils import (
@@ -45,8 +51,13 @@ from .validation import (
     calculate_ensemble_rmsd
 )
 
+# Profiling and status reporting
+from .profiling import Profiler
+from .status_writer import StatusWriter
+
 # Batch screening
 from .batch_screening import batch_screening
+from .results_store import ScreeningResultsStore
 
 # Package version
 __version__ = '2.1.0'
@@ -16,6 +16,7 @@ from scipy.spatial.transform import Rotation
 from .search import DockingSearch
 from .utils import setup_logging
 from .utils import calculate_rmsd
+from .pose_optimization import optimize_pose, rigid_body_gradient, supports_analytic_gradient
 
 
 class GradientBasedSearch(DockingSearch):
@@ -65,6 +66,11 @@ class GradientBasedSearch(DockingSearch):
         numpy.ndarray
             Gradient vector [tx, ty, tz, rx, ry, rz]
         """
+        # Project analytic atom gradients when the scoring function has them
+        if supports_analytic_gradient(self.scoring_function):
+            _, atom_gradient = self.scoring_function.score_gradient(protein, pose)
+            return rigid_body_gradient(pose.xyz, atom_gradient, np.mean(pose.xyz, axis=0))
+        
         # Make a copy of the pose to avoid modifying the original
         base_pose = copy.deepcopy(pose)
 
@@ -1688,92 +1694,8 @@ class HybridSearch(DockingSearch):
         tuple
             (optimized_pose, optimized_score)
         """
-        # Make a copy of the pose to avoid modifying original
-        ligand_pose = copy.deepcopy(pose)
-        
-        # Get initial pose parameters (position and orientation)
-        centroid = np.mean(ligand_pose.xyz, axis=0)
-        initial_params = np.zeros(6)  # [tx, ty, tz, rx, ry, rz]
-        initial_params[:3] = centroid
-        
-        # Define objective function for L-BFGS
-        def objective(params):
-            # Create a new pose for evaluation
-            test_pose = copy.deepcopy(ligand_pose)
-            
-            # Extract translation and rotation
-            translation = params[:3] - centroid
-            rotation_vec = params[3:6]
-            
-            # Apply translation
-            test_pose.translate(translation)
-            
-            # Apply rotation if rotation vector is not zero
-            rot_magnitude = np.linalg.norm(rotation_vec)
-            if rot_magnitude > 1e-6:
-                from scipy.spatial.transform import Rotation
-                
-                # Normalize rotation vector
-                axis = rotation_vec / rot_magnitude
-                
-                # Create rotation matrix
-                rotation = Rotation.from_rotvec(axis * rot_magnitude)
-                rotation_matrix = rotation.as_matrix()
-                
-                # Apply rotation around center of mass
-                new_centroid = np.mean(test_pose.xyz, axis=0)
-                test_pose.translate(-new_centroid)
-                test_pose.rotate(rotation_matrix)
-                test_pose.translate(new_centroid)
-            
-            # Evaluate score
-            score = self.scoring_function.score(protein, test_pose)
-            return score
-        
-        # Run L-BFGS optimization
-        result = minimize(
-            objective,
-            initial_params,
-            method='L-BFGS-B',
-            options={
-                'maxiter': self.lbfgs_iterations,
-                'disp': False
-            }
-        )
-        
-        # Create final optimized pose
-        optimized_pose = copy.deepcopy(ligand_pose)
-        
-        # Apply optimal transformation
-        final_params = result.x
-        translation = final_params[:3] - centroid
-        rotation_vec = final_params[3:6]
-        
-        # Apply translation
-        optimized_pose.translate(translation)
-        
-        # Apply rotation if rotation vector is not zero
-        rot_magnitude = np.linalg.norm(rotation_vec)
-        if rot_magnitude > 1e-6:
-            from scipy.spatial.transform import Rotation
-            
-            # Normalize rotation vector
-            axis = rotation_vec / rot_magnitude
-            
-            # Create rotation matrix
-            rotation = Rotation.from_rotvec(axis * rot_magnitude)
-            rotation_matrix = rotation.as_matrix()
-            
-            # Apply rotation around center of mass
-            new_centroid = np.mean(optimized_pose.xyz, axis=0)
-            optimized_pose.translate(-new_centroid)
-            optimized_pose.rotate(rotation_matrix)
-            optimized_pose.translate(new_centroid)
-        
-        # Get final score
-        optimized_score = self.scoring_function.score(protein, optimized_pose)
-        
-        return optimized_pose, optimized_score
+        return optimize_pose(self.scoring_function, protein, pose,
+                             max_iterations=self.lbfgs_iterations)
 
 
 def create_advanced_search_algorithm(algorithm_type, scoring_function, **kwargs):
@@ -1797,6 +1719,7 @@ import os
 import copy
 import time
 import random
+import multiprocessing as mp
 from scipy.optimize import minimize
 from .search import DockingSearch
 from scipy.spatial.transform import Rotation
@@ -1808,6 +1731,10 @@ class GradientBasedSearch(DockingSearch):
         self.convergence_threshold = convergence_threshold
 
     def _calculate_gradient(self, protein, pose, delta=0.1):
+        if supports_analytic_gradient(self.scoring_function):
+            _, atom_gradient = self.scoring_function.score_gradient(protein, pose)
+            return rigid_body_gradient(pose.xyz, atom_gradient, np.mean(pose.xyz, axis=0))
+
         base_pose = copy.deepcopy(pose)
         base_score = self.scoring_function.score(protein, base_pose)
         gradient = np.zeros(6)
@@ -1882,67 +1809,192 @@ class GradientBasedSearch(DockingSearch):
 
         for i, start_pose in enumerate(poses):
             print(f"Optimizing pose {i+1}/10")
-            centroid = np.mean(start_pose.xyz, axis=0)
+            final_pose, score = optimize_pose(
+                self.scoring_function, protein, start_pose,
+                max_iterations=self.max_iterations, ftol=self.convergence_threshold
+            )
+            results.append((final_pose, score))
 
-            def objective(params):
-                test_pose = copy.deepcopy(start_pose)
-                translation = params[:3] - centroid
-                rot_vec = params[3:6]
+        results.sort(key=lambda x: x[1])
+        print(f"Best gradient-based score: {results[0][1]:.2f} in {time.time()-start:.1f}s")
+        return results
 
-                test_pose.translate(translation)
-                if np.linalg.norm(rot_vec) > 1e-6:
-                    rot = Rotation.from_rotvec(rot_vec)
-                    test_pose.translate(-centroid)
-                    test_pose.rotate(rot.as_matrix())
-                    test_pose.translate(centroid)
-                return self.scoring_function.score(protein, test_pose)
+def _replica_moves(scoring_function, protein, pose, score, temperature, n_steps,
+                   max_translation, max_rotation, k_boltzmann, best):
+    """
+    Advance one Monte Carlo chain by n_steps rigid-body moves.
+    
+    Parameters:
+    -----------
+    pose : Ligand
+        Current pose
+    score : float
+        Score of the current pose
+    best : list
+        [best_score, best_coords] of the chain, updated in place
+    
+    Returns:
+    --------
+    tuple
+        (pose, score) after the moves
+    """
+    for _ in range(n_steps):
+        new_pose = copy.deepcopy(pose)
+        new_pose.translate(np.random.uniform(-max_translation, max_translation, 3))
+        axis = np.random.randn(3); axis /= np.linalg.norm(axis)
+        angle = np.random.uniform(-max_rotation, max_rotation)
+        rot = Rotation.from_rotvec(axis * angle)
+        centroid = np.mean(new_pose.xyz, axis=0)
+        new_pose.translate(-centroid)
+        new_pose.rotate(rot.as_matrix())
+        new_pose.translate(centroid)
+        new_score = scoring_function.score(protein, new_pose)
+        delta = new_score - score
+        if delta <= 0 or np.random.rand() < np.exp(-delta / (k_boltzmann * temperature)):
+            pose, score = new_pose, new_score
+            if new_score < best[0]:
+                best[0], best[1] = new_score, new_pose.xyz.copy()
+    return pose, score
+
+
+def _replica_worker(connection, scoring_function, protein, pose, k_boltzmann, seed):
+    """
+    Persistent worker process running one replica's Monte Carlo chain.
+    
+    The replica's pose stays in the worker. Every ('run', temperature,
+    n_steps, max_translation, max_rotation) request advances the chain and
+    answers with the current (score, coords); ('best',) answers with the
+    chain's best (score, coords) and ('stop',) ends the worker.
+    """
+    np.random.seed(seed)
+    score = scoring_function.score(protein, pose)
+    best = [score, pose.xyz.copy()]
+    connection.send((score, pose.xyz))
+    
+    while True:
+        message = connection.recv()
+        if message[0] == 'run':
+            _, temperature, n_steps, max_translation, max_rotation = message
+            pose, score = _replica_moves(scoring_function, protein, pose, score, temperature,
+                                         n_steps, max_translation, max_rotation, k_boltzmann, best)
+            connection.send((score, pose.xyz))
+        elif message[0] == 'best':
+            connection.send(tuple(best))
+        else:
+            break
+    connection.close()
 
-            def gradient(params):
-                test_pose = copy.deepcopy(start_pose)
-                translation = params[:3] - centroid
-                rot_vec = params[3:6]
 
-                test_pose.translate(translation)
-                if np.linalg.norm(rot_vec) > 1e-6:
-                    rot = Rotation.from_rotvec(rot_vec)
-                    test_pose.translate(-centroid)
-                    test_pose.rotate(rot.as_matrix())
-                    test_pose.translate(centroid)
-                return self._calculate_gradient(protein, test_pose, delta=self.gradient_step)
+class _LocalReplica:
+    """Replica chain advanced in the calling process (same interface as _ReplicaProcess)."""
+    
+    def __init__(self, scoring_function, protein, pose, k_boltzmann):
+        self.scoring_function = scoring_function
+        self.protein = protein
+        self.pose = pose
+        self.k_boltzmann = k_boltzmann
+        self.score = scoring_function.score(protein, pose)
+        self.best = [self.score, pose.xyz.copy()]
+        self._request = None
+    
+    def submit(self, temperature, n_steps, max_translation, max_rotation):
+        self._request = (temperature, n_steps, max_translation, max_rotation)
+    
+    def result(self):
+        if self._request is not None:
+            self.pose, self.score = _replica_moves(self.scoring_function, self.protein, self.pose,
+                                                   self.score, *self._request, self.k_boltzmann,
+                                                   self.best)
+            self._request = None
+        return self.score, self.pose.xyz
+    
+    def best_result(self):
+        return tuple(self.best)
+    
+    def close(self):
+        pass
 
-            result = minimize(
-                objective,
-                np.concatenate([centroid, np.zeros(3)]),
-                method='L-BFGS-B',
-                jac=gradient,
-                options={'maxiter': self.max_iterations, 'ftol': self.convergence_threshold, 'disp': False}
-            )
 
-            final_pose = copy.deepcopy(start_pose)
-            translation = result.x[:3] - centroid
-            rot_vec = result.x[3:6]
-            final_pose.translate(translation)
-            if np.linalg.norm(rot_vec) > 1e-6:
-                rot = Rotation.from_rotvec(rot_vec)
-                final_pose.translate(-centroid)
-                final_pose.rotate(rot.as_matrix())
-                final_pose.translate(centroid)
-
-            score = self.scoring_function.score(protein, final_pose)
-            results.append((final_pose, score))
+class _ReplicaProcess:
+    """Replica chain advanced by a persistent worker process."""
+    
+    def __init__(self, context, scoring_function, protein, pose, k_boltzmann, seed):
+        self.connection, worker_connection = context.Pipe()
+        self.process = context.Process(
+            target=_replica_worker,
+            args=(worker_connection, scoring_function, protein, pose, k_boltzmann, seed),
+            daemon=True
+        )
+        self.process.start()
+        worker_connection.close()
+        self._pending = True  # Initial score
+    
+    def submit(self, temperature, n_steps, max_translation, max_rotation):
+        self.connection.send(('run', temperature, n_steps, max_translation, max_rotation))
+        self._pending = True
+    
+    def result(self):
+        if self._pending:
+            self._result = self.connection.recv()
+            self._pending = False
+        return self._result
+    
+    def best_result(self):
+        self.connection.send(('best',))
+        return self.connection.recv()
+    
+    def close(self):
+        try:
+            self.connection.send(('stop',))
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.connection.close()
 
-        results.sort(key=lambda x: x[1])
-        print(f"Best gradient-based score: {results[0][1]:.2f} in {time.time()-start:.1f}s")
-        return results
 
 class ReplicaExchangeDocking(DockingSearch):
-    def __init__(self, scoring_function, n_replicas=4, temperatures=None, exchange_steps=10, steps_per_exchange=100, output_dir=None):
+    """
+    Replica Exchange Monte Carlo for enhanced sampling of docking poses.
+    
+    Each replica is a Monte Carlo chain; with more than one process the
+    chains run in persistent worker processes, one per replica, which keep
+    their pose between exchanges. Between exchanges the workers report only
+    their current score and coordinates. An accepted exchange swaps the
+    temperatures of two replicas instead of copying poses between them.
+    """
+    
+    def __init__(self, scoring_function, n_replicas=4, temperatures=None, exchange_steps=10,
+                 steps_per_exchange=100, output_dir=None, n_processes=None):
+        """
+        Initialize replica exchange docking.
+        
+        Parameters:
+        -----------
+        scoring_function : ScoringFunction
+            Scoring function to evaluate poses
+        n_replicas : int
+            Number of replicas
+        temperatures : list, optional
+            Replica temperatures in K (geometric 300-1200 K by default)
+        exchange_steps : int
+            Number of exchange attempts
+        steps_per_exchange : int
+            Monte Carlo steps of every replica between exchanges
+        output_dir : str or Path
+            Output directory
+        n_processes : int, optional
+            Number of CPU cores (None = all); with more than one, every
+            replica runs in its own worker process
+        """
         super().__init__(scoring_function, steps_per_exchange * exchange_steps, output_dir)
         self.n_replicas = n_replicas
         self.output_dir = output_dir
         self.exchange_steps = exchange_steps
         self.steps_per_exchange = steps_per_exchange
         self.k_boltzmann = 1.9872e-3
+        self.n_processes = n_processes or mp.cpu_count()
 
         if temperatures is None:
             self.temperatures = np.geomspace(300.0, 1200.0, n_replicas)
@@ -1950,6 +2002,29 @@ class ReplicaExchangeDocking(DockingSearch):
             self.temperatures = np.array(temperatures)
             if len(self.temperatures) != n_replicas:
                 raise ValueError("Temperature count must match replica count")
+        
+        # Accepted / attempted exchanges per pair of neighbouring temperatures
+        self.exchange_attempts = np.zeros(max(0, n_replicas - 1), dtype=int)
+        self.exchange_accepted = np.zeros(max(0, n_replicas - 1), dtype=int)
+
+    def _start_replicas(self, protein, poses):
+        """Start one replica chain per initial pose, in worker processes if parallel."""
+        if min(self.n_processes, self.n_replicas) <= 1:
+            return [_LocalReplica(self.scoring_function, protein, pose, self.k_boltzmann)
+                    for pose in poses]
+        
+        context = mp.get_context()
+        seeds = np.random.randint(0, 2**31 - 1, size=len(poses))
+        replicas = []
+        try:
+            for pose, seed in zip(poses, seeds):
+                replicas.append(_ReplicaProcess(context, self.scoring_function, protein, pose,
+                                                self.k_boltzmann, int(seed)))
+        except Exception:
+            for replica in replicas:
+                replica.close()
+            raise
+        return replicas
 
     def search(self, protein, ligand):
         print(f"\n🔁 Performing Replica Exchange Monte Carlo with {self.n_replicas} replicas\n")
@@ -1964,7 +2039,7 @@ class ReplicaExchangeDocking(DockingSearch):
             center = np.mean(protein.xyz, axis=0)
             radius = 15.0
 
-        replicas = []
+        poses = []
         for i in range(self.n_replicas):
             pose = copy.deepcopy(ligand)
             r = radius * np.random.random() ** (1.0 / 3.0)
@@ -1978,36 +2053,49 @@ class ReplicaExchangeDocking(DockingSearch):
             pose.translate(-centroid)
             pose.rotate(Rotation.random().as_matrix())
             pose.translate(centroid)
-            score = self.scoring_function.score(protein, pose)
-            replicas.append({'pose': pose, 'score': score, 'temperature': self.temperatures[i]})
-
-        best_pose, best_score = None, float('inf')
-        for step in range(self.exchange_steps):
-            for rep in replicas:
-                for _ in range(self.steps_per_exchange):
-                    new_pose = copy.deepcopy(rep['pose'])
-                    max_t = 2.0 * (rep['temperature'] / self.temperatures[-1])
-                    max_r = 0.3 * (rep['temperature'] / self.temperatures[-1])
-                    new_pose.translate(np.random.uniform(-max_t, max_t, 3))
-                    axis = np.random.randn(3); axis /= np.linalg.norm(axis)
-                    angle = np.random.uniform(-max_r, max_r)
-                    rot = Rotation.from_rotvec(axis * angle)
-                    centroid = np.mean(new_pose.xyz, axis=0)
-                    new_pose.translate(-centroid)
-                    new_pose.rotate(rot.as_matrix())
-                    new_pose.translate(centroid)
-                    new_score = self.scoring_function.score(protein, new_pose)
-                    delta = new_score - rep['score']
-                    if delta <= 0 or np.random.rand() < np.exp(-delta / (self.k_boltzmann * rep['temperature'])):
-                        rep['pose'], rep['score'] = new_pose, new_score
-                        if new_score < best_score:
-                            best_pose, best_score = copy.deepcopy(new_pose), new_score
-            for i in range(self.n_replicas - 1):
-                rep1, rep2 = replicas[i], replicas[i + 1]
-                delta = (1.0 / (self.k_boltzmann * rep1['temperature']) - 1.0 / (self.k_boltzmann * rep2['temperature'])) * (rep2['score'] - rep1['score'])
-                if delta <= 0 or np.random.rand() < np.exp(-delta):
-                    rep1['pose'], rep2['pose'] = rep2['pose'], rep1['pose']
-                    rep1['score'], rep2['score'] = rep2['score'], rep1['score']
+            poses.append(pose)
 
+        # ladder[k] is the replica currently simulated at temperature k
+        ladder = list(range(self.n_replicas))
+        self.exchange_attempts[:] = 0
+        self.exchange_accepted[:] = 0
+        
+        replicas = self._start_replicas(protein, poses)
+        try:
+            scores = [replica.result()[0] for replica in replicas]
+            
+            for step in range(self.exchange_steps):
+                # All replicas advance concurrently until the next exchange
+                for k, index in enumerate(ladder):
+                    temperature = self.temperatures[k]
+                    replicas[index].submit(
+                        temperature, self.steps_per_exchange,
+                        2.0 * (temperature / self.temperatures[-1]),
+                        0.3 * (temperature / self.temperatures[-1])
+                    )
+                scores = [replica.result()[0] for replica in replicas]
+                
+                for k in range(self.n_replicas - 1):
+                    i, j = ladder[k], ladder[k + 1]
+                    delta = (1.0 / (self.k_boltzmann * self.temperatures[k]) -
+                             1.0 / (self.k_boltzmann * self.temperatures[k + 1])) * (scores[j] - scores[i])
+                    self.exchange_attempts[k] += 1
+                    if delta <= 0 or np.random.rand() < np.exp(-delta):
+                        ladder[k], ladder[k + 1] = j, i
+                        self.exchange_accepted[k] += 1
+            
+            # Best pose visited by any chain
+            best_score, best_coords = min((replica.best_result() for replica in replicas),
+                                          key=lambda result: result[0])
+        finally:
+            for replica in replicas:
+                replica.close()
+        
+        best_pose = ligand.copy()
+        best_pose.xyz = best_coords
+        
+        if self.n_replicas > 1:
+            rates = self.exchange_accepted / np.maximum(self.exchange_attempts, 1)
+            print("Exchange acceptance:", ", ".join(f"{rate:.0%}" for rate in rates))
         print(f"Best REMC score: {best_score:.2f} in {time.time()-start_time:.1f}s")
-        return [(best_pose, best_score)]
\ No newline at end of file
+        return [(best_pose, best_score)]
@@ -0,0 +1,42 @@
+"""
+Atomic file writes for files that other processes read while PandaDock runs.
+
+Status files, cached grid maps and conformer ensembles are read by other
+processes (monitoring tools, screening workers) while they are written. They
+are written to a temporary file in the target directory and renamed over the
+target, so a reader sees either the old or the new file, never a partial one.
+"""
+
+import os
+import threading
+from pathlib import Path
+
+
+def atomic_write(path, write, binary=False):
+    """
+    Write a file atomically.
+
+    Parameters:
+    -----------
+    path : str or Path
+        Target file; missing parent directories are created
+    write : callable
+        Called with the open temporary file to write the contents
+        (e.g. lambda f: np.save(f, array))
+    binary : bool
+        Open the temporary file in binary mode
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Unique per process and thread, so concurrent writers never share a temporary file
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'wb' if binary else 'w') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -9,6 +9,7 @@ import time
 import json
 import csv
 import multiprocessing as mp
+from multiprocessing.util import Finalize
 from datetime import datetime
 from pathlib import Path
 import glob
@@ -20,8 +21,10 @@ from .virtual_screening import VirtualScreeningManager
 
 from .protein import Protein
 from .ligand import Ligand
+from .ligand_library import LigandLibrary, LigandRecord
+from .results_store import ScreeningResultsStore, ligand_smiles, pose_energy_terms
 from .utils import save_docking_results
-from .utils import detect_steric_clash
+from .utils import detect_steric_clash, detect_steric_clash_batch
 from .utils import setup_logging
 from .utils import calculate_rmsd
 from scipy.spatial.transform import Rotation
@@ -31,12 +34,104 @@ from .main_integration import (
     setup_hardware_acceleration,
     create_optimized_scoring_function,
     create_optimized_search_algorithm,
-    get_algorithm_kwargs_from_args
+    get_algorithm_kwargs_from_args,
+    GA_STOPPING_CRITERIA
 )
 
 
-# Global variable to store shared configuration for multiprocessing
-_mp_config = {}
+# Per-process screening state, set up once by _init_screening_worker
+_worker_state = {}
+
+# Longest time (s) finished ligands are buffered before they are written out
+_RESULTS_FLUSH_INTERVAL = 30.0
+
+
+class ScreeningManifest:
+    """
+    Persistent record of the ligands finished in a screening campaign.
+
+    Each finished ligand is appended to a JSON-lines file in the output
+    directory and flushed to disk immediately, so an interrupted campaign
+    can be resumed by skipping every ligand already in the manifest.
+    Ligands whose docking failed are recorded too, but are not finished:
+    a resumed campaign docks them again.
+    """
+    
+    filename = "screening_manifest.jsonl"
+    
+    def __init__(self, output_path):
+        """
+        Open (or create) the manifest of a screening output directory.
+        
+        Parameters:
+        -----------
+        output_path : str or Path
+            Screening output directory
+        """
+        self.path = Path(output_path) / self.filename
+        self.entries = self._load()
+    
+    def __len__(self):
+        return sum(1 for entry in self.entries.values() if self._succeeded(entry))
+    
+    def __contains__(self, ligand_name):
+        entry = self.entries.get(ligand_name)
+        return entry is not None and self._succeeded(entry)
+    
+    @staticmethod
+    def _succeeded(entry):
+        return entry.get('status', "Success") == "Success"
+    
+    def _load(self):
+        """Read finished ligands, dropping a partial line left by a killed run."""
+        entries = {}
+        if not self.path.exists():
+            return entries
+        
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        
+        complete = data.rfind(b'\n') + 1
+        if complete < len(data):
+            with open(self.path, 'r+b') as f:
+                f.truncate(complete)
+        
+        for line in data[:complete].splitlines():
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            entries[entry['name']] = entry
+        
+        return entries
+    
+    def pending(self, ligand_files):
+        """Return the ligand files or library records that have not been finished yet."""
+        return [f for f in ligand_files if _ligand_job_name(f) not in self]
+    
+    def record(self, result):
+        """
+        Append a finished ligand to the manifest.
+        
+        Parameters:
+        -----------
+        result : dict
+            Ligand result with at least a 'name' key
+        """
+        self.record_many([result])
+    
+    def record_many(self, results):
+        """Append several finished ligands with a single write and sync."""
+        if not results:
+            return
+        with open(self.path, 'a') as f:
+            f.write(''.join(json.dumps(result) + '\n' for result in results))
+            f.flush()
+            os.fsync(f.fileno())
+        for result in results:
+            self.entries[result['name']] = result
 
 
 def run(config):
@@ -48,15 +143,188 @@ def run(config):
     config : dict
         Configuration dictionary with the following keys:
         - protein: Path to protein PDB file
-        - ligand_library: Path to directory containing ligand files
+        - ligand_library: Path to directory containing ligand files, or to a
+          multi-record SDF/SMILES library file (optionally gzipped)
         - output_dir: Output directory for results
         - screening_params: Dictionary of screening parameters
+        - n_processes: Number of worker processes (default: 1)
+        - resume: True to continue the latest run of output_dir, or the
+          path of the output directory to continue (default: False)
     
     Returns:
     --------
     dict
         Dictionary of results with ligand filenames as keys
     """
+    return _run_screening(config, config.get('n_processes', 1))
+
+
+def _init_screening_worker(protein_file, screening_params, docking_params, hw_config, output_path):
+    """Load the receptor and hardware manager once per screening process."""
+    _close_screening_worker()
+    _worker_state.update({
+        'protein': _load_screening_protein(protein_file, screening_params),
+        'hybrid_manager': setup_hardware_acceleration(hw_config),
+        'scoring_function': _create_screening_scoring_function(docking_params),
+        'docking_params': docking_params,
+        'output_path': Path(output_path),
+    })
+    Finalize(None, _close_screening_worker, exitpriority=10)
+
+
+def _close_screening_worker():
+    """Release the resources held by the screening process state."""
+    hybrid_manager = _worker_state.pop('hybrid_manager', None)
+    _worker_state.clear()
+    if hybrid_manager is not None:
+        hybrid_manager.cleanup()
+
+
+def _ligand_job_name(ligand_job):
+    """Name of a ligand file or library record, used for output and the manifest."""
+    if isinstance(ligand_job, LigandRecord):
+        return ligand_job.name
+    return Path(ligand_job).stem
+
+
+def _screen_ligand_in_worker(ligand_job):
+    """Dock a single ligand file or library record against the receptor held by this process."""
+    ligand_name = _ligand_job_name(ligand_job)
+    ligand_output = _worker_state['output_path'] / ligand_name
+    ligand_output.mkdir(exist_ok=True)
+    
+    if isinstance(ligand_job, LigandRecord):
+        ligand_file = ligand_job.source
+        job_info = {'name': ligand_name, 'file': str(ligand_file), 'record': int(ligand_job.index)}
+    else:
+        ligand_file = ligand_job
+        job_info = {'name': ligand_name, 'file': str(ligand_file)}
+    
+    start_time = time.time()
+    try:
+        ligand = None
+        if isinstance(ligand_job, LigandRecord):
+            # Each worker keeps the library open and seeks to the record
+            libraries = _worker_state.setdefault('libraries', {})
+            if ligand_file not in libraries:
+                libraries[ligand_file] = LigandLibrary(ligand_file)
+            ligand = libraries[ligand_file].get(ligand_job.index)
+        
+        protein = _worker_state['protein']
+        scoring_function = _worker_state['scoring_function']
+        search_summary = {}
+        results = _dock_single_ligand(
+            protein=protein,
+            ligand_file=ligand_file,
+            output_dir=ligand_output,
+            hybrid_manager=_worker_state['hybrid_manager'],
+            docking_params=_worker_state['docking_params'],
+            ligand=ligand,
+            scoring_function=scoring_function,
+            search_summary=search_summary
+        )
+        
+        best_pose = results[0][0] if results else None
+        return dict(job_info, **{
+            'score': float(results[0][1]) if results else float('inf'),
+            'runtime': time.time() - start_time,
+            'status': "Success",
+            'poses': [(i, float(score)) for i, (pose, score) in enumerate(results)],
+            'smiles': ligand_smiles(best_pose if best_pose is not None else ligand),
+            'energy_terms': pose_energy_terms(scoring_function, protein, best_pose) if best_pose is not None else None,
+            'stop_reason': search_summary.get('stop_reason'),
+            'generations': search_summary.get('generations'),
+            'evaluations': search_summary.get('evaluations'),
+            # Coordinates go to the results store only, not to the manifest
+            'pose_coords': [np.asarray(pose.xyz, dtype=np.float32) for pose, _ in results[:10]]
+        })
+        
+    except Exception as e:
+        print(f"Error processing ligand {ligand_name}: {e}")
+        return dict(job_info, **{
+            'score': float('inf'),
+            'runtime': time.time() - start_time,
+            'status': f"Error: {str(e)}",
+            'error': str(e)
+        })
+
+
+def _iter_screening_results(ligand_files, worker_args, n_processes):
+    """
+    Dock ligands on a fixed set of worker processes and yield their results.
+    
+    Every worker sets up the receptor once through _init_screening_worker;
+    results are yielded in completion order so the caller is the single writer.
+    """
+    n_processes = max(1, min(n_processes or 1, len(ligand_files)))
+    if not ligand_files:
+        return
+    
+    if n_processes == 1:
+        _init_screening_worker(*worker_args)
+        try:
+            for ligand_file in tqdm(ligand_files):
+                yield _screen_ligand_in_worker(ligand_file)
+        finally:
+            _close_screening_worker()
+        return
+    
+    # Library records are handed out in contiguous runs so workers read their shard in order
+    chunksize = 1
+    if isinstance(ligand_files[0], LigandRecord):
+        chunksize = max(1, min(16, len(ligand_files) // (4 * n_processes)))
+    
+    pool = mp.Pool(processes=n_processes, initializer=_init_screening_worker, initargs=worker_args)
+    try:
+        for result in tqdm(pool.imap_unordered(_screen_ligand_in_worker, ligand_files, chunksize),
+                           total=len(ligand_files)):
+            yield result
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+
+def _screening_output_path(output_dir, resume):
+    """Return the output directory of a new or resumed screening run."""
+    if resume:
+        if not isinstance(resume, bool):
+            return Path(resume)
+        
+        previous = sorted(
+            p for p in glob.glob(f"{output_dir}_*")
+            if (Path(p) / ScreeningManifest.filename).exists()
+        )
+        if previous:
+            return Path(previous[-1])
+        print(f"No previous screening run found for {output_dir}, starting a new one")
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return Path(f"{output_dir}_{timestamp}")
+
+
+def _resolve_active_site(protein_file, screening_params):
+    """Detect the binding pocket once so worker processes only define the site."""
+    if 'site' in screening_params or not screening_params.get('detect_pockets', False):
+        return screening_params
+    
+    print("Detecting binding pockets...")
+    pockets = Protein(protein_file).detect_pockets()
+    if not pockets:
+        return screening_params
+    
+    print(f"Found {len(pockets)} potential binding pockets")
+    print(f"Using largest pocket as active site")
+    screening_params = dict(screening_params)
+    screening_params['site'] = [float(x) for x in pockets[0]['center']]
+    screening_params['radius'] = float(pockets[0]['radius'])
+    return screening_params
+
+
+def _run_screening(config, n_processes):
+    """Screen a ligand library on a fixed worker pool with resumable progress."""
     # Extract configuration
     protein_file = config.get('protein')
     ligand_library = config.get('ligand_library')
@@ -70,171 +338,122 @@ def run(config):
     if not ligand_library or not os.path.exists(ligand_library):
         raise ValueError(f"Ligand library not found: {ligand_library}")
     
-    # Create output directory
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_path = Path(f"{output_dir}_{timestamp}")
+    # Create (or reopen) output directory
+    output_path = _screening_output_path(output_dir, config.get('resume', False))
     output_path.mkdir(parents=True, exist_ok=True)
+    manifest = ScreeningManifest(output_path)
     
     # Configure hardware
     hw_config = _parse_hardware_config(screening_params.get('hardware', {}))
-    hybrid_manager = setup_hardware_acceleration(hw_config)
     
     # Prepare protein (done once for all ligands)
-    print(f"Preparing protein: {protein_file}")
-    protein = _prepare_protein(protein_file, screening_params, output_path)
+    prepared_protein_file = output_path / "prepared_protein.pdb"
+    if manifest.entries and prepared_protein_file.exists():
+        print(f"Reusing prepared protein: {prepared_protein_file}")
+    else:
+        print(f"Preparing protein: {protein_file}")
+        prepared_protein_file = _prepare_protein_file(protein_file, screening_params, output_path)
+    screening_params = _resolve_active_site(prepared_protein_file, screening_params)
     
     # Get list of ligand files
     ligand_files = _get_ligand_files(ligand_library)
+    pending = manifest.pending(ligand_files)
     print(f"Found {len(ligand_files)} ligands for screening")
-    
-    # Create summary file
-    summary_file = output_path / "screening_summary.csv"
-    with open(summary_file, 'w', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow(['Ligand', 'Score', 'Runtime_s', 'Status'])
+    if manifest.entries:
+        print(f"Resuming {output_path}: {len(ligand_files) - len(pending)} ligands already finished")
     
     # Prepare docking parameters
     docking_params = _prepare_docking_params(screening_params)
     
-    # Set up results dictionary
-    all_results = {}
+    # Build grid maps once; worker processes memory-map them from the cache
+    if docking_params['use_grid'] and pending:
+        docking_params['grid_cache_dir'] = docking_params['grid_cache_dir'] or str(output_path / "grid_cache")
+        _prepare_grid_maps(
+            _load_screening_protein(prepared_protein_file, screening_params),
+            docking_params
+        )
     
-    # Process each ligand
-    print(f"Starting batch screening of {len(ligand_files)} ligands...")
+    # Results of earlier runs come from the manifest
+    all_results = {name: _summary_entry(entry) for name, entry in manifest.entries.items()}
     
-    for i, ligand_file in enumerate(tqdm(ligand_files)):
-        ligand_name = Path(ligand_file).stem
-        ligand_output = output_path / ligand_name
-        ligand_output.mkdir(exist_ok=True)
-        
-        try:
-            # Process this ligand
-            start_time = time.time()
-            results = _dock_single_ligand(
-                protein=protein,
-                ligand_file=ligand_file,
-                output_dir=ligand_output,
-                hybrid_manager=hybrid_manager,
-                docking_params=docking_params
-            )
-            runtime = time.time() - start_time
-            
-            # Store best score
-            best_score = results[0][1] if results else float('inf')
-            status = "Success"
-            
-            # Add to results dictionary
-            all_results[ligand_name] = {
-                'file': ligand_file,
-                'score': best_score,
-                'runtime': runtime,
-                'poses': [(i, score) for i, (pose, score) in enumerate(results)]
-            }
-            
-        except Exception as e:
-            print(f"Error processing ligand {ligand_name}: {e}")
-            status = f"Error: {str(e)}"
-            runtime = time.time() - start_time
-            
-            # Add error entry
-            all_results[ligand_name] = {
-                'file': ligand_file,
-                'score': float('inf'),
-                'runtime': runtime,
-                'error': str(e)
-            }
-        
-        # Update summary file
-        with open(summary_file, 'a', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow([ligand_name, 
-                             best_score if status == "Success" else "N/A", 
-                             f"{runtime:.2f}", 
-                             status])
+    summary_file = output_path / "screening_summary.csv"
+    write_header = not summary_file.exists()
+    results_store = ScreeningResultsStore(
+        output_path / ScreeningResultsStore.filename,
+        batch_size=config.get('results_batch_size', 256)
+    )
+    worker_args = (prepared_protein_file, screening_params, docking_params, hw_config, output_path)
     
-    # Clean up resources
-    hybrid_manager.cleanup()
+    print(f"Starting batch screening of {len(pending)} ligands using {max(1, min(n_processes or 1, len(pending)))} processes...")
     
-    # Generate summary report and visualizations
-    _generate_summary_report(all_results, output_path)
+    # Single writer: results stream in from the workers as ligands finish and
+    # are written in batches; the manifest only lists ligands already stored
+    try:
+        with open(summary_file, 'a', newline='') as f:
+            writer = csv.writer(f)
+            if write_header:
+                writer.writerow(['Ligand', 'Score', 'Runtime_s', 'Status'])
+            
+            finished = []
+            last_flush = time.time()
+            try:
+                for result in _iter_screening_results(pending, worker_args, n_processes):
+                    pose_coords = result.pop('pose_coords', None) or []
+                    pose_scores = [score for _, score in result.get('poses', [])]
+                    results_store.add(result, list(zip(pose_scores, pose_coords)))
+                    writer.writerow([
+                        result['name'],
+                        result['score'] if result['status'] == "Success" else "N/A",
+                        f"{result['runtime']:.2f}",
+                        result['status']
+                    ])
+                    finished.append(result)
+                    all_results[result['name']] = _summary_entry(result)
+                    
+                    if len(finished) >= results_store.batch_size or time.time() - last_flush > _RESULTS_FLUSH_INTERVAL:
+                        f.flush()
+                        results_store.flush()
+                        manifest.record_many(finished)
+                        finished = []
+                        last_flush = time.time()
+            finally:
+                f.flush()
+                results_store.flush()
+                manifest.record_many(finished)
+        
+        # Generate summary report and visualizations
+        _generate_summary_report(results_store, output_path)
+    finally:
+        results_store.close()
     
     print(f"Batch screening completed. Results saved to: {output_path}")
     return all_results
 
 
-# Function to process a single ligand for parallelization
-def _process_ligand_parallel(ligand_file):
-    """Process a single ligand for parallel screening."""
-    # Get configuration from global variable
-    config = _mp_config
-    output_path = config['output_path']
-    prepared_protein_file = config['prepared_protein_file']
-    screening_params = config['screening_params']
-    docking_params = config['docking_params']
-    hw_config = config['hw_config']
+def _summary_entry(result):
+    """Convert a worker or manifest result into an all_results entry."""
+    entry = {key: result[key] for key in ('file', 'score', 'runtime', 'status')}
+    for key in ('record', 'poses', 'error', 'stop_reason', 'generations', 'evaluations'):
+        if key in result:
+            entry[key] = result[key]
+    return entry
+
+
+def _load_screening_protein(protein_file, screening_params):
+    """Load the receptor and define its active site as configured."""
+    protein = Protein(protein_file)
     
-    ligand_name = Path(ligand_file).stem
-    ligand_output = output_path / ligand_name
-    ligand_output.mkdir(exist_ok=True)
+    # Configure active site if needed
+    if 'site' in screening_params:
+        site = screening_params['site']
+        radius = screening_params.get('radius', 10.0)
+        protein.define_active_site(site, radius)
+    elif screening_params.get('detect_pockets', False):
+        pockets = protein.detect_pockets()
+        if pockets:
+            protein.define_active_site(pockets[0]['center'], pockets[0]['radius'])
     
-    try:
-        # Create separate hybrid manager for each process
-        process_hybrid_manager = setup_hardware_acceleration(hw_config)
-        
-        # Load protein
-        protein = Protein(prepared_protein_file)
-        
-        # Configure active site if needed
-        if 'site' in screening_params:
-            site = screening_params['site']
-            radius = screening_params.get('radius', 10.0)
-            protein.define_active_site(site, radius)
-        elif screening_params.get('detect_pockets', False):
-            pockets = protein.detect_pockets()
-            if pockets:
-                protein.define_active_site(pockets[0]['center'], pockets[0]['radius'])
-        
-        # Process this ligand
-        start_time = time.time()
-        results = _dock_single_ligand(
-            protein=protein,
-            ligand_file=ligand_file,
-            output_dir=ligand_output,
-            hybrid_manager=process_hybrid_manager,
-            docking_params=docking_params
-        )
-        runtime = time.time() - start_time
-        
-        # Store best score
-        best_score = results[0][1] if results else float('inf')
-        status = "Success"
-        
-        # Clean up hybrid manager
-        process_hybrid_manager.cleanup()
-        
-        # Return results
-        return {
-            'name': ligand_name,
-            'file': ligand_file,
-            'score': best_score,
-            'runtime': runtime,
-            'status': status
-        }
-        
-    except Exception as e:
-        print(f"Error processing ligand {ligand_name}: {e}")
-        status = f"Error: {str(e)}"
-        runtime = time.time() - start_time if 'start_time' in locals() else 0
-        
-        # Return error information
-        return {
-            'name': ligand_name,
-            'file': ligand_file,
-            'score': float('inf'),
-            'runtime': runtime,
-            'status': status,
-            'error': str(e)
-        }
+    return protein
 
 
 def run_parallel(config):
@@ -246,106 +465,20 @@ def run_parallel(config):
     config : dict
         Configuration dictionary with the following keys:
         - protein: Path to protein PDB file
-        - ligand_library: Path to directory containing ligand files
+        - ligand_library: Path to directory containing ligand files, or to a
+          multi-record SDF/SMILES library file (optionally gzipped)
         - output_dir: Output directory for results
         - screening_params: Dictionary of screening parameters
         - n_processes: Number of parallel processes (default: CPU count)
+        - resume: True to continue the latest run of output_dir, or the
+          path of the output directory to continue (default: False)
     
     Returns:
     --------
     dict
         Dictionary of results with ligand filenames as keys
     """
-    global _mp_config
-    
-    # Extract configuration
-    protein_file = config.get('protein')
-    ligand_library = config.get('ligand_library')
-    output_dir = config.get('output_dir', 'screening_results')
-    screening_params = config.get('screening_params', {})
-    n_processes = config.get('n_processes', mp.cpu_count())
-    
-    # Verify inputs
-    if not protein_file or not os.path.exists(protein_file):
-        raise ValueError(f"Protein file not found: {protein_file}")
-    
-    if not ligand_library or not os.path.exists(ligand_library):
-        raise ValueError(f"Ligand library not found: {ligand_library}")
-    
-    # Create output directory
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_path = Path(f"{output_dir}_{timestamp}")
-    output_path.mkdir(parents=True, exist_ok=True)
-    
-    # Configure hardware
-    hw_config = _parse_hardware_config(screening_params.get('hardware', {}))
-    
-    # Prepare protein (done once for all ligands)
-    print(f"Preparing protein: {protein_file}")
-    prepared_protein_file = _prepare_protein_file(protein_file, screening_params, output_path)
-    
-    # Get list of ligand files
-    ligand_files = _get_ligand_files(ligand_library)
-    print(f"Found {len(ligand_files)} ligands for screening")
-    
-    # Create summary file
-    summary_file = output_path / "screening_summary.csv"
-    with open(summary_file, 'w', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow(['Ligand', 'Score', 'Runtime_s', 'Status'])
-    
-    # Prepare docking parameters
-    docking_params = _prepare_docking_params(screening_params)
-    
-    # Set up configuration for parallel processing
-    _mp_config = {
-        'output_path': output_path,
-        'prepared_protein_file': prepared_protein_file,
-        'screening_params': screening_params,
-        'docking_params': docking_params,
-        'hw_config': hw_config
-    }
-    
-    # Run parallel ligand processing
-    print(f"Starting batch screening of {len(ligand_files)} ligands using {n_processes} processes...")
-    
-    with mp.Pool(processes=n_processes) as pool:
-        results = list(tqdm(
-            pool.imap(_process_ligand_parallel, ligand_files),
-            total=len(ligand_files)
-        ))
-    
-    # Process results
-    all_results = {}
-    for result in results:
-        ligand_name = result['name']
-        
-        # Update summary file
-        with open(summary_file, 'a', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                ligand_name, 
-                result['score'] if result['status'] == "Success" else "N/A", 
-                f"{result['runtime']:.2f}", 
-                result['status']
-            ])
-        
-        # Add to results dictionary
-        all_results[ligand_name] = {
-            'file': result['file'],
-            'score': result['score'],
-            'runtime': result['runtime'],
-            'status': result['status']
-        }
-        
-        if 'error' in result:
-            all_results[ligand_name]['error'] = result['error']
-    
-    # Generate summary report and visualizations
-    _generate_summary_report(all_results, output_path)
-    
-    print(f"Batch screening completed. Results saved to: {output_path}")
-    return all_results
+    return _run_screening(config, config.get('n_processes', mp.cpu_count()))
 
 
 def _parse_hardware_config(hardware_params):
@@ -412,7 +545,15 @@ def _prepare_protein_file(protein_file, params, output_dir):
 
 
 def _get_ligand_files(ligand_library):
-    """Get list of ligand files from directory."""
+    """
+    Get the ligands to screen.
+    
+    A directory yields its ligand files; a multi-record SDF/SMILES library
+    file yields one LigandRecord per record (see ligand_library.LigandLibrary).
+    """
+    if os.path.isfile(ligand_library) and LigandLibrary.library_format(ligand_library):
+        return LigandLibrary(ligand_library).records()
+    
     # Get all potential ligand files
     extensions = ['*.mol', '*.mol2', '*.sdf', '*.pdb']
     ligand_files = []
@@ -436,28 +577,73 @@ def _prepare_docking_params(screening_params):
         'prepare_molecules': screening_params.get('prepare_molecules', True),
         'grid_spacing': screening_params.get('grid_spacing', 0.375),
         'grid_radius': screening_params.get('grid_radius', 10.0),
+        'use_grid': screening_params.get('use_grid', False),
+        'grid_cache_dir': screening_params.get('grid_cache_dir', None),
+        'conformer_cache': screening_params.get('conformer_cache', None),
     }
+    # Early termination of the genetic algorithm (most ligands converge early)
+    for key in GA_STOPPING_CRITERIA:
+        if screening_params.get(key) is not None:
+            docking_params[key] = screening_params[key]
     return docking_params
 
 
-def _dock_single_ligand(protein, ligand_file, output_dir, hybrid_manager, docking_params):
-    """Dock a single ligand against the protein target."""
-    # Prepare ligand
-    if docking_params.get('prepare_molecules', True):
-        prepared_file = output_dir / f"prepared_{Path(ligand_file).name}"
-        ligand_path = prepare_ligand(
-            ligand_file,
-            output_file=prepared_file
+def _create_screening_scoring_function(docking_params):
+    """Create the scoring function for a ligand job, with grid maps if requested."""
+    scoring_type = docking_params.get('scoring_function', 'enhanced')
+    scoring_function = create_optimized_scoring_function(scoring_type)
+    
+    if docking_params.get('use_grid', False):
+        from .grid_scoring import create_grid_scoring_function
+        scoring_function = create_grid_scoring_function(
+            scoring_function,
+            spacing=docking_params.get('grid_spacing', 0.375),
+            cache_dir=docking_params.get('grid_cache_dir')
         )
-    else:
-        ligand_path = ligand_file
     
-    # Load ligand
-    ligand = Ligand(ligand_path)
+    return scoring_function
+
+
+def _prepare_grid_maps(protein, docking_params):
+    """Populate the grid map cache for the receptor before ligands are docked."""
+    from .grid_scoring import GridScoringFunction
+    
+    scoring_function = _create_screening_scoring_function(docking_params)
+    if isinstance(scoring_function, GridScoringFunction):
+        print(f"Preparing receptor grid maps in {docking_params.get('grid_cache_dir')}")
+        start_time = time.time()
+        scoring_function.prepare(protein)
+        print(f"Grid maps ready in {time.time() - start_time:.1f} s")
+
+
+def _dock_single_ligand(protein, ligand_file, output_dir, hybrid_manager, docking_params, ligand=None,
+                        scoring_function=None, search_summary=None):
+    """
+    Dock a single ligand against the protein target.
     
-    # Set up scoring function
-    scoring_type = docking_params.get('scoring_function', 'enhanced')
-    scoring_function = create_optimized_scoring_function(scoring_type)
+    A ligand already parsed from a library record is passed as ligand and
+    docked as provided; otherwise ligand_file is prepared and loaded. A
+    scoring function set up by the caller is reused across ligands. If
+    search_summary is a dict, it is filled with the stop reason, generations
+    and evaluations reported by the search algorithm.
+    """
+    if ligand is None:
+        # Prepare ligand
+        if docking_params.get('prepare_molecules', True):
+            prepared_file = output_dir / f"prepared_{Path(ligand_file).name}"
+            ligand_path = prepare_ligand(
+                ligand_file,
+                output_file=prepared_file
+            )
+        else:
+            ligand_path = ligand_file
+        
+        # Load ligand
+        ligand = Ligand(ligand_path)
+    
+    # Set up scoring function (grid maps are memory-mapped from the cache)
+    if scoring_function is None:
+        scoring_function = _create_screening_scoring_function(docking_params)
     
     # Set up search algorithm
     algorithm_type = docking_params.get('algorithm', 'genetic')
@@ -474,6 +660,13 @@ def _dock_single_ligand(protein, ligand_file, output_dir, hybrid_manager, dockin
     if algorithm_type == 'genetic':
         algorithm_kwargs['population_size'] = docking_params.get('population_size', 100)
         algorithm_kwargs['mutation_rate'] = docking_params.get('mutation_rate', 0.2)
+        for key in GA_STOPPING_CRITERIA:
+            if docking_params.get(key) is not None:
+                algorithm_kwargs[key] = docking_params[key]
+    elif algorithm_type == 'pandadock' and docking_params.get('conformer_cache'):
+        # Ensembles are embedded the first time a ligand is seen and reused afterwards
+        from .conformer_store import ConformerStore
+        algorithm_kwargs['conformer_store'] = ConformerStore(docking_params['conformer_cache'])
     
     # Create search algorithm
     search_algorithm = create_optimized_search_algorithm(
@@ -498,6 +691,8 @@ def _dock_single_ligand(protein, ligand_file, output_dir, hybrid_manager, dockin
     else:
         # Single docking run
         results = search_algorithm.search(protein, ligand)
+        if search_summary is not None and getattr(search_algorithm, 'search_summary', None):
+            search_summary.update(search_algorithm.search_summary)
     
     # Apply local optimization to top poses if requested
     if docking_params.get('local_opt', False):
@@ -529,32 +724,18 @@ def _dock_single_ligand(protein, ligand_file, output_dir, hybrid_manager, dockin
     return results
 
 
-def _generate_summary_report(all_results, output_path):
-    """Generate summary report and visualizations from screening results."""
-    # Extract scores and runtimes
-    scores = []
-    runtimes = []
-    ligands = []
-    
-    for ligand_name, result in all_results.items():
-        if 'error' not in result:
-            scores.append(result['score'])
-            runtimes.append(result['runtime'])
-            ligands.append(ligand_name)
+def _generate_summary_report(results_store, output_path):
+    """Generate summary report and visualizations from the screening results store."""
+    # Write tabular report straight from the score index
+    report_file = output_path / "ranked_ligands.csv"
+    with open(report_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Rank', 'Ligand', 'Score', 'Runtime (s)'])
+        for i, (ligand, score, runtime, _) in enumerate(results_store.iter_ranked()):
+            writer.writerow([i+1, ligand, f"{score:.2f}", f"{runtime:.2f}"])
     
-    # Create a rank-ordered list
-    if scores:
-        data = list(zip(ligands, scores, runtimes))
-        ranked_data = sorted(data, key=lambda x: x[1])
-        
-        # Write tabular report
-        report_file = output_path / "ranked_ligands.csv"
-        with open(report_file, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(['Rank', 'Ligand', 'Score', 'Runtime (s)'])
-            for i, (ligand, score, runtime) in enumerate(ranked_data):
-                writer.writerow([i+1, ligand, f"{score:.2f}", f"{runtime:.2f}"])
-        
+    scores = results_store.scores()
+    if len(scores):
         # Create score distribution visualization
         plt.figure(figsize=(10, 6))
         plt.hist(scores, bins=20, alpha=0.7)
@@ -566,10 +747,11 @@ def _generate_summary_report(all_results, output_path):
         plt.close()
         
         # Create top compounds chart
-        top_n = min(20, len(ranked_data))
+        ranked_data = results_store.top(20)
+        top_n = len(ranked_data)
         plt.figure(figsize=(12, 8))
-        top_ligands = [x[0] for x in ranked_data[:top_n]]
-        top_scores = [x[1] for x in ranked_data[:top_n]]
+        top_ligands = [x[0] for x in ranked_data]
+        top_scores = [x[1] for x in ranked_data]
         
         y_pos = np.arange(len(top_ligands))
         plt.barh(y_pos, top_scores)
@@ -579,20 +761,10 @@ def _generate_summary_report(all_results, output_path):
         plt.tight_layout()
         plt.savefig(output_path / "top_compounds.png")
         plt.close()
-    
-    # Create runtime statistics
-    if runtimes:
-        avg_runtime = sum(runtimes) / len(runtimes)
-        total_runtime = sum(runtimes)
         
-        summary = {
-            "total_ligands": len(all_results),
-            "successful_dockings": len(scores),
-            "errors": len(all_results) - len(scores),
-            "average_runtime_per_ligand": avg_runtime,
-            "total_runtime": total_runtime,
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        }
+        # Create runtime statistics
+        summary = results_store.statistics()
+        summary["timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         # Save runtime stats
         with open(output_path / "screening_stats.json", 'w') as f:
@@ -612,7 +784,8 @@ class RapidPandaDock:
     """
     
     def __init__(self, scoring_function, exhaustiveness=8, num_modes=9, 
-                 max_evals=10000, rmsd_thresh=2.0, grid_spacing=0.375, grid_radius=10.0):
+                 max_evals=10000, rmsd_thresh=2.0, grid_spacing=0.375, grid_radius=10.0,
+                 conformer_store=None):
         """
         Initialize RapidPandaDock.
         
@@ -632,6 +805,10 @@ class RapidPandaDock:
             Spacing between grid points
         grid_radius : float
             Radius of the search sphere
+        conformer_store : ConformerStore, optional
+            Store of precomputed conformer ensembles; random poses are
+            drawn from the ligand's stored conformers as well as its input
+            conformation
         """
         self.scoring_function = scoring_function
         self.exhaustiveness = exhaustiveness
@@ -640,6 +817,7 @@ class RapidPandaDock:
         self.rmsd_thresh = rmsd_thresh
         self.grid_spacing = grid_spacing
         self.grid_radius = grid_radius
+        self.conformer_store = conformer_store
     
     def search(self, protein, ligand):
         """
@@ -680,62 +858,51 @@ class RapidPandaDock:
         n_failed = 0
         max_fail_ratio = 0.8  # If 80% of poses fail, adjust parameters
         
-        # Main search loop
-        for attempt in range(max_attempts):
-            # Create a copy of the ligand
-            pose = copy.deepcopy(ligand)
-            
-            # Get ligand centroid
-            centroid = np.mean(pose.xyz, axis=0)
-            
-            # Generate random position in a sphere (uniform distribution)
-            r = radius * np.random.random() ** (1.0 / 3.0)  # Cube root for uniformity
-            theta = np.random.uniform(0, 2 * np.pi)
-            phi = np.random.uniform(0, np.pi)
-            
-            # Calculate random point coordinates
-            x = center[0] + r * np.sin(phi) * np.cos(theta)
-            y = center[1] + r * np.sin(phi) * np.sin(theta)
-            z = center[2] + r * np.cos(phi)
-            
-            # Translate ligand to new position
-            translation = np.array([x, y, z]) - centroid
-            pose.translate(translation)
-            
-            # Apply random rotation
-            rotation = Rotation.random()
-            rotation_matrix = rotation.as_matrix()
-            
-            centroid = np.mean(pose.xyz, axis=0)
-            pose.translate(-centroid)
-            pose.rotate(rotation_matrix)
-            pose.translate(centroid)
-            
-            # Check for steric clashes first (fast pre-filter)
-            if detect_steric_clash(protein.atoms, pose.atoms):
-                n_failed += 1
-                # If too many failures, try expanding search space
-                if n_failed / (attempt + 1) > max_fail_ratio:
-                    radius *= 1.2  # Expand radius by 20%
-                    n_failed = 0  # Reset counter
-                    print(f"Expanding search radius to {radius:.2f}Å due to high clash rate")
-                continue
+        # Clash-free poses waiting to be scored
+        pending = []
+        
+        # Conformations random poses start from
+        templates = [ligand]
+        if self.conformer_store is not None and getattr(ligand, 'rdmol', None) is not None:
+            templates.extend(self.conformer_store.conformers(ligand))
+        
+        # Main search loop, in blocks of attempts that are clash-checked together
+        block_size = 100
+        for block_start in range(0, max_attempts, block_size):
+            attempts = range(block_start, min(block_start + block_size, max_attempts))
+            candidates = [self._random_pose(templates[np.random.randint(len(templates))], center, radius)
+                          for _ in attempts]
             
-            # Score the pose
-            score = self.scoring_function.score(protein, pose)
+            # Check for steric clashes first (fast batched pre-filter)
+            clashes = detect_steric_clash_batch(
+                protein.atoms, np.stack([pose.xyz for pose in candidates]))
             
-            # Add to results
-            poses.append((pose, score))
+            for attempt, pose, clash in zip(attempts, candidates, clashes):
+                if clash:
+                    n_failed += 1
+                    # If too many failures, try expanding search space
+                    if n_failed / (attempt + 1) > max_fail_ratio:
+                        radius *= 1.2  # Expand radius by 20%
+                        n_failed = 0  # Reset counter
+                        print(f"Expanding search radius to {radius:.2f}Å due to high clash rate")
+                else:
+                    pending.append(pose)
             
             # Progress reporting
-            if (attempt + 1) % 100 == 0:
+            if attempts.stop % 100 == 0:
+                # Score the accepted poses of this block in one batch
+                poses.extend(self._score_poses(protein, pending))
+                pending = []
+                
                 n_unique = self._count_unique_clusters(poses)
-                print(f"Evaluated {attempt + 1}/{max_attempts} poses, found {n_unique} unique clusters")
+                print(f"Evaluated {attempts.stop}/{max_attempts} poses, found {n_unique} unique clusters")
                 
                 # Early termination if we have enough unique poses
                 if n_unique >= self.num_modes * 2:
                     break
         
+        poses.extend(self._score_poses(protein, pending))
+        
         # Sort by score
         poses.sort(key=lambda x: x[1])
         
@@ -745,6 +912,77 @@ class RapidPandaDock:
         # Return top N poses after clustering
         return clustered_poses[:self.num_modes]
     
+    def _random_pose(self, ligand, center, radius):
+        """
+        Place a copy of the ligand at a random point and orientation in a sphere.
+        
+        Parameters:
+        -----------
+        ligand : Ligand
+            Ligand object
+        center : array-like
+            Center of the search sphere
+        radius : float
+            Radius of the search sphere (Å)
+        
+        Returns:
+        --------
+        Ligand
+            Randomly placed pose
+        """
+        # Create a copy of the ligand
+        pose = copy.deepcopy(ligand)
+        
+        # Get ligand centroid
+        centroid = np.mean(pose.xyz, axis=0)
+        
+        # Generate random position in a sphere (uniform distribution)
+        r = radius * np.random.random() ** (1.0 / 3.0)  # Cube root for uniformity
+        theta = np.random.uniform(0, 2 * np.pi)
+        phi = np.random.uniform(0, np.pi)
+        
+        # Calculate random point coordinates
+        x = center[0] + r * np.sin(phi) * np.cos(theta)
+        y = center[1] + r * np.sin(phi) * np.sin(theta)
+        z = center[2] + r * np.cos(phi)
+        
+        # Translate ligand to new position
+        translation = np.array([x, y, z]) - centroid
+        pose.translate(translation)
+        
+        # Apply random rotation
+        rotation = Rotation.random()
+        rotation_matrix = rotation.as_matrix()
+        
+        centroid = np.mean(pose.xyz, axis=0)
+        pose.translate(-centroid)
+        pose.rotate(rotation_matrix)
+        pose.translate(centroid)
+        
+        return pose
+    
+    def _score_poses(self, protein, poses):
+        """
+        Score poses of the same ligand in one batched call.
+        
+        Parameters:
+        -----------
+        protein : Protein
+            Protein object
+        poses : list
+            Ligand poses sharing one topology
+        
+        Returns:
+        --------
+        list
+            List of (pose, score) tuples
+        """
+        if not poses:
+            return []
+        coords = np.stack([pose.xyz for pose in poses])
+        scores = self.scoring_function.score_batch(protein, poses[0], coords)
+        return [(pose, float(score)) for pose, score in zip(poses, scores)]
+    
     def _count_unique_clusters(self, poses, quick=True):
         """
         Count the number of unique conformational clusters in a set of poses.
@@ -939,34 +1177,40 @@ def run_virtual_screening(protein_file, ligand_dir, output_dir, **kwargs):
             radius = 15.0
             protein.define_active_site(center, radius)
     
-    # Find ligand files
-    ligand_pattern = os.path.join(ligand_dir, "*.*")
-    ligand_files = []
-    
-    # Support multiple formats
-    for ext in ['.mol', '.mol2', '.sdf', '.pdb']:
-        ligand_files.extend(glob.glob(os.path.join(ligand_dir, f"*{ext}")))
-    
-    if not ligand_files:
-        logger.error(f"No ligand files found in {ligand_dir}")
-        return None
-    
-    logger.info(f"Found {len(ligand_files)} ligand files")
-    
-    # Load ligands
-    ligands = []
-    ligand_names = []
-    
-    for ligand_file in ligand_files:
-        try:
-            ligand = Ligand(ligand_file)
-            ligand_name = Path(ligand_file).stem
-            ligands.append(ligand)
-            ligand_names.append(ligand_name)
-        except Exception as e:
-            logger.error(f"Error loading ligand {ligand_file}: {e}")
-    
-    logger.info(f"Successfully loaded {len(ligands)} ligands")
+    # A multi-record library file is streamed; a directory holds one file per ligand
+    if os.path.isfile(ligand_dir) and LigandLibrary.library_format(ligand_dir):
+        ligands = LigandLibrary(ligand_dir)
+        ligand_names = None
+        logger.info(f"Found {len(ligands)} ligands in library {ligand_dir}")
+    else:
+        # Find ligand files
+        ligand_pattern = os.path.join(ligand_dir, "*.*")
+        ligand_files = []
+        
+        # Support multiple formats
+        for ext in ['.mol', '.mol2', '.sdf', '.pdb']:
+            ligand_files.extend(glob.glob(os.path.join(ligand_dir, f"*{ext}")))
+        
+        if not ligand_files:
+            logger.error(f"No ligand files found in {ligand_dir}")
+            return None
+        
+        logger.info(f"Found {len(ligand_files)} ligand files")
+        
+        # Load ligands
+        ligands = []
+        ligand_names = []
+        
+        for ligand_file in ligand_files:
+            try:
+                ligand = Ligand(ligand_file)
+                ligand_name = Path(ligand_file).stem
+                ligands.append(ligand)
+                ligand_names.append(ligand_name)
+            except Exception as e:
+                logger.error(f"Error loading ligand {ligand_file}: {e}")
+        
+        logger.info(f"Successfully loaded {len(ligands)} ligands")
     
     # Set up virtual screening manager
     vs_manager = VirtualScreeningManager(
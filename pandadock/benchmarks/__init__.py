@@ -0,0 +1,19 @@
+"""
+PandaDock benchmark suite.
+
+Measures scoring, search, pocket detection and screening throughput on
+fixed fixtures and compares the results against a stored baseline:
+
+    python -m pandadock.benchmarks run -o results.json
+    python -m pandadock.benchmarks run -o results.json --baseline baseline.json
+    python -m pandadock.benchmarks compare results.json baseline.json
+"""
+
+from .suite import (
+    BENCHMARK_GROUPS,
+    run_benchmarks,
+    compare_results,
+    format_comparison,
+    save_results,
+    load_results,
+)
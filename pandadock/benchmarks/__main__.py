@@ -0,0 +1,84 @@
+"""
+Command-line interface of the PandaDock benchmark suite.
+
+Exits with status 1 when a run is compared against a baseline and at
+least one benchmark regressed beyond the tolerance.
+"""
+
+import argparse
+import sys
+
+from .suite import (
+    BENCHMARK_GROUPS,
+    run_benchmarks,
+    compare_results,
+    format_comparison,
+    save_results,
+    load_results,
+)
+
+
+def parse_arguments(argv=None):
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(prog="python -m pandadock.benchmarks",
+                                     description="PandaDock performance benchmarks")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Run benchmarks and write a JSON report')
+    run_parser.add_argument('-o', '--output', default='benchmark_results.json',
+                            help='JSON report to write (default: benchmark_results.json)')
+    run_parser.add_argument('-g', '--groups', nargs='+', choices=BENCHMARK_GROUPS,
+                            default=list(BENCHMARK_GROUPS),
+                            help='Benchmark groups to run (default: all)')
+    run_parser.add_argument('--scoring-classes', nargs='+',
+                            help='Scoring function classes to measure (default: all)')
+    run_parser.add_argument('--quick', action='store_true',
+                            help='Small workloads for a fast smoke run')
+    run_parser.add_argument('--cpu-workers', type=int, default=1,
+                            help='Worker processes of the screening benchmark (default: 1)')
+    run_parser.add_argument('--baseline',
+                            help='Baseline report to compare the new results against')
+    run_parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Allowed relative slowdown before a regression (default: 0.2)')
+    run_parser.add_argument('--verbose', action='store_true',
+                            help='Show the output of the benchmarked code')
+
+    compare_parser = commands.add_parser('compare', help='Compare a report against a baseline')
+    compare_parser.add_argument('results', help='JSON report of the run under test')
+    compare_parser.add_argument('baseline', help='Baseline JSON report')
+    compare_parser.add_argument('--tolerance', type=float, default=0.2,
+                                help='Allowed relative slowdown before a regression (default: 0.2)')
+
+    return parser.parse_args(argv)
+
+
+def _report_comparison(results, baseline_file, tolerance):
+    """Print the comparison with a baseline and return the exit status."""
+    comparison = compare_results(results, load_results(baseline_file), tolerance)
+    print(f"\nComparison with baseline {baseline_file}:")
+    print(format_comparison(comparison, tolerance))
+    return 1 if any(entry['regression'] for entry in comparison) else 0
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+
+    if args.command == 'compare':
+        return _report_comparison(load_results(args.results), args.baseline, args.tolerance)
+
+    report = run_benchmarks(groups=args.groups, quick=args.quick,
+                            scoring_classes=args.scoring_classes,
+                            n_processes=args.cpu_workers, verbose=args.verbose)
+    save_results(report, args.output)
+
+    for name, result in sorted(report['results'].items()):
+        print(f"{name:<52} {result['value']:12.4g} {result['unit']}")
+    print(f"Benchmark report saved to {args.output}")
+
+    if args.baseline:
+        return _report_comparison(report, args.baseline, args.tolerance)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,500 @@
+"""
+Throughput benchmarks for PandaDock.
+
+Every benchmark runs on the fixtures shipped in pandadock/benchmarks/data:
+
+- receptor.pdb: the residues of the test receptor within 14 Å of the
+  reference ligand (small enough for pocket detection to run quickly)
+- ligand.sdf: the reference ligand in its binding pose
+- library.sdf: a four-record screening library
+
+Results are collected as {name: measurement} where a measurement records
+its 'value', 'unit' and whether higher values are better, so two result
+files can be compared without knowing what each benchmark measures.
+"""
+
+import contextlib
+import io
+import json
+import multiprocessing as mp
+import platform
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+from scipy.spatial.transform import Rotation
+
+# Fixture files shipped with the package
+DATA_DIR = Path(__file__).resolve().parent / "data"
+RECEPTOR_FILE = DATA_DIR / "receptor.pdb"
+LIGAND_FILE = DATA_DIR / "ligand.sdf"
+LIBRARY_FILE = DATA_DIR / "library.sdf"
+
+BENCHMARK_GROUPS = ('scoring', 'search', 'pockets', 'screening')
+
+
+def measurement(value, unit, higher_is_better=True, **details):
+    """
+    Result of one benchmark.
+
+    Parameters:
+    -----------
+    value : float
+        Measured value
+    unit : str
+        Unit of the value (e.g. 'poses/s')
+    higher_is_better : bool
+        Whether larger values are improvements
+    **details
+        Extra information stored with the result (counts, raw times)
+
+    Returns:
+    --------
+    dict
+        Measurement with 'value', 'unit', 'higher_is_better' and the details
+    """
+    result = {'value': float(value), 'unit': unit, 'higher_is_better': bool(higher_is_better)}
+    result.update(details)
+    return result
+
+
+def best_time(function, repeat=3):
+    """Shortest wall-clock time (s) of repeat calls to function."""
+    times = []
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+@contextlib.contextmanager
+def _quiet(verbose):
+    """Silence the progress output of the code under test unless verbose."""
+    if verbose:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        yield
+
+
+def _seed(seed):
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+def load_fixtures(radius=10.0):
+    """
+    Load the benchmark receptor and ligand.
+
+    The active site is centered on the reference ligand, so no pocket
+    detection runs while the fixtures are loaded.
+
+    Parameters:
+    -----------
+    radius : float
+        Active site radius (Angstroms)
+
+    Returns:
+    --------
+    tuple
+        (protein, ligand)
+    """
+    from ..ligand import Ligand
+    from ..protein import Protein
+
+    ligand = Ligand(str(LIGAND_FILE))
+    center = tuple(float(x) for x in ligand.xyz.mean(axis=0))
+    protein = Protein(str(RECEPTOR_FILE), grid_center=center)
+    protein.define_active_site(center, radius)
+    return protein, ligand
+
+
+def random_poses(ligand, n_poses, seed=0, max_translation=2.0, max_angle=np.pi):
+    """
+    Rigid-body perturbations of a ligand around its current pose.
+
+    Parameters:
+    -----------
+    ligand : Ligand
+        Reference pose
+    n_poses : int
+        Number of poses
+    seed : int
+        Random seed
+    max_translation : float
+        Maximum displacement of the centroid per axis (Angstroms)
+    max_angle : float
+        Maximum rotation angle about the centroid (radians)
+
+    Returns:
+    --------
+    numpy.ndarray
+        Pose coordinates, shape (n_poses, N, 3)
+    """
+    rng = np.random.default_rng(seed)
+    center = ligand.xyz.mean(axis=0)
+    axes = rng.normal(size=(n_poses, 3))
+    axes /= np.linalg.norm(axes, axis=1)[:, None]
+    rotations = Rotation.from_rotvec(axes * rng.uniform(0.0, max_angle, size=(n_poses, 1)))
+    shifts = rng.uniform(-max_translation, max_translation, size=(n_poses, 3))
+    return np.array([rotation.apply(ligand.xyz - center) + center + shift
+                     for rotation, shift in zip(rotations, shifts)])
+
+
+def scoring_function_classes():
+    """
+    Concrete ScoringFunction classes of pandadock.unified_scoring.
+
+    Returns:
+    --------
+    dict
+        Class name -> class, for every subclass that implements score()
+    """
+    from .. import unified_scoring
+    from ..unified_scoring import ScoringFunction
+
+    classes = {}
+    pending = list(ScoringFunction.__subclasses__())
+    while pending:
+        cls = pending.pop(0)
+        pending.extend(cls.__subclasses__())
+        if cls.__module__ == unified_scoring.__name__ and cls.score is not ScoringFunction.score:
+            classes[cls.__name__] = cls
+    return classes
+
+
+def benchmark_scoring(protein, ligand, n_poses=20, repeat=3, classes=None, verbose=False):
+    """
+    Poses scored per second by every scoring function.
+
+    Each class is measured pose by pose with score() and, for the same
+    poses, with score_batch(). GridScoringFunction is measured on top of
+    VectorizedScoringFunction maps, with the map build time reported
+    separately.
+
+    Parameters:
+    -----------
+    protein : Protein
+        Receptor with an active site
+    ligand : Ligand
+        Reference ligand
+    n_poses : int
+        Number of poses scored per run
+    repeat : int
+        Runs per measurement (the fastest is kept)
+    classes : list, optional
+        Names of the classes to measure (default: all)
+
+    Returns:
+    --------
+    dict
+        Measurements keyed 'scoring/<class>/<method>'
+    """
+    from ..grid_scoring import GridScoringFunction
+    from ..unified_scoring import VectorizedScoringFunction
+
+    coords = random_poses(ligand, n_poses)
+    pose = ligand.copy()
+
+    def score_each(scoring_function):
+        for pose_coords in coords:
+            pose.xyz[...] = pose_coords
+            scoring_function.score(protein, pose)
+
+    factories = dict(scoring_function_classes())
+    factories['GridScoringFunction'] = lambda: GridScoringFunction(VectorizedScoringFunction())
+    if classes:
+        factories = {name: factory for name, factory in factories.items() if name in classes}
+
+    results = {}
+    for name, factory in factories.items():
+        with _quiet(verbose):
+            scoring_function = factory()
+            if isinstance(scoring_function, GridScoringFunction):
+                prepare_time = best_time(lambda: scoring_function.prepare(protein), repeat=1)
+                results[f"scoring/{name}/prepare"] = measurement(prepare_time, 's', higher_is_better=False)
+            # One untimed call builds per-receptor caches
+            scoring_function.score(protein, pose)
+            score_time = best_time(lambda: score_each(scoring_function), repeat)
+            batch_time = best_time(lambda: scoring_function.score_batch(protein, ligand, coords), repeat)
+        results[f"scoring/{name}/score"] = measurement(
+            n_poses / score_time, 'poses/s', poses=n_poses, seconds=score_time)
+        results[f"scoring/{name}/score_batch"] = measurement(
+            n_poses / batch_time, 'poses/s', poses=n_poses, seconds=batch_time)
+    return results
+
+
+def benchmark_search(protein, ligand, generations=5, population_size=20, random_iterations=200,
+                     mc_steps=200, scoring_function=None, seed=0, verbose=False):
+    """
+    Throughput of the genetic algorithm, random search and Monte Carlo sampling.
+
+    Parameters:
+    -----------
+    protein : Protein
+        Receptor with an active site
+    ligand : Ligand
+        Ligand to dock
+    generations : int
+        Genetic algorithm generations
+    population_size : int
+        Genetic algorithm population size
+    random_iterations : int
+        Random search iterations
+    mc_steps : int
+        Monte Carlo steps
+    scoring_function : ScoringFunction, optional
+        Scoring function used by every search (default:
+        VectorizedScoringFunction)
+    seed : int
+        Random seed set before every search
+
+    Returns:
+    --------
+    dict
+        Measurements keyed 'search/<algorithm>'
+    """
+    from ..physics import MonteCarloSampling
+    from ..search import GeneticAlgorithm, RandomSearch
+    from ..unified_scoring import VectorizedScoringFunction
+
+    with _quiet(verbose):
+        scoring_function = scoring_function or VectorizedScoringFunction()
+        scoring_function.score(protein, ligand)
+
+        runs = [
+            ('GeneticAlgorithm', generations, 'generations/s',
+             lambda: GeneticAlgorithm(scoring_function, max_iterations=generations,
+                                      population_size=population_size).search(protein, ligand)),
+            ('RandomSearch', random_iterations, 'iterations/s',
+             lambda: RandomSearch(scoring_function, max_iterations=random_iterations).search(protein, ligand)),
+            ('MonteCarloSampling', mc_steps, 'steps/s',
+             lambda: MonteCarloSampling(scoring_function, n_steps=mc_steps).run_sampling(protein, ligand)),
+        ]
+
+        results = {}
+        for name, count, unit, run in runs:
+            _seed(seed)
+            seconds = best_time(run, repeat=1)
+            results[f"search/{name}"] = measurement(count / seconds, unit, count=count, seconds=seconds)
+    return results
+
+
+def benchmark_pockets(repeat=1, verbose=False):
+    """
+    Pocket detection time on the benchmark receptor.
+
+    Returns:
+    --------
+    dict
+        Measurement 'pockets/detect_pockets' in seconds
+    """
+    from ..protein import Protein
+
+    with _quiet(verbose):
+        protein = Protein(str(RECEPTOR_FILE), grid_center=(0.0, 0.0, 0.0))
+        seconds = best_time(protein.detect_pockets, repeat)
+    return {'pockets/detect_pockets': measurement(
+        seconds, 's', higher_is_better=False, atoms=len(protein.atoms))}
+
+
+def benchmark_screening(iterations=20, algorithm='random', n_processes=1, scoring_function='enhanced',
+                        verbose=False):
+    """
+    Ligands screened per hour by batch_screening on the fixture library.
+
+    Parameters:
+    -----------
+    iterations : int
+        Search iterations per ligand
+    algorithm : str
+        Search algorithm used for every ligand
+    n_processes : int
+        Screening worker processes
+    scoring_function : str
+        Scoring function type
+
+    Returns:
+    --------
+    dict
+        Measurement 'screening/batch_screening' in successfully docked
+        ligands per hour, with the number of failed ligands as 'failures'
+    """
+    from ..batch_screening import run
+    from ..ligand import Ligand
+
+    with _quiet(verbose):
+        reference = Ligand(str(LIGAND_FILE))
+    workdir = Path(tempfile.mkdtemp(prefix="pandadock_benchmark_"))
+    try:
+        # The library index is written next to the library, so screen a copy
+        library = Path(shutil.copy(LIBRARY_FILE, workdir / LIBRARY_FILE.name))
+        config = {
+            'protein': str(RECEPTOR_FILE),
+            'ligand_library': str(library),
+            'output_dir': str(workdir / "screening"),
+            'n_processes': n_processes,
+            'screening_params': {
+                'algorithm': algorithm,
+                'iterations': iterations,
+                'population_size': 10,
+                'scoring_function': scoring_function,
+                'prepare_molecules': False,
+                'site': [float(x) for x in reference.xyz.mean(axis=0)],
+                'radius': 10.0,
+            },
+        }
+        with _quiet(verbose):
+            start = time.perf_counter()
+            results = run(config)
+            seconds = time.perf_counter() - start
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    # Ligands that failed to dock do not count towards the throughput
+    n_ligands = sum(1 for result in results.values() if result.get('status') == "Success")
+    return {'screening/batch_screening': measurement(
+        3600.0 * n_ligands / seconds, 'ligands/h', ligands=n_ligands,
+        failures=len(results) - n_ligands, seconds=seconds, n_processes=n_processes)}
+
+
+def run_benchmarks(groups=BENCHMARK_GROUPS, quick=False, scoring_classes=None, n_processes=1,
+                   verbose=False):
+    """
+    Run benchmark groups on the shipped fixtures.
+
+    Parameters:
+    -----------
+    groups : iterable
+        Any of 'scoring', 'search', 'pockets' and 'screening'
+    quick : bool
+        Use small workloads (for smoke tests; the numbers are noisier)
+    scoring_classes : list, optional
+        Scoring function classes to measure (default: all)
+    n_processes : int
+        Worker processes of the screening benchmark
+    verbose : bool
+        Show the output of the code under test
+
+    Returns:
+    --------
+    dict
+        {'metadata': {...}, 'results': {name: measurement}}
+    """
+    from .. import __version__
+
+    unknown = set(groups) - set(BENCHMARK_GROUPS)
+    if unknown:
+        raise ValueError(f"Unknown benchmark groups: {', '.join(sorted(unknown))}")
+
+    results = {}
+    protein, ligand = None, None
+    if 'scoring' in groups or 'search' in groups:
+        with _quiet(verbose):
+            protein, ligand = load_fixtures()
+
+    if 'scoring' in groups:
+        print("Benchmarking scoring functions...")
+        results.update(benchmark_scoring(protein, ligand, n_poses=5 if quick else 20,
+                                         repeat=1 if quick else 3, classes=scoring_classes,
+                                         verbose=verbose))
+    if 'search' in groups:
+        print("Benchmarking search algorithms...")
+        results.update(benchmark_search(protein, ligand,
+                                        generations=2 if quick else 5,
+                                        population_size=10 if quick else 20,
+                                        random_iterations=20 if quick else 200,
+                                        mc_steps=20 if quick else 200,
+                                        verbose=verbose))
+    if 'pockets' in groups:
+        print("Benchmarking pocket detection...")
+        results.update(benchmark_pockets(verbose=verbose))
+    if 'screening' in groups:
+        print("Benchmarking batch screening...")
+        results.update(benchmark_screening(iterations=5 if quick else 20, n_processes=n_processes,
+                                           verbose=verbose))
+
+    metadata = {
+        'pandadock_version': __version__,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': mp.cpu_count(),
+        'numpy': np.__version__,
+        'quick': bool(quick),
+        'groups': list(groups),
+    }
+    return {'metadata': metadata, 'results': results}
+
+
+def save_results(report, path):
+    """Write a benchmark report as JSON."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    """Read a benchmark report written by save_results."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare_results(current, baseline, tolerance=0.2):
+    """
+    Compare a benchmark report against a baseline report.
+
+    Parameters:
+    -----------
+    current : dict
+        Report of the run under test
+    baseline : dict
+        Stored baseline report
+    tolerance : float
+        Relative slowdown allowed before a benchmark counts as a regression
+
+    Returns:
+    --------
+    list
+        One dict per benchmark present in both reports with 'name',
+        'baseline', 'current', 'unit', 'change' (relative, positive is an
+        improvement) and 'regression'; missing benchmarks are reported with
+        'current' None
+    """
+    current_results = current.get('results', current)
+    comparison = []
+    for name, reference in sorted(baseline.get('results', baseline).items()):
+        entry = {'name': name, 'baseline': reference['value'], 'unit': reference['unit'],
+                 'current': None, 'change': None, 'regression': False}
+        if name in current_results:
+            value = current_results[name]['value']
+            entry['current'] = value
+            if reference['value'] > 0 and value > 0:
+                # Speed-up factor, inverted for lower-is-better measurements
+                ratio = value / reference['value']
+                if not reference.get('higher_is_better', True):
+                    ratio = 1.0 / ratio
+                entry['change'] = ratio - 1.0
+                entry['regression'] = ratio < 1.0 - tolerance
+        comparison.append(entry)
+    return comparison
+
+
+def format_comparison(comparison, tolerance=0.2):
+    """Human-readable table of compare_results output."""
+    lines = [f"{'Benchmark':<52} {'Baseline':>12} {'Current':>12} {'Change':>8}  Unit"]
+    for entry in comparison:
+        current = 'missing' if entry['current'] is None else f"{entry['current']:12.4g}"
+        change = '' if entry['change'] is None else f"{100.0 * entry['change']:+7.1f}%"
+        flag = '  REGRESSION' if entry['regression'] else ''
+        lines.append(f"{entry['name']:<52} {entry['baseline']:12.4g} {current:>12} {change:>8}  "
+                     f"{entry['unit']}{flag}")
+    n_regressions = sum(entry['regression'] for entry in comparison)
+    lines.append(f"{n_regressions} regression(s) beyond {100.0 * tolerance:.0f}% tolerance")
+    return "\n".join(lines)
@@ -0,0 +1,318 @@
+"""
+Persistent conformer ensembles for PandaDock ligands.
+
+Generating conformers with RDKit's ETKDG is one of the more expensive
+per-ligand steps, and in screening campaigns the same ligand is docked
+repeatedly (against several targets or with different parameters).
+ConformerStore keeps each ensemble as a compact float32 block on disk,
+keyed by the molecule (InChIKey and canonical SMILES with explicit atoms)
+and the generation parameters, so an ensemble is embedded once and then
+reused by every docking run.
+
+Coordinates are stored in canonical atom order, so the same molecule read
+from differently ordered files maps onto the same ensemble.
+"""
+
+import hashlib
+import json
+import multiprocessing as mp
+from pathlib import Path
+import numpy as np
+from scipy.spatial.transform import Rotation
+
+from .atomic_io import atomic_write
+
+
+def _molecule_identity(mol):
+    """Canonical SMILES (all atoms explicit) and InChIKey of a molecule."""
+    from rdkit import Chem
+
+    smiles = Chem.MolToSmiles(mol, allHsExplicit=True)
+    try:
+        inchikey = Chem.MolToInchiKey(mol)
+    except Exception:
+        inchikey = ''
+    return smiles, inchikey
+
+
+def _canonical_ranks(mol):
+    """Canonical rank of every atom (ties broken), used to reorder coordinates."""
+    from rdkit import Chem
+    return np.array(list(Chem.CanonicalRankAtoms(mol, breakTies=True)), dtype=int)
+
+
+def _superimpose(coords, reference):
+    """Rigidly align coordinates onto reference coordinates (Kabsch)."""
+    center = coords.mean(axis=0)
+    reference_center = reference.mean(axis=0)
+    rotation, _ = Rotation.align_vectors(reference - reference_center, coords - center)
+    return rotation.apply(coords - center) + reference_center
+
+
+def embed_conformers(mol, n_conformers=10, random_seed=42, prune_rms=0.5, max_attempts=1000):
+    """
+    Embed a conformer ensemble for a molecule with ETKDG.
+
+    The atoms of the molecule are kept as they are (no hydrogens are added
+    or removed), so the coordinates line up with a Ligand built from it.
+
+    Parameters:
+    -----------
+    mol : rdkit.Chem.Mol
+        Molecule
+    n_conformers : int
+        Number of conformers to embed
+    random_seed : int
+        ETKDG random seed
+    prune_rms : float
+        RMSD (Å) below which conformers are considered duplicates
+    max_attempts : int
+        Maximum number of embedding attempts
+
+    Returns:
+    --------
+    numpy.ndarray
+        Conformer coordinates, shape (C, N, 3); C may be smaller than
+        n_conformers after pruning, or 0 if embedding failed
+    """
+    from rdkit import Chem
+    from rdkit.Chem import AllChem
+
+    mol = Chem.Mol(mol)
+    mol.RemoveAllConformers()
+
+    params = AllChem.ETKDGv3()
+    params.randomSeed = random_seed
+    params.pruneRmsThresh = prune_rms
+    params.maxIterations = max_attempts
+    conf_ids = list(AllChem.EmbedMultipleConfs(mol, numConfs=n_conformers, params=params))
+
+    coords = np.zeros((len(conf_ids), mol.GetNumAtoms(), 3))
+    for i, conf_id in enumerate(conf_ids):
+        coords[i] = mol.GetConformer(conf_id).GetPositions()
+    return coords
+
+
+def _embed_job(job):
+    """Worker entry point of ConformerStore.populate."""
+    key, mol, params = job
+    try:
+        coords = embed_conformers(mol, **params)
+    except Exception as e:
+        print(f"Conformer generation failed for {key}: {e}")
+        coords = np.zeros((0, mol.GetNumAtoms(), 3))
+    return key, mol, coords
+
+
+class ConformerStore:
+    """
+    Directory of precomputed conformer ensembles.
+
+    Every ensemble is a float32 array of shape (C, N, 3) saved as
+    '<key>.npy', where the key combines the molecule's InChIKey with a
+    digest of its canonical SMILES and the generation parameters.
+    """
+
+    def __init__(self, directory, n_conformers=10, random_seed=42, prune_rms=0.5, max_attempts=1000):
+        """
+        Open (or create) a conformer store.
+
+        Parameters:
+        -----------
+        directory : str or Path
+            Store directory
+        n_conformers : int
+            Number of conformers embedded per molecule
+        random_seed : int
+            ETKDG random seed
+        prune_rms : float
+            RMSD (Å) below which conformers are considered duplicates
+        max_attempts : int
+            Maximum number of embedding attempts
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.params = {
+            'n_conformers': int(n_conformers),
+            'random_seed': int(random_seed),
+            'prune_rms': float(prune_rms),
+            'max_attempts': int(max_attempts),
+        }
+
+    def key(self, mol):
+        """
+        Store key of a molecule under the store's generation parameters.
+
+        Parameters:
+        -----------
+        mol : rdkit.Chem.Mol or Ligand
+            Molecule (a Ligand is keyed by its RDKit molecule)
+
+        Returns:
+        --------
+        str
+            Key used as the file name of the ensemble
+        """
+        mol = self._rdmol(mol)
+        smiles, inchikey = _molecule_identity(mol)
+        digest = hashlib.sha1(
+            json.dumps([smiles, self.params], sort_keys=True).encode()
+        ).hexdigest()[:16]
+        return f"{inchikey}-{digest}" if inchikey else digest
+
+    def __contains__(self, mol):
+        return self._path(self.key(mol)).exists()
+
+    def get(self, mol):
+        """
+        Load the stored ensemble of a molecule.
+
+        Parameters:
+        -----------
+        mol : rdkit.Chem.Mol or Ligand
+            Molecule
+
+        Returns:
+        --------
+        numpy.ndarray or None
+            Coordinates in the molecule's atom order, shape (C, N, 3), or
+            None if the ensemble has not been generated yet
+        """
+        mol = self._rdmol(mol)
+        path = self._path(self.key(mol))
+        if not path.exists():
+            return None
+        block = np.load(path)
+        # Canonical order back to the atom order of this molecule
+        return block[:, _canonical_ranks(mol)].astype(float)
+
+    def put(self, mol, coords):
+        """
+        Store an ensemble of a molecule.
+
+        Parameters:
+        -----------
+        mol : rdkit.Chem.Mol or Ligand
+            Molecule
+        coords : array-like
+            Coordinates in the molecule's atom order, shape (C, N, 3)
+        """
+        mol = self._rdmol(mol)
+        coords = np.asarray(coords, dtype=np.float32).reshape(-1, mol.GetNumAtoms(), 3)
+        block = np.empty_like(coords)
+        block[:, _canonical_ranks(mol)] = coords
+        self._save(self.key(mol), block)
+
+    def ensemble(self, mol):
+        """
+        Stored ensemble of a molecule, embedding and storing it if missing.
+
+        A failed embedding (no conformers) is returned but not stored.
+
+        Parameters:
+        -----------
+        mol : rdkit.Chem.Mol or Ligand
+            Molecule
+
+        Returns:
+        --------
+        numpy.ndarray
+            Coordinates in the molecule's atom order, shape (C, N, 3)
+        """
+        coords = self.get(mol)
+        if coords is None:
+            coords = embed_conformers(self._rdmol(mol), **self.params)
+            if len(coords):
+                self.put(mol, coords)
+        return coords
+
+    def conformers(self, ligand, max_conformers=None):
+        """
+        Poses of a ligand in its stored conformations.
+
+        Each conformer is superimposed on the ligand's current coordinates,
+        so the poses start in the same place as the input ligand.
+
+        Parameters:
+        -----------
+        ligand : Ligand
+            Ligand with an RDKit molecule
+        max_conformers : int, optional
+            Maximum number of conformers returned
+
+        Returns:
+        --------
+        list
+            Ligand poses sharing the ligand's topology
+        """
+        coords = self.ensemble(ligand)[:max_conformers]
+        poses = []
+        for conformer in coords:
+            pose = ligand.copy()
+            pose.xyz[...] = _superimpose(conformer, ligand.xyz)
+            poses.append(pose)
+        return poses
+
+    def populate(self, molecules, n_processes=None, chunksize=4):
+        """
+        Embed and store the ensembles of many molecules in parallel.
+
+        Molecules that are already in the store are skipped. Embedding runs
+        in a worker pool; the parent process writes the store. Molecules
+        whose embedding failed are not stored, so a later call retries them.
+
+        Parameters:
+        -----------
+        molecules : iterable
+            RDKit molecules or Ligands (e.g. a LigandLibrary)
+        n_processes : int, optional
+            Number of worker processes (defaults to the CPU count)
+        chunksize : int
+            Molecules sent to a worker at a time
+
+        Returns:
+        --------
+        int
+            Number of ensembles generated and stored
+        """
+        n_processes = n_processes or mp.cpu_count()
+        params = self.params
+
+        def jobs():
+            seen = set()
+            for molecule in molecules:
+                mol = self._rdmol(molecule)
+                key = self.key(mol)
+                if key not in seen and not self._path(key).exists():
+                    seen.add(key)
+                    yield key, mol, params
+
+        generated = 0
+        if n_processes <= 1:
+            results = map(_embed_job, jobs())
+            for key, mol, coords in results:
+                if len(coords):
+                    self.put(mol, coords)
+                    generated += 1
+            return generated
+
+        with mp.Pool(processes=n_processes) as pool:
+            for key, mol, coords in pool.imap_unordered(_embed_job, jobs(), chunksize=chunksize):
+                if len(coords):
+                    self.put(mol, coords)
+                    generated += 1
+        return generated
+
+    def _path(self, key):
+        return self.directory / key[:2] / f"{key}.npy"
+
+    def _save(self, key, block):
+        """Write an ensemble; screening workers may load it at the same time."""
+        atomic_write(self._path(key), lambda f: np.save(f, block), binary=True)
+
+    @staticmethod
+    def _rdmol(molecule):
+        mol = getattr(molecule, 'rdmol', molecule)
+        if mol is None:
+            raise ValueError("Conformer store requires a ligand with an RDKit molecule")
+        return mol
@@ -0,0 +1,711 @@
+"""
+Precomputed receptor grid maps for PandaDock.
+
+For rigid-receptor docking the protein contribution to every intermolecular
+energy term only depends on where a ligand atom sits and on its atom class.
+This module tabulates those contributions once on a regular 3D lattice
+covering the active site (AutoDock-style grid maps) and scores poses by
+trilinear interpolation, so each score() call costs O(n_ligand_atoms)
+instead of O(n_protein_atoms * n_ligand_atoms).
+"""
+
+import os
+import re
+import json
+import hashlib
+import numpy as np
+from scipy.spatial import cKDTree
+from scipy.spatial.distance import cdist
+
+from . import profiling
+from .atomic_io import atomic_write
+from .unified_scoring import VectorizedScoringFunction
+
+
+class ReceptorGridMaps:
+    """
+    Energy grid maps of a receptor for each ligand atom class.
+
+    A ligand atom class is the (atom type, element symbol) pair that fully
+    determines the ligand-side parameters used by VectorizedScoringFunction.
+    Maps for a class are computed on demand the first time a ligand atom of
+    that class is scored, and hold the unweighted per-term energies so the
+    scoring weights can still be changed after the grid is built.
+    """
+
+    TERMS = ('vdw', 'hbond', 'elec', 'desolv', 'hydrophobic', 'clash', 'backbone_clash')
+
+    def __init__(self, scoring_function, protein_atoms, center, radius,
+                 spacing=0.375, padding=4.0, cache=None, cache_key=None):
+        """
+        Initialize an (empty) set of grid maps.
+
+        Parameters:
+        -----------
+        scoring_function : VectorizedScoringFunction
+            Scoring function providing the per-pair energy terms
+        protein_atoms : list
+            Receptor atoms contributing to the maps (usually the active site)
+        center : array-like
+            Center of the grid box (Å)
+        radius : float
+            Radius of the search sphere (Å)
+        spacing : float
+            Grid spacing (Å)
+        padding : float
+            Extra margin around the search sphere so that ligand atoms away
+            from the centroid still fall inside the grid (Å)
+        cache : GridMapCache, optional
+            On-disk cache to load maps from and store new maps in
+        cache_key : str, optional
+            Key of this receptor/grid combination in the cache
+        """
+        self.scoring_function = scoring_function
+        self.protein_atoms = protein_atoms
+        self.protein_coords = scoring_function._coords_array(protein_atoms)
+        self.center = np.asarray(center, dtype=float)
+        self.radius = float(radius)
+        self.spacing = float(spacing)
+        self.padding = float(padding)
+
+        half_width = self.radius + self.padding
+        n_points = int(np.ceil(2.0 * half_width / self.spacing)) + 1
+        self.shape = (n_points, n_points, n_points)
+        self.origin = self.center - 0.5 * (n_points - 1) * self.spacing
+
+        self.cache = cache
+        self.cache_key = cache_key
+
+        # One (nx, ny, nz, n_terms) array per ligand atom class
+        self.class_keys = []
+        self.class_index = {}
+        self.maps = []
+
+        self._protein_tree = None
+
+    @property
+    def protein_tree(self):
+        """KD-tree of the receptor atoms contributing to the maps."""
+        if self._protein_tree is None:
+            self._protein_tree = cKDTree(self.protein_coords)
+        return self._protein_tree
+
+    def atom_class(self, atom):
+        """Return the class key of a ligand atom."""
+        return (self.scoring_function._get_atom_type(atom), atom.get('symbol', 'C'))
+
+    def class_indices(self, ligand_atoms):
+        """
+        Map ligand atoms to grid map indices, building missing maps.
+
+        Parameters:
+        -----------
+        ligand_atoms : list
+            List of ligand atom dictionaries
+
+        Returns:
+        --------
+        numpy.ndarray
+            Index into self.maps for every ligand atom
+        """
+        keys = [self.atom_class(atom) for atom in ligand_atoms]
+
+        missing = {}
+        for key, atom in zip(keys, ligand_atoms):
+            if key not in self.class_index and key not in missing:
+                missing[key] = atom
+        if missing:
+            self.add_classes(missing)
+
+        return np.array([self.class_index[key] for key in keys], dtype=int)
+
+    def add_classes(self, representatives):
+        """
+        Load or compute grid maps for new ligand atom classes.
+
+        Parameters:
+        -----------
+        representatives : dict
+            Mapping of class key to a representative ligand atom dictionary
+        """
+        loaded = {}
+        if self.cache is not None:
+            for key in representatives:
+                grid = self.cache.load(self.cache_key, key, self.shape + (len(self.TERMS),))
+                if grid is not None:
+                    loaded[key] = grid
+
+        to_compute = [key for key in representatives if key not in loaded]
+        if to_compute:
+            new_maps = self._compute_maps([representatives[key] for key in to_compute])
+            for key, grid in zip(to_compute, new_maps):
+                if self.cache is not None:
+                    grid = self.cache.save(self.cache_key, key, grid, self.metadata())
+                loaded[key] = grid
+
+        for key in representatives:
+            self.class_index[key] = len(self.class_keys)
+            self.class_keys.append(key)
+            self.maps.append(loaded[key])
+
+    def metadata(self):
+        """Describe the grid geometry (stored next to cached maps)."""
+        return {
+            'center': self.center.tolist(),
+            'radius': self.radius,
+            'spacing': self.spacing,
+            'padding': self.padding,
+            'origin': self.origin.tolist(),
+            'shape': list(self.shape),
+            'terms': list(self.TERMS),
+            'scoring_function': type(self.scoring_function).__name__,
+        }
+
+    def _compute_maps(self, representatives):
+        """Tabulate per-term energies of each representative atom on the lattice."""
+        sf = self.scoring_function
+        p_all = sf._atom_parameter_arrays(self.protein_atoms, is_protein=True)
+        ligand_params = [sf._atom_parameter_arrays([atom], is_protein=False)
+                         for atom in representatives]
+
+        nx, ny, nz = self.shape
+        maps = np.zeros((len(representatives),) + self.shape + (len(self.TERMS),), dtype=np.float32)
+        if len(self.protein_atoms) == 0:
+            return maps
+
+        axis = np.arange(nx) * self.spacing
+        yy, zz = np.meshgrid(self.origin[1] + axis[:ny], self.origin[2] + axis[:nz], indexing='ij')
+        n_slab = yy.size
+
+        # Short-range terms use neighbour pairs; electrostatics uses charged atoms only
+        short_cutoff = max(sf.vdw_cutoff, sf.hbond_cutoff, sf.desolv_cutoff, sf.hydrophobic_cutoff)
+        short_terms = [(self.TERMS.index('vdw'), sf._vdw_pairs),
+                       (self.TERMS.index('hbond'), sf._hbond_pairs),
+                       (self.TERMS.index('desolv'), sf._desolvation_pairs),
+                       (self.TERMS.index('hydrophobic'), sf._hydrophobic_pairs),
+                       (self.TERMS.index('clash'), sf._clash_pairs)]
+        elec_index = self.TERMS.index('elec')
+        backbone_index = self.TERMS.index('backbone_clash')
+
+        protein_tree = self.protein_tree
+        charged = np.flatnonzero(np.abs(p_all['charge']) >= 1e-6)
+
+        for ix in range(nx):
+            x = self.origin[0] + ix * self.spacing
+            points = np.column_stack([np.full(n_slab, x), yy.ravel(), zz.ravel()])
+
+            pairs = cKDTree(points).sparse_distance_matrix(
+                protein_tree, short_cutoff, output_type='ndarray')
+            point_idx = pairs['i']
+            p = sf._subset_parameters(p_all, pairs['j'])
+            distances = pairs['v']
+
+            near = charged[np.abs(self.protein_coords[charged, 0] - x) <= sf.elec_cutoff]
+            elec_distances = cdist(self.protein_coords[near], points) if len(near) else None
+            p_near = sf._subset_parameters(p_all, near)
+
+            for k, l in enumerate(ligand_params):
+                slab = maps[k, ix].reshape(n_slab, len(self.TERMS))
+                if len(point_idx):
+                    for t, pair_function in short_terms:
+                        energy = pair_function(p, l, distances)
+                        slab[:, t] = np.bincount(point_idx, weights=energy, minlength=n_slab)
+                    energy = sf._enhanced_clash_pairs(p, l, distances, backbone_factor=3.0)
+                    slab[:, backbone_index] = np.bincount(point_idx, weights=energy, minlength=n_slab)
+
+                if elec_distances is not None and abs(l['charge'][0]) >= 1e-6:
+                    energy = sf._electrostatics_pairs(*sf._outer_parameters(p_near, l), elec_distances)
+                    slab[:, elec_index] = energy.sum(axis=0)
+
+        return maps
+
+    def contains(self, coords):
+        """
+        Check which coordinates fall inside the interpolation box.
+
+        Parameters:
+        -----------
+        coords : numpy.ndarray
+            Coordinates of shape (..., 3)
+
+        Returns:
+        --------
+        numpy.ndarray
+            Boolean mask of shape (...)
+        """
+        upper = self.origin + (np.array(self.shape) - 1) * self.spacing
+        return np.all((coords >= self.origin) & (coords <= upper), axis=-1)
+
+    def interpolate(self, class_indices, coords):
+        """
+        Trilinearly interpolate per-term energies at atom positions.
+
+        Parameters:
+        -----------
+        class_indices : numpy.ndarray
+            Map index for each atom, shape (N,)
+        coords : numpy.ndarray
+            Atom coordinates inside the grid, shape (N, 3)
+
+        Returns:
+        --------
+        numpy.ndarray
+            Per-atom energies of shape (N, n_terms)
+        """
+        fractional = (coords - self.origin) / self.spacing
+        base = np.floor(fractional).astype(int)
+        base = np.clip(base, 0, np.array(self.shape) - 2)
+        t = fractional - base
+
+        energies = np.empty((len(coords), len(self.TERMS)))
+        for k in np.unique(class_indices):
+            selected = class_indices == k
+            grid = self.maps[k]
+            x0, y0, z0 = base[selected, 0], base[selected, 1], base[selected, 2]
+            tx, ty, tz = t[selected, 0:1], t[selected, 1:2], t[selected, 2:3]
+
+            def corner(dx, dy, dz):
+                return grid[x0 + dx, y0 + dy, z0 + dz]
+
+            c00 = corner(0, 0, 0) * (1 - tx) + corner(1, 0, 0) * tx
+            c10 = corner(0, 1, 0) * (1 - tx) + corner(1, 1, 0) * tx
+            c01 = corner(0, 0, 1) * (1 - tx) + corner(1, 0, 1) * tx
+            c11 = corner(0, 1, 1) * (1 - tx) + corner(1, 1, 1) * tx
+
+            c0 = c00 * (1 - ty) + c10 * ty
+            c1 = c01 * (1 - ty) + c11 * ty
+            energies[selected] = c0 * (1 - tz) + c1 * tz
+
+        return energies
+
+
+class GridMapCache:
+    """
+    Persistent on-disk cache of receptor grid maps.
+
+    Each receptor/active-site/grid combination is stored in its own
+    sub-directory of cache_dir, named by a hash of the PDB contents, the
+    receptor atoms, the grid center, radius, spacing and padding, and the
+    scoring function class. Every ligand atom class is written as a separate
+    .npy file and loaded with mmap_mode='r', so worker processes screening
+    against the same receptor share one copy of the maps in the page cache
+    and restarted runs skip grid construction. Maps are unweighted, so the
+    scoring weights are not part of the key.
+    """
+
+    def __init__(self, cache_dir):
+        """
+        Initialize grid map cache.
+
+        Parameters:
+        -----------
+        cache_dir : str or Path
+            Directory holding cached maps
+        """
+        self.cache_dir = str(cache_dir)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(protein, protein_atoms, center, radius, spacing, padding, scoring_function):
+        """
+        Build the cache key for a receptor grid.
+
+        Parameters:
+        -----------
+        protein : Protein
+            Receptor (its PDB file contents are hashed when available)
+        protein_atoms : list
+            Receptor atoms contributing to the maps
+        center : array-like
+            Grid center
+        radius : float
+            Search radius
+        spacing : float
+            Grid spacing
+        padding : float
+            Grid padding
+        scoring_function : ScoringFunction
+            Scoring function whose terms are tabulated
+
+        Returns:
+        --------
+        str
+            Hex digest identifying the grid
+        """
+        digest = hashlib.sha256()
+
+        pdb_file = getattr(protein, 'pdb_file', None)
+        if pdb_file and os.path.exists(pdb_file):
+            with open(pdb_file, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+
+        # The receptor atom selection (active site) determines the maps
+        coords = np.array([atom['coords'] for atom in protein_atoms], dtype=np.float64)
+        digest.update(np.round(coords, 4).tobytes())
+        digest.update('|'.join(atom.get('name', '') for atom in protein_atoms).encode())
+
+        geometry = np.round(np.concatenate([np.asarray(center, dtype=float).ravel(),
+                                            [radius, spacing, padding]]), 4)
+        digest.update(geometry.tobytes())
+        digest.update(f"{type(scoring_function).__module__}.{type(scoring_function).__name__}".encode())
+
+        return digest.hexdigest()[:32]
+
+    def _class_path(self, key, class_key):
+        name = re.sub(r'[^A-Za-z0-9.]+', '-', '_'.join(class_key))
+        return os.path.join(self.cache_dir, key, f"{name}.npy")
+
+    def load(self, key, class_key, shape):
+        """
+        Memory-map a cached map if it exists.
+
+        Returns:
+        --------
+        numpy.ndarray or None
+            Read-only memory-mapped map, or None on a cache miss
+        """
+        path = self._class_path(key, class_key)
+        if not os.path.exists(path):
+            return None
+        try:
+            grid = np.load(path, mmap_mode='r')
+        except (ValueError, OSError):
+            return None
+        if grid.shape != tuple(shape):
+            return None
+        return grid
+
+    def save(self, key, class_key, grid, metadata=None):
+        """
+        Atomically write a map to the cache and return a memory-mapped view.
+
+        Parameters:
+        -----------
+        key : str
+            Grid key from make_key
+        class_key : tuple
+            Ligand atom class
+        grid : numpy.ndarray
+            Map to store
+        metadata : dict, optional
+            Grid description written to meta.json
+
+        Returns:
+        --------
+        numpy.ndarray
+            Memory-mapped copy of the stored map
+        """
+        path = self._class_path(key, class_key)
+        directory = os.path.dirname(path)
+
+        # Concurrent readers only ever see complete maps
+        grid = np.ascontiguousarray(grid, dtype=np.float32)
+        atomic_write(path, lambda f: np.save(f, grid), binary=True)
+
+        meta_path = os.path.join(directory, 'meta.json')
+        if metadata is not None and not os.path.exists(meta_path):
+            atomic_write(meta_path, lambda f: json.dump(metadata, f, indent=2))
+
+        return np.load(path, mmap_mode='r')
+
+
+class GridScoringFunction:
+    """
+    Scoring function wrapper that evaluates intermolecular terms from
+    precomputed receptor grid maps.
+
+    The wrapped VectorizedScoringFunction supplies the energy model and the
+    weights. Grid maps are built lazily for the protein being scored and
+    rebuilt whenever a different protein atom list is passed. Ligand atoms
+    that fall outside the grid box are scored exactly, and the entropy term
+    is always computed by the wrapped function. The receptor is assumed to
+    be rigid while the maps are in use. With cache_dir set, maps are shared
+    through a GridMapCache.
+    """
+
+    # Ligand elements whose maps are built up front by prepare()
+    COMMON_ELEMENTS = ('C', 'N', 'O', 'S', 'P', 'F', 'Cl', 'Br', 'I', 'H')
+
+    def __init__(self, base_scoring_function, spacing=0.375, center=None,
+                 radius=None, padding=4.0, cache_dir=None):
+        """
+        Initialize grid-based scoring function.
+
+        Parameters:
+        -----------
+        base_scoring_function : VectorizedScoringFunction
+            Scoring function whose energy terms are tabulated
+        spacing : float
+            Grid spacing (Å)
+        center : array-like, optional
+            Grid center. Defaults to the active site center.
+        radius : float, optional
+            Search radius covered by the grid. Defaults to the active site radius.
+        padding : float
+            Extra margin around the search sphere (Å)
+        cache_dir : str or Path, optional
+            Directory of a persistent grid map cache
+        """
+        if not isinstance(base_scoring_function, VectorizedScoringFunction):
+            raise TypeError("Grid maps require a VectorizedScoringFunction, "
+                            f"got {type(base_scoring_function).__name__}")
+
+        self.base_scoring_function = base_scoring_function
+        self.spacing = spacing
+        self.center = center
+        self.radius = radius
+        self.padding = padding
+        self.cache = GridMapCache(cache_dir) if cache_dir else None
+        self.grid_maps = None
+
+        # Copy weights and verbose flag from base scoring function
+        self.weights = self.base_scoring_function.weights
+        self.verbose = getattr(self.base_scoring_function, 'verbose', False)
+
+    def _grid_geometry(self, protein, protein_atoms):
+        """Determine grid center and radius for a protein."""
+        active_site = getattr(protein, 'active_site', None) or {}
+
+        center = self.center
+        if center is None:
+            center = active_site.get('center')
+        if center is None:
+            center = np.mean(self.base_scoring_function._coords_array(protein_atoms), axis=0)
+
+        radius = self.radius
+        if radius is None:
+            radius = active_site.get('radius', 10.0)
+
+        return np.asarray(center, dtype=float), float(radius)
+
+    def get_grid_maps(self, protein):
+        """
+        Return grid maps for a protein, building them if needed.
+
+        Parameters:
+        -----------
+        protein : Protein
+            Receptor
+
+        Returns:
+        --------
+        ReceptorGridMaps
+            Grid maps covering the active site of the protein
+        """
+        protein_atoms = self.base_scoring_function._get_protein_atoms(protein)
+        if self.grid_maps is None or self.grid_maps.protein_atoms is not protein_atoms:
+            center, radius = self._grid_geometry(protein, protein_atoms)
+            cache_key = None
+            if self.cache is not None:
+                cache_key = GridMapCache.make_key(
+                    protein, protein_atoms, center, radius,
+                    self.spacing, self.padding, self.base_scoring_function
+                )
+            self.grid_maps = ReceptorGridMaps(
+                self.base_scoring_function, protein_atoms, center, radius,
+                spacing=self.spacing, padding=self.padding,
+                cache=self.cache, cache_key=cache_key
+            )
+        return self.grid_maps
+
+    def prepare(self, protein, ligand_atoms=None):
+        """
+        Build (or load) maps before docking starts.
+
+        Parameters:
+        -----------
+        protein : Protein
+            Receptor
+        ligand_atoms : list, optional
+            Ligand atoms whose classes are needed. Defaults to the common
+            organic elements in COMMON_ELEMENTS.
+
+        Returns:
+        --------
+        ReceptorGridMaps
+            Grid maps of the receptor
+        """
+        if ligand_atoms is None:
+            ligand_atoms = [{'symbol': element} for element in self.COMMON_ELEMENTS]
+        grid_maps = self.get_grid_maps(protein)
+        grid_maps.class_indices(ligand_atoms)
+        return grid_maps
+
+    def calculate_energy_terms(self, protein, ligand):
+        """
+        Evaluate energy components of a pose from the grid maps.
+
+        Parameters:
+        -----------
+        protein : Protein
+        ligand : Ligand
+
+        Returns:
+        --------
+        dict
+            Unweighted energy components keyed by term name
+        """
+        grid_maps = self.get_grid_maps(protein)
+        ligand_atoms = self.base_scoring_function._get_ligand_atoms(ligand)
+        coords = self.base_scoring_function._coords_array(ligand_atoms)
+
+        class_indices = grid_maps.class_indices(ligand_atoms)
+        inside = grid_maps.contains(coords)
+        totals = profiling.timed('scoring', 'grid_maps', grid_maps.interpolate,
+                                 class_indices[inside], coords[inside]).sum(axis=0)
+        terms = {name: float(value) for name, value in zip(grid_maps.TERMS, totals)}
+
+        # Atoms outside the box are scored exactly against the receptor
+        if not inside.all():
+            outside_atoms = [atom for atom, flag in zip(ligand_atoms, inside) if not flag]
+            p, l, distances = self.base_scoring_function._prepare_pair_data(
+                grid_maps.protein_atoms, outside_atoms)
+            pairs = self.base_scoring_function._pair_energy_matrices(p, l, distances)
+            for name, energy in pairs.items():
+                terms[name] += float(np.sum(energy))
+
+        terms['entropy'] = profiling.timed('scoring', 'entropy', self.base_scoring_function.calculate_entropy,
+                                           ligand, protein)
+        return terms
+
+    def calculate_energy_terms_batch(self, protein, ligand, coords):
+        """
+        Evaluate energy components of a batch of poses from the grid maps.
+
+        Parameters:
+        -----------
+        protein : Protein
+        ligand : Ligand
+            Ligand providing the topology shared by all poses
+        coords : numpy.ndarray
+            Pose coordinates of shape (P, N, 3)
+
+        Returns:
+        --------
+        dict
+            Unweighted energy components keyed by term name, each of shape (P,)
+        """
+        base = self.base_scoring_function
+        grid_maps = self.get_grid_maps(protein)
+        ligand_atoms = base._get_ligand_atoms(ligand)
+        coords = np.asarray(coords, dtype=float).reshape(len(coords), -1, 3)
+        n_poses, n_ligand = coords.shape[:2]
+
+        flat_coords = coords.reshape(-1, 3)
+        pose_index = np.repeat(np.arange(n_poses), n_ligand)
+        atom_index = np.tile(np.arange(n_ligand), n_poses)
+        class_indices = grid_maps.class_indices(ligand_atoms)[atom_index]
+
+        inside = grid_maps.contains(flat_coords)
+        energies = np.zeros((len(flat_coords), len(grid_maps.TERMS)))
+        energies[inside] = profiling.timed('scoring', 'grid_maps', grid_maps.interpolate,
+                                           class_indices[inside], flat_coords[inside])
+
+        # Atoms outside the box are scored exactly against the receptor
+        if not inside.all():
+            outside = np.flatnonzero(~inside)
+            p = base._get_protein_parameters(grid_maps.protein_atoms)
+            l = base._subset_parameters(base._atom_parameter_arrays(ligand_atoms, is_protein=False),
+                                        atom_index[outside])
+            distances = cdist(grid_maps.protein_coords, flat_coords[outside])
+            pairs = base._pair_energy_matrices(*base._outer_parameters(p, l), distances)
+            for t, name in enumerate(grid_maps.TERMS):
+                energies[outside, t] = pairs[name].sum(axis=0)
+
+        terms = {name: np.bincount(pose_index, weights=energies[:, t], minlength=n_poses)
+                 for t, name in enumerate(grid_maps.TERMS)}
+
+        buried = np.isfinite(grid_maps.protein_tree.query(flat_coords, distance_upper_bound=4.0)[0])
+        n_buried = np.bincount(pose_index, weights=buried, minlength=n_poses)
+        terms['entropy'] = profiling.timed('scoring', 'entropy', base._batch_entropy, protein, ligand, n_buried)
+        return terms
+
+    def score_batch(self, protein, ligand, coords):
+        """
+        Score several poses of the same ligand using grid maps.
+
+        Parameters:
+        -----------
+        protein : Protein
+        ligand : Ligand
+            Ligand providing the topology shared by all poses
+        coords : array-like
+            Stacked pose coordinates of shape (P, N, 3)
+
+        Returns:
+        --------
+        numpy.ndarray
+            Scores of shape (P,) (lower is better)
+        """
+        if len(coords) == 0:
+            return np.empty(0)
+        self.base_scoring_function.verbose = self.verbose
+        terms = self.calculate_energy_terms_batch(protein, ligand, coords)
+        return np.array([self.base_scoring_function.combine_terms({name: value[i] for name, value in terms.items()})
+                         for i in range(len(coords))])
+
+    def score(self, protein, ligand):
+        """
+        Calculate the docking score of a pose using grid maps.
+
+        Parameters:
+        -----------
+        protein : Protein
+        ligand : Ligand
+
+        Returns:
+        --------
+        float
+            Docking score (lower is better)
+        """
+        self.base_scoring_function.verbose = self.verbose
+        return self.base_scoring_function.combine_terms(self.calculate_energy_terms(protein, ligand))
+
+    def __getstate__(self):
+        # With a cache, maps are re-mapped from disk in the receiving process
+        state = self.__dict__.copy()
+        if self.cache is not None:
+            state['grid_maps'] = None
+        return state
+
+    # Forward methods to base scoring function
+    def __getattr__(self, name):
+        if name == 'base_scoring_function':
+            raise AttributeError(name)
+        return getattr(self.base_scoring_function, name)
+
+
+def create_grid_scoring_function(scoring_function, spacing=0.375, center=None,
+                                 radius=None, padding=4.0, cache_dir=None):
+    """
+    Wrap a scoring function with grid maps when the energy model supports it.
+
+    Parameters:
+    -----------
+    scoring_function : ScoringFunction
+        Scoring function to accelerate
+    spacing : float
+        Grid spacing (Å)
+    center : array-like, optional
+        Grid center
+    radius : float, optional
+        Search radius covered by the grid
+    padding : float
+        Extra margin around the search sphere (Å)
+    cache_dir : str or Path, optional
+        Directory of a persistent grid map cache
+
+    Returns:
+    --------
+    ScoringFunction
+        GridScoringFunction, or the original function if it cannot be tabulated
+    """
+    if isinstance(scoring_function, GridScoringFunction):
+        return scoring_function
+    if not isinstance(scoring_function, VectorizedScoringFunction):
+        print(f"Warning: grid maps are not supported for {type(scoring_function).__name__}. "
+              "Using direct scoring.")
+        return scoring_function
+    return GridScoringFunction(scoring_function, spacing=spacing, center=center,
+                               radius=radius, padding=padding, cache_dir=cache_dir)
@@ -480,7 +480,9 @@ class HybridDockingManager:
         if algorithm_type.lower() == 'genetic':
             # Filter out parameters not used by genetic algorithm
             genetic_kwargs = {k: v for k, v in kwargs.items() 
-                             if k in ['max_iterations', 'population_size', 'mutation_rate']}
+                             if k in ['max_iterations', 'population_size', 'mutation_rate',
+                                      'patience', 'score_variance_threshold', 'diversity_threshold',
+                                      'time_limit', 'max_evaluations']}
             
             # Use parallel genetic algorithm
             from .parallel_search import ParallelGeneticAlgorithm
@@ -653,8 +655,8 @@ class HybridDockingManager:
                 print(f"CPU run {i+1}/{n_cpu_runs}")
                 
                 # Run single docking on CPU
-                from .unified_scoring import EnhancedScoringFunction
-                scoring_function = EnhancedScoringFunction()
+                from .unified_scoring import EnhancedVectorizedScoringFunction
+                scoring_function = EnhancedVectorizedScoringFunction()
 
                 # ✅ Inject grid arguments
                 kwargs['grid_spacing'] = args.grid_spacing
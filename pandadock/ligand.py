@@ -3,6 +3,74 @@ import numpy as np
 from pathlib import Path
 from rdkit import Chem
 
+
+class LigandAtom(dict):
+    """
+    Atom dictionary bound to a row of the owning ligand's coordinate array.
+
+    The 'coords' entry is a view into Ligand.xyz. Assigning a new value to
+    'coords' writes it into the coordinate array, so atom dictionaries and
+    xyz never drift apart.
+    """
+
+    def __setitem__(self, key, value):
+        if key == 'coords' and 'coords' in self:
+            coords = dict.__getitem__(self, 'coords')
+            if value is not coords:
+                coords[...] = value
+            return
+        dict.__setitem__(self, key, value)
+
+
+def apply_torsion_angles(coords, torsion_tree, angles):
+    """
+    Rotate torsions of a coordinate array in one pass.
+
+    Torsions are applied from the leaves of the torsion tree towards its
+    root (smallest moving set first). A torsion then never moves the axis
+    of a torsion applied after it, so all rotation matrices can be built at
+    once from the input coordinates.
+
+    Parameters:
+    -----------
+    coords : numpy.ndarray
+        Atom coordinates, shape (N, 3)
+    torsion_tree : list
+        (atom_a, atom_b, moving_atoms) per torsion (see Ligand.torsion_tree)
+    angles : array-like
+        Rotation angle per torsion in radians, shape (T,)
+
+    Returns:
+    --------
+    numpy.ndarray
+        Rotated coordinates, shape (N, 3)
+    """
+    coords = np.array(coords, dtype=float)
+    angles = np.asarray(angles, dtype=float)
+    active = [k for k in range(len(torsion_tree)) if angles[k] != 0.0 and len(torsion_tree[k][2])]
+    if not active:
+        return coords
+
+    atom_a = np.array([torsion_tree[k][0] for k in active])
+    atom_b = np.array([torsion_tree[k][1] for k in active])
+    axes = coords[atom_b] - coords[atom_a]
+    axes /= np.linalg.norm(axes, axis=1)[:, None]
+
+    # Rodrigues' formula for all torsions at once
+    theta = angles[active]
+    skew = np.zeros((len(active), 3, 3))
+    skew[:, 0, 1], skew[:, 0, 2], skew[:, 1, 2] = -axes[:, 2], axes[:, 1], -axes[:, 0]
+    skew -= skew.transpose(0, 2, 1)
+    rotations = (np.eye(3) + np.sin(theta)[:, None, None] * skew +
+                 (1.0 - np.cos(theta))[:, None, None] * skew @ skew)
+    pivots = coords[atom_b]
+
+    for j in sorted(range(len(active)), key=lambda j: len(torsion_tree[active[j]][2])):
+        moving = torsion_tree[active[j]][2]
+        coords[moving] = (coords[moving] - pivots[j]) @ rotations[j].T + pivots[j]
+    return coords
+
+
 class Ligand:
     """Class representing a small molecule ligand."""
     
@@ -15,16 +83,84 @@ class Ligand:
         mol_file : str
             Path to MOL/SDF file containing ligand structure
         """
-        self.atoms = []
+        # Topology (shared between a ligand and its poses)
+        self.atom_records = []
         self.bonds = []
-        self.xyz = None
         self.rotatable_bonds = []
         self.conformers = []
         self.mol = None
         self.rdmol = None
+        self._torsion_tree = None
+        self._internal_pairs = None
+
+        # Pose state (owned by each copy)
+        self._xyz = None
+        self._atoms = None
+        self.translation = np.zeros(3)
+        self.rotation = np.eye(3)
+        self.torsions = np.zeros(0)
         
         if mol_file:
             self.load_molecule(mol_file)
+
+    @property
+    def xyz(self):
+        """Atom coordinates, shape (N, 3)."""
+        return self._xyz
+
+    @xyz.setter
+    def xyz(self, coords):
+        self._xyz = None if coords is None else np.asarray(coords, dtype=float)
+        # Atom dictionaries are rebound to the new array on next access
+        self._atoms = None
+
+    @property
+    def atoms(self):
+        """Atom dictionaries whose 'coords' are views into xyz."""
+        if self._atoms is None:
+            if self._xyz is None or len(self._xyz) != len(self.atom_records):
+                return []
+            self._atoms = [LigandAtom(record, coords=self._xyz[i])
+                           for i, record in enumerate(self.atom_records)]
+        return self._atoms
+
+    def _set_topology(self, atom_records, coords):
+        """Store per-atom topology records (without coordinates) and coordinates."""
+        self.atom_records = atom_records
+        self.xyz = coords
+        self.torsions = np.zeros(len(self.rotatable_bonds))
+
+    def copy(self):
+        """
+        Create a pose of this ligand.
+
+        The pose shares the immutable topology (atom records, bonds,
+        rotatable bonds, RDKit molecules and conformers) and owns only a
+        copy of the coordinates and the rigid-body/torsion state, so the
+        cost is a single array copy.
+
+        Returns:
+        --------
+        LigandPose
+            New pose with independent coordinates
+        """
+        pose = LigandPose.__new__(LigandPose)
+        pose.__dict__.update(self.__dict__)
+        pose._xyz = None if self._xyz is None else self._xyz.copy()
+        pose._atoms = None
+        pose.translation = self.translation.copy()
+        pose.rotation = self.rotation.copy()
+        pose.torsions = self.torsions.copy()
+        return pose
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def __getstate__(self):
+        # Atom dictionaries are views into xyz; rebuild them after unpickling
+        state = self.__dict__.copy()
+        state['_atoms'] = None
+        return state
         
     
     def load_molecule(self, mol_file):
@@ -43,55 +179,19 @@ class Ligand:
         try:
             # Use RDKit for robust molecule parsing if available
             from rdkit import Chem
-            mol_supplier = Chem.SDMolSupplier(str(mol_file), removeHs=False)
-            mols = [mol for mol in mol_supplier if mol is not None]
-            if not mols:
-                raise ValueError(f"No valid molecules found in {mol_file}")
-            self.mol = mols[0]
-            self.rdmol = self.mol
-            self.xyz = self.mol.GetConformer().GetPositions()
-            mol = Chem.MolFromMolFile(str(mol_path))
-            if mol is None:
-                raise ValueError(f"Failed to parse molecule file: {mol_file}")
-            ext = Path(mol_file).suffix.lower()
+            ext = mol_path.suffix.lower()
             if ext == ".sdf":
-                suppl = Chem.SDMolSupplier(mol_file, removeHs=False)
-                mol = suppl[0] if suppl and len(suppl) > 0 else None
+                # Only the first record is needed; parse nothing beyond it
+                mol = next(iter(Chem.SDMolSupplier(str(mol_path), removeHs=False)), None)
             elif ext == ".mol":
-                mol = Chem.MolFromMolFile(mol_file, removeHs=False)
+                mol = Chem.MolFromMolFile(str(mol_path), removeHs=False)
             else:
                 raise ValueError(f"Unsupported format for ligand: {mol_file}")
 
             if mol is None:
                 raise ValueError(f"Failed to read ligand file: {mol_file}")
 
-            self.rdmol = mol
-            # Get atom coordinates
-            conformer = mol.GetConformer()
-            self.xyz = np.array([conformer.GetAtomPosition(i) for i in range(mol.GetNumAtoms())])
-            
-            # Get atom information
-            for atom in mol.GetAtoms():
-                self.atoms.append({
-                    'idx': atom.GetIdx(),
-                    'symbol': atom.GetSymbol(),
-                    'formal_charge': atom.GetFormalCharge(),
-                    'coords': self.xyz[atom.GetIdx()]
-                })
-            
-            # Get bond information
-            for bond in mol.GetBonds():
-                self.bonds.append({
-                    'begin_atom_idx': bond.GetBeginAtomIdx(),
-                    'end_atom_idx': bond.GetEndAtomIdx(),
-                    'bond_type': bond.GetBondType(),
-                    'is_rotatable': bond.GetBondTypeAsDouble() == 1 and not bond.IsInRing()
-                })
-                
-                # Track rotatable bonds for conformer generation
-                if bond.GetBondTypeAsDouble() == 1 and not bond.IsInRing():
-                    self.rotatable_bonds.append(bond.GetIdx())
-            
+            self._load_rdmol(mol)
             print(f"Loaded ligand with {len(self.atoms)} atoms and {len(self.bonds)} bonds")
             print(f"Identified {len(self.rotatable_bonds)} rotatable bonds")
             
@@ -100,6 +200,57 @@ class Ligand:
             print("Warning: RDKit not available, using simplified MOL parser")
             self._parse_mol_file(mol_path)
     
+    @classmethod
+    def from_rdmol(cls, mol):
+        """
+        Create a ligand from an RDKit molecule with 3D coordinates.
+        
+        Parameters:
+        -----------
+        mol : rdkit.Chem.Mol
+            Molecule with at least one conformer
+        
+        Returns:
+        --------
+        Ligand
+            Ligand built from the molecule
+        """
+        ligand = cls()
+        ligand._load_rdmol(mol)
+        return ligand
+    
+    def _load_rdmol(self, mol):
+        """Set topology and coordinates from a parsed RDKit molecule."""
+        self.mol = mol
+        self.rdmol = mol
+        
+        # Get atom information
+        atom_records = []
+        for atom in mol.GetAtoms():
+            atom_records.append({
+                'idx': atom.GetIdx(),
+                'symbol': atom.GetSymbol(),
+                'formal_charge': atom.GetFormalCharge()
+            })
+        
+        # Get bond information
+        for bond in mol.GetBonds():
+            self.bonds.append({
+                'begin_atom_idx': bond.GetBeginAtomIdx(),
+                'end_atom_idx': bond.GetEndAtomIdx(),
+                'bond_type': bond.GetBondType(),
+                'is_rotatable': bond.GetBondTypeAsDouble() == 1 and not bond.IsInRing()
+            })
+            
+            # Track rotatable bonds for conformer generation
+            if bond.GetBondTypeAsDouble() == 1 and not bond.IsInRing():
+                self.rotatable_bonds.append(bond.GetIdx())
+        
+        self._set_topology(atom_records, mol.GetConformer().GetPositions())
+        
+        # Build the torsion tree once so that all poses share it
+        self._build_torsion_tree()
+    
     @property
     def rdmol(self):
         return self._rdmol
@@ -121,6 +272,7 @@ class Ligand:
         bond_count = int(counts_line[3:6])
         
         # Parse atoms (starts at line 5)
+        atom_records = []
         atom_coords = []
         for i in range(atom_count):
             atom_line = lines[4+i]
@@ -129,14 +281,13 @@ class Ligand:
             z = float(atom_line[20:30].strip())
             symbol = atom_line[31:34].strip()
             
-            self.atoms.append({
+            atom_records.append({
                 'idx': i,
-                'symbol': symbol,
-                'coords': np.array([x, y, z])
+                'symbol': symbol
             })
             atom_coords.append([x, y, z])
         
-        self.xyz = np.array(atom_coords)
+        self._set_topology(atom_records, np.array(atom_coords))
         
         # Parse bonds
         for i in range(bond_count):
@@ -151,49 +302,36 @@ class Ligand:
                 'bond_type': bond_type
             })
     
-    def generate_conformers(self, n_conformers=10):
+    def generate_conformers(self, n_conformers=10, store=None):
         """
-        Generate ligand conformers by rotating bonds using RDKit's ETKDG algorithm.
+        Generate ligand conformers using RDKit's ETKDG algorithm.
         
         Parameters:
         -----------
         n_conformers : int
             Number of conformers to generate
+        store : ConformerStore, optional
+            Conformer store to read the ensemble from (it is generated and
+            stored on first use)
         
         Returns:
         --------
         list
-            List of conformers as numpy arrays
+            List of conformers as numpy arrays in the ligand's atom order
         """
         try:
-            from rdkit import Chem
-            from rdkit.Chem import AllChem
-            
-            # Convert the ligand to an RDKit molecule
-            mol = Chem.MolFromMolBlock(self.to_mol_block())
-            if mol is None:
-                raise ValueError("Failed to convert ligand to RDKit molecule")
+            from .conformer_store import embed_conformers
             
-            # Add hydrogens to the molecule
-            mol = Chem.AddHs(mol)
+            if self.rdmol is None:
+                raise ValueError("Ligand has no RDKit molecule")
             
-            # Generate conformers using the ETKDG algorithm
-            params = AllChem.ETKDGv3()  # Use the latest version of ETKDG
-            params.numThreads = 0  # Use all available threads
-            params.maxAttempts = 1000  # Increase attempts for better success rate
-            params.randomSeed = 42  # Set a seed for reproducibility
-            params.pruneRmsThresh = 0.5  # Prune conformers with RMSD < 0.5 Å
-            
-            print(f"Generating {n_conformers} conformers using ETKDG...")
-            AllChem.EmbedMultipleConfs(mol, numConfs=n_conformers, params=params)
-            
-            # Extract conformers as numpy arrays
-            conformers = []
-            for conf_id in range(mol.GetNumConformers()):
-                conformer = mol.GetConformer(conf_id)
-                coords = np.array([list(conformer.GetAtomPosition(i)) for i in range(mol.GetNumAtoms())])
-                conformers.append(coords)
+            if store is not None:
+                ensemble = store.ensemble(self)[:n_conformers]
+            else:
+                print(f"Generating {n_conformers} conformers using ETKDG...")
+                ensemble = embed_conformers(self.rdmol, n_conformers=n_conformers)
             
+            conformers = list(ensemble)
             self.conformers = conformers
             print(f"Generated {len(conformers)} conformers")
             return conformers
@@ -205,6 +343,157 @@ class Ligand:
             print(f"Error during conformer generation: {e}")
             return []
     
+    @property
+    def torsion_tree(self):
+        """
+        Moving atoms of every rotatable bond, aligned with rotatable_bonds.
+
+        Each entry is (atom_a, atom_b, moving_atoms): the atoms on the
+        smaller side of the bond, which rotate about the atom_a -> atom_b
+        axis (positive angles are right-handed). Bonds to terminal atoms
+        have no moving atoms.
+        """
+        if self._torsion_tree is None:
+            self._build_torsion_tree()
+        return self._torsion_tree
+
+    @property
+    def active_torsions(self):
+        """Indices of the torsions that move at least one atom."""
+        return [k for k, (_, _, moving) in enumerate(self.torsion_tree) if len(moving)]
+
+    def _build_torsion_tree(self):
+        """Precompute the moving-atom set of every rotatable bond."""
+        n_atoms = len(self.atom_records)
+        neighbors = [[] for _ in range(n_atoms)]
+        for bond in self.bonds:
+            neighbors[bond['begin_atom_idx']].append(bond['end_atom_idx'])
+            neighbors[bond['end_atom_idx']].append(bond['begin_atom_idx'])
+
+        tree = []
+        for bond_idx in self.rotatable_bonds:
+            atom_a = self.bonds[bond_idx]['begin_atom_idx']
+            atom_b = self.bonds[bond_idx]['end_atom_idx']
+
+            # Atoms reachable from atom_b without crossing the bond
+            side = {atom_b}
+            stack = [atom_b]
+            while stack:
+                for neighbor in neighbors[stack.pop()]:
+                    if neighbor != atom_a and neighbor not in side:
+                        side.add(neighbor)
+                        stack.append(neighbor)
+            side.discard(atom_b)
+
+            # Move the smaller side so the core of the ligand stays in place
+            if 2 * (len(side) + 1) > n_atoms:
+                atom_a, atom_b = atom_b, atom_a
+                side = set(range(n_atoms)) - side - {atom_a, atom_b}
+            tree.append((atom_a, atom_b, np.array(sorted(side), dtype=int)))
+
+        self._torsion_tree = tree
+        self._internal_pairs = self._find_internal_pairs(tree)
+        self.torsions = np.zeros(len(tree))
+
+    def _find_internal_pairs(self, tree):
+        """Heavy-atom pairs at least four bonds apart that a torsion separates."""
+        n_atoms = len(self.atom_records)
+        moves = np.zeros((len(tree), n_atoms), dtype=bool)
+        for k, (_, _, moving) in enumerate(tree):
+            moves[k, moving] = True
+        heavy = np.array([record['symbol'] != 'H' for record in self.atom_records], dtype=bool)
+
+        # Atoms within three bonds of each other
+        adjacency = np.eye(n_atoms, dtype=int)
+        for bond in self.bonds:
+            adjacency[bond['begin_atom_idx'], bond['end_atom_idx']] = 1
+            adjacency[bond['end_atom_idx'], bond['begin_atom_idx']] = 1
+        near = np.linalg.matrix_power(adjacency, 3) > 0
+
+        first, second = np.triu_indices(n_atoms, k=1)
+        keep = (heavy[first] & heavy[second] & ~near[first, second] &
+                (moves[:, first] != moves[:, second]).any(axis=0))
+        return first[keep], second[keep]
+
+    @property
+    def internal_pairs(self):
+        """
+        Heavy-atom pairs whose distance depends on the torsion angles.
+
+        Pairs closer than four bonds are excluded; their distances are
+        fixed by bond lengths and angles.
+
+        Returns:
+        --------
+        tuple
+            (first, second) atom index arrays
+        """
+        if self._internal_pairs is None:
+            self._build_torsion_tree()
+        return self._internal_pairs
+
+    def has_internal_clash(self, threshold=2.0, coords=None):
+        """
+        Check whether torsion rotations brought non-bonded atoms too close.
+
+        Parameters:
+        -----------
+        threshold : float
+            Minimum allowed distance (Å) between atoms of internal_pairs
+        coords : numpy.ndarray, optional
+            Coordinates to check instead of the current ones
+
+        Returns:
+        --------
+        bool
+            True if any pair is closer than the threshold
+        """
+        coords = self.xyz if coords is None else coords
+        first, second = self.internal_pairs
+        if len(first) == 0:
+            return False
+        distances = np.linalg.norm(coords[first] - coords[second], axis=1)
+        return bool(np.any(distances < threshold))
+
+    def rotate_torsions(self, angles):
+        """
+        Rotate all torsions by the given angles in one pass.
+
+        Parameters:
+        -----------
+        angles : array-like
+            Rotation per torsion in radians, aligned with rotatable_bonds
+        """
+        angles = np.asarray(angles, dtype=float)
+        self._xyz[...] = apply_torsion_angles(self._xyz, self.torsion_tree, angles)
+        self.torsions = (self.torsions + angles + np.pi) % (2 * np.pi) - np.pi
+
+    def set_torsions(self, angles):
+        """
+        Set the torsion angles relative to the input conformation.
+
+        Parameters:
+        -----------
+        angles : array-like
+            Torsion angles in radians, aligned with rotatable_bonds
+        """
+        self.rotate_torsions(np.asarray(angles, dtype=float) - self.torsions)
+
+    def rotate_bond(self, bond_idx, angle):
+        """
+        Rotate a single rotatable bond.
+
+        Parameters:
+        -----------
+        bond_idx : int
+            Index into rotatable_bonds
+        angle : float
+            Rotation angle in radians
+        """
+        angles = np.zeros(len(self.torsion_tree))
+        angles[bond_idx] = angle
+        self.rotate_torsions(angles)
+
     def translate(self, vector):
         """
         Translate ligand by a vector.
@@ -214,10 +503,10 @@ class Ligand:
         vector : array-like
             Translation vector [x, y, z]
         """
-        vector = np.array(vector)
-        self.xyz += vector
-        for atom in self.atoms:
-            atom['coords'] += vector
+        vector = np.asarray(vector, dtype=float)
+        # Atom coordinates are views into xyz, so one in-place update moves both
+        self._xyz += vector
+        self.translation += vector
     
     def rotate(self, rotation_matrix):
         """
@@ -228,9 +517,19 @@ class Ligand:
         rotation_matrix : array-like
             3x3 rotation matrix
         """
-        rotation_matrix = np.array(rotation_matrix)
-        self.xyz = np.dot(self.xyz, rotation_matrix.T)
-        for atom in self.atoms:
-            atom['coords'] = np.dot(atom['coords'], rotation_matrix.T)
+        rotation_matrix = np.asarray(rotation_matrix, dtype=float)
+        self._xyz[...] = self._xyz @ rotation_matrix.T
+        self.rotation = rotation_matrix @ self.rotation
+        self.translation = rotation_matrix @ self.translation
+
 
+class LigandPose(Ligand):
+    """
+    Lightweight ligand pose created by Ligand.copy().
 
+    Shares topology with the ligand it was copied from and owns only its
+    coordinate array and rigid-body/torsion state. The rigid-body state
+    maps the parent coordinates onto the pose (x' = R x + t) when no bond
+    rotations have been applied.
+    """
+    pass
@@ -0,0 +1,352 @@
+"""
+Streaming ligand libraries for PandaDock screening.
+
+Screening libraries usually arrive as one large multi-record SDF (often
+gzipped) or SMILES file rather than as one file per ligand. LigandLibrary
+reads such a file record by record, parsing every record exactly once into
+a Ligand, so memory stays bounded by a single record. A byte-offset index
+lets a worker seek straight to its shard instead of reading the library
+from the start.
+"""
+
+import gzip
+import os
+import re
+from collections import namedtuple
+from pathlib import Path
+import numpy as np
+
+from .ligand import Ligand
+
+
+# Reference to one record of a library, used as a picklable screening job
+LigandRecord = namedtuple('LigandRecord', ['source', 'index', 'name'])
+
+
+class LigandLibrary:
+    """
+    Multi-record ligand library backed by a single SDF or SMILES file.
+
+    Supported formats are SDF (.sdf, .sd) and SMILES (.smi, .smiles), each
+    optionally gzipped (.gz). SMILES records are embedded in 3D with ETKDG
+    when they are parsed.
+
+    Offsets of gzipped libraries refer to the decompressed stream. Seeking
+    forward in a gzipped file decompresses the skipped data, so shards of
+    gzipped libraries are best read in order (see items()).
+    """
+
+    SDF_SUFFIXES = ('.sdf', '.sd')
+    SMILES_SUFFIXES = ('.smi', '.smiles')
+
+    def __init__(self, path, index_path=None):
+        """
+        Open a ligand library.
+
+        Parameters:
+        -----------
+        path : str or Path
+            Library file
+        index_path : str or Path, optional
+            Location of the persistent offset index. Defaults to
+            '<library>.idx.npz' next to the library.
+        """
+        self.path = Path(path)
+        if not self.path.is_file():
+            raise FileNotFoundError(f"Ligand library not found: {path}")
+
+        self.format = self.library_format(self.path)
+        if self.format is None:
+            raise ValueError(f"Unsupported ligand library format: {path}")
+        self.compressed = self.path.suffix.lower() == '.gz'
+
+        if index_path is None:
+            index_path = self.path.with_name(self.path.name + '.idx.npz')
+        self.index_path = Path(index_path)
+
+        self._offsets = None
+        self._names = None
+        self._handle = None
+
+    @classmethod
+    def library_format(cls, path):
+        """
+        Detect the record format of a library file.
+
+        Parameters:
+        -----------
+        path : str or Path
+            Library file
+
+        Returns:
+        --------
+        str or None
+            'sdf', 'smiles' or None if the file is not a supported library
+        """
+        suffixes = [s.lower() for s in Path(path).suffixes]
+        if suffixes and suffixes[-1] == '.gz':
+            suffixes = suffixes[:-1]
+        if not suffixes:
+            return None
+        if suffixes[-1] in cls.SDF_SUFFIXES:
+            return 'sdf'
+        if suffixes[-1] in cls.SMILES_SUFFIXES:
+            return 'smiles'
+        return None
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        for _, ligand in self.items():
+            yield ligand
+
+    def __getstate__(self):
+        # Open file handles are per process
+        state = self.__dict__.copy()
+        state['_handle'] = None
+        return state
+
+    def close(self):
+        """Close the file handle used for random access."""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    @property
+    def offsets(self):
+        """Byte offset of every record, shape (N,)."""
+        if self._offsets is None:
+            self._load_index()
+        return self._offsets
+
+    @property
+    def names(self):
+        """Unique, file-name safe identifier of every record."""
+        if self._names is None:
+            self._load_index()
+        return self._names
+
+    def records(self):
+        """
+        Reference every record of the library.
+
+        Returns:
+        --------
+        list
+            LigandRecord (source, index, name) per record
+        """
+        source = str(self.path)
+        return [LigandRecord(source, i, name) for i, name in enumerate(self.names)]
+
+    def shard(self, worker_id, n_workers):
+        """
+        Contiguous record range assigned to one of n_workers workers.
+
+        Returns:
+        --------
+        tuple
+            (start, stop) record indices
+        """
+        bounds = np.linspace(0, len(self), n_workers + 1).astype(int)
+        return int(bounds[worker_id]), int(bounds[worker_id + 1])
+
+    def get(self, index):
+        """
+        Parse a single record.
+
+        Parameters:
+        -----------
+        index : int
+            Record index
+
+        Returns:
+        --------
+        Ligand
+            Parsed ligand
+        """
+        if self._handle is None:
+            self._handle = self._open()
+        self._handle.seek(int(self.offsets[index]))
+        for _, block in self._iter_blocks(self._handle):
+            return self.parse_record(block)
+        raise IndexError(f"Record {index} not found in {self.path}")
+
+    def items(self, start=0, stop=None, skip_errors=True):
+        """
+        Stream (name, ligand) pairs for a range of records.
+
+        A full pass without an index is a single sequential read; a shard
+        seeks to its first record through the offset index.
+
+        Parameters:
+        -----------
+        start : int
+            First record index
+        stop : int, optional
+            End of the record range (exclusive)
+        skip_errors : bool
+            Report and skip records that fail to parse instead of raising
+
+        Yields:
+        -------
+        tuple
+            (name, Ligand)
+        """
+        # Without an index, names are assigned while streaming
+        unique_names = _UniqueNames(self.path) if start == 0 and stop is None and self._names is None else None
+        names = None if unique_names else self.names[start:stop]
+
+        with self._open() as handle:
+            if start:
+                handle.seek(int(self.offsets[start]))
+            count = None if stop is None else stop - start
+
+            for i, (_, block) in enumerate(self._iter_blocks(handle)):
+                if count is not None and i >= count:
+                    break
+                name = unique_names.add(self._record_title(block)) if unique_names else names[i]
+                try:
+                    ligand = self.parse_record(block)
+                except ValueError as e:
+                    if not skip_errors:
+                        raise
+                    print(f"Skipping ligand {name}: {e}")
+                    continue
+                yield name, ligand
+
+    def parse_record(self, block):
+        """
+        Parse the text of one record into a Ligand.
+
+        Parameters:
+        -----------
+        block : bytes
+            Raw record text
+
+        Returns:
+        --------
+        Ligand
+            Parsed ligand
+        """
+        from rdkit import Chem
+        from rdkit.Chem import AllChem
+
+        text = block.decode('utf-8', errors='replace')
+        if self.format == 'sdf':
+            mol = Chem.MolFromMolBlock(text, removeHs=False)
+            if mol is None:
+                raise ValueError("Failed to parse SDF record")
+        else:
+            fields = text.split(None, 1)
+            mol = Chem.MolFromSmiles(fields[0]) if fields else None
+            if mol is None:
+                raise ValueError(f"Failed to parse SMILES: {text.strip()}")
+            mol = Chem.AddHs(mol)
+            params = AllChem.ETKDGv3()
+            params.randomSeed = 42
+            if AllChem.EmbedMolecule(mol, params) < 0:
+                raise ValueError(f"Failed to embed SMILES in 3D: {fields[0]}")
+            if len(fields) > 1:
+                mol.SetProp('_Name', fields[1].strip())
+
+        return Ligand.from_rdmol(mol)
+
+    def build_index(self):
+        """
+        Scan the library once and record the offset and name of every record.
+
+        The index is saved to index_path when it is writable and reused
+        while the library file is unchanged.
+        """
+        offsets = []
+        names = _UniqueNames(self.path)
+        with self._open() as handle:
+            for offset, block in self._iter_blocks(handle):
+                offsets.append(offset)
+                names.add(self._record_title(block))
+
+        self._offsets = np.array(offsets, dtype=np.int64)
+        self._names = names.names
+
+        stat = os.stat(self.path)
+        try:
+            with open(self.index_path, 'wb') as f:
+                np.savez(f, offsets=self._offsets, names=np.array(self._names, dtype=str),
+                         source=np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64))
+        except OSError as e:
+            print(f"Warning: could not save ligand library index {self.index_path}: {e}")
+
+    def _load_index(self):
+        """Load the saved index if it matches the library, otherwise rebuild it."""
+        if self.index_path.exists():
+            stat = os.stat(self.path)
+            try:
+                with np.load(self.index_path) as index:
+                    if index['source'].tolist() == [stat.st_size, stat.st_mtime_ns]:
+                        self._offsets = index['offsets']
+                        self._names = index['names'].tolist()
+                        return
+            except (OSError, ValueError, KeyError):
+                pass
+        self.build_index()
+
+    def _open(self):
+        if self.compressed:
+            return gzip.open(self.path, 'rb')
+        return open(self.path, 'rb')
+
+    def _iter_blocks(self, handle):
+        """Yield (offset, raw record) pairs from the current file position."""
+        offset = handle.tell()
+
+        if self.format == 'smiles':
+            for line in handle:
+                stripped = line.strip()
+                if stripped and not stripped.startswith(b'#'):
+                    yield offset, stripped
+                offset += len(line)
+            return
+
+        start = offset
+        lines = []
+        for line in handle:
+            offset += len(line)
+            if line.strip() == b'$$$$':
+                yield start, b''.join(lines)
+                lines = []
+                start = offset
+            else:
+                lines.append(line)
+        if any(line.strip() for line in lines):
+            yield start, b''.join(lines)
+
+    def _record_title(self, block):
+        if self.format == 'smiles':
+            fields = block.split(None, 1)
+            return fields[1].decode('utf-8', errors='replace').strip() if len(fields) > 1 else ''
+        return block.split(b'\n', 1)[0].decode('utf-8', errors='replace').strip()
+
+
+class _UniqueNames:
+    """Turn record titles into unique, file-name safe ligand names."""
+
+    def __init__(self, path):
+        stem = Path(path).name.split('.')[0]
+        self.prefix = re.sub(r'[^A-Za-z0-9._-]+', '_', stem) or 'ligand'
+        self.names = []
+        self._seen = set()
+
+    def add(self, title):
+        index = len(self.names) + 1
+        name = re.sub(r'[^A-Za-z0-9._-]+', '_', title).strip('._') or f"{self.prefix}_{index}"
+        if name in self._seen:
+            # A title may itself look like a generated name, so keep counting
+            base, suffix = f"{name}_{index}", 1
+            name = base
+            while name in self._seen:
+                suffix += 1
+                name = f"{base}_{suffix}"
+        self._seen.add(name)
+        self.names.append(name)
+        return name
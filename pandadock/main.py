@@ -18,7 +18,8 @@ from .utils import (
     save_docking_results,
     create_initial_files,
     update_status,
-    save_intermediate_result
+    save_intermediate_result,
+    flush_status_writers
 )
 from .unified_scoring import (
     ScoringFunction,
@@ -53,6 +54,7 @@ from .main_integration import (
     get_algorithm_kwargs_from_args
 )
 from . import __version__
+from . import profiling
 
 __all__ = ['__version__', 'add_hardware_options', 'configure_hardware',
            'setup_hardware_acceleration', 'create_optimized_scoring_function',
@@ -258,7 +260,8 @@ def _detect_flexible_residues(protein, binding_site_residues, max_residues=5, lo
     # Return up to max_residues
     return [res_id for res_id, _, _ in candidate_residues[:max_residues]]
 
-def write_results_to_txt(results, output_dir, elapsed_time, protein_path, ligand_path, algorithm, iterations, logger):
+def write_results_to_txt(results, output_dir, elapsed_time, protein_path, ligand_path, algorithm, iterations, logger,
+                         search_summary=None):
     """
     Write docking results to a text file.
     
@@ -280,6 +283,8 @@ def write_results_to_txt(results, output_dir, elapsed_time, protein_path, ligand
         Number of iterations/generations
     logger : logging.Logger
         Logger instance
+    search_summary : dict, optional
+        Stop reason, generations and evaluations reported by the search
     """
     results_path = Path(output_dir) / "docking_scores.txt"
     
@@ -306,6 +311,10 @@ def write_results_to_txt(results, output_dir, elapsed_time, protein_path, ligand
         f.write(f"Ligand: {ligand_path}\n")
         f.write(f"Algorithm: {algorithm}\n")
         f.write(f"Iterations/Generations: {iterations}\n")
+        if search_summary:
+            f.write(f"Stop Reason: {search_summary['stop_reason']}\n")
+            f.write(f"Generations Run: {search_summary['generations']}\n")
+            f.write(f"Evaluations: {search_summary['evaluations']}\n")
         f.write(f"Total Runtime: {elapsed_time:.2f} seconds\n\n")
         
         # Check if results is empty
@@ -514,6 +523,9 @@ def main():
                             help='Output directory for docking results')
         parser.add_argument('--verbose', action='store_true', help='Enable verbose output')
         parser.add_argument('--log-file', type=str, default='pandadock.log', help='Log file for verbose output')
+        parser.add_argument('--profile', action='store_true',
+                            help='Record time per scoring term, search phase and I/O step in profile.json '
+                                 'in the output directory')
         parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducibility')
         parser.add_argument('-a', '--algorithm', choices=['random', 'genetic', 'pandadock'], default='genetic',
                             help='Docking algorithm to use (default: genetic)')
@@ -548,6 +560,24 @@ def main():
                             help='Prepare protein and ligand before docking (recommended)')
         parser.add_argument('--population-size', type=int, default=150,
                             help='Population size for genetic algorithm (default: 150)')
+        parser.add_argument('--islands', type=int, default=None,
+                            help='Evolve this many genetic algorithm sub-populations in parallel processes '
+                                 '(island model; --population-size is per island)')
+        parser.add_argument('--migration-interval', type=int, default=5,
+                            help='Generations between migrations of elite poses between islands (default: 5)')
+        parser.add_argument('--migration-topology', choices=['ring', 'fully_connected'], default='ring',
+                            help='Islands exchanging migrants: ring or fully_connected (default: ring)')
+        parser.add_argument('--patience', type=int, default=None,
+                            help='Stop the genetic algorithm after N generations without improvement')
+        parser.add_argument('--score-variance-threshold', type=float, default=None,
+                            help='Stop the genetic algorithm when the population score variance drops below this value')
+        parser.add_argument('--diversity-threshold', type=float, default=None,
+                            help='Stop the genetic algorithm when the mean population RMSD to the best pose '
+                                 'drops below this value (Å)')
+        parser.add_argument('--time-limit', type=float, default=None,
+                            help='Wall-clock budget of the genetic algorithm in seconds')
+        parser.add_argument('--max-evaluations', type=int, default=None,
+                            help='Budget of scored poses for the genetic algorithm')
         parser.add_argument('--exhaustiveness', type=int, default=1,
                             help='Number of independent docking runs (default: 1)')
         parser.add_argument('--local-opt', action='store_true', # Default is False
@@ -576,6 +606,8 @@ def main():
                                 help='Target temperature for pandadock cooling (K)')
         pandadock_group.add_argument('--num-conformers', type=int, default=10,
                                 help='Number of ligand conformers to generate in pandadock')
+        pandadock_group.add_argument('--conformer-cache', type=str, default=None,
+                                help='Directory of precomputed ligand conformer ensembles, reused across runs')
         pandadock_group.add_argument('--num-orientations', type=int, default=10,
                                 help='Number of orientations to try for each conformer in pandadock')
         pandadock_group.add_argument('--md-steps', type=int, default=1000,
@@ -583,7 +615,7 @@ def main():
         pandadock_group.add_argument('--minimize-steps', type=int, default=200,
                                 help='Number of minimization steps for final refinement in pandadock')
         pandadock_group.add_argument('--use-grid', action='store_true',
-                                help='Use grid-based energy calculations in pandadock')
+                                help='Use precomputed receptor grid maps for scoring (rigid receptor)')
         pandadock_group.add_argument('--cooling-factor', type=float, default=0.95,
                                 help='Cooling factor for simulated annealing (applies to PANDADOCK and Monte Carlo)')
 
@@ -687,6 +719,8 @@ def main():
         # Create initial files and setup logging
         create_initial_files(output_dir, args)
         logger = setup_logging(output_dir)
+        if args.profile:
+            profiling.enable()
         logger.info(f"============ PandaDock - Python Molecular Docking ============")
         logger.info(f"PandaDock starting - output will be saved to {output_dir}")
         
@@ -935,6 +969,17 @@ def main():
             else:
                 logger.info("\nUsing standard composite scoring function with hardware acceleration")
                 update_status(output_dir, scoring_function="standard")
+
+        # Tabulate receptor interactions on a grid for rigid-receptor scoring
+        if getattr(args, 'use_grid', False):
+            from .grid_scoring import create_grid_scoring_function
+            scoring_function = create_grid_scoring_function(
+                scoring_function,
+                spacing=args.grid_spacing
+            )
+            if hasattr(scoring_function, 'grid_maps'):
+                logger.info(f"Using precomputed receptor grid maps (spacing = {args.grid_spacing} Å)")
+                update_status(output_dir, grid_maps=True, grid_map_spacing=args.grid_spacing)
         
         # Initialize reporter
         reporter = DockingReporter(output_dir, args, timestamp=readable_date)
@@ -968,6 +1013,7 @@ def main():
                 adv_search_kwargs['n_replicas'] = args.n_replicas
                 adv_search_kwargs['temperatures'] = args.replica_temperatures
                 adv_search_kwargs['exchange_steps'] = args.exchange_steps
+                adv_search_kwargs['n_processes'] = getattr(args, 'cpu_workers', None)
             
             search_algorithm = create_advanced_search_algorithm(
                 args.advanced_search,
@@ -1092,6 +1138,15 @@ def main():
                 # Sort results before selecting top poses for optimization
                 sorted_initial_results = sorted(all_results, key=lambda x: x[1])
                 
+                # MMFF poses are minimized together, sharing the receptor pocket and ligand typing
+                mmff_poses = None
+                if args.mmff_minimization and PHYSICS_AVAILABLE:
+                    mmff_poses = MMFFMinimization().minimize_poses(
+                        protein,
+                        [pose for pose, _ in sorted_initial_results[:poses_to_optimize]],
+                        n_workers=getattr(hybrid_manager, 'n_cpu_workers', 1) or 1
+                    )
+                
                 for i, (pose, score) in enumerate(sorted_initial_results[:poses_to_optimize]):
                     logger.info(f"Optimizing pose {i+1} (initial score: {score:.2f})...")
                     update_status(
@@ -1104,8 +1159,7 @@ def main():
                     if args.mmff_minimization and PHYSICS_AVAILABLE:
                         # Use MMFF minimization in protein environment
                         logger.info(f"  Using MMFF minimization in protein environment")
-                        minimizer = MMFFMinimization()
-                        opt_pose = minimizer.minimize_pose(protein, pose)
+                        opt_pose = mmff_poses[i]
                         opt_score = scoring_function.score(protein, opt_pose)
                         optimized_results.append((opt_pose, opt_score))
                         
@@ -1393,7 +1447,8 @@ def main():
             ligand_path=args.ligand,
             algorithm=algorithm_type,
             iterations=args.iterations if algorithm_type != 'monte-carlo' else args.mc_steps,
-            logger=logger
+            logger=logger,
+            search_summary=getattr(search_algorithm, 'search_summary', None)
         )
         
         # Print summary
@@ -1475,6 +1530,15 @@ def main():
         return_code = 1
     
     finally:
+        # Wait for pending status updates and intermediate poses
+        flush_status_writers()
+        
+        # Write the profile next to status.json
+        profiler = profiling.disable()
+        if profiler is not None and output_dir is not None:
+            profile_path = profiler.save(output_dir)
+            print(f"Profile saved to {profile_path}")
+        
         # Clean up temporary files
         if temp_dir is not None and hasattr(args, 'prepare_molecules') and args.prepare_molecules:
             import shutil
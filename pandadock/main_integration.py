@@ -191,6 +191,21 @@ def create_optimized_search_algorithm(manager, algorithm_type, scoring_function,
 
     # ----------------------------------------------------
     if algorithm_type == 'genetic':
+        if kwargs.get('n_islands'):
+            # Island model: one process per sub-population, whatever the worker count
+            from .parallel_search import IslandGeneticAlgorithm
+            for key in ['n_steps', 'temperature', 'cooling_factor', 'high_temp', 'target_temp',
+                        'num_conformers', 'num_orientations', 'md_steps', 'minimize_steps',
+                        'use_grid', 'use_monte_carlo']:
+                kwargs.pop(key, None)
+            return IslandGeneticAlgorithm(
+                scoring_function=scoring_function,
+                grid_spacing=grid_spacing,
+                grid_radius=grid_radius,
+                grid_center=grid_center,
+                output_dir=output_dir,
+                **kwargs
+            )
         if use_parallel:
             from .parallel_search import ParallelGeneticAlgorithm
             # Remove irrelevant kwargs
@@ -361,6 +376,11 @@ def get_algorithm_type_from_args(args):
     
 
 
+# Stopping criteria accepted by GeneticAlgorithm and ParallelGeneticAlgorithm
+GA_STOPPING_CRITERIA = ('patience', 'score_variance_threshold', 'diversity_threshold',
+                        'time_limit', 'max_evaluations')
+
+
 def get_algorithm_kwargs_from_args(args):
     """
     Get algorithm keyword arguments based on command-line arguments and algorithm type.
@@ -383,6 +403,17 @@ def get_algorithm_kwargs_from_args(args):
         if hasattr(args, 'local_opt'):
             algorithm_kwargs['perform_local_opt'] = args.local_opt
         
+        # Island model
+        if getattr(args, 'islands', None):
+            algorithm_kwargs['n_islands'] = args.islands
+            algorithm_kwargs['migration_interval'] = getattr(args, 'migration_interval', 5)
+            algorithm_kwargs['topology'] = getattr(args, 'migration_topology', 'ring')
+        
+        # Early termination criteria (disabled unless given)
+        for key in GA_STOPPING_CRITERIA:
+            if getattr(args, key, None) is not None:
+                algorithm_kwargs[key] = getattr(args, key)
+        
     elif algorithm_type == 'monte-carlo':
         # Monte Carlo specific parameters
         if hasattr(args, 'mc_steps'):
@@ -416,5 +447,12 @@ def get_algorithm_kwargs_from_args(args):
             
         if hasattr(args, 'use_grid'):
             algorithm_kwargs['use_grid'] = args.use_grid
+        
+        if getattr(args, 'conformer_cache', None):
+            from .conformer_store import ConformerStore
+            algorithm_kwargs['conformer_store'] = ConformerStore(
+                args.conformer_cache,
+                n_conformers=getattr(args, 'num_conformers', 10)
+            )
     
     return algorithm_kwargs
\ No newline at end of file
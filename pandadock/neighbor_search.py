@@ -0,0 +1,174 @@
+"""
+Spatial neighbour search over receptor atoms for PandaDock.
+
+Pairwise energy terms vanish beyond their distance cutoffs, so evaluating
+every receptor-ligand pair wastes most of the work when a large part of
+the receptor is scored. ReceptorNeighborIndex builds a static KD-tree over
+the receptor atoms once and enumerates only the pairs within a cutoff for
+each pose (or for many poses at once).
+"""
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+class ReceptorNeighborIndex:
+    """
+    Static KD-tree over receptor atom coordinates.
+
+    The index is built once per receptor atom selection and queried with
+    ligand coordinates; the receptor is assumed to be rigid while the index
+    is in use (see matches()).
+    """
+
+    def __init__(self, coords):
+        """
+        Build the index.
+
+        Parameters:
+        -----------
+        coords : array-like
+            Receptor atom coordinates, shape (N, 3)
+        """
+        self.coords = np.array(coords, dtype=float).reshape(-1, 3)
+        self.tree = cKDTree(self.coords)
+
+    def __len__(self):
+        return len(self.coords)
+
+    def matches(self, coords):
+        """Check whether the index was built for the given coordinates."""
+        return coords.shape == self.coords.shape and np.array_equal(coords, self.coords)
+
+    def pairs(self, query_coords, cutoff):
+        """
+        Enumerate receptor-query atom pairs within a cutoff.
+
+        Parameters:
+        -----------
+        query_coords : array-like
+            Query (ligand) coordinates, shape (M, 3)
+        cutoff : float
+            Distance cutoff (Å)
+
+        Returns:
+        --------
+        tuple
+            (receptor_indices, query_indices, distances) of all pairs with
+            distance <= cutoff
+        """
+        query_coords = np.asarray(query_coords, dtype=float).reshape(-1, 3)
+        if len(self.coords) == 0 or len(query_coords) == 0:
+            empty = np.zeros(0, dtype=np.intp)
+            return empty, empty, np.zeros(0)
+        pairs = self.tree.sparse_distance_matrix(cKDTree(query_coords), cutoff, output_type='ndarray')
+        return pairs['i'], pairs['j'], pairs['v']
+
+    def count_within(self, query_coords, cutoff):
+        """
+        Count receptor atoms within a cutoff of each query atom.
+
+        Parameters:
+        -----------
+        query_coords : array-like
+            Query (ligand) coordinates, shape (M, 3)
+        cutoff : float
+            Distance cutoff (Å)
+
+        Returns:
+        --------
+        numpy.ndarray
+            Number of receptor atoms near each query atom, shape (M,)
+        """
+        query_coords = np.asarray(query_coords, dtype=float).reshape(-1, 3)
+        if len(self.coords) == 0:
+            return np.zeros(len(query_coords), dtype=int)
+        return self.tree.query_ball_point(query_coords, cutoff, return_length=True)
+
+
+class StericClashChecker:
+    """
+    Steric clash pre-filter bound to a receptor.
+
+    Answers whether any ligand atom lies closer than a threshold to any
+    receptor atom with a nearest-neighbour query on a KD-tree built once
+    per receptor, for one pose or for many candidate poses at once.
+    """
+
+    def __init__(self, coords, threshold=1.6):
+        """
+        Initialize clash checker.
+
+        Parameters:
+        -----------
+        coords : array-like
+            Receptor atom coordinates, shape (N, 3)
+        threshold : float
+            Default minimum allowed distance (Å) between receptor and ligand atoms
+        """
+        self.index = ReceptorNeighborIndex(coords)
+        self.threshold = float(threshold)
+
+    def nearest_distances(self, coords, threshold=None):
+        """
+        Distance from each query atom to the closest receptor atom.
+
+        Distances beyond the threshold are not resolved and returned as inf.
+
+        Parameters:
+        -----------
+        coords : array-like
+            Query coordinates, shape (..., 3)
+        threshold : float, optional
+            Search radius (Å); defaults to the checker threshold
+
+        Returns:
+        --------
+        numpy.ndarray
+            Nearest receptor distance per query atom, shape (...)
+        """
+        threshold = self.threshold if threshold is None else threshold
+        coords = np.asarray(coords, dtype=float)
+        if len(self.index) == 0 or coords.size == 0:
+            return np.full(coords.shape[:-1], np.inf)
+        distances, _ = self.index.tree.query(coords.reshape(-1, 3), k=1, distance_upper_bound=threshold)
+        return distances.reshape(coords.shape[:-1])
+
+    def has_clash(self, coords, threshold=None):
+        """
+        Check a single pose for clashes.
+
+        Parameters:
+        -----------
+        coords : array-like
+            Ligand coordinates, shape (N, 3)
+        threshold : float, optional
+            Minimum allowed distance (Å); defaults to the checker threshold
+
+        Returns:
+        --------
+        bool
+            True if any ligand atom is closer than the threshold to the receptor
+        """
+        threshold = self.threshold if threshold is None else threshold
+        return bool(np.any(self.nearest_distances(coords, threshold) < threshold))
+
+    def clash_mask(self, coords, threshold=None):
+        """
+        Check many candidate poses for clashes in one call.
+
+        Parameters:
+        -----------
+        coords : array-like
+            Stacked ligand coordinates, shape (P, N, 3)
+        threshold : float, optional
+            Minimum allowed distance (Å); defaults to the checker threshold
+
+        Returns:
+        --------
+        numpy.ndarray
+            Boolean array of shape (P,), True for clashing poses
+        """
+        threshold = self.threshold if threshold is None else threshold
+        coords = np.asarray(coords, dtype=float)
+        return np.any(self.nearest_distances(coords, threshold) < threshold, axis=-1)
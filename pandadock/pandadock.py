@@ -31,7 +31,8 @@ class PANDADOCKAlgorithm(DockingSearch):
                  high_temp=1000, target_temp=300, 
                  num_conformers=10, num_orientations=10,
                  md_steps=1000, minimize_steps=200, 
-                 use_grid=True, output_dir=None, grid_spacing=0.375, grid_radius=10.0, grid_center=None):
+                 use_grid=True, output_dir=None, grid_spacing=0.375, grid_radius=10.0, grid_center=None,
+                 conformer_store=None):
         self.grid_spacing = grid_spacing  # Add grid_spacing as an attribute
         self.grid_radius = grid_radius  # Add grid_radius as an attribute
         self.grid_center = np.array(grid_center) if grid_center is not None else np.array([0.0, 0.0, 0.0])  # Default grid center
@@ -59,6 +60,9 @@ class PANDADOCKAlgorithm(DockingSearch):
             Number of minimization steps for final refinement
         use_grid : bool
             Whether to use grid-based energy calculations
+        conformer_store : ConformerStore, optional
+            Store of precomputed conformer ensembles; conformers are taken
+            from it instead of being generated for every run
         """
         super().__init__(scoring_function, max_iterations, output_dir)
         
@@ -70,6 +74,13 @@ class PANDADOCKAlgorithm(DockingSearch):
         self.minimize_steps = minimize_steps
         self.use_grid = use_grid
         self.output_dir = output_dir
+        self.conformer_store = conformer_store
+
+        if self.use_grid:
+            from .grid_scoring import create_grid_scoring_function
+            self.scoring_function = create_grid_scoring_function(
+                self.scoring_function, spacing=grid_spacing
+            )
 
     def _save_sphere_pdb(self, center, radius, filename="sphere.pdb"):
         """
@@ -183,21 +194,17 @@ class PANDADOCKAlgorithm(DockingSearch):
         if not hasattr(ligand, 'rotatable_bonds') or not ligand.rotatable_bonds:
             return conformers
         
-        # Systematic rotation of rotatable bonds to generate diverse conformers
+        # Prebuilt ETKDG ensemble from the conformer store
+        if self.conformer_store is not None and getattr(ligand, 'rdmol', None) is not None:
+            conformers.extend(self.conformer_store.conformers(ligand, self.num_conformers - 1))
+            return conformers
+        
+        # Random torsion angles for all rotatable bonds, rejecting internal clashes
         for _ in range(self.num_conformers - 1):
             # Create a new conformer
             conf = copy.deepcopy(ligand)
-            
-            # Rotate each rotatable bond by a random angle
-            for bond_idx in range(len(conf.rotatable_bonds)):
-                # Random rotation angle (0 to 360 degrees)
-                angle = random.uniform(0, 2 * np.pi)
-                
-                # Apply rotation if the ligand has this method
-                if hasattr(conf, 'rotate_bond'):
-                    conf.rotate_bond(bond_idx, angle)
-            
-            conformers.append(conf)
+            if self._randomize_torsions(conf):
+                conformers.append(conf)
         
         return conformers
     
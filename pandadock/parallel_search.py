@@ -9,12 +9,14 @@ import copy
 import random
 import time
 import multiprocessing as mp
+import queue
 from pathlib import Path
 from scipy.spatial.transform import Rotation, Slerp
 import os
 from scipy.optimize import minimize
 import logging
 
+from . import profiling
 from .search import DockingSearch
 from .search import GeneticAlgorithm, RandomSearch
 from .utils import (
@@ -23,6 +25,33 @@ from .utils import (
     is_inside_sphere, random_point_in_sphere, local_optimize_pose
 )
 
+# ------------------------------------------------------------------------------
+# Worker-side scoring state
+# ------------------------------------------------------------------------------
+# Filled once per worker process by _init_scoring_worker, so the protein,
+# ligand topology and scoring function are not pickled again for every task.
+_worker_state = {}
+
+
+def _init_scoring_worker(scoring_function, protein, ligand):
+    """Pool initializer storing the scoring state in the worker process."""
+    _worker_state['scoring_function'] = scoring_function
+    _worker_state['protein'] = protein
+    _worker_state['ligand'] = ligand
+
+
+def _score_coordinates_in_worker(coords):
+    """Score a (P, N, 3) block of pose coordinates with the worker's state."""
+    return _worker_state['scoring_function'].score_batch(
+        _worker_state['protein'], _worker_state['ligand'], coords)
+
+
+def _score_coordinates_with_state(task):
+    """Score a block of pose coordinates shipped together with its scoring state."""
+    scoring_function, protein, ligand, coords = task
+    return scoring_function.score_batch(protein, ligand, coords)
+
+
 # ------------------------------------------------------------------------------
 # Base Parallel Search Class
 # ------------------------------------------------------------------------------
@@ -137,7 +166,9 @@ class ParallelGeneticAlgorithm(GeneticAlgorithm):
                  mutation_rate=0.2, crossover_rate=0.8, tournament_size=3, 
                  n_processes=None, batch_size=None, process_pool=None, 
                  output_dir=None, perform_local_opt=False, grid_spacing=0.375, 
-                 grid_radius=10.0, grid_center=None, logger=None):
+                 grid_radius=10.0, grid_center=None, logger=None, patience=None,
+                 improvement_tolerance=1e-3, score_variance_threshold=None,
+                 diversity_threshold=None, time_limit=None, max_evaluations=None):
         """
         Initialize parallel genetic algorithm.
         
@@ -171,8 +202,15 @@ class ParallelGeneticAlgorithm(GeneticAlgorithm):
             Radius of the search sphere
         grid_center : array-like
             Center coordinates of the search sphere
-        """
-        super().__init__(scoring_function, max_iterations, population_size, mutation_rate)
+        patience, improvement_tolerance, score_variance_threshold,
+        diversity_threshold, time_limit, max_evaluations
+            Stopping criteria (see GeneticAlgorithm)
+        """
+        super().__init__(scoring_function, max_iterations, population_size, mutation_rate,
+                         patience=patience, improvement_tolerance=improvement_tolerance,
+                         score_variance_threshold=score_variance_threshold,
+                         diversity_threshold=diversity_threshold,
+                         time_limit=time_limit, max_evaluations=max_evaluations)
         self.scoring_function = scoring_function  # Ensure this is set
         self.output_dir = output_dir
         self.crossover_rate = crossover_rate
@@ -196,6 +234,7 @@ class ParallelGeneticAlgorithm(GeneticAlgorithm):
 
         self.process_pool = process_pool
         self.own_pool = False
+        self._pool_state = None
 
         # Performance tracking
         self.eval_time = 0.0
@@ -249,6 +288,7 @@ class ParallelGeneticAlgorithm(GeneticAlgorithm):
         # Generate initial population
         for _ in range(self.population_size):
             pose = copy.deepcopy(ligand)
+            self._randomize_torsions(pose)
 
             # Select a random point from precomputed spherical grid
             random_grid_point = random.choice(self.grid_points)
@@ -517,6 +557,13 @@ class ParallelGeneticAlgorithm(GeneticAlgorithm):
         list
             List of (pose, score) tuples, sorted by score
         """
+        try:
+            return self._genetic_search(protein, ligand)
+        finally:
+            self._close_process_pool()
+
+    def _genetic_search(self, protein, ligand):
+        """Run the evolutionary loop (see search)."""
         start_time = time.time()
         
         # Setup search space
@@ -526,6 +573,7 @@ class ParallelGeneticAlgorithm(GeneticAlgorithm):
         else:
             center = np.mean(protein.xyz, axis=0)
             radius = 10.0
+        self.protein = protein  # Used by _mutate to reject clashing mutations
         self.smart_grid_points = self.initialize_smart_grid(protein, center, radius)
         # Initialize population with clash-free poses
         population = []
@@ -534,8 +582,9 @@ class ParallelGeneticAlgorithm(GeneticAlgorithm):
             if i % 10 == 0:
                 print(f"  {i}/{self.population_size} poses generated")
             
-            pose = self._generate_valid_pose(protein, ligand, center, radius)
-            score = self.scoring_function.score(protein, pose)
+            with profiling.section('search', 'init'):
+                pose = self._generate_valid_pose(protein, ligand, center, radius)
+                score = self.scoring_function.score(protein, pose)
             population.append((pose, score))
     
         # Sort population by score
@@ -558,7 +607,7 @@ class ParallelGeneticAlgorithm(GeneticAlgorithm):
         print(f"Searching around center {center} with radius {radius}")
         
         # Initialize population
-        population = self.initialize_population(protein, ligand)
+        population = profiling.timed('search', 'init', self.initialize_population, protein, ligand)
         
         # Evaluate initial population
         evaluated_population = self._evaluate_population(protein, population)
@@ -577,49 +626,16 @@ class ParallelGeneticAlgorithm(GeneticAlgorithm):
         
         # Track all individuals if population is diverse
         all_individuals = [evaluated_population[0]]
+        self.convergence.start(evaluated_population)
         
         # Main evolutionary loop
         for generation in range(self.max_iterations):
             current_radius = self._adjust_search_radius(radius, generation, self.max_iterations)
 
             gen_start = time.time()
-            
-            # Select parents
-            parents = self._selection(evaluated_population)
-            
-            # Create offspring through crossover and mutation
-            offspring = []
-            
-            # Apply genetic operators
-            for i in range(0, len(parents), 2):
-                if i + 1 < len(parents):
-                    parent1 = parents[i][0]
-                    parent2 = parents[i+1][0]
-                    
-                    # Crossover with probability
-                    if random.random() < self.crossover_rate:
-                        child1, child2 = self._crossover_pair(parent1, parent2)
-                    else:
-                        child1, child2 = copy.deepcopy(parent1), copy.deepcopy(parent2)
-                    
-                    # Mutation
-                    self._mutate(child1, copy.deepcopy(parent1), center, current_radius)
-                    self._mutate(child2, copy.deepcopy(parent2), center, current_radius)
-
-                    offspring.append((child1, None))
-                    offspring.append((child2, None))
-            
-            # Evaluate offspring
-            eval_start = time.time()
-            evaluated_offspring = self._evaluate_population(protein, offspring)
-            self.eval_time += time.time() - eval_start
-            
-            # Combine parent and offspring populations (μ + λ)
-            combined = evaluated_population + evaluated_offspring
-            
-            # Keep only the best individuals (elitism)
-            combined.sort(key=lambda x: x[1])
-            evaluated_population = combined[:self.population_size]
+            evaluated_population, evaluated_offspring = self._next_generation(
+                protein, evaluated_population, center, current_radius
+            )
             
             # Update best solution
             if evaluated_population[0][1] < self.best_score:
@@ -636,7 +652,8 @@ class ParallelGeneticAlgorithm(GeneticAlgorithm):
             
             # Apply local search to the best individual occasionally
             if hasattr(self, '_local_optimization') and generation % 5 == 0:
-                best_pose, best_score = self._local_optimization(evaluated_population[0][0], protein)
+                best_pose, best_score = profiling.timed('search', 'local_opt', self._local_optimization,
+                                                        evaluated_population[0][0], protein)
                 
                 if best_score < self.best_score:
                     self.best_pose = best_pose
@@ -646,6 +663,12 @@ class ParallelGeneticAlgorithm(GeneticAlgorithm):
                     evaluated_population[0] = (best_pose, best_score)
                     evaluated_population.sort(key=lambda x: x[1])
                     all_individuals.append((best_pose, best_score))
+            
+            # Stop early once the search has converged or its budget is spent
+            if self.convergence.update(evaluated_population, len(evaluated_offspring)):
+                break
+        
+        self._finish_search()
         
         # Return unique solutions, best first
         self.total_time = time.time() - start_time
@@ -659,9 +682,127 @@ class ParallelGeneticAlgorithm(GeneticAlgorithm):
         return all_individuals
     
 
+    def _next_generation(self, protein, evaluated_population, center, radius):
+        """
+        Evolve a population by one generation.
+        
+        Parents are chosen by tournament selection, recombined with
+        probability crossover_rate, mutated and scored; the best
+        population_size individuals of parents and offspring survive.
+        
+        Parameters:
+        -----------
+        protein : Protein
+            Protein object
+        evaluated_population : list
+            Current (pose, score) tuples
+        center : array-like
+            Center of the search sphere
+        radius : float
+            Current search radius
+        
+        Returns:
+        --------
+        tuple
+            (population, offspring): the next population sorted by score and
+            the evaluated offspring
+        """
+        # Select parents
+        parents = profiling.timed('search', 'selection', self._selection, evaluated_population)
+        
+        # Create offspring through crossover and mutation
+        offspring = []
+        
+        # Apply genetic operators
+        for i in range(0, len(parents), 2):
+            if i + 1 < len(parents):
+                parent1 = parents[i][0]
+                parent2 = parents[i+1][0]
+                
+                # Crossover with probability
+                if random.random() < self.crossover_rate:
+                    child1, child2 = profiling.timed('search', 'crossover', self._crossover_pair,
+                                                     parent1, parent2)
+                else:
+                    child1, child2 = copy.deepcopy(parent1), copy.deepcopy(parent2)
+                
+                # Mutation
+                with profiling.section('search', 'mutation'):
+                    self._mutate(child1, copy.deepcopy(parent1), center, radius)
+                    self._mutate(child2, copy.deepcopy(parent2), center, radius)
+
+                offspring.append((child1, None))
+                offspring.append((child2, None))
+        
+        # Evaluate offspring
+        eval_start = time.time()
+        evaluated_offspring = self._evaluate_population(protein, offspring)
+        self.eval_time += time.time() - eval_start
+        
+        # Combine parent and offspring populations (μ + λ)
+        combined = evaluated_population + evaluated_offspring
+        
+        # Keep only the best individuals (elitism)
+        combined.sort(key=lambda x: x[1])
+        return combined[:self.population_size], evaluated_offspring
+
+    def _get_process_pool(self, protein, ligand):
+        """
+        Return the worker pool used for population evaluation.
+        
+        A pool created here is initialized once with the protein, ligand
+        topology and scoring function, and is reused for every generation
+        until the receptor or ligand changes. The receptor is treated as
+        rigid while the pool is alive.
+        
+        Parameters:
+        -----------
+        protein : Protein
+            Protein object
+        ligand : Ligand
+            Any pose of the ligand being docked
+        
+        Returns:
+        --------
+        multiprocessing.Pool or None
+            Worker pool, or None to score in the calling process
+        """
+        if self.process_pool is not None and not self.own_pool:
+            return self.process_pool
+        if self.n_processes <= 1:
+            return None
+        
+        state = (protein, getattr(ligand, 'atom_records', ligand))
+        if self.process_pool is not None and self._pool_state is not None:
+            if state[0] is self._pool_state[0] and state[1] is self._pool_state[1]:
+                return self.process_pool
+            self._close_process_pool()
+        
+        self.process_pool = mp.Pool(
+            processes=self.n_processes,
+            initializer=_init_scoring_worker,
+            initargs=(self.scoring_function, protein, ligand.copy())
+        )
+        self.own_pool = True
+        self._pool_state = state
+        return self.process_pool
+    
+    def _close_process_pool(self):
+        """Shut down the worker pool if it was created by this instance."""
+        if self.own_pool and self.process_pool is not None:
+            self.process_pool.close()
+            self.process_pool.join()
+            self.process_pool = None
+            self.own_pool = False
+            self._pool_state = None
+    
     def _evaluate_population(self, protein, population):
         """
-        Evaluate population sequentially to avoid multiprocessing issues.
+        Evaluate population in parallel.
+        
+        Pose coordinates are stacked and split into chunks of batch_size
+        poses; each worker scores its chunks with score_batch and only the
+        coordinate arrays and scores cross process boundaries.
         
         Parameters:
         -----------
@@ -675,23 +816,25 @@ class ParallelGeneticAlgorithm(GeneticAlgorithm):
         list
             Evaluated population as (pose, score) tuples
         """
-        results = []
+        if not population:
+            return []
         
-        # Process all poses
-        for i, (pose, _) in enumerate(population):
-            # Show progress for large populations
-            if i % 10 == 0 and i > 0 and len(population) > 50:
-                print(f"  Evaluating pose {i}/{len(population)}...")
-                
-            score = self.scoring_function.score(protein, pose)
-            results.append((copy.deepcopy(pose), score))
-
-            if detect_steric_clash(protein.atoms, pose.atoms):
-                score = float('inf')  # or apply a large clash penalty
+        poses = [pose for pose, _ in population]
+        coords = np.stack([pose.xyz for pose in poses])
+        chunks = [coords[i:i + self.batch_size] for i in range(0, len(coords), self.batch_size)]
+        
+        pool = self._get_process_pool(protein, poses[0]) if len(chunks) > 1 else None
+        with profiling.section('search', 'evaluation'):
+            if pool is None:
+                scores = self.scoring_function.score_batch(protein, poses[0], coords)
+            elif self.own_pool:
+                scores = np.concatenate(pool.map(_score_coordinates_in_worker, chunks))
             else:
-                score = self.scoring_function.score(protein, pose)
-                
-        return results
+                # An external pool was not initialized with our state, so ship it per chunk
+                tasks = [(self.scoring_function, protein, poses[0], chunk) for chunk in chunks]
+                scores = np.concatenate(pool.map(_score_coordinates_with_state, tasks))
+        
+        return [(pose, float(score)) for pose, score in zip(poses, scores)]
     
     def _selection(self, population):
         """
@@ -752,10 +895,9 @@ class ParallelGeneticAlgorithm(GeneticAlgorithm):
         child1.translate(new_centroid1 - centroid1)
         child2.translate(new_centroid2 - centroid2)
         
-        # Fragment-based crossover
-        fragment_indices = random.sample(range(len(parent1.xyz)), len(parent1.xyz) // 2)
-        for idx in fragment_indices:
-            child1.xyz[idx], child2.xyz[idx] = child2.xyz[idx], child1.xyz[idx]
+        # Exchange torsion genes
+        self._crossover_torsions(child1, parent2)
+        self._crossover_torsions(child2, parent1)
         
         # Rotation interpolation
         rotation1 = Rotation.random()
@@ -966,6 +1108,7 @@ class ParallelGeneticAlgorithm(GeneticAlgorithm):
         for attempt in range(max_attempts):
             # Create a fresh copy
             pose = copy.deepcopy(ligand)
+            self._randomize_torsions(pose)
             
             # Choose a random valid grid point
             if not hasattr(self, 'smart_grid_points') or self.smart_grid_points is None:
@@ -1016,8 +1159,14 @@ class ParallelGeneticAlgorithm(GeneticAlgorithm):
         if random.random() >= self.mutation_rate:
             return  # No mutation
 
-        # Perform either translation, rotation, or both
-        mutation_type = random.choice(['translation', 'rotation', 'both'])
+        # Perform either translation, rotation, both or a torsion change
+        mutation_types = ['translation', 'rotation', 'both']
+        if getattr(individual, 'active_torsions', None):
+            mutation_types.append('torsion')
+        mutation_type = random.choice(mutation_types)
+
+        if mutation_type == 'torsion':
+            self._mutate_torsions(individual)
 
         if mutation_type in ['translation', 'both']:
             translation = np.random.normal(0, 2.0, 3)  # 2.0 Å standard deviation
@@ -1037,12 +1186,13 @@ class ParallelGeneticAlgorithm(GeneticAlgorithm):
         if not is_within_grid(individual, center, radius):
             # If out of bounds, revert to original
             individual.xyz = original_individual.xyz.copy()
-            original_xyz = individual.xyz.copy()
+            individual.torsions = original_individual.torsions.copy()
 
         # Verify no clashes were introduced
         if not self._check_pose_validity(individual, self.protein):
             # Revert to original if mutation caused clashes
-            individual.xyz = original_xyz
+            individual.xyz = original_individual.xyz.copy()
+            individual.torsions = original_individual.torsions.copy()
 
         return individual
 
@@ -1305,6 +1455,7 @@ class ParallelGeneticAlgorithm(GeneticAlgorithm):
         for attempt in range(max_attempts):
             # Create a new pose
             pose = copy.deepcopy(ligand)
+            self._randomize_torsions(pose)
             
             # Sample from the grid points if available
             if self.grid_points is not None and len(self.grid_points) > 0:
@@ -1558,6 +1709,404 @@ class ParallelGeneticAlgorithm(GeneticAlgorithm):
         
         # Return clash status and score
         return (clash_score > 0.3 or max_overlap > 0.3), clash_score
+# ------------------------------------------------------------------------------
+# Island-Model Genetic Algorithm
+# ------------------------------------------------------------------------------
+# Each island evolves its own sub-population in a separate process. Every
+# migration_interval generations an island sends copies of its elite to the
+# islands it is connected to and replaces its worst individuals with the
+# migrants it receives. Migrants travel as arrays (coordinates, torsion state
+# and scores), never as pickled poses; the receiving island rebuilds them
+# from its own copy of the ligand topology.
+
+MIGRATION_TOPOLOGIES = ('ring', 'fully_connected')
+
+
+class MigrationBroker:
+    """
+    Local stand-in for a message broker exchanging migrants between islands.
+    
+    Every island owns an inbox queue. Messages are tagged with the migration
+    epoch (generation), so an island that runs ahead never mixes migrants of
+    different epochs. An island that stops early keeps draining its inbox
+    until its sources have finished, since a process cannot exit while
+    unread messages it put on a queue fill the pipe. A distributed
+    deployment would replace the queues with a network broker exposing the
+    same send/receive/finish/drain methods.
+    """
+    
+    def __init__(self, n_islands, topology='ring', timeout=300.0, context=None):
+        """
+        Create the inboxes of all islands.
+        
+        Parameters:
+        -----------
+        n_islands : int
+            Number of islands
+        topology : str
+            'ring' (each island sends to the next one) or 'fully_connected'
+            (each island sends to all others)
+        timeout : float
+            Maximum time (s) an island waits for the migrants of one epoch
+        context : multiprocessing context, optional
+            Context used to create the queues
+        """
+        if topology not in MIGRATION_TOPOLOGIES:
+            raise ValueError(f"Unknown migration topology '{topology}', "
+                             f"expected one of {MIGRATION_TOPOLOGIES}")
+        context = context or mp.get_context()
+        self.n_islands = n_islands
+        self.topology = topology
+        self.timeout = timeout
+        self.inboxes = [context.Queue() for _ in range(n_islands)]
+        # Messages of later epochs and finished sources, per receiving island
+        self._pending = {}
+        self._finished = set()
+    
+    def targets(self, island):
+        """Islands that receive the migrants of an island."""
+        if self.n_islands < 2:
+            return []
+        if self.topology == 'ring':
+            return [(island + 1) % self.n_islands]
+        return [i for i in range(self.n_islands) if i != island]
+    
+    def sources(self, island):
+        """Islands whose migrants an island receives."""
+        return [i for i in range(self.n_islands) if island in self.targets(i)]
+    
+    def send(self, island, epoch, coords, torsions, scores):
+        """
+        Send migrants to the islands connected to an island.
+        
+        Parameters:
+        -----------
+        island : int
+            Sending island
+        epoch : int
+            Generation at which the migration takes place
+        coords : numpy.ndarray
+            Migrant coordinates, shape (M, N, 3)
+        torsions : numpy.ndarray
+            Torsion state of the migrants, shape (M, T)
+        scores : numpy.ndarray
+            Migrant scores, shape (M,)
+        """
+        for target in self.targets(island):
+            self.inboxes[target].put((island, epoch, (coords, torsions, scores)))
+    
+    def finish(self, island):
+        """Tell the connected islands that an island sends no more migrants."""
+        for target in self.targets(island):
+            self.inboxes[target].put((island, None, None))
+    
+    def receive(self, island, epoch):
+        """
+        Collect the migrants of an epoch from all connected islands.
+        
+        Waits until every source island has sent its migrants for the epoch
+        or has finished, or until the timeout expires.
+        
+        Parameters:
+        -----------
+        island : int
+            Receiving island
+        epoch : int
+            Migration epoch
+        
+        Returns:
+        --------
+        list
+            (coords, torsions, scores) tuples, one per source
+        """
+        pending = self._pending.setdefault(island, {})
+        expected = [source for source in self.sources(island) if source not in self._finished]
+        migrants = []
+        deadline = time.time() + self.timeout
+        
+        while expected:
+            for source in list(expected):
+                if (source, epoch) in pending:
+                    migrants.append(pending.pop((source, epoch)))
+                    expected.remove(source)
+            if not expected:
+                break
+            try:
+                source, message_epoch, payload = self.inboxes[island].get(
+                    timeout=max(0.0, deadline - time.time()))
+            except queue.Empty:
+                print(f"Island {island}: no migrants from islands {expected} "
+                      f"at generation {epoch}, continuing without them")
+                break
+            if message_epoch is None:
+                self._finished.add(source)
+                if source in expected:
+                    expected.remove(source)
+            else:
+                pending[(source, message_epoch)] = payload
+        
+        return migrants
+    
+    def drain(self, island):
+        """
+        Discard the migrants sent to a finished island until all its sources
+        have finished, or until no message arrived within the timeout.
+        
+        Parameters:
+        -----------
+        island : int
+            Finished island
+        """
+        self._pending.pop(island, None)
+        remaining = [source for source in self.sources(island) if source not in self._finished]
+        while remaining:
+            try:
+                source, message_epoch, _ = self.inboxes[island].get(timeout=self.timeout)
+            except queue.Empty:
+                break
+            if message_epoch is None:
+                self._finished.add(source)
+                if source in remaining:
+                    remaining.remove(source)
+
+
+def _run_island(search, island, protein, ligand, broker, results, seed):
+    """
+    Worker process of IslandGeneticAlgorithm evolving one island.
+    
+    Puts (island, coords, torsions, scores, summary) of the final
+    population on the results queue, then drains the island's inbox so the
+    islands still running can exit.
+    """
+    random.seed(seed)
+    np.random.seed(seed % 2**32)
+    
+    try:
+        population, summary = search._evolve_island(island, protein, ligand, broker)
+    except Exception as e:
+        print(f"Island {island} failed: {e}")
+        broker.finish(island)
+        results.put((island, None, None, None, {'stop_reason': 'error', 'error': str(e)}))
+    else:
+        coords, torsions, scores = IslandGeneticAlgorithm._pack(population)
+        results.put((island, coords, torsions, scores, summary))
+    broker.drain(island)
+
+
+class IslandGeneticAlgorithm(ParallelGeneticAlgorithm):
+    """
+    Island-model genetic algorithm.
+    
+    n_islands sub-populations of population_size individuals are evolved in
+    separate processes with the operators of ParallelGeneticAlgorithm
+    (_selection, _crossover_pair, _mutate). Every migration_interval
+    generations each island sends its n_migrants best individuals to its
+    neighbours in the migration topology, where they replace the worst
+    individuals. The islands keep their diversity between migrations while
+    good solutions still spread through the archipelago.
+    """
+    
+    def __init__(self, scoring_function, max_iterations=10, population_size=50,
+                 n_islands=None, migration_interval=5, n_migrants=2, topology='ring',
+                 migration_timeout=300.0, seed=None, **kwargs):
+        """
+        Initialize island-model genetic algorithm.
+        
+        Parameters:
+        -----------
+        scoring_function : ScoringFunction
+            Scoring function to evaluate poses
+        max_iterations : int
+            Maximum number of generations per island
+        population_size : int
+            Size of each island's population
+        n_islands : int
+            Number of islands, each evolved by one process (None = number
+            of CPU cores)
+        migration_interval : int
+            Generations between two migrations
+        n_migrants : int
+            Elite individuals each island sends per migration
+        topology : str
+            Migration topology, 'ring' or 'fully_connected'
+        migration_timeout : float
+            Maximum time (s) an island waits for its migrants
+        seed : int, optional
+            Base random seed; island i is seeded with seed + i
+        **kwargs : dict
+            Further ParallelGeneticAlgorithm parameters (mutation_rate,
+            crossover_rate, stopping criteria, ...)
+        """
+        super().__init__(scoring_function, max_iterations, population_size, **kwargs)
+        if topology not in MIGRATION_TOPOLOGIES:
+            raise ValueError(f"Unknown migration topology '{topology}', "
+                             f"expected one of {MIGRATION_TOPOLOGIES}")
+        self.n_islands = n_islands or mp.cpu_count()
+        self.migration_interval = max(1, int(migration_interval))
+        self.n_migrants = n_migrants
+        self.topology = topology
+        self.migration_timeout = migration_timeout
+        self.seed = seed
+    
+    def search(self, protein, ligand):
+        """
+        Evolve all islands in parallel and merge their final populations.
+        
+        Parameters:
+        -----------
+        protein : Protein
+            Protein object
+        ligand : Ligand
+            Ligand object
+        
+        Returns:
+        --------
+        list
+            (pose, score) tuples of all islands' final populations, sorted
+            by score
+        """
+        start_time = time.time()
+        if self.seed is None:
+            seed = random.randrange(2**31)
+        else:
+            seed = self.seed
+        
+        print(f"Starting island-model genetic algorithm with {self.n_islands} islands of "
+              f"{self.population_size} poses ({self.topology} topology, migration of "
+              f"{self.n_migrants} poses every {self.migration_interval} generations)")
+        
+        context = mp.get_context()
+        broker = MigrationBroker(self.n_islands, self.topology, self.migration_timeout, context)
+        results = context.Queue()
+        processes = [
+            context.Process(target=_run_island,
+                            args=(self, island, protein, ligand, broker, results, seed + island),
+                            daemon=True)
+            for island in range(self.n_islands)
+        ]
+        for process in processes:
+            process.start()
+        
+        # Collect one result per island; stop waiting for islands that died
+        island_results = {}
+        while len(island_results) < self.n_islands:
+            try:
+                island, coords, torsions, scores, summary = results.get(timeout=1.0)
+                island_results[island] = (coords, torsions, scores, summary)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes) and results.empty():
+                    break
+        for process in processes:
+            process.join(timeout=10.0)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        
+        population = []
+        summaries = []
+        for island in sorted(island_results):
+            coords, torsions, scores, summary = island_results[island]
+            summaries.append(summary)
+            if coords is not None:
+                population.extend(self._unpack(ligand, coords, torsions, scores))
+        
+        if not population:
+            print("[Error] No island returned a population.")
+            return []
+        population.sort(key=lambda x: x[1])
+        self.best_pose, self.best_score = population[0]
+        
+        self.total_time = time.time() - start_time
+        self._finish_search({
+            'stop_reason': ','.join(sorted({s['stop_reason'] for s in summaries})),
+            'generations': max(s.get('generations', 0) for s in summaries),
+            'evaluations': sum(s.get('evaluations', 0) for s in summaries),
+            'elapsed_time': self.total_time,
+            'islands': summaries,
+        })
+        print(f"Island search completed in {self.total_time:.2f} seconds. "
+              f"Best score: {self.best_score:.4f}")
+        return population
+    
+    def _evolve_island(self, island, protein, ligand, broker):
+        """
+        Evolve one island, exchanging migrants through the broker.
+        
+        Runs inside the island's process; population scoring stays in that
+        process.
+        
+        Returns:
+        --------
+        tuple
+            (population, summary): final (pose, score) tuples and the
+            convergence summary of the island
+        """
+        self.n_processes = 1
+        self.process_pool = None
+        self.own_pool = False
+        self.protein = protein  # Used by _mutate to reject clashing mutations
+        
+        if protein.active_site:
+            center = protein.active_site['center']
+            radius = protein.active_site['radius']
+        else:
+            center = np.mean(protein.xyz, axis=0)
+            radius = 10.0
+        
+        # Random grid poses, topped up with clash-free poses if too few were valid
+        population = self.initialize_population(protein, ligand)
+        while len(population) < self.population_size:
+            population.append((self._generate_valid_pose(protein, ligand, center, radius), None))
+        population = self._evaluate_population(protein, population[:self.population_size])
+        population.sort(key=lambda x: x[1])
+        self.convergence.start(population)
+        
+        for generation in range(self.max_iterations):
+            current_radius = self._adjust_search_radius(radius, generation, self.max_iterations)
+            population, offspring = self._next_generation(protein, population, center, current_radius)
+            
+            epoch = generation + 1
+            if epoch % self.migration_interval == 0 and epoch < self.max_iterations:
+                broker.send(island, epoch, *self._pack(population[:self.n_migrants]))
+                for coords, torsions, scores in broker.receive(island, epoch):
+                    population = self._integrate_migrants(
+                        population, self._unpack(ligand, coords, torsions, scores))
+            
+            print(f"Island {island} generation {epoch}/{self.max_iterations}: "
+                  f"Best score = {population[0][1]:.4f}")
+            
+            if self.convergence.update(population, len(offspring)):
+                break
+        
+        broker.finish(island)
+        return population, self.convergence.summary()
+    
+    def _integrate_migrants(self, population, migrants):
+        """Replace the worst individuals of a sorted population with migrants."""
+        combined = population[:max(0, len(population) - len(migrants))] + migrants
+        combined.sort(key=lambda x: x[1])
+        return combined[:self.population_size]
+    
+    @staticmethod
+    def _pack(population):
+        """Coordinate, torsion and score arrays of (pose, score) tuples."""
+        coords = np.stack([pose.xyz for pose, _ in population])
+        torsions = np.stack([np.asarray(pose.torsions, dtype=float) for pose, _ in population])
+        scores = np.array([score for _, score in population], dtype=float)
+        return coords, torsions, scores
+    
+    @staticmethod
+    def _unpack(ligand, coords, torsions, scores):
+        """(pose, score) tuples rebuilt from arrays on a ligand's topology."""
+        population = []
+        for xyz, pose_torsions, score in zip(coords, torsions, scores):
+            pose = ligand.copy()
+            pose.xyz = xyz.copy()
+            pose.torsions = pose_torsions.copy()
+            population.append((pose, float(score)))
+        return population
+
+
 # ------------------------------------------------------------------------------
 # Parallel Random Search
 # ------------------------------------------------------------------------------
@@ -9,11 +9,18 @@ import os
 import tempfile
 import seaborn as sns
 import copy
+import threading
+import multiprocessing as mp
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import matplotlib.pyplot as plt
 from .utils import save_docking_results
 from .ligand import Ligand
 from .protein import Protein
 from .utils import generate_valid_random_pose
+from .neighbor_search import ReceptorNeighborIndex
+from scipy.optimize import minimize
+from scipy.spatial import cKDTree
 
 # -------------------------------------------
 # Constants section for shared parameters
@@ -82,6 +89,16 @@ class BaseScoringFunction:
     def score(self, protein, ligand):
         """Calculate binding score between protein and ligand."""
         raise NotImplementedError("Subclasses must implement this method")
+
+    def score_batch(self, protein, ligand, coords):
+        """Score several poses of the same ligand, given stacked coordinates of shape (P, N, 3)."""
+        coords = np.asarray(coords, dtype=float)
+        pose = ligand.copy()
+        scores = np.empty(len(coords))
+        for i, pose_coords in enumerate(coords):
+            pose.xyz[...] = pose_coords
+            scores[i] = self.score(protein, pose)
+        return scores
     
     def calculate_vdw(self, protein_atoms, ligand_atoms):
         """Calculate van der Waals energy."""
@@ -121,9 +138,24 @@ class MMFFMinimization:
     """
     MMFF94 Force Field minimization for ligands using RDKit.
     This provides full molecular mechanics energy minimization.
+    
+    Molecules are built in memory from the ligand's RDKit molecule (or
+    its topology) and the current pose coordinates, and minimized
+    coordinates are written straight back into a copy of the pose.
+
+    Pose minimization keeps the receptor fixed, so its internal terms are
+    constant: the energy is the ligand's own MMFF force field plus the
+    MMFF van der Waals and electrostatic terms between the ligand and the
+    receptor residues around it. The pocket fragment is kept per
+    receptor, and the ligand force field and ligand-pocket parameters per
+    ligand topology, so poses of the same ligand only update coordinates
+    and minimize.
     """
     
-    def __init__(self, max_iterations=200, converge_criterion=0.01):
+    # Ligand systems (force field and pocket parameters) kept per pocket fragment
+    max_cached_systems = 8
+    
+    def __init__(self, max_iterations=200, converge_criterion=0.01, pocket_margin=2.0):
         """
         Initialize MMFF minimization.
         
@@ -133,11 +165,30 @@ class MMFFMinimization:
             Maximum number of minimization steps
         converge_criterion : float
             Convergence criterion for energy change
+        pocket_margin : float
+            Extra distance (Angstroms) around the first pose included in the
+            cached pocket fragment, so nearby poses reuse it
         """
         self.max_iterations = max_iterations
         self.converge_criterion = converge_criterion
+        self.pocket_margin = pocket_margin
+        self._receptor_cache = None
+        self._pocket_cache = None
+        self._lock = threading.Lock()
         self._check_rdkit()
     
+    def __getstate__(self):
+        # RDKit fragments and receptor records are rebuilt in worker processes
+        state = self.__dict__.copy()
+        state['_receptor_cache'] = None
+        state['_pocket_cache'] = None
+        state['_lock'] = None
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+    
     def _check_rdkit(self):
         """Check if RDKit is available and raise import error if not."""
         try:
@@ -167,18 +218,9 @@ class MMFFMinimization:
             return ligand
         
         try:
-            from rdkit import Chem
             from rdkit.Chem import AllChem
             
-            # Create a temporary file for the ligand
-            fd, tmp_file = tempfile.mkstemp(suffix='.sdf')
-            os.close(fd)
-            
-            # Write ligand to SDF file
-            self._write_ligand_to_sdf(ligand, tmp_file)
-            
-            # Read with RDKit
-            mol = Chem.SDMolSupplier(tmp_file)[0]
+            mol = self._ligand_mol(ligand)
             if mol is None:
                 print("Error: Could not read ligand with RDKit.")
                 return ligand
@@ -195,24 +237,13 @@ class MMFFMinimization:
                 print("Warning: MMFF setup failed. Falling back to UFF.")
                 AllChem.UFFOptimizeMolecule(mol, maxIters=self.max_iterations)
             
-            # Write minimized structure back to file
-            writer = Chem.SDWriter(tmp_file)
-            writer.write(mol)
-            writer.close()
-            
-            # Read back into a new ligand object
-            minimized_ligand = self._read_ligand_from_sdf(tmp_file)
-            
-            # Clean up
-            os.unlink(tmp_file)
-            
-            return minimized_ligand
+            return self._pose_with_coords(ligand, mol.GetConformer().GetPositions())
             
         except Exception as e:
             print(f"Error during minimization: {e}")
             return ligand
     
-    def minimize_pose(self, protein, ligand_pose, distance_cutoff=2.0):
+    def minimize_pose(self, protein, ligand_pose, distance_cutoff=2.0, pocket_cutoff=6.0):
         """
         Perform constrained minimization of a ligand pose in protein environment.
         
@@ -224,6 +255,9 @@ class MMFFMinimization:
             Ligand pose to minimize
         distance_cutoff : float
             Distance cutoff for protein-ligand interactions (Angstroms)
+        pocket_cutoff : float
+            Receptor residues with an atom within this distance (Angstroms)
+            of the pose are included, fixed, in the minimization
         
         Returns:
         --------
@@ -235,125 +269,348 @@ class MMFFMinimization:
             return ligand_pose
         
         try:
-            from rdkit import Chem
             from rdkit.Chem import AllChem
             
-            # Create temporary files
-            fd1, tmp_ligand = tempfile.mkstemp(suffix='.sdf')
-            fd2, tmp_protein = tempfile.mkstemp(suffix='.pdb')
-            os.close(fd1)
-            os.close(fd2)
-            
-            # Write ligand and protein to files
-            self._write_ligand_to_sdf(ligand_pose, tmp_ligand)
-            self._write_protein_to_pdb(protein, tmp_protein)
-            
-            # Read with RDKit
-            lig_mol = Chem.SDMolSupplier(tmp_ligand)[0]
-            prot_mol = Chem.MolFromPDB(tmp_protein)
-            
-            if lig_mol is None or prot_mol is None:
+            system = self._pose_system(protein, ligand_pose, pocket_cutoff)
+            if system is None:
                 print("Error reading molecules for constrained minimization.")
                 return ligand_pose
             
-            # Create a combined system for MMFF
-            combo = Chem.CombineMols(prot_mol, lig_mol)
-            
-            # Setup MMFF and minimize
             try:
-                # This part is experimental and may not work in all RDKit versions
-                mp = AllChem.MMFFGetMoleculeProperties(combo)
-                ff = AllChem.MMFFGetMoleculeForceField(
-                    combo, mp, nonBondedThresh=distance_cutoff
-                )
-                
-                # Freeze protein atoms
-                for i in range(prot_mol.GetNumAtoms()):
-                    ff.AddFixedPoint(i)
-                
-                # Run minimization
-                ff.Minimize(maxIts=self.max_iterations, 
-                           energyTol=self.converge_criterion)
-                
-                # Extract ligand part
-                minimized_mol = Chem.DeleteSubstructs(combo, prot_mol)
-                
-                # Write to file
-                writer = Chem.SDWriter(tmp_ligand)
-                writer.write(minimized_mol)
-                writer.close()
-                
-                # Read minimized pose
-                minimized_pose = self._read_ligand_from_sdf(tmp_ligand)
+                if system['force_field'] is None:
+                    raise ValueError("missing MMFF parameters for the pocket or ligand")
+                coords = self._minimize_in_pocket(system, ligand_pose.xyz, distance_cutoff)
                 
             except Exception as e:
                 print(f"MMFF constrained minimization failed: {e}")
                 print("Falling back to ligand-only minimization.")
+                lig_mol = self._ligand_mol(ligand_pose)
                 AllChem.MMFFOptimizeMolecule(lig_mol, maxIters=self.max_iterations)
-                
-                # Write to file
-                writer = Chem.SDWriter(tmp_ligand)
-                writer.write(lig_mol)
-                writer.close()
-                
-                # Read minimized pose
-                minimized_pose = self._read_ligand_from_sdf(tmp_ligand)
+                coords = lig_mol.GetConformer().GetPositions()
             
-            # Clean up
-            os.unlink(tmp_ligand)
-            os.unlink(tmp_protein)
-            
-            return minimized_pose
+            return self._pose_with_coords(ligand_pose, coords)
             
         except Exception as e:
             print(f"Error during constrained minimization: {e}")
             return ligand_pose
     
-    def _write_ligand_to_sdf(self, ligand, filename):
-        """Write ligand to SDF file."""
-        with open(filename, 'w') as f:
-            f.write("Ligand\n")
-            f.write("  PandaDock\n\n")
-            
-            # Number of atoms and bonds
-            f.write(f"{len(ligand.atoms):3d}{len(ligand.bonds):3d}  0  0  0  0  0  0  0  0999 V2000\n")
-            
-            # Atoms
-            for atom in ligand.atoms:
-                coords = atom['coords']
-                symbol = atom.get('symbol', 'C')
-                f.write(f"{coords[0]:10.4f}{coords[1]:10.4f}{coords[2]:10.4f} {symbol:<3}  0  0  0  0  0  0  0  0  0  0  0  0\n")
+    def _minimize_in_pocket(self, system, coords, distance_cutoff):
+        """L-BFGS minimization of ligand coordinates in the fixed pocket."""
+        force_field = system['force_field']
+        x0 = np.asarray(coords, dtype=float).ravel()
+        # Like RDKit's nonBondedThresh, the cutoff selects the pairs once, so
+        # the objective stays smooth while atoms move across it
+        pairs = self._pocket_pairs(system, x0.reshape(-1, 3), distance_cutoff)
+        
+        def objective(x):
+            positions = x.tolist()
+            energy, gradient = self._pocket_interaction(system, x.reshape(-1, 3), pairs)
+            energy += force_field.CalcEnergy(positions)
+            gradient = gradient.ravel() + np.asarray(force_field.CalcGrad(positions))
+            return energy, gradient
+        
+        initial_energy, _ = objective(x0)
+        # converge_criterion is an absolute energy change; L-BFGS-B takes a relative one
+        result = minimize(objective, x0, jac=True, method='L-BFGS-B',
+                          options={'maxiter': self.max_iterations,
+                                   'ftol': self.converge_criterion / max(abs(initial_energy), 1.0)})
+        return result.x.reshape(-1, 3)
+    
+    @staticmethod
+    def _pocket_pairs(system, coords, distance_cutoff):
+        """Mask of pocket-ligand atom pairs within the cutoff, shape (pocket atoms, ligand atoms)."""
+        d = np.linalg.norm(coords[None, :, :] - system['pocket_coords'][:, None, :], axis=-1)
+        return d <= distance_cutoff
+    
+    @staticmethod
+    def _pocket_interaction(system, coords, pairs):
+        """
+        MMFF buffered 14-7 and electrostatic energy (and ligand gradient) with the pocket.
+        
+        Only the atom pairs in the fixed mask (see _pocket_pairs) interact.
+        """
+        if not pairs.any():
+            return 0.0, np.zeros_like(coords)
+        
+        offsets = coords[None, :, :] - system['pocket_coords'][:, None, :]
+        d = np.linalg.norm(offsets, axis=-1)
+        d = np.where(pairs, d, 1.0)
+        r_star, epsilon = system['r_star'], system['epsilon']
+        a = 1.07 * r_star / (d + 0.07 * r_star)
+        d7, r7 = d ** 7, 0.12 * r_star ** 7
+        b = 1.12 * r_star ** 7 / (d7 + r7)
+        vdw = epsilon * a ** 7 * (b - 2.0)
+        dvdw = epsilon * a ** 7 * (-7.0 * (b - 2.0) / (d + 0.07 * r_star) - 7.0 * b * d ** 6 / (d7 + r7))
+        elec = system['charge_products'] / (d + 0.05)
+        delec = -elec / (d + 0.05)
+        
+        energy = float(np.sum(np.where(pairs, vdw + elec, 0.0)))
+        scale = np.where(pairs, (dvdw + delec) / np.maximum(d, 1e-12), 0.0)
+        return energy, np.sum(scale[:, :, None] * offsets, axis=0)
+    
+    def minimize_poses(self, protein, poses, n_workers=1, backend='thread', distance_cutoff=2.0,
+                       pocket_cutoff=6.0):
+        """
+        Minimize several poses (e.g. the top-k poses of a ligand) in a pool.
+        
+        Parameters:
+        -----------
+        protein : Protein
+            Protein object from PandaDock
+        poses : list
+            Ligand poses to minimize
+        n_workers : int
+            Number of threads or processes
+        backend : str
+            'thread' shares this minimizer's caches between threads;
+            'process' gives every worker process its own copy of the
+            minimizer and protein
+        distance_cutoff : float
+            Distance cutoff for protein-ligand interactions (Angstroms)
+        pocket_cutoff : float
+            Receptor residue cutoff around each pose (Angstroms)
+        
+        Returns:
+        --------
+        list
+            Minimized poses in input order
+        """
+        poses = list(poses)
+        n_workers = min(n_workers or 1, len(poses))
+        if n_workers <= 1:
+            return [self.minimize_pose(protein, pose, distance_cutoff, pocket_cutoff) for pose in poses]
+        
+        if backend == 'process':
+            with mp.Pool(processes=n_workers, initializer=_init_mmff_worker,
+                         initargs=(self, protein)) as pool:
+                return pool.map(_minimize_pose_in_worker,
+                                [(pose, distance_cutoff, pocket_cutoff) for pose in poses])
+        
+        # Prepare the pocket and ligand system once before the threads share them
+        self._pocket_fragment(protein, np.vstack([pose.xyz for pose in poses]), pocket_cutoff)
+        self._pose_system(protein, poses[0], pocket_cutoff)
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            return list(executor.map(
+                lambda pose: self.minimize_pose(protein, pose, distance_cutoff, pocket_cutoff), poses))
+    
+    def _ligand_mol(self, ligand):
+        """RDKit molecule of a ligand at its current coordinates."""
+        from rdkit import Chem
+        from rdkit.Geometry import Point3D
+        
+        rdmol = getattr(ligand, 'rdmol', None)
+        if rdmol is None or rdmol.GetNumAtoms() != len(ligand.xyz):
+            # No RDKit topology: build it from the atom and bond records
+            return Chem.MolFromMolBlock(self._ligand_mol_block(ligand), removeHs=False)
+        
+        mol = Chem.Mol(rdmol)
+        mol.RemoveAllConformers()
+        conformer = Chem.Conformer(mol.GetNumAtoms())
+        for i, (x, y, z) in enumerate(ligand.xyz):
+            conformer.SetAtomPosition(i, Point3D(float(x), float(y), float(z)))
+        mol.AddConformer(conformer, assignId=True)
+        return mol
+    
+    @staticmethod
+    def _pose_with_coords(ligand, coords):
+        """Copy of a pose with new coordinates."""
+        pose = ligand.copy()
+        pose.xyz[...] = coords
+        return pose
+    
+    def _ligand_mol_block(self, ligand):
+        """MDL mol block of a ligand."""
+        lines = ["Ligand", f"{'  PandaDock':<20}3D", "",
+                 f"{len(ligand.atoms):3d}{len(ligand.bonds):3d}  0  0  0  0  0  0  0  0999 V2000"]
+        
+        # Atoms
+        for atom in ligand.atoms:
+            coords = atom['coords']
+            symbol = atom.get('symbol', 'C')
+            lines.append(f"{coords[0]:10.4f}{coords[1]:10.4f}{coords[2]:10.4f} {symbol:<3}"
+                         f"  0  0  0  0  0  0  0  0  0  0  0  0")
+        
+        # Bonds
+        for bond in ligand.bonds:
+            a1 = bond['begin_atom_idx'] + 1  # 1-based indexing in SDF
+            a2 = bond['end_atom_idx'] + 1
+            type_num = bond.get('bond_type', 1)
+            if isinstance(type_num, str):
+                type_num = 1  # Default to single bond
+            type_num = int(type_num)
+            if type_num == 12:
+                type_num = 4  # RDKit aromatic bond type
+            lines.append(f"{a1:3d}{a2:3d}{type_num:3d}  0  0  0  0")
+        
+        lines.append("M  END")
+        return "\n".join(lines) + "\n"
+    
+    def _receptor_records(self, protein):
+        """
+        PDB records and coordinates of the receptor grouped by residue (cached).
+        
+        Returns:
+        --------
+        dict
+            'index' over all atom coordinates, 'residue' index of every atom
+            and the PDB 'lines' of every atom
+        """
+        atoms = protein.atoms
+        coords = np.array([atom['coords'] for atom in atoms], dtype=float).reshape(-1, 3)
+        cache = self._receptor_cache
+        if cache is not None and cache['atoms'] is atoms and cache['index'].matches(coords):
+            return cache
+        
+        keys = [(atom.get('chain_id', 'A'), atom.get('residue_id', 1)) for atom in atoms]
+        _, residue = np.unique(np.array([f"{chain}_{res}" for chain, res in keys]), return_inverse=True)
+        
+        lines = []
+        for i, atom in enumerate(atoms):
+            name = atom.get('name', '')
+            # Four-character names start one column earlier
+            name = name.ljust(4) if len(name) == 4 else f" {name:<3}"
+            element = atom.get('element', '') or next((c for c in atom.get('name', 'C') if c.isalpha()), 'C')
+            x, y, z = atom['coords']
+            lines.append(f"ATOM  {i + 1:5d} {name} {atom.get('residue_name', 'UNK'):3s} "
+                         f"{atom.get('chain_id', 'A'):1s}{atom.get('residue_id', 1):4d}    "
+                         f"{x:8.3f}{y:8.3f}{z:8.3f}  1.00  0.00          "
+                         f"{element.strip()[:2].upper():>2s}")
+        
+        self._receptor_cache = {
+            'atoms': atoms,
+            'index': ReceptorNeighborIndex(coords),
+            'residue': residue,
+            'lines': lines,
+        }
+        return self._receptor_cache
+    
+    def _pocket_fragment(self, protein, coords, cutoff):
+        """
+        RDKit molecule of the receptor residues within a cutoff of a pose.
+        
+        The fragment is kept per receptor and built with pocket_margin of
+        extra room, so it is reused as long as later poses select no
+        residues outside it.
+        
+        Returns:
+        --------
+        dict or None
+            'mol' (None if RDKit could not read the fragment), selected
+            'residues' and the pocket-ligand 'systems' built on it
+        """
+        from rdkit import Chem
+        
+        receptor = self._receptor_records(protein)
+        near = np.unique(receptor['index'].pairs(coords, cutoff)[0])
+        residues = np.unique(receptor['residue'][near])
+        
+        cache = self._pocket_cache
+        if (cache is not None and cache['receptor'] is receptor and
+                np.all(np.isin(residues, cache['residues']))):
+            return cache
+        
+        near = np.unique(receptor['index'].pairs(coords, cutoff + self.pocket_margin)[0])
+        residues = np.unique(receptor['residue'][near])
+        selected = np.flatnonzero(np.isin(receptor['residue'], residues))
+        block = "\n".join(receptor['lines'][i] for i in selected) + "\nEND\n"
+        pocket = Chem.MolFromPDBBlock(block, removeHs=False)
+        if pocket is not None and pocket.GetNumAtoms() != len(selected):
+            pocket = None
+        self._pocket_cache = {
+            'receptor': receptor,
+            'residues': residues,
+            'mol': pocket,
+            'systems': OrderedDict(),
+        }
+        return self._pocket_cache
+    
+    def _pose_system(self, protein, ligand, pocket_cutoff):
+        """
+        Cached ligand force field and ligand-pocket parameters for a ligand topology.
+        
+        Returns:
+        --------
+        dict or None
+            Ligand 'force_field' (None if MMFF cannot type the pocket or
+            ligand), fixed 'pocket_coords' and the per pair 'r_star',
+            'epsilon' and 'charge_products' of the pocket-ligand terms
+        """
+        from rdkit import Chem
+        from rdkit.Chem import AllChem
+        
+        # Poses share their RDKit molecule (or atom records) with the ligand
+        topology = getattr(ligand, 'rdmol', None)
+        if topology is None or topology.GetNumAtoms() != len(ligand.xyz):
+            topology = ligand.atom_records
+        
+        with self._lock:
+            pocket = self._pocket_fragment(protein, ligand.xyz, pocket_cutoff)
+            if pocket['mol'] is None:
+                return None
+            systems = pocket['systems']
+            system = systems.get(id(topology))
+            if system is not None and system['topology'] is topology:
+                systems.move_to_end(id(topology))
+                return system
             
-            # Bonds
-            for bond in ligand.bonds:
-                a1 = bond['begin_atom_idx'] + 1  # 1-based indexing in SDF
-                a2 = bond['end_atom_idx'] + 1
-                type_num = bond.get('bond_type', 1)
-                if isinstance(type_num, str):
-                    type_num = 1  # Default to single bond
-                f.write(f"{a1:3d}{a2:3d}{type_num:3d}  0  0  0  0\n")
+            lig_mol = self._ligand_mol(ligand)
+            if lig_mol is None:
+                return None
+            system = {'topology': topology, 'force_field': None}
             
-            # Terminator
-            f.write("M  END\n$$$$\n")
-    
-    def _write_protein_to_pdb(self, protein, filename):
-        """Write protein to PDB file."""
-        with open(filename, 'w') as f:
-            for i, atom in enumerate(protein.atoms):
-                name = atom.get('name', '').ljust(4)
-                res_name = atom.get('residue_name', 'UNK')
-                chain_id = atom.get('chain_id', 'A')
-                res_id = atom.get('residue_id', 1)
-                coords = atom['coords']
+            # Pocket-ligand pair parameters come from the typing of the combined system
+            n_pocket = pocket['mol'].GetNumAtoms()
+            properties = AllChem.MMFFGetMoleculeProperties(Chem.CombineMols(pocket['mol'], lig_mol))
+            ligand_properties = AllChem.MMFFGetMoleculeProperties(lig_mol)
+            if properties is not None and ligand_properties is not None:
+                n_ligand = lig_mol.GetNumAtoms()
+                types = [properties.GetMMFFAtomType(i) for i in range(n_pocket + n_ligand)]
+                charges = np.array([properties.GetMMFFPartialCharge(i) for i in range(n_pocket + n_ligand)])
                 
-                f.write(f"ATOM  {i+1:5d} {name} {res_name:3s} {chain_id:1s}{res_id:4d}    "
-                        f"{coords[0]:8.3f}{coords[1]:8.3f}{coords[2]:8.3f}  1.00  0.00\n")
-            f.write("END\n")
-    
-    def _read_ligand_from_sdf(self, filename):
-        """Read ligand from SDF file."""
-        from .ligand import Ligand
-        return Ligand(filename)
+                # Van der Waals parameters only depend on the two atom types
+                pair_params = {}
+                r_star = np.zeros((n_pocket, n_ligand))
+                epsilon = np.zeros((n_pocket, n_ligand))
+                for i in range(n_pocket):
+                    for j in range(n_ligand):
+                        key = (types[i], types[n_pocket + j])
+                        if key not in pair_params:
+                            pair_params[key] = properties.GetMMFFVdWParams(i, n_pocket + j)[2:]
+                        r_star[i, j], epsilon[i, j] = pair_params[key]
+                
+                system.update({
+                    # The force field refers to the molecule, which must outlive it
+                    'mol': lig_mol,
+                    # All ligand pairs are included, so the force field holds for every pose
+                    'force_field': AllChem.MMFFGetMoleculeForceField(lig_mol, ligand_properties,
+                                                                     nonBondedThresh=100.0),
+                    'pocket_coords': pocket['mol'].GetConformer().GetPositions(),
+                    'r_star': r_star,
+                    'epsilon': epsilon,
+                    'charge_products': 332.0716 * np.outer(charges[:n_pocket], charges[n_pocket:]),
+                })
+            
+            systems[id(topology)] = system
+            if len(systems) > self.max_cached_systems:
+                systems.popitem(last=False)
+            return system
+
+
+# Filled once per worker process by _init_mmff_worker
+_mmff_worker_state = {}
+
+
+def _init_mmff_worker(minimizer, protein):
+    """Pool initializer storing the minimizer and receptor in the worker process."""
+    _mmff_worker_state['minimizer'] = minimizer
+    _mmff_worker_state['protein'] = protein
+
+
+def _minimize_pose_in_worker(task):
+    """Minimize one pose with the worker's minimizer and receptor."""
+    pose, distance_cutoff, pocket_cutoff = task
+    return _mmff_worker_state['minimizer'].minimize_pose(
+        _mmff_worker_state['protein'], pose, distance_cutoff, pocket_cutoff)
 
 
 class ImprovedElectrostatics:
@@ -436,6 +693,10 @@ class ImprovedElectrostatics:
         """
         Calculate electrostatic interaction energy using a modified Poisson-Boltzmann approach.
         
+        Receptor charges and burial are computed once per receptor atom
+        selection and attached to the protein (see receptor_descriptors);
+        each pose only recomputes the burial of the ligand atoms.
+        
         Parameters:
         -----------
         protein : Protein
@@ -448,64 +709,82 @@ class ImprovedElectrostatics:
         float
             Electrostatic interaction energy in kcal/mol
         """
-        # Get active site atoms if defined
-        if protein.active_site and 'atoms' in protein.active_site:
-            protein_atoms = protein.active_site['atoms']
-        else:
-            protein_atoms = protein.atoms
+        receptor = self.receptor_descriptors(protein)
+        if len(receptor['charged']) == 0:
+            return 0.0
         
-        # Calculate solvent accessible surface for protein and ligand atoms
-        protein_sasa = self._calc_approximate_sasa(protein_atoms)
-        ligand_sasa = self._calc_approximate_sasa(ligand.atoms)
+        # Ligand charges and burial (only ligand atoms move between poses)
+        l_coords = np.array([atom['coords'] for atom in ligand.atoms], dtype=float).reshape(-1, 3)
+        l_charges = np.array([self.atom_charges.get(atom.get('symbol', 'C'), 0.0) for atom in ligand.atoms])
+        l_buried = 1.0 - np.minimum(1.0, self._approximate_sasa(l_coords, self._sasa_radii(ligand.atoms)))
         
-        # Initialize energy
-        elec_energy = 0.0
+        l_charged = np.flatnonzero(l_charges)
+        if len(l_charged) == 0:
+            return 0.0
         
-        # Constants for conversion to kcal/mol (from J)
-        conversion = 1.0 / (4.184 * 1000)  # J to kcal/mol
+        # Charged receptor-ligand pairs within the cutoff
+        p_idx, l_idx, distance = receptor['index'].pairs(l_coords[l_charged], 15.0)
+        p_idx, l_idx = receptor['charged'][p_idx], l_charged[l_idx]
+        qq = receptor['charges'][p_idx] * l_charges[l_idx]
+        keep = (np.abs(qq) >= 1e-6) & (distance >= 0.1)
+        p_idx, l_idx, qq, distance = p_idx[keep], l_idx[keep], qq[keep], distance[keep]
+        
+        # More buried atoms experience a lower dielectric
+        burial_factor = (receptor['buried'][p_idx] + l_buried[l_idx]) / 2.0
+        effective_dielectric = self.interior_dielectric + \
+                             (self.solvent_dielectric - self.interior_dielectric) * (1.0 - burial_factor)
+        
+        # Modified Coulomb with Debye-Hückel screening
+        energy = 332.0 * qq / (effective_dielectric * distance) * np.exp(-self.kappa * distance)
+        return float(np.sum(energy))
+    
+    def receptor_descriptors(self, protein):
+        """
+        Charges, burial and neighbour index of the scored receptor atoms.
         
-        # Calculate pairwise interactions
-        for i, p_atom in enumerate(protein_atoms):
-            p_coords = p_atom['coords']
-            p_symbol = p_atom.get('element', p_atom.get('name', 'C'))[0]
-            p_charge = self.atom_charges.get(p_symbol, 0.0)
-            p_buried = 1.0 - min(1.0, protein_sasa[i])
-            
-            for j, l_atom in enumerate(ligand.atoms):
-                l_coords = l_atom['coords']
-                l_symbol = l_atom.get('symbol', 'C')
-                l_charge = self.atom_charges.get(l_symbol, 0.0)
-                l_buried = 1.0 - min(1.0, ligand_sasa[j])
-                
-                # Skip if either charge is zero
-                if abs(p_charge * l_charge) < 1e-6:
-                    continue
-                
-                # Calculate distance
-                distance = np.linalg.norm(p_coords - l_coords)
-                
-                # Skip if too far away
-                if distance > 15.0:  # Cutoff for efficiency
-                    continue
-                
-                # Calculate effective dielectric based on burial
-                # More buried atoms experience lower dielectric
-                burial_factor = (p_buried + l_buried) / 2.0
-                effective_dielectric = self.interior_dielectric + \
-                                     (self.solvent_dielectric - self.interior_dielectric) * (1.0 - burial_factor)
-                
-                # Modified Coulomb with Debye-Hückel screening
-                if distance < 0.1:  # Avoid division by zero
-                    energy = 0.0
-                else:
-                    # Coulomb term with screening
-                    coulomb = 332.0 * p_charge * l_charge / (effective_dielectric * distance)
-                    screening = np.exp(-self.kappa * distance)
-                    energy = coulomb * screening
-                
-                elec_energy += energy
+        The descriptors are stored on the protein and reused by every pose
+        (and by every model with the same atom parameters) until the active
+        site is redefined or the receptor atoms move.
         
-        return elec_energy
+        Parameters:
+        -----------
+        protein : Protein
+            Protein object
+        
+        Returns:
+        --------
+        dict
+            'charges' and 'buried' per atom, indices of the 'charged' atoms
+            and a neighbour 'index' over them
+        """
+        # Get active site atoms if defined
+        if protein.active_site and 'atoms' in protein.active_site:
+            protein_atoms = protein.active_site['atoms']
+        else:
+            protein_atoms = protein.atoms
+        coords = np.array([atom['coords'] for atom in protein_atoms], dtype=float).reshape(-1, 3)
+        
+        descriptors = getattr(protein, 'electrostatics_descriptors', None)
+        if (descriptors is not None and descriptors['atoms'] is protein_atoms and
+                descriptors['parameters'] == (self.atom_charges, self.atom_radii) and
+                np.array_equal(descriptors['coords'], coords)):
+            return descriptors
+        
+        symbols = [atom.get('element', atom.get('name', 'C'))[0] for atom in protein_atoms]
+        charges = np.array([self.atom_charges.get(symbol, 0.0) for symbol in symbols], dtype=float)
+        sasa = self._approximate_sasa(coords, self._sasa_radii(protein_atoms))
+        charged = np.flatnonzero(charges)
+        descriptors = {
+            'atoms': protein_atoms,
+            'parameters': (dict(self.atom_charges), dict(self.atom_radii)),
+            'coords': coords,
+            'charges': charges,
+            'buried': 1.0 - np.minimum(1.0, sasa),
+            'charged': charged,
+            'index': ReceptorNeighborIndex(coords[charged]),
+        }
+        protein.electrostatics_descriptors = descriptors
+        return descriptors
     
     def _calc_approximate_sasa(self, atoms):
         """
@@ -518,56 +797,38 @@ class ImprovedElectrostatics:
         
         Returns:
         --------
-        list
-            List of SASA values for each atom
+        numpy.ndarray
+            SASA value for each atom
         """
-        # Convert atoms to numpy array for faster computation
-        coords = np.array([atom['coords'] for atom in atoms])
-        n_atoms = len(atoms)
-        
-        # Get radii
-        radii = np.zeros(n_atoms)
-        for i, atom in enumerate(atoms):
-            symbol = atom.get('element', atom.get('name', atom.get('symbol', 'C')))[0]
-            radii[i] = self.atom_radii.get(symbol, 1.7)
-        
-        # Add water probe radius (1.4 Å)
-        radii_with_probe = radii + 1.4
-        
-        # Calculate approximate SASA by check for neighboring atoms
-        sasa = np.ones(n_atoms)  # Start with fully exposed
-        
-        # Calculate all pairwise distances
-        dist_matrix = np.zeros((n_atoms, n_atoms))
-        for i in range(n_atoms):
-            for j in range(i+1, n_atoms):
-                dist = np.linalg.norm(coords[i] - coords[j])
-                dist_matrix[i,j] = dist
-                dist_matrix[j,i] = dist
-        
-        # For each atom, check how many neighbors are within van der Waals contact
-        for i in range(n_atoms):
-            r_i = radii_with_probe[i]
-            
-            # Count neighbors that overlap
-            for j in range(n_atoms):
-                if i == j:
-                    continue
-                    
-                r_j = radii[j]  # Note: no probe for neighbors
-                dist = dist_matrix[i,j]
-                
-                # Check if atoms overlap
-                if dist < (r_i + r_j):
-                    # Estimate overlap
-                    overlap = 1.0 - (dist / (r_i + r_j))
-                    # Reduce SASA proportionally to overlap
-                    sasa[i] -= overlap * 0.1  # Scale factor to avoid overestimation
+        coords = np.array([atom['coords'] for atom in atoms], dtype=float).reshape(-1, 3)
+        return self._approximate_sasa(coords, self._sasa_radii(atoms))
+    
+    def _sasa_radii(self, atoms):
+        """Accessibility radius of each atom."""
+        return np.array([
+            self.atom_radii.get(atom.get('element', atom.get('name', atom.get('symbol', 'C')))[0], 1.7)
+            for atom in atoms
+        ], dtype=float)
+    
+    @staticmethod
+    def _approximate_sasa(coords, radii):
+        """Fractional exposure of each atom from its overlaps with neighbouring atoms."""
+        sasa = np.ones(len(coords))  # Start with fully exposed
+        if len(coords) < 2:
+            return sasa
+        
+        # Neighbours that overlap the probe-inflated atom (no probe for neighbours)
+        pairs = cKDTree(coords).query_pairs(2.0 * np.max(radii) + 1.4, output_type='ndarray')
+        i, j = pairs[:, 0], pairs[:, 1]
+        dist = np.linalg.norm(coords[i] - coords[j], axis=1)
+        for a, b in ((i, j), (j, i)):
+            contact = radii[a] + 1.4 + radii[b]
+            overlap = dist < contact
+            # Reduce SASA proportionally to overlap (scaled to avoid overestimation)
+            np.subtract.at(sasa, a[overlap], 0.1 * (1.0 - dist[overlap] / contact[overlap]))
         
         # Ensure SASA is non-negative
-        sasa = np.maximum(0.0, sasa)
-        
-        return sasa
+        return np.maximum(0.0, sasa)
 
 
 class GeneralizedBornSolvation:
@@ -637,30 +898,40 @@ class GeneralizedBornSolvation:
         self.solpar = 0.005  # Updated from 0.05 to 0.005
         self.solvation_k = 3.5  # Solvation radius in Å
         
+        # Receptor arrays, Born sums and surface overlaps reused across poses
+        self._receptor_cache = None
+        self._charge_cache = None
+    
+    def __getstate__(self):
+        # Do not ship cached receptor arrays to worker processes
+        state = self.__dict__.copy()
+        state['_receptor_cache'] = None
+        state['_charge_cache'] = None
+        return state
+        
     def calculate(self, protein_atoms, ligand_atoms):
         """Simple desolvation energy using a distance-dependent Generalized Born model."""
-        desolv_energy = 0.0
-        for p_atom in protein_atoms:
-            for l_atom in ligand_atoms:
-                p_coords = p_atom['coords']
-                l_coords = l_atom['coords']
-                distance = np.linalg.norm(p_coords - l_coords)
-                if distance < 0.1:
-                    distance = 0.1
-                
-                # Burial factor (simplified)
-                burial_factor = np.exp(-self.kappa * distance)
-
-                # Effective dielectric
-                dielectric = self.interior_dielectric + (self.solvent_dielectric - self.interior_dielectric) * burial_factor
-
-                # Solvation energy: simple Coulomb desolvation penalty
-                q1 = p_atom.get('charge', 0.0)
-                q2 = l_atom.get('charge', 0.0)
-                energy = (q1 * q2) / (dielectric * distance)
-                
-                desolv_energy += energy
-        return desolv_energy
+        protein_coords, protein_charges = self._explicit_charges(protein_atoms, is_protein=True)
+        ligand_coords, ligand_charges = self._explicit_charges(ligand_atoms)
+        
+        # Only pairs of charged atoms contribute
+        p_charged = np.flatnonzero(protein_charges)
+        l_charged = np.flatnonzero(ligand_charges)
+        if len(p_charged) == 0 or len(l_charged) == 0:
+            return 0.0
+        
+        distances = np.linalg.norm(
+            protein_coords[p_charged, None, :] - ligand_coords[None, l_charged, :], axis=-1)
+        distances = np.maximum(distances, 0.1)
+        
+        # Burial factor (simplified) and effective dielectric
+        burial_factor = np.exp(-self.kappa * distances)
+        dielectric = self.interior_dielectric + (self.solvent_dielectric - self.interior_dielectric) * burial_factor
+        
+        # Solvation energy: simple Coulomb desolvation penalty
+        q1q2 = protein_charges[p_charged, None] * ligand_charges[None, l_charged]
+        return float(np.sum(q1q2 / (dielectric * distances)))
+    
     def calculate_solvation_free_energy(self, molecule, molecule_type='ligand'):
         """
         Calculate solvation free energy using GB model.
@@ -677,33 +948,16 @@ class GeneralizedBornSolvation:
         tuple
             (polar_energy, nonpolar_energy, total_energy) in kcal/mol
         """
-        if molecule_type == 'ligand':
-            atoms = molecule.atoms
-            atom_list = []
-            for atom in atoms:
-                symbol = atom.get('symbol', 'C')
-                coords = atom['coords']
-                charge = self.atom_charges.get(symbol, 0.0)
-                radius = self.atom_radii.get(symbol, 1.7)
-                atom_list.append((coords, charge, radius))
-        else:  # protein
-            atoms = molecule.atoms
-            atom_list = []
-            for atom in atoms:
-                symbol = atom.get('element', atom.get('name', 'C'))[0]
-                coords = atom['coords']
-                charge = self.atom_charges.get(symbol, 0.0)
-                radius = self.atom_radii.get(symbol, 1.7)
-                atom_list.append((coords, charge, radius))
+        coords, charges, radii = self._atom_arrays(molecule.atoms, molecule_type == 'protein')
         
         # Calculate Born radii
-        born_radii = self._calculate_born_radii(atom_list)
+        born_radii = self._born_radii(self._born_sums(coords, radii))
         
         # Calculate polar solvation energy (electrostatic)
-        polar_energy = self._calculate_polar_energy(atom_list, born_radii)
+        polar_energy = self._polar_energy(coords, charges, born_radii)
         
         # Calculate nonpolar solvation energy (cavity formation)
-        nonpolar_energy = self._calculate_nonpolar_energy(atom_list)
+        nonpolar_energy = self._nonpolar_energy(radii, self._overlap_sums(coords, radii))
         
         # Total solvation energy
         total_energy = polar_energy + nonpolar_energy
@@ -714,6 +968,12 @@ class GeneralizedBornSolvation:
         """
         Calculate solvation contribution to binding free energy.
         
+        ΔG_solv(complex) - ΔG_solv(protein) - ΔG_solv(ligand) is evaluated
+        incrementally: the receptor's Born radii, surface overlaps and
+        solvation energy are computed once and cached, and each pose only
+        updates the ligand, the receptor atoms within reach of the ligand
+        and the receptor-ligand cross terms.
+        
         Parameters:
         -----------
         protein : Protein
@@ -729,52 +989,57 @@ class GeneralizedBornSolvation:
         # Get active site atoms if defined
         if protein.active_site and 'atoms' in protein.active_site:
             protein_atoms = protein.active_site['atoms']
-            p_obj = type('obj', (object,), {'atoms': protein_atoms})
         else:
-            p_obj = protein
-        
-        # Calculate solvation for ligand alone
-        ligand_polar, ligand_nonpolar, ligand_total = self.calculate_solvation_free_energy(
-            ligand, 'ligand')
-        
-        # Calculate solvation for protein alone
-        protein_polar, protein_nonpolar, protein_total = self.calculate_solvation_free_energy(
-            p_obj, 'protein')
-        
-        # Create a combined molecule for the complex
-        complex_atoms = []
-        
-        # Add protein atoms
-        for atom in protein_atoms:
-            symbol = atom.get('element', atom.get('name', 'C'))[0]
-            coords = atom['coords']
-            charge = self.atom_charges.get(symbol, 0.0)
-            radius = self.atom_radii.get(symbol, 1.7)
-            complex_atoms.append((coords, charge, radius))
-        
-        # Add ligand atoms
-        for atom in ligand.atoms:
-            symbol = atom.get('symbol', 'C')
-            coords = atom['coords']
-            charge = self.atom_charges.get(symbol, 0.0)
-            radius = self.atom_radii.get(symbol, 1.7)
-            complex_atoms.append((coords, charge, radius))
-        
-        # Calculate Born radii for complex
-        complex_born_radii = self._calculate_born_radii(complex_atoms)
-        
-        # Calculate polar solvation energy for complex
-        complex_polar = self._calculate_polar_energy(complex_atoms, complex_born_radii)
-        
-        # Calculate nonpolar solvation energy for complex
-        complex_nonpolar = self._calculate_nonpolar_energy(complex_atoms)
-        
-        complex_total = complex_polar + complex_nonpolar
+            protein_atoms = protein.atoms
+        receptor = self._get_receptor(protein_atoms)
+        
+        l_coords, l_charges, l_radii = self._atom_arrays(ligand.atoms)
+        l_born_sums = self._born_sums(l_coords, l_radii)
+        l_overlaps = self._overlap_sums(l_coords, l_radii)
+        p_charges, p_radii = receptor['charges'], receptor['radii']
+        
+        # Receptor-ligand pairs within the longest Born radius cutoff
+        cutoff = 2.0 * max(np.max(p_radii, initial=0.0), np.max(l_radii, initial=0.0)) + 5.0
+        p_idx, l_idx, d = receptor['index'].pairs(l_coords, cutoff)
+        
+        # Born sums in the complex
+        born = self._still_mask(d, p_radii[p_idx], l_radii[l_idx])
+        still = np.exp(-d[born] ** 2 / (4.0 * p_radii[p_idx[born]] * l_radii[l_idx[born]])) / d[born] ** 2
+        changed = np.unique(p_idx[born])
+        p_born_sums = receptor['born_sums'].copy()
+        np.add.at(p_born_sums, p_idx[born], l_radii[l_idx[born]] * still)
+        complex_l_born_sums = l_born_sums.copy()
+        np.add.at(complex_l_born_sums, l_idx[born], p_radii[p_idx[born]] * still)
+        
+        p_born_radii = self._born_radii(p_born_sums)
+        l_born_radii = self._born_radii(complex_l_born_sums)
+        
+        # Polar energy: receptor terms of atoms whose Born radius changed,
+        # ligand terms, and receptor-ligand cross terms
+        polar = self._polar_energy_change(receptor, changed, p_born_radii)
+        polar += (self._polar_energy(l_coords, l_charges, l_born_radii) -
+                  self._polar_energy(l_coords, l_charges, self._born_radii(l_born_sums)))
+        polar += self._cross_polar_energy(receptor['coords'], p_charges, p_born_radii,
+                                          l_coords, l_charges, l_born_radii)
+        
+        # Nonpolar energy: only atoms whose surface overlaps the other molecule change
+        p_overlap = d < p_radii[p_idx] + 1.4 + l_radii[l_idx]
+        l_overlap = d < l_radii[l_idx] + 1.4 + p_radii[p_idx]
+        overlapped = np.unique(p_idx[p_overlap])
+        p_overlaps = receptor['overlap_sums'].copy()
+        np.add.at(p_overlaps, p_idx[p_overlap],
+                  1.0 - d[p_overlap] / (p_radii[p_idx[p_overlap]] + 1.4 + l_radii[l_idx[p_overlap]]))
+        complex_l_overlaps = l_overlaps.copy()
+        np.add.at(complex_l_overlaps, l_idx[l_overlap],
+                  1.0 - d[l_overlap] / (l_radii[l_idx[l_overlap]] + 1.4 + p_radii[p_idx[l_overlap]]))
+        
+        nonpolar = (self._nonpolar_energy(p_radii[overlapped], p_overlaps[overlapped]) -
+                    self._nonpolar_energy(p_radii[overlapped], receptor['overlap_sums'][overlapped]))
+        nonpolar += (self._nonpolar_energy(l_radii, complex_l_overlaps) -
+                     self._nonpolar_energy(l_radii, l_overlaps))
         
         # Solvation contribution to binding = ΔG_solv(complex) - ΔG_solv(protein) - ΔG_solv(ligand)
-        solvation_contribution = complex_total - protein_total - ligand_total
-        
-        return solvation_contribution
+        return float(polar + nonpolar)
     
     def _calculate_born_radii(self, atom_list):
         """
@@ -787,56 +1052,11 @@ class GeneralizedBornSolvation:
         
         Returns:
         --------
-        list
-            List of Born radii for each atom
+        numpy.ndarray
+            Born radius of each atom
         """
-        n_atoms = len(atom_list)
-        born_radii = np.zeros(n_atoms)
-        
-        # Extract coordinates and radii
-        coords = np.array([atom[0] for atom in atom_list])
-        radii = np.array([atom[2] for atom in atom_list])
-        
-        # Calculate self-volumes and initialize Born radii
-        for i in range(n_atoms):
-            # Initial Born radius is atom radius
-            born_radii[i] = 1.0 / radii[i]
-        
-        # Adjust Born radii based on atom overlaps (simplified)
-        for i in range(n_atoms):
-            r_i = radii[i]
-            c_i = coords[i]
-            
-            for j in range(n_atoms):
-                if i == j:
-                    continue
-                
-                r_j = radii[j]
-                c_j = coords[j]
-                
-                # Calculate distance
-                d_ij = np.linalg.norm(c_i - c_j)
-                
-                # Skip pairs that are too far apart
-                if d_ij > r_i + r_j + 5.0:
-                    continue
-                
-                # Calculate contribution to Born radius
-                if d_ij < 0.1:  # Avoid numerical issues
-                    continue
-                
-                # Simplified Still formula
-                born_term = r_j / (d_ij * d_ij) * np.exp(-d_ij * d_ij / (4.0 * r_i * r_j))
-                born_radii[i] += born_term
-        
-        # Convert summed terms to actual Born radii
-        for i in range(n_atoms):
-            if born_radii[i] > 0:
-                born_radii[i] = 1.0 / (born_radii[i] * self.scale_factor)
-            else:
-                born_radii[i] = radii[i]  # Fallback to atom radius
-        
-        return born_radii
+        coords, _, radii = self._unpack(atom_list)
+        return self._born_radii(self._born_sums(coords, radii))
     
     def _calculate_polar_energy(self, atom_list, born_radii):
         """
@@ -854,42 +1074,8 @@ class GeneralizedBornSolvation:
         float
             Polar solvation energy in kcal/mol
         """
-        n_atoms = len(atom_list)
-        polar_energy = 0.0
-        
-        # Extract charges and coordinates
-        coords = np.array([atom[0] for atom in atom_list])
-        charges = np.array([atom[1] for atom in atom_list])
-        
-        # Calculate energy
-        for i in range(n_atoms):
-            q_i = charges[i]
-            r_i = born_radii[i]
-            c_i = coords[i]
-            
-            # Self-energy term
-            self_energy = -166.0 * (q_i * q_i) / (2.0 * r_i) * (1.0 - (1.0 / self.solvent_dielectric))
-            polar_energy += self_energy
-            
-            # Cross-terms
-            for j in range(i+1, n_atoms):
-                q_j = charges[j]
-                r_j = born_radii[j]
-                c_j = coords[j]
-                
-                d_ij = np.linalg.norm(c_i - c_j)
-                
-                if d_ij < 0.1:  # Avoid numerical issues
-                    continue
-                
-                # "f_GB" term for GB equation
-                f_gb = np.sqrt(d_ij * d_ij + r_i * r_j * np.exp(-d_ij * d_ij / (4.0 * r_i * r_j)))
-                
-                # Cross-term energy
-                cross_energy = -166.0 * (q_i * q_j) / f_gb * (1.0 - (1.0 / self.solvent_dielectric))
-                polar_energy += cross_energy
-        
-        return polar_energy
+        coords, charges, _ = self._unpack(atom_list)
+        return self._polar_energy(coords, charges, np.asarray(born_radii, dtype=float))
     
     def _calculate_nonpolar_energy(self, atom_list):
         """
@@ -905,54 +1091,167 @@ class GeneralizedBornSolvation:
         float
             Nonpolar solvation energy in kcal/mol
         """
-        # Extract coordinates and radii
-        coords = np.array([atom[0] for atom in atom_list])
-        radii = np.array([atom[2] for atom in atom_list])
-        
-        # Calculate approximate surface area for each atom
-        n_atoms = len(atom_list)
-        sasa = np.ones(n_atoms)  # Start with fully exposed
-        
-        # Calculate all pairwise distances
-        dist_matrix = np.zeros((n_atoms, n_atoms))
-        for i in range(n_atoms):
-            for j in range(i+1, n_atoms):
-                dist = np.linalg.norm(coords[i] - coords[j])
-                dist_matrix[i,j] = dist
-                dist_matrix[j,i] = dist
-        
-        # Add probe radius to atomic radii
+        coords, _, radii = self._unpack(atom_list)
+        return self._nonpolar_energy(radii, self._overlap_sums(coords, radii))
+    
+    def _atom_arrays(self, atoms, is_protein=False):
+        """Coordinates, charges and radii of atom dictionaries."""
+        if is_protein:
+            symbols = [atom.get('element', atom.get('name', 'C'))[0] for atom in atoms]
+        else:
+            symbols = [atom.get('symbol', 'C') for atom in atoms]
+        coords = np.array([atom['coords'] for atom in atoms], dtype=float).reshape(-1, 3)
+        charges = np.array([self.atom_charges.get(symbol, 0.0) for symbol in symbols], dtype=float)
+        radii = np.array([self.atom_radii.get(symbol, 1.7) for symbol in symbols], dtype=float)
+        return coords, charges, radii
+    
+    @staticmethod
+    def _unpack(atom_list):
+        """Coordinates, charges and radii of (coords, charge, radius) tuples."""
+        coords = np.array([atom[0] for atom in atom_list], dtype=float).reshape(-1, 3)
+        charges = np.array([atom[1] for atom in atom_list], dtype=float)
+        radii = np.array([atom[2] for atom in atom_list], dtype=float)
+        return coords, charges, radii
+    
+    def _explicit_charges(self, atoms, is_protein=False):
+        """Coordinates and explicit 'charge' entries of atoms (cached for the receptor)."""
+        coords = np.array([atom['coords'] for atom in atoms], dtype=float).reshape(-1, 3)
+        if is_protein:
+            # Receptor atoms moved in place invalidate the cached charges too
+            cache = self._charge_cache
+            if cache is not None and cache[0] is atoms and np.array_equal(cache[1], coords):
+                return cache[1], cache[2]
+        charges = np.array([atom.get('charge', 0.0) for atom in atoms], dtype=float)
+        if is_protein:
+            self._charge_cache = (atoms, coords, charges)
+        return coords, charges
+    
+    @staticmethod
+    def _still_mask(distances, radii_i, radii_j):
+        """Pairs that contribute to the Born radius sums."""
+        return (distances <= radii_i + radii_j + 5.0) & (distances >= 0.1)
+    
+    def _born_sums(self, coords, radii):
+        """Inverse atom radius plus the Still overlap terms of each atom's neighbours."""
+        sums = 1.0 / radii
+        if len(coords) < 2:
+            return sums
+        cutoff = 2.0 * np.max(radii) + 5.0
+        pairs = cKDTree(coords).query_pairs(cutoff, output_type='ndarray')
+        i, j = pairs[:, 0], pairs[:, 1]
+        d = np.linalg.norm(coords[i] - coords[j], axis=1)
+        mask = self._still_mask(d, radii[i], radii[j])
+        i, j, d = i[mask], j[mask], d[mask]
+        still = np.exp(-d * d / (4.0 * radii[i] * radii[j])) / (d * d)
+        np.add.at(sums, i, radii[j] * still)
+        np.add.at(sums, j, radii[i] * still)
+        return sums
+    
+    def _born_radii(self, born_sums):
+        """Convert summed Born terms to Born radii."""
+        return 1.0 / (born_sums * self.scale_factor)
+    
+    def _pair_polar_energy(self, coords_i, charges_i, radii_i, coords_j, charges_j, radii_j):
+        """GB cross-term energy matrix between two atom sets (zero for pairs closer than 0.1 Å)."""
+        d2 = np.sum((coords_i[:, None, :] - coords_j[None, :, :]) ** 2, axis=-1)
+        rr = radii_i[:, None] * radii_j[None, :]
+        f_gb = np.sqrt(d2 + rr * np.exp(-d2 / (4.0 * rr)))
+        energy = -166.0 * charges_i[:, None] * charges_j[None, :] / f_gb * (1.0 - 1.0 / self.solvent_dielectric)
+        return np.where(d2 >= 0.01, energy, 0.0)
+    
+    def _self_polar_energy(self, charges, born_radii):
+        """GB self-energy of each atom."""
+        return -166.0 * charges * charges / (2.0 * born_radii) * (1.0 - 1.0 / self.solvent_dielectric)
+    
+    def _polar_energy(self, coords, charges, born_radii, chunk_size=1024):
+        """Polar solvation energy (self terms plus all charged pairs)."""
+        energy = float(np.sum(self._self_polar_energy(charges, born_radii)))
+        charged = np.flatnonzero(charges)
+        coords, charges, born_radii = coords[charged], charges[charged], born_radii[charged]
+        cross = 0.0
+        for start in range(0, len(charged), chunk_size):
+            rows = slice(start, start + chunk_size)
+            cross += np.sum(self._pair_polar_energy(coords[rows], charges[rows], born_radii[rows],
+                                                    coords, charges, born_radii))
+        # Every pair was counted in both orders
+        return energy + 0.5 * float(cross)
+    
+    def _cross_polar_energy(self, coords_i, charges_i, radii_i, coords_j, charges_j, radii_j, chunk_size=1024):
+        """Polar energy of all charged pairs between two atom sets."""
+        ci, cj = np.flatnonzero(charges_i), np.flatnonzero(charges_j)
+        energy = 0.0
+        for start in range(0, len(ci), chunk_size):
+            rows = ci[start:start + chunk_size]
+            energy += np.sum(self._pair_polar_energy(coords_i[rows], charges_i[rows], radii_i[rows],
+                                                     coords_j[cj], charges_j[cj], radii_j[cj]))
+        return float(energy)
+    
+    def _polar_energy_change(self, receptor, changed, born_radii):
+        """Change of the receptor's polar energy when the Born radii of some atoms change."""
+        coords, charges, old_radii = receptor['coords'], receptor['charges'], receptor['born_radii']
+        changed = changed[charges[changed] != 0.0]
+        if len(changed) == 0:
+            return 0.0
+        delta = np.sum(self._self_polar_energy(charges[changed], born_radii[changed]) -
+                       self._self_polar_energy(charges[changed], old_radii[changed]))
+        
+        # Pairs with at least one changed atom; pairs of two changed atoms
+        # appear twice in the rows and are corrected below
+        charged = receptor['charged']
+        rows = (self._pair_polar_energy(coords[changed], charges[changed], born_radii[changed],
+                                        coords[charged], charges[charged], born_radii[charged]) -
+                self._pair_polar_energy(coords[changed], charges[changed], old_radii[changed],
+                                        coords[charged], charges[charged], old_radii[charged]))
+        both = (self._pair_polar_energy(coords[changed], charges[changed], born_radii[changed],
+                                        coords[changed], charges[changed], born_radii[changed]) -
+                self._pair_polar_energy(coords[changed], charges[changed], old_radii[changed],
+                                        coords[changed], charges[changed], old_radii[changed]))
+        return float(delta + np.sum(rows) - 0.5 * np.sum(both))
+    
+    @staticmethod
+    def _overlap_sums(coords, radii):
+        """Summed surface overlap of each atom (probe-inflated) with its neighbours."""
+        sums = np.zeros(len(coords))
+        if len(coords) < 2:
+            return sums
+        cutoff = 2.0 * np.max(radii) + 1.4
+        pairs = cKDTree(coords).query_pairs(cutoff, output_type='ndarray')
+        i, j = pairs[:, 0], pairs[:, 1]
+        d = np.linalg.norm(coords[i] - coords[j], axis=1)
+        for a, b in ((i, j), (j, i)):
+            contact = radii[a] + 1.4 + radii[b]
+            mask = d < contact
+            np.add.at(sums, a[mask], 1.0 - d[mask] / contact[mask])
+        return sums
+    
+    def _nonpolar_energy(self, radii, overlap_sums):
+        """Surface-area nonpolar energy from per-atom overlap sums."""
+        sasa = np.maximum(0.0, 1.0 - 0.2 * overlap_sums)
         radii_with_probe = radii + 1.4  # Water probe radius
-        
-        # For each atom, check how many neighbors are within van der Waals contact
-        for i in range(n_atoms):
-            r_i = radii_with_probe[i]
-            
-            # Count neighbors that overlap
-            for j in range(n_atoms):
-                if i == j:
-                    continue
-                    
-                r_j = radii[j]  # No probe for neighbors
-                dist = dist_matrix[i,j]
-                
-                # Check if atoms overlap
-                if dist < (r_i + r_j):
-                    # Estimate overlap
-                    overlap = 1.0 - (dist / (r_i + r_j))
-                    # Reduce SASA proportionally to overlap
-                    sasa[i] -= overlap * 0.2  # Reduced scale factor
-        
-        # Ensure SASA is non-negative
-        sasa = np.maximum(0.0, sasa)
-        
-        # Calculate surface area (4πr²) and apply exposure factor
         atom_areas = 4.0 * np.pi * radii_with_probe * radii_with_probe * sasa
-        
-        # Calculate nonpolar energy using surface area model
-        nonpolar_energy = self.surface_tension * np.sum(atom_areas)
-        
-        return nonpolar_energy
+        return self.surface_tension * float(np.sum(atom_areas))
+    
+    def _get_receptor(self, protein_atoms):
+        """Return the cached receptor arrays, Born sums and overlap sums for an atom list."""
+        coords = np.array([atom['coords'] for atom in protein_atoms], dtype=float).reshape(-1, 3)
+        cache = self._receptor_cache
+        if cache is not None and cache['atoms'] is protein_atoms and cache['index'].matches(coords):
+            return cache
+        
+        _, charges, radii = self._atom_arrays(protein_atoms, is_protein=True)
+        born_sums = self._born_sums(coords, radii)
+        self._receptor_cache = {
+            'atoms': protein_atoms,
+            'index': ReceptorNeighborIndex(coords),
+            'coords': coords,
+            'charges': charges,
+            'charged': np.flatnonzero(charges),
+            'radii': radii,
+            'born_sums': born_sums,
+            'born_radii': self._born_radii(born_sums),
+            'overlap_sums': self._overlap_sums(coords, radii),
+        }
+        return self._receptor_cache
 
 
 class MonteCarloSampling:
@@ -962,7 +1261,8 @@ class MonteCarloSampling:
     """
     
     def __init__(self, scoring_function, temperature=300.0, n_steps=1000, 
-                 max_translation=2.0, max_rotation=0.3, cooling_factor=0.95, output_dir=None):
+                 max_translation=2.0, max_rotation=0.3, cooling_factor=0.95, output_dir=None,
+                 max_torsion=0.5):
         """
         Initialize Monte Carlo sampling.
         
@@ -980,6 +1280,8 @@ class MonteCarloSampling:
             Maximum rotation step size in radians
         cooling_factor : float
             Temperature cooling factor for simulated annealing (< 1.0)
+        max_torsion : float
+            Maximum torsion step size in radians (0 keeps the ligand rigid)
         """
         self.scoring_function = scoring_function
         self.temperature = temperature
@@ -987,6 +1289,7 @@ class MonteCarloSampling:
         self.max_translation = max_translation
         self.max_rotation = max_rotation
         self.cooling_factor = cooling_factor
+        self.max_torsion = max_torsion
         self.output_dir = output_dir 
         self.grid_points = None
         
@@ -1105,6 +1408,15 @@ class MonteCarloSampling:
             candidate_pose.rotate(rotation.as_matrix())
             candidate_pose.translate(centroid)
             
+            # Rotate one flexible torsion, undoing moves that cause internal clashes
+            active_torsions = getattr(candidate_pose, 'active_torsions', None)
+            if active_torsions and self.max_torsion > 0:
+                bond_idx = active_torsions[np.random.randint(len(active_torsions))]
+                angle = np.random.uniform(-self.max_torsion, self.max_torsion)
+                candidate_pose.rotate_bond(bond_idx, angle)
+                if candidate_pose.has_internal_clash():
+                    candidate_pose.rotate_bond(bond_idx, -angle)
+            
             # Evaluate candidate pose
             candidate_score = self.scoring_function.score(protein, candidate_pose)
             
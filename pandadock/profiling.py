@@ -0,0 +1,202 @@
+"""
+Opt-in profiling of PandaDock hot paths.
+
+Scoring terms, search phases and I/O steps are wrapped in named sections
+that record wall time and call counts while a Profiler is enabled:
+
+    from pandadock import profiling
+
+    profiler = profiling.enable()
+    results = search_algorithm.search(protein, ligand)
+    profiling.disable()
+    profiler.save("output/profile.json")
+
+While profiling is disabled, section() returns a shared no-op context
+and timed() calls the function directly, so the hooks stay in place in
+production runs at the cost of one global lookup per call. Sections are
+recorded in the process that enabled profiling; work done inside pool
+worker processes shows up as the time the parent spends waiting for it.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+
+# Sections are grouped by category, e.g. ('scoring', 'vdw')
+CATEGORIES = ('scoring', 'search', 'io')
+
+_NULL_SECTION = contextlib.nullcontext()
+
+# Profiler collecting sections, None while profiling is disabled
+_active_profiler = None
+
+
+class Profiler:
+    """
+    Accumulates wall time and call counts per (category, name) section.
+    """
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.started = datetime.now().isoformat()
+        self._sections = {}
+        self._lock = threading.Lock()
+
+    def record(self, category, name, seconds, calls=1):
+        """
+        Add time spent in a section.
+
+        Parameters:
+        -----------
+        category : str
+            Section category ('scoring', 'search' or 'io')
+        name : str
+            Section name within the category
+        seconds : float
+            Wall time spent
+        calls : int
+            Number of calls the time covers
+        """
+        with self._lock:
+            entry = self._sections.setdefault((category, name), [0, 0.0])
+            entry[0] += calls
+            entry[1] += seconds
+
+    @contextlib.contextmanager
+    def section(self, category, name):
+        """Time the enclosed block as one call of a section."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(category, name, time.perf_counter() - start)
+
+    def report(self):
+        """
+        Structured profile of all recorded sections.
+
+        Returns:
+        --------
+        dict
+            'started', 'wall_time' and per category the 'calls',
+            'total_time' and 'mean_time' of every section, plus the
+            category 'total_time'
+        """
+        with self._lock:
+            sections = dict(self._sections)
+
+        categories = {}
+        for (category, name), (calls, seconds) in sorted(sections.items()):
+            group = categories.setdefault(category, {'total_time': 0.0, 'sections': {}})
+            group['sections'][name] = {
+                'calls': calls,
+                'total_time': seconds,
+                'mean_time': seconds / calls if calls else 0.0,
+            }
+            group['total_time'] += seconds
+
+        return {
+            'started': self.started,
+            'wall_time': time.perf_counter() - self.start_time,
+            'pid': os.getpid(),
+            'categories': categories,
+        }
+
+    def save(self, path):
+        """
+        Write the profile as JSON.
+
+        Parameters:
+        -----------
+        path : str or Path
+            Profile file, or an output directory (the profile is then
+            written to 'profile.json' next to its status.json)
+
+        Returns:
+        --------
+        Path
+            Path of the written profile
+        """
+        path = Path(path)
+        if path.is_dir():
+            path = path / "profile.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+        return path
+
+
+def enable(profiler=None):
+    """
+    Start recording sections.
+
+    Parameters:
+    -----------
+    profiler : Profiler, optional
+        Profiler to record into (a new one by default)
+
+    Returns:
+    --------
+    Profiler
+        Active profiler
+    """
+    global _active_profiler
+    _active_profiler = profiler or Profiler()
+    return _active_profiler
+
+
+def disable():
+    """
+    Stop recording sections.
+
+    Returns:
+    --------
+    Profiler or None
+        Profiler that was active
+    """
+    global _active_profiler
+    profiler, _active_profiler = _active_profiler, None
+    return profiler
+
+
+def get_profiler():
+    """Active Profiler, or None while profiling is disabled."""
+    return _active_profiler
+
+
+def is_enabled():
+    return _active_profiler is not None
+
+
+def section(category, name):
+    """
+    Context manager timing a block as one call of a section.
+
+    A no-op while profiling is disabled.
+    """
+    profiler = _active_profiler
+    if profiler is None:
+        return _NULL_SECTION
+    return profiler.section(category, name)
+
+
+def timed(category, name, function, *args, **kwargs):
+    """
+    Call function(*args, **kwargs), timing it as one call of a section.
+
+    Used where a call sits inside an expression (e.g. a dict of energy
+    terms); while profiling is disabled the function is called directly.
+    """
+    profiler = _active_profiler
+    if profiler is None:
+        return function(*args, **kwargs)
+    start = time.perf_counter()
+    try:
+        return function(*args, **kwargs)
+    finally:
+        profiler.record(category, name, time.perf_counter() - start)
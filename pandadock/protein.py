@@ -3,6 +3,135 @@ import numpy as np
 from pathlib import Path
 from .pockets import OptimizedCastpDetector
 
+
+class ProteinAtomTable:
+    """
+    Structure-of-arrays storage for protein atoms.
+
+    Coordinates and per-atom properties are kept in flat NumPy arrays that
+    are built once when the structure is loaded. Scoring-related properties
+    (type codes, charges, vdW radii) follow the default typing rules of
+    unified_scoring.ScoringFunction. Per-atom dictionaries are materialized
+    lazily, only for the atoms that are actually requested, and their
+    'coords' entries are views into the shared coordinate array.
+    """
+
+    BACKBONE_ATOMS = frozenset({'CA', 'C', 'N', 'O'})
+
+    def __init__(self, names, residue_names, chain_ids, residue_ids, coords, elements=None):
+        """
+        Build the atom table.
+
+        Parameters:
+        -----------
+        names : list
+            Atom names
+        residue_names : list
+            Residue name of each atom
+        chain_ids : list
+            Chain identifier of each atom
+        residue_ids : list
+            Residue sequence number of each atom
+        coords : array-like
+            Atom coordinates, shape (N, 3)
+        elements : list, optional
+            Element symbols (PDB columns 77-78). Derived from atom names when missing.
+        """
+        from .unified_scoring import ScoringFunction
+
+        n_atoms = len(names)
+        self.coords = np.asarray(coords, dtype=float).reshape(n_atoms, 3)
+        self.names = np.array(names, dtype='U4')
+
+        if elements is None:
+            elements = [''] * n_atoms
+        elements = [e.strip().capitalize() or self._element_from_name(name)
+                    for e, name in zip(elements, names)]
+        self.elements, element_codes = np.unique(np.array(elements, dtype='U2'), return_inverse=True)
+        self.element_codes = element_codes.astype(np.int16)
+
+        # Residues in file order; chain index per atom
+        residue_keys = [f"{chain}_{resid}" for chain, resid in zip(chain_ids, residue_ids)]
+        self.residue_keys = list(dict.fromkeys(residue_keys))
+        residue_lookup = {key: i for i, key in enumerate(self.residue_keys)}
+        self.residue_index = np.array([residue_lookup[key] for key in residue_keys], dtype=np.int32)
+        first_atom = np.full(len(self.residue_keys), -1, dtype=np.int64)
+        first_atom[self.residue_index[::-1]] = np.arange(n_atoms)[::-1]
+        self.residue_names = np.array([residue_names[i] for i in first_atom], dtype='U3')
+        self.residue_ids = np.array([residue_ids[i] for i in first_atom], dtype=np.int32)
+
+        self.chain_ids = list(dict.fromkeys(chain_ids))
+        chain_lookup = {chain: i for i, chain in enumerate(self.chain_ids)}
+        self.chain_index = np.array([chain_lookup[chain] for chain in chain_ids], dtype=np.int16)
+
+        self.backbone_mask = np.isin(self.names, list(self.BACKBONE_ATOMS))
+
+        # Default scoring parameters, evaluated once per unique atom name
+        scoring = ScoringFunction()
+        self.unique_names, name_codes = np.unique(self.names, return_inverse=True)
+        self.name_codes = name_codes.astype(np.int32)
+        name_types = [scoring._get_atom_type({'name': name}) for name in self.unique_names]
+        self.types, type_codes = np.unique(np.array(name_types, dtype='U4'), return_inverse=True)
+        self.type_codes = type_codes.astype(np.int16)[self.name_codes]
+        self.charges = np.array([scoring.atom_charges.get(e, 0.0) for e in self.elements])[self.element_codes]
+        self.vdw_radii = np.array([scoring.vdw_radii.get(e, 1.7) for e in self.elements])[self.element_codes]
+
+        self._records = [None] * n_atoms
+        self._all_records = None
+
+    @staticmethod
+    def _element_from_name(name):
+        for char in name:
+            if char.isalpha():
+                return char.upper()
+        return 'C'
+
+    def __len__(self):
+        return len(self.coords)
+
+    def record(self, index):
+        """Return the compatibility atom dictionary for one atom."""
+        atom = self._records[index]
+        if atom is None:
+            residue = self.residue_index[index]
+            atom = {
+                'name': str(self.names[index]),
+                'residue_name': str(self.residue_names[residue]),
+                'chain_id': self.chain_ids[self.chain_index[index]],
+                'residue_id': int(self.residue_ids[residue]),
+                'coords': self.coords[index]
+            }
+            self._records[index] = atom
+        return atom
+
+    def records(self, indices=None):
+        """
+        Return compatibility atom dictionaries.
+
+        Parameters:
+        -----------
+        indices : array-like, optional
+            Atom indices. All atoms when omitted (the list is cached).
+
+        Returns:
+        --------
+        list
+            List of atom dictionaries
+        """
+        if indices is not None:
+            return [self.record(i) for i in indices]
+        if self._all_records is None:
+            self._all_records = [self.record(i) for i in range(len(self))]
+        return self._all_records
+
+    def residue_records(self):
+        """Group compatibility atom dictionaries by residue key."""
+        residues = {key: [] for key in self.residue_keys}
+        for atom, residue in zip(self.records(), self.residue_index):
+            residues[self.residue_keys[residue]].append(atom)
+        return residues
+
+
 class Protein:
     """Class representing a protein structure."""
     
@@ -19,8 +148,10 @@ class Protein:
         grid_size : float, optional
             Size of the grid for docking
         """
-        self.atoms = []
-        self.residues = {}
+        self.atom_table = None
+        self._atoms = None
+        self._residues = None
+        self.pdb_file = None
         self.active_site = None
         self.xyz = None
         self.grid_center = grid_center
@@ -40,14 +171,47 @@ class Protein:
         else:
                 self.detect_pockets()
     
+    @property
+    def atoms(self):
+        """List of atom dictionaries (materialized lazily from the atom table)."""
+        if self._atoms is None:
+            self._atoms = self.atom_table.records() if self.atom_table is not None else []
+        return self._atoms
+
+    @atoms.setter
+    def atoms(self, atoms):
+        self._atoms = atoms
+
+    @property
+    def residues(self):
+        """Atom dictionaries grouped by 'chain_resid' key."""
+        if self._residues is None:
+            self._residues = self.atom_table.residue_records() if self.atom_table is not None else {}
+        return self._residues
+
+    @residues.setter
+    def residues(self, residues):
+        self._residues = residues
+
+    def _atom_indices_within(self, center, radius):
+        """Indices of atoms within radius of center."""
+        if self.atom_table is not None:
+            coords = self.atom_table.coords
+        else:
+            coords = np.array([atom['coords'] for atom in self.atoms]).reshape(-1, 3)
+        distances = np.linalg.norm(coords - np.asarray(center, dtype=float), axis=1)
+        return np.flatnonzero(distances <= radius)
+
+    def _atoms_at(self, indices):
+        """Atom dictionaries for the given indices."""
+        if self.atom_table is not None and self._atoms is None:
+            return self.atom_table.records(indices)
+        return [self.atoms[i] for i in indices]
+
     def _select_atoms_near(self, center, radius=10.0):
         """Select atoms within a radius of the specified center point."""
-        center = np.array(center)
-        nearby_atoms = [
-            atom for atom in self.atoms
-            if np.linalg.norm(np.array(atom['coords']) - center) <= radius
-        ]
-        return {'atoms': nearby_atoms}
+        indices = self._atom_indices_within(center, radius)
+        return {'atoms': self._atoms_at(indices), 'indices': indices}
     
 
     def load_pdb(self, pdb_file):
@@ -62,39 +226,27 @@ class Protein:
         pdb_path = Path(pdb_file)
         if not pdb_path.exists():
             raise FileNotFoundError(f"PDB file not found: {pdb_file}")
+        self.pdb_file = str(pdb_path)
         
+        names, residue_names, chain_ids, residue_ids, elements = [], [], [], [], []
+        atom_coords = []
         with open(pdb_path, 'r') as f:
-            atom_coords = []
             for line in f:
                 if line.startswith("ATOM"):
                     # Parse PDB ATOM record
-                    atom_name = line[12:16].strip()
-                    residue_name = line[17:20].strip()
-                    chain_id = line[21]
-                    residue_id = int(line[22:26])
-                    x = float(line[30:38])
-                    y = float(line[38:46])
-                    z = float(line[46:54])
-                    
-                    # Store atom information
-                    atom = {
-                        'name': atom_name,
-                        'residue_name': residue_name,
-                        'chain_id': chain_id,
-                        'residue_id': residue_id,
-                        'coords': np.array([x, y, z])
-                    }
-                    self.atoms.append(atom)
-                    atom_coords.append([x, y, z])
-                    
-                    # Organize by residue
-                    res_key = f"{chain_id}_{residue_id}"
-                    if res_key not in self.residues:
-                        self.residues[res_key] = []
-                    self.residues[res_key].append(atom)
-            
-            self.xyz = np.array(atom_coords)
-            print(f"Loaded protein with {len(self.atoms)} atoms and {len(self.residues)} residues")
+                    names.append(line[12:16].strip())
+                    residue_names.append(line[17:20].strip())
+                    chain_ids.append(line[21])
+                    residue_ids.append(int(line[22:26]))
+                    atom_coords.append([float(line[30:38]), float(line[38:46]), float(line[46:54])])
+                    elements.append(line[76:78])
+        
+        self.atom_table = ProteinAtomTable(names, residue_names, chain_ids, residue_ids,
+                                           atom_coords, elements)
+        self._atoms = None
+        self._residues = None
+        self.xyz = self.atom_table.coords
+        print(f"Loaded protein with {len(self.atom_table)} atoms and {len(self.atom_table.residue_keys)} residues")
     
     def define_active_site(self, center, radius=10.0):
         """
@@ -113,24 +265,15 @@ class Protein:
         }
         
         # Find atoms within the active site
-        active_atoms = []
-        active_residues = set()
-        
-        for i, atom in enumerate(self.atoms):
-            distance = np.linalg.norm(self.xyz[i] - self.active_site['center'])
-            if distance <= radius:
-                active_atoms.append(atom)
-                res_key = f"{atom['chain_id']}_{atom['residue_id']}"
-                active_residues.add(res_key)
-            
+        indices = self._atom_indices_within(self.active_site['center'], radius)
+        active_atoms = self._atoms_at(indices)
+        active_residues = {f"{atom['chain_id']}_{atom['residue_id']}" for atom in active_atoms}
         
         self.active_site['atoms'] = active_atoms
+        self.active_site['indices'] = indices
         self.active_site['residues'] = list(active_residues)
         print(f"Defined active site with {len(active_atoms)} atoms and {len(active_residues)} residues")
     
-
-
-
     def detect_pockets(self):
         """
         Advanced algorithm to detect potential binding pockets.
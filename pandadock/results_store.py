@@ -0,0 +1,293 @@
+"""
+Indexed results store for PandaDock screening campaigns.
+
+Screening runs write one row per ligand and one row per saved pose to a
+SQLite database in batched transactions. Summary reports and top-N hit
+selection then become indexed queries instead of a re-read of per-ligand
+files or a dictionary holding every pose of every ligand in memory.
+"""
+
+import json
+import sqlite3
+import numpy as np
+
+
+class ScreeningResultsStore:
+    """
+    SQLite-backed sink for per-ligand screening results.
+
+    Rows are buffered and written batch_size at a time in one transaction;
+    call flush() (or close()) to make buffered rows visible to queries.
+    """
+
+    filename = "screening_results.db"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS ligands (
+            name TEXT PRIMARY KEY,
+            file TEXT,
+            record INTEGER,
+            smiles TEXT,
+            score REAL,
+            runtime REAL,
+            status TEXT,
+            error TEXT,
+            n_poses INTEGER,
+            energy_terms TEXT,
+            stop_reason TEXT,
+            generations INTEGER,
+            evaluations INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS ligands_score ON ligands (score);
+        CREATE TABLE IF NOT EXISTS poses (
+            ligand TEXT,
+            rank INTEGER,
+            score REAL,
+            n_atoms INTEGER,
+            coords BLOB,
+            PRIMARY KEY (ligand, rank)
+        );
+    """
+
+    # Columns added after the first schema, created in older databases on open
+    ADDED_COLUMNS = (
+        ('stop_reason', 'TEXT'),
+        ('generations', 'INTEGER'),
+        ('evaluations', 'INTEGER'),
+    )
+
+    def __init__(self, path, batch_size=256):
+        """
+        Open (or create) a results database.
+
+        Parameters:
+        -----------
+        path : str or Path
+            Database file
+        batch_size : int
+            Number of ligands buffered before they are written
+        """
+        self.path = str(path)
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(self.SCHEMA)
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(ligands)")}
+        with self.connection:
+            for column, column_type in self.ADDED_COLUMNS:
+                if column not in columns:
+                    self.connection.execute(f"ALTER TABLE ligands ADD COLUMN {column} {column_type}")
+        self._ligand_rows = []
+        self._pose_rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        self.flush()
+        return self.connection.execute("SELECT COUNT(*) FROM ligands").fetchone()[0]
+
+    def add(self, result, poses=None):
+        """
+        Buffer the result of one ligand.
+
+        Parameters:
+        -----------
+        result : dict
+            Ligand result with 'name', 'score', 'runtime' and 'status' and
+            optionally 'file', 'record', 'smiles', 'error', 'energy_terms'
+            and the search's 'stop_reason', 'generations' and 'evaluations'
+        poses : list, optional
+            (score, coords) of the saved poses, best first
+        """
+        poses = poses or []
+        success = result.get('status') == "Success"
+        terms = result.get('energy_terms')
+        self._ligand_rows.append((
+            result['name'],
+            result.get('file'),
+            result.get('record'),
+            result.get('smiles'),
+            float(result['score']) if success else None,
+            float(result.get('runtime', 0.0)),
+            result.get('status'),
+            result.get('error'),
+            len(poses),
+            json.dumps(terms) if terms else None,
+            result.get('stop_reason'),
+            result.get('generations'),
+            result.get('evaluations'),
+        ))
+        for rank, (score, coords) in enumerate(poses):
+            coords = np.asarray(coords, dtype=np.float32).reshape(-1, 3)
+            self._pose_rows.append((result['name'], rank, float(score), len(coords), coords.tobytes()))
+
+        if len(self._ligand_rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write all buffered rows in a single transaction."""
+        if not self._ligand_rows:
+            return
+        with self.connection:
+            # A re-docked ligand replaces its earlier poses
+            self.connection.executemany(
+                "DELETE FROM poses WHERE ligand = ?", [(row[0],) for row in self._ligand_rows]
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO ligands (name, file, record, smiles, score, runtime, status, error, "
+                "n_poses, energy_terms, stop_reason, generations, evaluations) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", self._ligand_rows
+            )
+            self.connection.executemany("INSERT INTO poses VALUES (?, ?, ?, ?, ?)", self._pose_rows)
+        self._ligand_rows = []
+        self._pose_rows = []
+
+    def clear(self):
+        """Delete all results, e.g. before a new campaign reuses the database."""
+        self._ligand_rows = []
+        self._pose_rows = []
+        with self.connection:
+            self.connection.execute("DELETE FROM poses")
+            self.connection.execute("DELETE FROM ligands")
+
+    def close(self):
+        """Flush buffered rows and close the database."""
+        if self.connection is not None:
+            self.flush()
+            self.connection.close()
+            self.connection = None
+
+    def top(self, n=None):
+        """
+        Best-scoring successful ligands.
+
+        Parameters:
+        -----------
+        n : int, optional
+            Number of ligands (all when None)
+
+        Returns:
+        --------
+        list
+            (name, score, runtime, smiles) tuples ordered by score
+        """
+        self.flush()
+        query = "SELECT name, score, runtime, smiles FROM ligands WHERE score IS NOT NULL ORDER BY score"
+        if n is None:
+            return self.connection.execute(query).fetchall()
+        return self.connection.execute(query + " LIMIT ?", (int(n),)).fetchall()
+
+    def iter_ranked(self):
+        """Iterate over successful ligands ordered by score without loading them all."""
+        self.flush()
+        yield from self.connection.execute(
+            "SELECT name, score, runtime, smiles FROM ligands WHERE score IS NOT NULL ORDER BY score"
+        )
+
+    def scores(self):
+        """Scores of all successful ligands as an array."""
+        self.flush()
+        rows = self.connection.execute("SELECT score FROM ligands WHERE score IS NOT NULL").fetchall()
+        return np.array([row[0] for row in rows], dtype=float)
+
+    def statistics(self):
+        """
+        Campaign-level counts and runtimes.
+
+        Returns:
+        --------
+        dict
+            total_ligands, successful_dockings, errors and the total and
+            average runtime of successful ligands
+        """
+        self.flush()
+        total, successes, runtime = self.connection.execute(
+            "SELECT COUNT(*), COUNT(score), SUM(CASE WHEN score IS NOT NULL THEN runtime END) FROM ligands"
+        ).fetchone()
+        runtime = runtime or 0.0
+        return {
+            "total_ligands": total,
+            "successful_dockings": successes,
+            "errors": total - successes,
+            "average_runtime_per_ligand": runtime / successes if successes else 0.0,
+            "total_runtime": runtime,
+        }
+
+    def energy_terms(self, name):
+        """Per-term energies stored for a ligand's best pose (empty if none)."""
+        self.flush()
+        row = self.connection.execute("SELECT energy_terms FROM ligands WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else {}
+
+    def search_summary(self, name):
+        """
+        Why the search of a ligand stopped.
+
+        Parameters:
+        -----------
+        name : str
+            Ligand name
+
+        Returns:
+        --------
+        dict
+            'stop_reason', 'generations' and 'evaluations' (None when the
+            search did not report them)
+        """
+        self.flush()
+        row = self.connection.execute(
+            "SELECT stop_reason, generations, evaluations FROM ligands WHERE name = ?", (name,)
+        ).fetchone() or (None, None, None)
+        return dict(zip(('stop_reason', 'generations', 'evaluations'), row))
+
+    def pose_coords(self, name, rank=0):
+        """
+        Coordinates of a saved pose.
+
+        Parameters:
+        -----------
+        name : str
+            Ligand name
+        rank : int
+            Pose rank (0 = best)
+
+        Returns:
+        --------
+        numpy.ndarray or None
+            Pose coordinates, shape (N, 3)
+        """
+        self.flush()
+        row = self.connection.execute(
+            "SELECT coords FROM poses WHERE ligand = ? AND rank = ?", (name, rank)
+        ).fetchone()
+        if row is None:
+            return None
+        return np.frombuffer(row[0], dtype=np.float32).reshape(-1, 3).astype(float)
+
+
+def ligand_smiles(ligand):
+    """Canonical SMILES of a ligand's RDKit molecule, or None if unavailable."""
+    mol = getattr(ligand, 'rdmol', None)
+    if mol is None:
+        return None
+    try:
+        from rdkit import Chem
+        return Chem.MolToSmiles(Chem.RemoveHs(mol))
+    except Exception:
+        return None
+
+
+def pose_energy_terms(scoring_function, protein, pose):
+    """Per-term energies of a pose if the scoring function exposes them, else None."""
+    if not hasattr(scoring_function, 'calculate_energy_terms'):
+        return None
+    try:
+        terms = scoring_function.calculate_energy_terms(protein, pose)
+    except Exception:
+        return None
+    return {name: float(value) for name, value in terms.items()}
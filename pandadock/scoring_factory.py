@@ -1,6 +1,8 @@
 from .unified_scoring import (
     CompositeScoringFunction,
     EnhancedScoringFunction,
+    VectorizedScoringFunction,
+    EnhancedVectorizedScoringFunction,
     GPUScoringFunction,
     EnhancedGPUScoringFunction,
     TetheredScoringFunction,
@@ -12,9 +14,11 @@ from .physics import (
 from .physics import PhysicsBasedScoringFunction
 def create_scoring_function(use_gpu=False, physics_based=False, enhanced=True, 
                            tethered=False, reference_ligand=None, weights=None,
-                           device='cuda', precision='float32', verbose=False):
+                           device='cuda', precision='float32', verbose=False,
+                           use_grid=False, grid_spacing=0.375, grid_cache_dir=None):
     """
     Factory function to create the correct scoring function.
+    If use_grid is set, the function is wrapped with precomputed receptor grid maps.
     """
     if physics_based:
         base_function = PhysicsBasedScoringFunction()
@@ -25,7 +29,8 @@ def create_scoring_function(use_gpu=False, physics_based=False, enhanced=True,
     elif use_gpu:
         base_function = EnhancedGPUScoringFunction(device=device, precision=precision) if enhanced else GPUScoringFunction(device=device, precision=precision)
     else:
-        base_function = EnhancedScoringFunction() if enhanced else CompositeScoringFunction()
+        # Vectorized CPU backend gives the same scores as the loop-based classes
+        base_function = EnhancedVectorizedScoringFunction() if enhanced else VectorizedScoringFunction()
 
     if weights:
         for key, value in weights.items():
@@ -33,4 +38,10 @@ def create_scoring_function(use_gpu=False, physics_based=False, enhanced=True,
                 base_function.weights[key] = value
 
     base_function.verbose = verbose
+
+    if use_grid:
+        from .grid_scoring import create_grid_scoring_function
+        base_function = create_grid_scoring_function(base_function, spacing=grid_spacing,
+                                                     cache_dir=grid_cache_dir)
+
     return base_function  # Ensure the scoring function is returned
@@ -15,7 +15,7 @@ For multi-core parallel implementations, see parallel_search.py.
 
 import numpy as np
 from scipy.spatial.transform import Rotation
-import pathlib as Path
+from pathlib import Path
 import random
 import copy
 import time
@@ -23,7 +23,9 @@ import os
 
 # Import necessary utility functions
 from .utils import setup_logging, generate_spherical_grid, is_inside_sphere, random_point_in_sphere
+from .pose_optimization import optimize_pose, supports_analytic_gradient
 from .utils import save_intermediate_result, update_status, detect_steric_clash
+from . import profiling
 
 class DockingSearch:
     """
@@ -143,6 +145,28 @@ class DockingSearch:
         """
         raise NotImplementedError("Subclasses must implement this method")
     
+    def _score_poses(self, protein, poses):
+        """
+        Score poses of the same ligand in one batched call.
+
+        Parameters:
+        -----------
+        protein : Protein
+            Protein object
+        poses : list
+            Ligand poses sharing one topology
+
+        Returns:
+        --------
+        list
+            Score of each pose
+        """
+        if not poses:
+            return []
+        with profiling.section('search', 'evaluation'):
+            coords = np.stack([pose.xyz for pose in poses])
+            return [float(score) for score in self.scoring_function.score_batch(protein, poses[0], coords)]
+
     def _adjust_search_radius(self, initial_radius, generation, total_generations):
         """
         Adaptively shrink the search radius as the search progresses.
@@ -270,6 +294,91 @@ class DockingSearch:
                     clash_score += overlap**2  # Square to emphasize severe clashes
         
         return clash_score
+
+    def _randomize_torsions(self, pose, max_attempts=10):
+        """
+        Assign random angles to the flexible torsions of a pose.
+        
+        Parameters:
+        -----------
+        pose : Ligand
+            Pose to modify in place
+        max_attempts : int
+            Number of draws tried before keeping the current torsions
+        
+        Returns:
+        --------
+        bool
+            True if new torsions without internal clashes were applied
+        """
+        active = getattr(pose, 'active_torsions', None)
+        if not active:
+            return False
+        
+        original = pose.torsions.copy()
+        angles = original.copy()
+        for _ in range(max_attempts):
+            angles[active] = np.random.uniform(-np.pi, np.pi, len(active))
+            pose.set_torsions(angles)
+            if not pose.has_internal_clash():
+                return True
+        pose.set_torsions(original)
+        return False
+    
+    def _mutate_torsions(self, pose, max_angle=np.pi / 3):
+        """
+        Rotate one random flexible torsion of a pose.
+        
+        Parameters:
+        -----------
+        pose : Ligand
+            Pose to modify in place
+        max_angle : float
+            Maximum rotation in radians
+        
+        Returns:
+        --------
+        bool
+            True if the torsion was rotated without internal clashes
+        """
+        active = getattr(pose, 'active_torsions', None)
+        if not active:
+            return False
+        
+        bond_idx = random.choice(active)
+        angle = random.uniform(-max_angle, max_angle)
+        pose.rotate_bond(bond_idx, angle)
+        if pose.has_internal_clash():
+            pose.rotate_bond(bond_idx, -angle)
+            return False
+        return True
+    
+    def _crossover_torsions(self, child, donor):
+        """
+        Uniform crossover of torsion genes: the child takes each flexible
+        torsion of the donor with probability 0.5.
+        
+        Parameters:
+        -----------
+        child : Ligand
+            Pose to modify in place
+        donor : Ligand
+            Pose of the same ligand providing torsion angles
+        """
+        active = getattr(child, 'active_torsions', None)
+        if not active or len(getattr(donor, 'torsions', ())) != len(child.torsions):
+            return
+        
+        inherited = [k for k in active if random.random() < 0.5]
+        if not inherited:
+            return
+        original = child.torsions.copy()
+        angles = original.copy()
+        angles[inherited] = donor.torsions[inherited]
+        child.set_torsions(angles)
+        if child.has_internal_clash():
+            child.set_torsions(original)
+    
     def _generate_orientations(self, ligand, protein):
         orientations = []
 
@@ -319,15 +428,19 @@ class DockingSearch:
             
         Notes:
         ------
-        This method implements a simple gradient descent optimization
-        by trying small movements in different directions and accepting
-        improvements.
+        Scoring functions with analytic gradients are refined with L-BFGS
+        over translation and rotation. Otherwise this method implements a
+        simple gradient descent optimization by trying small movements in
+        different directions and accepting improvements.
         """
         # Set optimization parameters
         step_size = 0.1  # Angstroms for translation
         angle_step = 0.05  # Radians for rotation
         max_steps = 50  # Maximum optimization steps
         
+        if supports_analytic_gradient(self.scoring_function):
+            return optimize_pose(self.scoring_function, protein, pose, max_iterations=max_steps)
+        
         # Make copies to avoid modifying originals
         current_pose = copy.deepcopy(pose)
         current_score = self.scoring_function.score(protein, current_pose)
@@ -1607,6 +1720,59 @@ class RandomSearch(DockingSearch):
     and evaluating them.
     """
     
+    # Number of valid poses scored together with score_batch
+    batch_size = 64
+    
+    def _score_pending(self, protein, pending, results, best_score, best_pose):
+        """
+        Score a batch of pending poses and record the results.
+        
+        Parameters:
+        -----------
+        protein : Protein
+            Protein object
+        pending : list
+            List of (pose, iteration) tuples
+        results : list
+            List of (pose, score) tuples to extend
+        best_score : float
+            Best score so far
+        best_pose : Ligand
+            Best pose so far
+        
+        Returns:
+        --------
+        tuple
+            Updated (best_score, best_pose)
+        """
+        scores = self._score_poses(protein, [pose for pose, _ in pending])
+        for (pose, iteration), score in zip(pending, scores):
+            # Add to results
+            results.append((pose, score))
+            
+            # Update best pose
+            if score < best_score:
+                best_score = score
+                best_pose = copy.deepcopy(pose)
+                
+                # Save intermediate result if output_dir is specified
+                if self.output_dir:
+                    save_intermediate_result(
+                        best_pose, best_score, iteration + 1, 
+                        self.output_dir, self.max_iterations
+                    )
+                    
+                    # Update status file
+                    update_status(
+                        self.output_dir,
+                        current_iteration=iteration + 1,
+                        best_score=best_score,
+                        total_iterations=self.max_iterations,
+                        progress=(iteration + 1) / self.max_iterations
+                    )
+        
+        return best_score, best_pose
+    
     def search(self, protein, ligand):
         """
         Perform random search to find optimal ligand poses.
@@ -1665,6 +1831,9 @@ class RandomSearch(DockingSearch):
         failures = 0
         max_failures_before_adjust = 50
         
+        # Valid poses waiting to be scored as (pose, iteration)
+        pending = []
+        
         # Main search loop
         for iteration in range(self.max_iterations):
             # Adjust radius to focus search as we progress
@@ -1700,33 +1869,13 @@ class RandomSearch(DockingSearch):
             
             # Reset failure counter on success
             failures = 0
+            pending.append((pose, iteration))
             
-            # Score the pose
-            score = self.scoring_function.score(protein, pose)
-            
-            # Add to results
-            results.append((pose, score))
-            
-            # Update best pose
-            if score < best_score:
-                best_score = score
-                best_pose = copy.deepcopy(pose)
-                
-                # Save intermediate result if output_dir is specified
-                if self.output_dir:
-                    save_intermediate_result(
-                        best_pose, best_score, iteration + 1, 
-                        self.output_dir, self.max_iterations
-                    )
-                    
-                    # Update status file
-                    update_status(
-                        self.output_dir,
-                        current_iteration=iteration + 1,
-                        best_score=best_score,
-                        total_iterations=self.max_iterations,
-                        progress=(iteration + 1) / self.max_iterations
-                    )
+            # Score pending poses in batches
+            if (len(pending) >= self.batch_size or (iteration + 1) % 100 == 0 or
+                    iteration == self.max_iterations - 1):
+                best_score, best_pose = self._score_pending(protein, pending, results, best_score, best_pose)
+                pending = []
             
             # Progress reporting
             if (iteration + 1) % 100 == 0 or iteration == self.max_iterations - 1:
@@ -1736,6 +1885,9 @@ class RandomSearch(DockingSearch):
                       f"Best score: {best_score:.2f}, "
                       f"Time: {elapsed:.1f}s, ETA: {remaining:.1f}s")
         
+        # Score poses left over when the last iterations were invalid
+        best_score, best_pose = self._score_pending(protein, pending, results, best_score, best_pose)
+        
         # Sort results by score
         results.sort(key=lambda x: x[1])
         
@@ -1748,6 +1900,143 @@ class RandomSearch(DockingSearch):
 
 
 
+class ConvergenceMonitor:
+    """
+    Stopping criteria of an evolutionary search.
+    
+    After every generation the population is checked against the enabled
+    criteria; criteria set to None are disabled. The first criterion that is
+    met ends the search and is kept as stop_reason:
+    
+    'no_improvement'   best score improved by less than improvement_tolerance
+                       for patience generations
+    'score_variance'   variance of the population scores fell below
+                       score_variance_threshold
+    'diversity'        mean RMSD (Å) of the population to its best pose fell
+                       below diversity_threshold
+    'time_limit'       time_limit seconds have passed since start()
+    'max_evaluations'  max_evaluations poses have been scored
+    """
+    
+    STOP_REASONS = ('max_iterations', 'no_improvement', 'score_variance',
+                    'diversity', 'time_limit', 'max_evaluations')
+    
+    def __init__(self, patience=None, improvement_tolerance=1e-3,
+                 score_variance_threshold=None, diversity_threshold=None,
+                 time_limit=None, max_evaluations=None):
+        """
+        Initialize stopping criteria.
+        
+        Parameters:
+        -----------
+        patience : int, optional
+            Generations without improvement before stopping
+        improvement_tolerance : float
+            Smallest decrease of the best score counted as an improvement
+        score_variance_threshold : float, optional
+            Population score variance below which the search stops
+        diversity_threshold : float, optional
+            Mean RMSD (Å) to the best pose below which the search stops
+        time_limit : float, optional
+            Wall-clock budget in seconds
+        max_evaluations : int, optional
+            Budget of scored poses
+        """
+        self.patience = patience
+        self.improvement_tolerance = improvement_tolerance
+        self.score_variance_threshold = score_variance_threshold
+        self.diversity_threshold = diversity_threshold
+        self.time_limit = time_limit
+        self.max_evaluations = max_evaluations
+        self.start()
+    
+    def start(self, population=()):
+        """
+        Reset the monitor at the start of a search.
+        
+        Parameters:
+        -----------
+        population : list
+            Scored (pose, score) tuples of the initial population
+        """
+        self.start_time = time.time()
+        self.n_evaluations = len(population)
+        self.generations = 0
+        self.best_score = min((score for _, score in population), default=float('inf'))
+        self.stale_generations = 0
+        self.stop_reason = None
+    
+    def update(self, population, n_evaluations=0):
+        """
+        Record a finished generation and check the stopping criteria.
+        
+        Parameters:
+        -----------
+        population : list
+            (pose, score) tuples of the current population
+        n_evaluations : int
+            Poses scored during the generation
+        
+        Returns:
+        --------
+        str or None
+            Reason to stop, or None to continue
+        """
+        self.generations += 1
+        self.n_evaluations += n_evaluations
+        scores = np.array([score for _, score in population], dtype=float)
+        
+        best_score = scores.min()
+        if best_score < self.best_score - self.improvement_tolerance:
+            self.stale_generations = 0
+        else:
+            self.stale_generations += 1
+        self.best_score = min(self.best_score, best_score)
+        
+        if self.patience is not None and self.stale_generations >= self.patience:
+            self.stop_reason = 'no_improvement'
+        elif (self.score_variance_threshold is not None and
+              np.var(scores[np.isfinite(scores)]) < self.score_variance_threshold):
+            self.stop_reason = 'score_variance'
+        elif (self.diversity_threshold is not None and
+              self.population_diversity(population) < self.diversity_threshold):
+            self.stop_reason = 'diversity'
+        elif self.time_limit is not None and time.time() - self.start_time >= self.time_limit:
+            self.stop_reason = 'time_limit'
+        elif self.max_evaluations is not None and self.n_evaluations >= self.max_evaluations:
+            self.stop_reason = 'max_evaluations'
+        return self.stop_reason
+    
+    @staticmethod
+    def population_diversity(population):
+        """
+        Mean RMSD (Å) of a population to its best pose.
+        
+        Parameters:
+        -----------
+        population : list
+            (pose, score) tuples of poses sharing one topology
+        
+        Returns:
+        --------
+        float
+            Mean atom-to-atom RMSD to the lowest-scoring pose
+        """
+        best_index = int(np.argmin([score for _, score in population]))
+        coords = np.array([pose.xyz for pose, _ in population])
+        deviations = np.sum((coords - coords[best_index]) ** 2, axis=-1)
+        return float(np.mean(np.sqrt(np.mean(deviations, axis=-1))))
+    
+    def summary(self):
+        """Stop reason, generations run, evaluations and elapsed time of the search."""
+        return {
+            'stop_reason': self.stop_reason or 'max_iterations',
+            'generations': self.generations,
+            'evaluations': self.n_evaluations,
+            'elapsed_time': time.time() - self.start_time,
+        }
+
+
 class GeneticAlgorithm(DockingSearch):
     """
     Genetic algorithm for conformational search in molecular docking.
@@ -1759,7 +2048,9 @@ class GeneticAlgorithm(DockingSearch):
     
     def __init__(self, scoring_function, max_iterations=100, 
                  population_size=50, mutation_rate=0.2, perform_local_opt=False,
-                 output_dir=None, grid_spacing=0.375, grid_radius=10.0):
+                 output_dir=None, grid_spacing=0.375, grid_radius=10.0,
+                 patience=None, improvement_tolerance=1e-3, score_variance_threshold=None,
+                 diversity_threshold=None, time_limit=None, max_evaluations=None):
         """
         Initialize genetic algorithm with specific parameters.
         
@@ -1781,6 +2072,19 @@ class GeneticAlgorithm(DockingSearch):
             Spacing between grid points in Angstroms
         grid_radius : float
             Radius of search sphere in Angstroms
+        patience : int, optional
+            Stop after this many generations without improvement
+        improvement_tolerance : float
+            Smallest decrease of the best score counted as an improvement
+        score_variance_threshold : float, optional
+            Stop when the population score variance falls below this value
+        diversity_threshold : float, optional
+            Stop when the mean RMSD (Å) of the population to its best pose
+            falls below this value
+        time_limit : float, optional
+            Stop after this many seconds
+        max_evaluations : int, optional
+            Stop after this many poses have been scored
         """
         super().__init__(scoring_function, max_iterations, output_dir, 
                          grid_spacing, grid_radius)
@@ -1789,6 +2093,30 @@ class GeneticAlgorithm(DockingSearch):
         self.perform_local_opt = perform_local_opt
         self.grid_radius = grid_radius
         self.grid_spacing = grid_spacing
+        self.convergence = ConvergenceMonitor(
+            patience=patience,
+            improvement_tolerance=improvement_tolerance,
+            score_variance_threshold=score_variance_threshold,
+            diversity_threshold=diversity_threshold,
+            time_limit=time_limit,
+            max_evaluations=max_evaluations
+        )
+        # Stop reason, generations, evaluations and time of the last search
+        self.search_summary = None
+
+    def _finish_search(self, summary=None):
+        """Record why the last search stopped, also in the status file."""
+        self.search_summary = summary or self.convergence.summary()
+        summary = self.search_summary
+        print(f"Search stopped after {summary['generations']} generations "
+              f"({summary['evaluations']} evaluations): {summary['stop_reason']}")
+        if self.output_dir:
+            update_status(
+                self.output_dir,
+                stop_reason=summary['stop_reason'],
+                generations_run=summary['generations'],
+                evaluations=summary['evaluations']
+            )
 
     def search(self, protein, ligand):
         """
@@ -1835,29 +2163,31 @@ class GeneticAlgorithm(DockingSearch):
         print(f"Local optimization within GA generations is {'ENABLED' if self.perform_local_opt else 'DISABLED'}.")
 
         # Initialize population
-        population = []
-        for _ in range(self.population_size):
-            pose = copy.deepcopy(ligand)
+        with profiling.section('search', 'init'):
+            population = []
+            for _ in range(self.population_size):
+                pose = copy.deepcopy(ligand)
+                self._randomize_torsions(pose)
 
-            #  Pick a random point from grid
-            random_grid_point = random.choice(self.grid_points)
+                #  Pick a random point from grid
+                random_grid_point = random.choice(self.grid_points)
 
-            #  Move ligand centroid to grid point
-            centroid = np.mean(pose.xyz, axis=0)
-            translation = random_grid_point - centroid
-            pose.translate(translation)
+                #  Move ligand centroid to grid point
+                centroid = np.mean(pose.xyz, axis=0)
+                translation = random_grid_point - centroid
+                pose.translate(translation)
 
-            #  Apply random rotation
-            rotation = Rotation.random()
-            rotation_matrix = rotation.as_matrix()
-            centroid = np.mean(pose.xyz, axis=0)
-            pose.translate(-centroid)
-            pose.rotate(rotation_matrix)
-            pose.translate(centroid)
+                #  Apply random rotation
+                rotation = Rotation.random()
+                rotation_matrix = rotation.as_matrix()
+                centroid = np.mean(pose.xyz, axis=0)
+                pose.translate(-centroid)
+                pose.rotate(rotation_matrix)
+                pose.translate(centroid)
+                population.append(pose)
 
-            #  Evaluate Score
-            score = self.scoring_function.score(protein, pose)
-            population.append((pose, score))
+        #  Evaluate scores of the whole population at once
+        population = list(zip(population, self._score_poses(protein, population)))
 
         # Sort initial population
         population.sort(key=lambda x: x[1])
@@ -1866,6 +2196,7 @@ class GeneticAlgorithm(DockingSearch):
 
         # Track progress timing
         start_time = time.time()
+        self.convergence.start(population)
 
         # Main evolutionary loop
         for generation in range(self.max_iterations):
@@ -1873,13 +2204,13 @@ class GeneticAlgorithm(DockingSearch):
             current_radius = self._adjust_search_radius(radius, generation, self.max_iterations)
 
             # Selection: tournament selection
-            parents = self._selection(population)
+            parents = profiling.timed('search', 'selection', self._selection, population)
 
             # Crossover: create offspring
-            offspring = self._crossover(parents)
+            offspring = profiling.timed('search', 'crossover', self._crossover, parents)
 
             # Mutation: apply random modifications
-            self._mutation(offspring, current_radius, center)
+            profiling.timed('search', 'mutation', self._mutation, offspring, current_radius, center)
 
             # Enforce boundary constraints
             for i, (pose, _) in enumerate(offspring):
@@ -1887,6 +2218,7 @@ class GeneticAlgorithm(DockingSearch):
                 if not is_inside_sphere(pose, center, current_radius):
                     # If outside, regenerate this individual
                     new_pose = copy.deepcopy(ligand)
+                    self._randomize_torsions(new_pose)
                     
                     # Sample within the current radius
                     r = current_radius * np.random.random() ** (1/3)
@@ -1910,15 +2242,13 @@ class GeneticAlgorithm(DockingSearch):
                     offspring[i] = (new_pose, 0)  # Will be scored later
             
             # Evaluate offspring
-            for i, (pose, _) in enumerate(offspring):
-                # Apply local optimization to top offspring if enabled
-                if self.perform_local_opt and i < len(offspring) // 4:  # Optimize top 25%
-                    optimized_pose, optimized_score = self._local_optimization(pose, protein)
-                    offspring[i] = (optimized_pose, optimized_score)
-                else:
-                    # Just score
-                    score = self.scoring_function.score(protein, pose)
-                    offspring[i] = (pose, score)
+            n_optimized = len(offspring) // 4 if self.perform_local_opt else 0  # Optimize top 25%
+            for i, (pose, _) in enumerate(offspring[:n_optimized]):
+                offspring[i] = profiling.timed('search', 'local_opt', self._local_optimization, pose, protein)
+
+            # Score the remaining offspring in one batch
+            remaining = [pose for pose, _ in offspring[n_optimized:]]
+            offspring[n_optimized:] = list(zip(remaining, self._score_poses(protein, remaining)))
             
             # Combine parents and offspring, then select new population (elitism)
             combined = population + offspring
@@ -1952,6 +2282,12 @@ class GeneticAlgorithm(DockingSearch):
             print(f"Generation {generation + 1}/{self.max_iterations}, "
                   f"Best score: {best_score:.2f}, "
                   f"Time: {elapsed:.1f}s, ETA: {remaining:.1f}s")
+            
+            # Stop early once the search has converged or its budget is spent
+            if self.convergence.update(population, len(offspring)):
+                break
+        
+        self._finish_search()
         
         # Final local optimization of top poses if enabled
         if self.perform_local_opt:
@@ -1974,7 +2310,8 @@ class GeneticAlgorithm(DockingSearch):
             # Optimize each pose
             for i, (pose, score) in enumerate(unique_poses):
                 print(f"  Optimizing pose {i+1}/10 (initial score: {score:.2f})...")
-                optimized_pose, optimized_score = self._enhanced_local_optimization(
+                optimized_pose, optimized_score = profiling.timed(
+                    'search', 'local_opt', self._enhanced_local_optimization,
                     protein, pose, step_size=0.2, angle_step=0.05, max_steps=50
                 )
                 optimized_results.append((optimized_pose, optimized_score))
@@ -2061,6 +2398,10 @@ class GeneticAlgorithm(DockingSearch):
                 child2_centroid = np.mean(child2.xyz, axis=0)
                 child2.translate(avg_centroid - child2_centroid)
                 
+                # Exchange torsion genes
+                self._crossover_torsions(child1, parent2)
+                self._crossover_torsions(child2, parent1)
+                
                 offspring.append((child1, 0))
                 offspring.append((child2, 0))
         
@@ -2116,6 +2457,10 @@ class GeneticAlgorithm(DockingSearch):
             individual.rotate(rotation_matrix)
             individual.translate(centroid)
         
+        # Torsion mutation
+        if random.random() < self.mutation_rate:
+            self._mutate_torsions(individual)
+        
         # Mutate flexible residues if available
         # Check if the protein has flexible residues
         if hasattr(self, 'protein') and hasattr(self.protein, 'flexible_residues') and self.protein.flexible_residues:
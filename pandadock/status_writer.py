@@ -0,0 +1,320 @@
+"""
+Background writer for docking status and intermediate poses.
+
+Searches report progress on every improvement and screening runs on every
+ligand. Reading and rewriting status.json synchronously on each report puts
+filesystem latency on the search thread, which is noticeable on shared
+network filesystems. A StatusWriter keeps the status of an output directory
+in memory and writes it from a background thread:
+
+* updates are merged in memory and written at most once per min_interval
+  seconds, so bursts of reports coalesce into a single write;
+* status.json is replaced atomically (write to a temporary file, then
+  rename), so readers never see a partially written file;
+* intermediate poses are snapshotted by the caller and their PDB files are
+  written by the background thread.
+
+The functions in utils (update_status, save_intermediate_result) use one
+shared writer per output directory. Pending writes are flushed by
+flush_status_writers() and at interpreter exit.
+"""
+
+import atexit
+import json
+import logging
+import multiprocessing as mp
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from . import profiling
+from .atomic_io import atomic_write
+
+
+# Default minimum time (s) between two writes of status.json
+DEFAULT_MIN_INTERVAL = 1.0
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+# Process that registered the exit flush (forked workers register their own)
+_exit_flush_pid = None
+
+
+class StatusWriter:
+    """
+    Coalescing, rate-limited writer of an output directory's status.json
+    and intermediate pose files.
+    """
+
+    def __init__(self, output_dir, min_interval=DEFAULT_MIN_INTERVAL):
+        """
+        Start a writer for an output directory.
+
+        Parameters:
+        -----------
+        output_dir : str or Path
+            Output directory holding status.json
+        min_interval : float
+            Minimum time (s) between two writes of status.json
+        """
+        self.output_dir = Path(output_dir)
+        self.status_path = self.output_dir / "status.json"
+        self.intermediate_dir = self.output_dir / "intermediate"
+        self.min_interval = float(min_interval)
+        self.pid = os.getpid()
+        self.logger = logging.getLogger("pandadock")
+
+        self.status = self._read_status()
+        self._dirty = False
+        self._last_write = float('-inf')
+        self._poses = deque()
+        self._flush_requested = False
+        self._written = 0          # Generation of the last completed write
+        self._requested = 0        # Generation of the last requested flush
+        self._closed = False
+        self._condition = threading.Condition()
+
+        self._thread = threading.Thread(target=self._run, name="pandadock-status-writer",
+                                        daemon=True)
+        self._thread.start()
+
+    def update(self, **kwargs):
+        """
+        Merge key-value pairs into the status.
+
+        Returns immediately; the status file is written by the background
+        thread within min_interval seconds.
+        """
+        with self._condition:
+            self.status.update(kwargs)
+            self.status["last_update"] = datetime.now().isoformat()
+            self._dirty = True
+            self._condition.notify()
+
+    def replace(self, status):
+        """
+        Replace the whole status (e.g. at the start of a new run).
+
+        Parameters:
+        -----------
+        status : dict
+            New status
+        """
+        with self._condition:
+            self.status = dict(status)
+            self._dirty = True
+            self._condition.notify()
+
+    def record_result(self, pose, score, iteration, total_iterations=None):
+        """
+        Record an intermediate result.
+
+        Updates iteration, progress and top score. Every 10th iteration and
+        every new top score also queues the pose for writing to the
+        'intermediate' directory; the pose coordinates are copied, so the
+        caller may keep modifying the pose.
+
+        Parameters:
+        -----------
+        pose : Ligand
+            Ligand pose
+        score : float
+            Docking score
+        iteration : int
+            Current iteration number
+        total_iterations : int, optional
+            Total number of iterations (for progress calculation)
+
+        Returns:
+        --------
+        bool
+            Whether the pose was queued for writing
+        """
+        is_milestone = (iteration % 10 == 0)
+
+        with self._condition:
+            status = self.status
+            status["current_iteration"] = iteration
+            status["last_update"] = datetime.now().isoformat()
+
+            if total_iterations is None:
+                total_iterations = status.get("total_iterations", 100)
+            status["progress"] = min(1.0, iteration / total_iterations)
+
+            top_score = status.get("top_score")
+            if top_score is None or score < top_score:
+                status["top_score"] = score
+                is_milestone = True  # Always save best poses
+
+            if is_milestone:
+                coords = np.array([atom['coords'] for atom in pose.atoms], dtype=float)
+                symbols = [atom.get('symbol', 'C') for atom in pose.atoms]
+                self._poses.append((iteration, score, symbols, coords))
+
+            self._dirty = True
+            self._condition.notify()
+
+        return is_milestone
+
+    def flush(self, timeout=None):
+        """
+        Write pending status and poses now and wait until they are on disk.
+
+        Parameters:
+        -----------
+        timeout : float, optional
+            Maximum time (s) to wait
+
+        Returns:
+        --------
+        bool
+            False if the timeout expired before the writes finished
+        """
+        with self._condition:
+            if self._closed or not self._thread.is_alive():
+                return True
+            self._requested += 1
+            generation = self._requested
+            self._flush_requested = True
+            self._condition.notify()
+            return self._condition.wait_for(lambda: self._written >= generation, timeout)
+
+    def close(self, timeout=None):
+        """Flush pending writes and stop the background thread."""
+        self.flush(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join(timeout)
+
+    def _read_status(self):
+        try:
+            with open(self.status_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            self.logger.warning(f"Could not read status file: {e}")
+        return {"start_time": datetime.now().isoformat()}
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if self._closed:
+                        return
+                    if self._flush_requested or self._poses:
+                        break
+                    if self._dirty:
+                        remaining = self._last_write + self.min_interval - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                    else:
+                        self._condition.wait()
+
+                generation = self._requested
+                self._flush_requested = False
+                poses = list(self._poses)
+                self._poses.clear()
+                status = None
+                if self._dirty and (generation > self._written or
+                                    time.monotonic() - self._last_write >= self.min_interval):
+                    status = json.dumps(self.status, indent=2, default=str)
+                    self._dirty = False
+
+            for pose in poses:
+                self._write_pose(*pose)
+            if status is not None:
+                self._write_status(status)
+
+            with self._condition:
+                if status is not None:
+                    self._last_write = time.monotonic()
+                self._written = max(self._written, generation)
+                self._condition.notify_all()
+
+    def _write_status(self, text):
+        with profiling.section('io', 'status_flush'):
+            try:
+                atomic_write(self.status_path, lambda f: f.write(text))
+            except Exception as e:
+                self.logger.warning(f"Could not update status file: {e}")
+
+    def _write_pose(self, iteration, score, symbols, coords):
+        with profiling.section('io', 'intermediate_save'):
+            pdb_path = self.intermediate_dir / f"pose_iter_{iteration}_score_{score:.2f}.pdb"
+            lines = [f"REMARK   1 Iteration: {iteration}, Score: {score:.4f}\n"]
+            for j, (symbol, xyz) in enumerate(zip(symbols, coords)):
+                # PDB ATOM format
+                lines.append(f"HETATM{j+1:5d} {symbol:<4}{'':<1}{'LIG':<3} {'A':1}{1:4d}    "
+                             f"{xyz[0]:8.3f}{xyz[1]:8.3f}{xyz[2]:8.3f}"
+                             f"{1.0:6.2f}{0.0:6.2f}          {symbol:>2}\n")
+            try:
+                atomic_write(pdb_path, lambda f: f.writelines(lines))
+                self.logger.debug(f"Saved intermediate pose at iteration {iteration} to {pdb_path}")
+            except Exception as e:
+                self.logger.warning(f"Could not save intermediate pose: {e}")
+
+
+def get_status_writer(output_dir):
+    """
+    Shared StatusWriter of an output directory.
+
+    Parameters:
+    -----------
+    output_dir : str or Path
+        Output directory
+
+    Returns:
+    --------
+    StatusWriter
+        Writer of the directory, created on first use (writers inherited
+        from a parent process are replaced)
+    """
+    key = str(Path(output_dir).resolve())
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None or writer.pid != os.getpid():
+            _register_exit_flush()
+            writer = StatusWriter(output_dir)
+            _writers[key] = writer
+        return writer
+
+
+def flush_status_writers(timeout=None):
+    """Write all pending status updates and poses of this process."""
+    with _writers_lock:
+        writers = [w for w in _writers.values() if w.pid == os.getpid()]
+    for writer in writers:
+        writer.flush(timeout)
+
+
+def close_status_writers(timeout=None):
+    """Flush and stop all status writers of this process."""
+    with _writers_lock:
+        writers = [w for w in _writers.values() if w.pid == os.getpid()]
+        _writers.clear()
+    for writer in writers:
+        writer.close(timeout)
+
+
+def _register_exit_flush():
+    global _exit_flush_pid
+    if _exit_flush_pid == os.getpid():
+        return
+    _exit_flush_pid = os.getpid()
+
+    # Worker processes of multiprocessing exit without running atexit hooks,
+    # but run multiprocessing finalizers when they end normally
+    if mp.current_process().name == 'MainProcess':
+        atexit.register(close_status_writers, 10.0)
+    else:
+        from multiprocessing import util
+        util.Finalize(None, close_status_writers, args=(10.0,), exitpriority=10)
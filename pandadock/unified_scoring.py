@@ -10,6 +10,8 @@ import sys
 from typing import List, Dict, Any
 from typing import TYPE_CHECKING
 from pandadock.physics import PhysicsBasedScoring, PhysicsBasedScoringFunction
+from pandadock.neighbor_search import ReceptorNeighborIndex
+from pandadock import profiling
 
 
 if TYPE_CHECKING:
@@ -201,6 +203,34 @@ class ScoringFunction:
             Binding score (lower is better)
         """
         raise NotImplementedError("Subclasses must implement this method")
+
+    def score_batch(self, protein: 'Protein', ligand: 'Ligand', coords) -> np.ndarray:
+        """
+        Score several poses of the same ligand.
+
+        The default implementation scores one pose at a time; vectorized
+        scoring functions override it to evaluate all poses in one pass.
+
+        Parameters:
+        -----------
+        protein : Protein
+        ligand : Ligand
+            Ligand providing the topology shared by all poses
+        coords : array-like
+            Stacked pose coordinates of shape (P, N, 3)
+
+        Returns:
+        --------
+        numpy.ndarray
+            Scores of shape (P,) (lower is better)
+        """
+        coords = np.asarray(coords, dtype=float)
+        pose = ligand.copy()
+        scores = np.empty(len(coords))
+        for i, pose_coords in enumerate(coords):
+            pose.xyz[...] = pose_coords
+            scores[i] = self.score(protein, pose)
+        return scores
     
     def _get_atom_type(self, atom, default='C'):
         """Determine the atom type for an atom based on available information."""
@@ -717,20 +747,22 @@ class CompositeScoringFunction(CPUScoringFunction):
         ligand_atoms = self._get_ligand_atoms(ligand)
         
         # Calculate energy components
-        vdw = self.calculate_vdw(protein_atoms, ligand_atoms)
-        hbond = self.calculate_hbond(protein_atoms, ligand_atoms)
-        elec = self.calculate_electrostatics(protein_atoms, ligand_atoms)
-        desolv = self.calculate_desolvation(protein_atoms, ligand_atoms)
-        hydrophobic = self.calculate_hydrophobic(protein_atoms, ligand_atoms)
+        vdw = profiling.timed('scoring', 'vdw', self.calculate_vdw, protein_atoms, ligand_atoms)
+        hbond = profiling.timed('scoring', 'hbond', self.calculate_hbond, protein_atoms, ligand_atoms)
+        elec = profiling.timed('scoring', 'elec', self.calculate_electrostatics, protein_atoms, ligand_atoms)
+        desolv = profiling.timed('scoring', 'desolv', self.calculate_desolvation, protein_atoms, ligand_atoms)
+        hydrophobic = profiling.timed('scoring', 'hydrophobic', self.calculate_hydrophobic,
+                                      protein_atoms, ligand_atoms)
         
         # Regular clash detection
-        clash = self.calculate_clashes(protein_atoms, ligand_atoms)
+        clash = profiling.timed('scoring', 'clash', self.calculate_clashes, protein_atoms, ligand_atoms)
         
         # Enhanced backbone-aware clash detection
-        backbone_clash = self.calculate_enhanced_clashes(protein_atoms, ligand_atoms, backbone_factor=3.0)
+        backbone_clash = profiling.timed('scoring', 'backbone_clash', self.calculate_enhanced_clashes,
+                                         protein_atoms, ligand_atoms, backbone_factor=3.0)
         
         # Entropy calculation
-        entropy = self.calculate_entropy(ligand, protein)
+        entropy = profiling.timed('scoring', 'entropy', self.calculate_entropy, ligand, protein)
         
         # Combine scores with special handling for backbone clashes
         total = (
@@ -804,6 +836,790 @@ class EnhancedScoringFunction(CompositeScoringFunction):
         }
 
 
+class VectorizedScoringFunction(CompositeScoringFunction):
+    """
+    NumPy-vectorized drop-in replacement for CompositeScoringFunction.
+
+    Each pose is evaluated from a single protein-ligand distance matrix.
+    Every energy term is then computed by broadcasting over per-atom
+    parameter arrays instead of looping over atom pairs. Protein parameter
+    arrays are cached per atom list, so only coordinates are gathered on
+    repeated calls. Results match the loop implementation in
+    CPUScoringFunction to floating point tolerance.
+    """
+
+    BACKBONE_ATOMS = frozenset({'CA', 'C', 'N', 'O'})
+    DEFAULT_HBOND_PARAMS = {'r_eq': 1.9, 'epsilon': 3.0}
+
+    # Upper bound on distance tensor entries evaluated at once by score_batch
+    max_batch_elements = 2_000_000
+
+    # Receptor selections with at least this many atoms are scored from a
+    # KD-tree neighbour list instead of the dense distance matrix
+    neighbor_search_min_atoms = 1000
+
+    def __init__(self):
+        super().__init__()
+        self._protein_atoms_ref = None
+        self._protein_params = None
+        self._table_ref = None
+        self._table_params = None
+        self._table_selection = None
+        self._neighbor_cache = None
+
+    def __getstate__(self):
+        # Do not ship the cached protein atom list to worker processes
+        state = self.__dict__.copy()
+        state['_protein_atoms_ref'] = None
+        state['_protein_params'] = None
+        state['_table_ref'] = None
+        state['_table_params'] = None
+        state['_table_selection'] = None
+        state['_neighbor_cache'] = None
+        return state
+
+    def _atom_parameter_arrays(self, atoms, is_protein):
+        """
+        Build per-atom parameter arrays for a list of atom dictionaries.
+
+        Parameters:
+        -----------
+        atoms : list
+            List of atom dictionaries
+        is_protein : bool
+            Whether the atoms belong to the receptor (element is taken from
+            the atom name) or to the ligand (element is taken from the symbol)
+
+        Returns:
+        --------
+        dict
+            Dictionary of parameter arrays indexed by atom
+        """
+        types = [self._get_atom_type(atom) for atom in atoms]
+        if is_protein:
+            elements = [atom.get('element', atom.get('name', 'C'))[0] for atom in atoms]
+            backbone = [atom.get('name', '').strip() in self.BACKBONE_ATOMS for atom in atoms]
+        else:
+            elements = [atom.get('symbol', 'C') for atom in atoms]
+            backbone = [False] * len(atoms)
+        hb_elements = [element.upper() for element in elements]
+
+        default_vdw = self.vdw_params['C']
+        vdw = [self.vdw_params.get(t, default_vdw) for t in types]
+
+        # Unique H-bond elements and per-atom indices into them
+        hb_vocab = sorted(set(hb_elements))
+        hb_lookup = {element: i for i, element in enumerate(hb_vocab)}
+
+        return {
+            'n_atoms': len(atoms),
+            'r_eq': np.array([p['r_eq'] for p in vdw], dtype=float),
+            'epsilon': np.array([p['epsilon'] for p in vdw], dtype=float),
+            'solv': np.array([self.atom_solvation_params.get(t, 0.0) for t in types], dtype=float),
+            'vol': np.array([self.atom_volume_params.get(t, 0.0) for t in types], dtype=float),
+            'hydrophobic': np.array([t in self.hydrophobic_types for t in types], dtype=bool),
+            'charge': np.array([self.atom_charges.get(e, 0.0) for e in hb_elements], dtype=float),
+            'donor': np.array([e in self.hbond_donor_types for e in hb_elements], dtype=bool),
+            'acceptor': np.array([e in self.hbond_acceptor_types for e in hb_elements], dtype=bool),
+            'hb_vocab': hb_vocab,
+            'hb_index': np.array([hb_lookup[e] for e in hb_elements], dtype=int),
+            'clash_radius': np.array([self.vdw_radii.get(e, 1.7) for e in elements], dtype=float),
+            'backbone': np.array(backbone, dtype=bool),
+        }
+
+    def _get_protein_parameters(self, protein_atoms):
+        """Return cached parameter arrays for the given protein atom list."""
+        if (self._protein_atoms_ref is not protein_atoms or
+                self._protein_params is None or
+                self._protein_params['n_atoms'] != len(protein_atoms)):
+            self._protein_params = self._atom_parameter_arrays(protein_atoms, is_protein=True)
+            self._protein_atoms_ref = protein_atoms
+        return self._protein_params
+
+    @staticmethod
+    def _subset_parameters(params, mask):
+        """Select a subset of atoms from a parameter array dictionary."""
+        subset = {}
+        for key, value in params.items():
+            if isinstance(value, np.ndarray):
+                subset[key] = value[mask]
+            else:
+                subset[key] = value
+        subset['n_atoms'] = len(subset['r_eq'])
+        return subset
+
+    def _protein_table_indices(self, protein):
+        """
+        Indices of the scored protein atoms in the protein's atom table.
+
+        Returns None when the protein has no atom table or when the scored
+        atom list is not backed by it (e.g. an externally assigned list).
+        """
+        table = getattr(protein, 'atom_table', None)
+        if table is None:
+            return None
+        active_site = getattr(protein, 'active_site', None)
+        if active_site and 'atoms' in active_site:
+            indices = active_site.get('indices')
+            if indices is None or len(indices) != len(active_site['atoms']):
+                return None
+            return indices
+        atoms = getattr(protein, '_atoms', None)
+        if atoms is not None and atoms is not table._all_records:
+            return None
+        return slice(None)
+
+    def _get_table_parameters(self, table, indices):
+        """Return cached parameter arrays for a selection of atom table rows."""
+        if self._table_ref is not table:
+            # Parameters only depend on the atom name, so type each unique name once
+            unique_atoms = [{'name': str(name)} for name in table.unique_names]
+            self._table_params = self._subset_parameters(
+                self._atom_parameter_arrays(unique_atoms, is_protein=True), table.name_codes)
+            self._table_ref = table
+            self._table_selection = None
+        if self._table_selection is None or self._table_selection[0] is not indices:
+            self._table_selection = (indices, self._subset_parameters(self._table_params, indices))
+        return self._table_selection[1]
+
+    def _protein_pair_inputs(self, protein):
+        """
+        Protein parameter arrays and coordinates for the scored atoms.
+
+        Table-backed proteins are gathered directly from the atom table
+        columns; otherwise the atom dictionaries are used.
+
+        Returns:
+        --------
+        tuple
+            (protein_params, protein_coords)
+        """
+        indices = None if isinstance(protein, list) else self._protein_table_indices(protein)
+        if indices is not None:
+            table = protein.atom_table
+            return self._get_table_parameters(table, indices), table.coords[indices]
+        protein_atoms = self._get_protein_atoms(protein)
+        return self._get_protein_parameters(protein_atoms), self._coords_array(protein_atoms)
+
+    @staticmethod
+    def _outer_parameters(p, l):
+        """
+        Shape protein and ligand parameter arrays for all-pairs evaluation.
+
+        The per-pair energy functions combine parameters elementwise, so they
+        accept either per-pair arrays of equal length (e.g. from a neighbour
+        list) or, after this reshaping, protein arrays of shape (n, 1) and
+        ligand arrays of shape (1, m) that broadcast to the full matrix.
+        """
+        def reshape(params, shape):
+            return {key: value.reshape(shape) if isinstance(value, np.ndarray) else value
+                    for key, value in params.items()}
+        return reshape(p, (-1, 1)), reshape(l, (1, -1))
+
+    @staticmethod
+    def _coords_array(atoms):
+        """Stack atom coordinates into an (N, 3) array."""
+        return np.array([atom['coords'] for atom in atoms], dtype=float).reshape(-1, 3)
+
+    def _prepare_pair_data(self, protein_atoms, ligand_atoms):
+        """
+        Gather parameter arrays and the protein-ligand distance matrix.
+
+        Returns:
+        --------
+        tuple
+            (protein_params, ligand_params, distances) where distances has
+            shape (n_protein_atoms, n_ligand_atoms) and the parameter arrays
+            are shaped to broadcast against it
+        """
+        p_params, l_params = self._outer_parameters(
+            self._get_protein_parameters(protein_atoms),
+            self._atom_parameter_arrays(ligand_atoms, is_protein=False))
+        distances = cdist(self._coords_array(protein_atoms), self._coords_array(ligand_atoms))
+        return p_params, l_params, distances
+
+    def _vdw_pairs(self, p, l, distances):
+        r_eq = 0.5 * (p['r_eq'] + l['r_eq'])
+        epsilon = np.sqrt(p['epsilon'] * l['epsilon'])
+        d = np.maximum(distances, 0.1)
+
+        ratio6 = (r_eq / d) ** 6
+        lj = np.clip(epsilon * (ratio6 * ratio6 - 2.0 * ratio6), -50.0, 50.0)
+        repulsion = np.minimum(50.0 * (0.7 * r_eq - d) / (0.7 * r_eq), 50.0)
+        energy = np.where(d >= 0.7 * r_eq, lj, repulsion)
+
+        return np.where(distances <= self.vdw_cutoff, energy, 0.0)
+
+    def _hbond_pair_table(self, donor_vocab, acceptor_vocab, key):
+        """Look up H-bond r_eq/epsilon for every donor-acceptor element pair."""
+        table = np.empty((len(donor_vocab), len(acceptor_vocab)))
+        for i, donor in enumerate(donor_vocab):
+            for j, acceptor in enumerate(acceptor_vocab):
+                params = self.hbond_params.get(f"{donor}-{acceptor}", self.DEFAULT_HBOND_PARAMS)
+                table[i, j] = params[key]
+        return table
+
+    def _hbond_pair_parameters(self, donor, acceptor):
+        """Per-pair H-bond r_eq and epsilon for donor/acceptor parameter arrays."""
+        r_eq = self._hbond_pair_table(donor['hb_vocab'], acceptor['hb_vocab'], 'r_eq')
+        epsilon = self._hbond_pair_table(donor['hb_vocab'], acceptor['hb_vocab'], 'epsilon')
+        return (r_eq[donor['hb_index'], acceptor['hb_index']],
+                epsilon[donor['hb_index'], acceptor['hb_index']])
+
+    def _hbond_pairs(self, p, l, distances):
+        within = distances <= self.hbond_cutoff
+        # Matches _calculate_hbond_angle_factor: 0 for overlapping atoms, 0.7 otherwise
+        angle_factor = np.where(distances < 0.1, 0.0, 0.7)
+        d = np.maximum(distances, 0.1)
+        energy = np.zeros_like(distances)
+
+        # Protein donor - ligand acceptor, then ligand donor - protein acceptor
+        for donor, acceptor in ((p, l), (l, p)):
+            mask = donor['donor'] & acceptor['acceptor'] & within
+            if not mask.any():
+                continue
+
+            r_eq, epsilon = self._hbond_pair_parameters(donor, acceptor)
+            diff = np.abs(d - r_eq)
+            term = np.where(diff <= 0.8, -epsilon * np.exp(-(diff ** 2) / 0.3), 0.0)
+            energy += np.where(mask, term * angle_factor, 0.0)
+
+        return energy
+
+    def _electrostatics_pairs(self, p, l, distances):
+        q = p['charge'] * l['charge']
+        charged = (np.abs(p['charge']) >= 1e-6) & (np.abs(l['charge']) >= 1e-6)
+        d = np.maximum(distances, 0.1)
+
+        # Coulomb with 6r dielectric and 10 Å Debye-Hückel-like screening
+        energy = 332.0 * q * np.exp(-d / 10.0) / (6.0 * d * d)
+        energy = np.clip(energy, -10.0, 10.0)
+
+        return np.where(charged & (distances <= self.elec_cutoff), energy, 0.0)
+
+    def _desolvation_pairs(self, p, l, distances):
+        sigma_squared_2 = 2.0 * self.solvation_k * self.solvation_k
+        prefactor = (self.solpar * p['solv'] * l['vol'] +
+                     self.solpar * l['solv'] * p['vol'])
+        energy = np.clip(prefactor * np.exp(-(distances * distances) / sigma_squared_2), -5.0, 5.0)
+
+        return np.where(distances <= self.desolv_cutoff, energy, 0.0)
+
+    def _hydrophobic_pairs(self, p, l, distances):
+        mask = (p['hydrophobic'] & l['hydrophobic'] &
+                (distances <= self.hydrophobic_cutoff) & (distances >= 0.5))
+
+        factor = (self.hydrophobic_cutoff - distances) / self.hydrophobic_cutoff
+        contact = factor / (1.0 + np.exp(-(factor * 10 - 5)))
+
+        return np.where(mask, -contact, 0.0)
+
+    def _clash_pairs(self, p, l, distances):
+        radii = 0.5 * (p['r_eq'] + l['r_eq'])
+        min_allowed = radii * 0.7
+        upper_bound = radii * 1.2
+
+        repulsion = (np.exp((min_allowed - distances) / min_allowed) - 1.0) ** 2
+        soft_penalty = 0.1 * ((upper_bound - distances) / (upper_bound - min_allowed)) ** 2
+
+        return np.where(distances < min_allowed, repulsion,
+                        np.where(distances < upper_bound, soft_penalty, 0.0))
+
+    def _enhanced_clash_pairs(self, p, l, distances, backbone_factor):
+        min_allowed = (p['clash_radius'] + l['clash_radius']) * 0.7
+        severity = (min_allowed / np.maximum(distances, 0.1)) ** 2
+        weight = np.where(p['backbone'], backbone_factor, 1.0)
+
+        return np.where(distances < min_allowed, severity * weight, 0.0)
+
+    # Distance derivatives dE/dr of the pair terms above. Clipped and
+    # constant regions have zero derivative; like the energies they take
+    # elementwise parameter arrays (see _outer_parameters).
+
+    def _vdw_pair_derivatives(self, p, l, distances):
+        r_eq = 0.5 * (p['r_eq'] + l['r_eq'])
+        epsilon = np.sqrt(p['epsilon'] * l['epsilon'])
+        d = np.maximum(distances, 0.1)
+
+        ratio6 = (r_eq / d) ** 6
+        lj = epsilon * (ratio6 * ratio6 - 2.0 * ratio6)
+        lj_derivative = np.where(np.abs(lj) < 50.0, 12.0 * epsilon * (ratio6 - ratio6 * ratio6) / d, 0.0)
+        repulsion_derivative = -50.0 / (0.7 * r_eq)
+        derivative = np.where(d >= 0.7 * r_eq, lj_derivative, repulsion_derivative)
+
+        return np.where((distances <= self.vdw_cutoff) & (distances > 0.1), derivative, 0.0)
+
+    def _hbond_pair_derivatives(self, p, l, distances):
+        within = (distances <= self.hbond_cutoff) & (distances >= 0.1)
+        derivative = np.zeros_like(distances)
+
+        for donor, acceptor in ((p, l), (l, p)):
+            mask = donor['donor'] & acceptor['acceptor'] & within
+            if not mask.any():
+                continue
+
+            r_eq, epsilon = self._hbond_pair_parameters(donor, acceptor)
+            delta = distances - r_eq
+            term = np.where(np.abs(delta) <= 0.8,
+                            epsilon * np.exp(-(delta ** 2) / 0.3) * 2.0 * delta / 0.3, 0.0)
+            derivative += np.where(mask, term * 0.7, 0.0)
+
+        return derivative
+
+    def _electrostatics_pair_derivatives(self, p, l, distances):
+        q = p['charge'] * l['charge']
+        charged = (np.abs(p['charge']) >= 1e-6) & (np.abs(l['charge']) >= 1e-6)
+        d = np.maximum(distances, 0.1)
+
+        energy = 332.0 * q * np.exp(-d / 10.0) / (6.0 * d * d)
+        derivative = np.where(np.abs(energy) < 10.0, energy * (-0.1 - 2.0 / d), 0.0)
+
+        return np.where(charged & (distances <= self.elec_cutoff) & (distances > 0.1), derivative, 0.0)
+
+    def _desolvation_pair_derivatives(self, p, l, distances):
+        sigma_squared_2 = 2.0 * self.solvation_k * self.solvation_k
+        prefactor = (self.solpar * p['solv'] * l['vol'] +
+                     self.solpar * l['solv'] * p['vol'])
+        energy = prefactor * np.exp(-(distances * distances) / sigma_squared_2)
+        derivative = np.where(np.abs(energy) < 5.0, energy * (-2.0 * distances / sigma_squared_2), 0.0)
+
+        return np.where(distances <= self.desolv_cutoff, derivative, 0.0)
+
+    def _hydrophobic_pair_derivatives(self, p, l, distances):
+        mask = (p['hydrophobic'] & l['hydrophobic'] &
+                (distances <= self.hydrophobic_cutoff) & (distances >= 0.5))
+
+        factor = (self.hydrophobic_cutoff - distances) / self.hydrophobic_cutoff
+        sigmoid = 1.0 / (1.0 + np.exp(-(factor * 10 - 5)))
+        contact_derivative = sigmoid + 10.0 * factor * sigmoid * (1.0 - sigmoid)
+
+        # E = -contact(factor) with d(factor)/dr = -1/cutoff
+        return np.where(mask, contact_derivative / self.hydrophobic_cutoff, 0.0)
+
+    def _clash_pair_derivatives(self, p, l, distances):
+        radii = 0.5 * (p['r_eq'] + l['r_eq'])
+        min_allowed = radii * 0.7
+        upper_bound = radii * 1.2
+
+        growth = np.exp((min_allowed - distances) / min_allowed)
+        repulsion_derivative = -2.0 * (growth - 1.0) * growth / min_allowed
+        soft_derivative = -0.2 * (upper_bound - distances) / (upper_bound - min_allowed) ** 2
+
+        return np.where(distances < min_allowed, repulsion_derivative,
+                        np.where(distances < upper_bound, soft_derivative, 0.0))
+
+    def _enhanced_clash_pair_derivatives(self, p, l, distances, backbone_factor):
+        min_allowed = (p['clash_radius'] + l['clash_radius']) * 0.7
+        d = np.maximum(distances, 0.1)
+        weight = np.where(p['backbone'], backbone_factor, 1.0)
+        derivative = -2.0 * min_allowed ** 2 / d ** 3 * weight
+
+        return np.where((distances < min_allowed) & (distances > 0.1), derivative, 0.0)
+
+    def _pair_energy_matrices(self, p, l, distances):
+        """
+        Per-pair energy matrices for all intermolecular terms.
+
+        Returns:
+        --------
+        dict
+            Arrays of shape (n_protein_atoms, n_ligand_atoms) keyed by term
+        """
+        return {
+            'vdw': profiling.timed('scoring', 'vdw', self._vdw_pairs, p, l, distances),
+            'hbond': profiling.timed('scoring', 'hbond', self._hbond_pairs, p, l, distances),
+            'elec': profiling.timed('scoring', 'elec', self._electrostatics_pairs, p, l, distances),
+            'desolv': profiling.timed('scoring', 'desolv', self._desolvation_pairs, p, l, distances),
+            'hydrophobic': profiling.timed('scoring', 'hydrophobic', self._hydrophobic_pairs, p, l, distances),
+            'clash': profiling.timed('scoring', 'clash', self._clash_pairs, p, l, distances),
+            'backbone_clash': profiling.timed('scoring', 'backbone_clash', self._enhanced_clash_pairs,
+                                              p, l, distances, backbone_factor=3.0),
+        }
+
+    def calculate_vdw(self, protein_atoms, ligand_atoms):
+        """Vectorized van der Waals energy (see CPUScoringFunction.calculate_vdw)."""
+        return float(np.sum(self._vdw_pairs(*self._prepare_pair_data(protein_atoms, ligand_atoms))))
+
+    def calculate_hbond(self, protein_atoms, ligand_atoms, protein=None, ligand=None):
+        """Vectorized hydrogen bond energy (see CPUScoringFunction.calculate_hbond)."""
+        return float(np.sum(self._hbond_pairs(*self._prepare_pair_data(protein_atoms, ligand_atoms))))
+
+    def calculate_electrostatics(self, protein_atoms, ligand_atoms):
+        """Vectorized electrostatics (see CPUScoringFunction.calculate_electrostatics)."""
+        return float(np.sum(self._electrostatics_pairs(*self._prepare_pair_data(protein_atoms, ligand_atoms))))
+
+    def calculate_desolvation(self, protein_atoms, ligand_atoms):
+        """Vectorized desolvation (see CPUScoringFunction.calculate_desolvation)."""
+        return float(np.sum(self._desolvation_pairs(*self._prepare_pair_data(protein_atoms, ligand_atoms))))
+
+    def calculate_hydrophobic(self, protein_atoms, ligand_atoms):
+        """Vectorized hydrophobic term (see CPUScoringFunction.calculate_hydrophobic)."""
+        return float(np.sum(self._hydrophobic_pairs(*self._prepare_pair_data(protein_atoms, ligand_atoms))))
+
+    def calculate_clashes(self, protein_atoms, ligand_atoms):
+        """Vectorized clash score (see CPUScoringFunction.calculate_clashes)."""
+        return float(np.sum(self._clash_pairs(*self._prepare_pair_data(protein_atoms, ligand_atoms))))
+
+    def calculate_enhanced_clashes(self, protein_atoms, ligand_atoms, backbone_factor=2.0):
+        """Vectorized backbone-aware clash score (see CPUScoringFunction.calculate_enhanced_clashes)."""
+        p, l, distances = self._prepare_pair_data(protein_atoms, ligand_atoms)
+        return float(np.sum(self._enhanced_clash_pairs(p, l, distances, backbone_factor)))
+
+    def _short_range_cutoff(self, p, l):
+        """Distance beyond which every term except electrostatics vanishes."""
+        # 4 Å is the burial radius used by the entropy estimate
+        cutoff = max(self.vdw_cutoff, self.hbond_cutoff, self.desolv_cutoff,
+                     self.hydrophobic_cutoff, 4.0)
+        if p['n_atoms'] and l['n_atoms']:
+            cutoff = max(cutoff,
+                         0.6 * (np.max(p['r_eq']) + np.max(l['r_eq'])),
+                         0.7 * (np.max(p['clash_radius']) + np.max(l['clash_radius'])))
+        return cutoff
+
+    def _get_neighbor_index(self, p, protein_coords):
+        """
+        Return cached KD-tree indices for the scored receptor atoms.
+
+        Returns:
+        --------
+        tuple
+            (index over all atoms, indices of charged atoms, index over charged atoms)
+        """
+        cache = self._neighbor_cache
+        if cache is None or cache[0] is not p or not cache[1].matches(protein_coords):
+            charged = np.flatnonzero(np.abs(p['charge']) >= 1e-6)
+            cache = (p, ReceptorNeighborIndex(protein_coords), charged,
+                     ReceptorNeighborIndex(protein_coords[charged]))
+            self._neighbor_cache = cache
+        return cache[1:]
+
+    def _neighbor_energy_terms(self, p, protein_coords, l, coords):
+        """
+        Evaluate energy components of poses from receptor neighbour pairs.
+
+        Only receptor-ligand pairs within the short-range cutoff (and, for
+        electrostatics, charged receptor atoms within elec_cutoff) are
+        enumerated, so the cost no longer scales with the full receptor size.
+
+        Parameters:
+        -----------
+        p : dict
+            Per-atom receptor parameter arrays
+        protein_coords : numpy.ndarray
+            Receptor coordinates, shape (n_protein, 3)
+        l : dict
+            Per-atom ligand parameter arrays
+        coords : numpy.ndarray
+            Pose coordinates, shape (P, N, 3)
+
+        Returns:
+        --------
+        tuple
+            (terms, n_buried) with unweighted energy components of shape (P,)
+            and the number of ligand atoms within 4 Å of the receptor per pose
+        """
+        n_poses, n_ligand = coords.shape[:2]
+        flat_coords = coords.reshape(-1, 3)
+        index, charged, charged_index = self._get_neighbor_index(p, protein_coords)
+
+        with profiling.section('scoring', 'pair_search'):
+            i, j, distances = index.pairs(flat_coords, self._short_range_cutoff(p, l))
+        pose = j // n_ligand
+        pp = self._subset_parameters(p, i)
+        lp = self._subset_parameters(l, j % n_ligand)
+        terms = {
+            'vdw': profiling.timed('scoring', 'vdw', self._vdw_pairs, pp, lp, distances),
+            'hbond': profiling.timed('scoring', 'hbond', self._hbond_pairs, pp, lp, distances),
+            'desolv': profiling.timed('scoring', 'desolv', self._desolvation_pairs, pp, lp, distances),
+            'hydrophobic': profiling.timed('scoring', 'hydrophobic', self._hydrophobic_pairs, pp, lp, distances),
+            'clash': profiling.timed('scoring', 'clash', self._clash_pairs, pp, lp, distances),
+            'backbone_clash': profiling.timed('scoring', 'backbone_clash', self._enhanced_clash_pairs,
+                                              pp, lp, distances, backbone_factor=3.0),
+        }
+        terms = {name: np.bincount(pose, weights=energy, minlength=n_poses)
+                 for name, energy in terms.items()}
+        buried = np.unique(j[distances <= 4.0])
+        n_buried = np.bincount(buried // n_ligand, minlength=n_poses)
+
+        terms['elec'] = np.zeros(n_poses)
+        if np.any(np.abs(l['charge']) >= 1e-6):
+            with profiling.section('scoring', 'elec'):
+                i, j, distances = charged_index.pairs(flat_coords, self.elec_cutoff)
+                energy = self._electrostatics_pairs(self._subset_parameters(p, charged[i]),
+                                                    self._subset_parameters(l, j % n_ligand), distances)
+                terms['elec'] = np.bincount(j // n_ligand, weights=energy, minlength=n_poses)
+
+        return terms, n_buried
+
+    def calculate_energy_terms(self, protein, ligand):
+        """
+        Evaluate all energy components for a pose from one distance matrix
+        (or from the receptor neighbour list for large receptor selections).
+
+        Parameters:
+        -----------
+        protein : Protein
+        ligand : Ligand
+
+        Returns:
+        --------
+        dict
+            Unweighted energy components keyed by term name
+        """
+        p, protein_coords = self._protein_pair_inputs(protein)
+        ligand_atoms = self._get_ligand_atoms(ligand)
+        l = self._atom_parameter_arrays(ligand_atoms, is_protein=False)
+        ligand_coords = self._coords_array(ligand_atoms)
+
+        if len(protein_coords) >= self.neighbor_search_min_atoms:
+            terms, n_buried = self._neighbor_energy_terms(p, protein_coords, l, ligand_coords[None])
+            terms = {name: float(value[0]) for name, value in terms.items()}
+            terms['entropy'] = float(profiling.timed('scoring', 'entropy', self._batch_entropy,
+                                                     protein, ligand, n_buried)[0])
+            return terms
+
+        p, l = self._outer_parameters(p, l)
+        distances = cdist(protein_coords, ligand_coords)
+        terms = {name: float(np.sum(energy))
+                 for name, energy in self._pair_energy_matrices(p, l, distances).items()}
+        terms['entropy'] = profiling.timed('scoring', 'entropy', self.calculate_entropy, ligand, protein)
+        return terms
+
+    def _batch_entropy(self, protein, ligand, n_buried):
+        """
+        Entropy penalty for a batch of poses (see calculate_entropy).
+
+        Parameters:
+        -----------
+        protein : Protein
+        ligand : Ligand
+        n_buried : numpy.ndarray
+            Number of ligand atoms within 4 Å of an active site atom per pose
+
+        Returns:
+        --------
+        numpy.ndarray
+            Entropy penalty per pose
+        """
+        n_rotatable = len(getattr(ligand, 'rotatable_bonds', []))
+        n_atoms = len(ligand.atoms)
+        active_site = getattr(protein, 'active_site', None)
+        if not active_site or not active_site.get('atoms') or n_atoms == 0:
+            flexibility = np.full(len(n_buried), 0.5)
+        else:
+            flexibility = np.clip(1.0 - n_buried / n_atoms, 0.1, 1.0)
+        return 0.5 * n_rotatable * flexibility * (1.0 + 0.05 * n_atoms)
+
+    def calculate_energy_terms_batch(self, protein, ligand, coords):
+        """
+        Evaluate all energy components for a batch of poses.
+
+        Poses are processed in chunks so that the (P, n_protein, n_ligand)
+        distance tensor stays below max_batch_elements entries. Large
+        receptor selections use the neighbour list instead (see
+        neighbor_search_min_atoms).
+
+        Parameters:
+        -----------
+        protein : Protein
+        ligand : Ligand
+            Ligand providing the topology shared by all poses
+        coords : numpy.ndarray
+            Pose coordinates of shape (P, N, 3)
+
+        Returns:
+        --------
+        dict
+            Unweighted energy components keyed by term name, each of shape (P,)
+        """
+        p, protein_coords = self._protein_pair_inputs(protein)
+        l = self._atom_parameter_arrays(self._get_ligand_atoms(ligand), is_protein=False)
+        use_neighbors = len(protein_coords) >= self.neighbor_search_min_atoms
+        if not use_neighbors:
+            p, l = self._outer_parameters(p, l)
+        coords = np.asarray(coords, dtype=float).reshape(len(coords), -1, 3)
+        n_poses, n_ligand = coords.shape[:2]
+
+        terms = {}
+        n_buried = np.zeros(n_poses)
+        chunk = max(1, self.max_batch_elements // max(1, len(protein_coords) * n_ligand))
+        for start in range(0, n_poses, chunk):
+            block = coords[start:start + chunk]
+            if use_neighbors:
+                block_terms, n_buried[start:start + chunk] = self._neighbor_energy_terms(
+                    p, protein_coords, l, block)
+            else:
+                distances = cdist(protein_coords, block.reshape(-1, 3))
+                distances = distances.reshape(len(protein_coords), len(block), n_ligand).transpose(1, 0, 2)
+                block_terms = {name: energy.sum(axis=(1, 2))
+                               for name, energy in self._pair_energy_matrices(p, l, distances).items()}
+                n_buried[start:start + chunk] = (distances <= 4.0).any(axis=1).sum(axis=1)
+            for name, value in block_terms.items():
+                terms.setdefault(name, np.zeros(n_poses))[start:start + chunk] = value
+
+        terms['entropy'] = profiling.timed('scoring', 'entropy', self._batch_entropy, protein, ligand, n_buried)
+        return terms
+
+    def score_batch(self, protein, ligand, coords):
+        """
+        Score several poses of the same ligand in one vectorized pass.
+
+        Parameters:
+        -----------
+        protein : Protein
+        ligand : Ligand
+            Ligand providing the topology shared by all poses
+        coords : array-like
+            Stacked pose coordinates of shape (P, N, 3)
+
+        Returns:
+        --------
+        numpy.ndarray
+            Scores of shape (P,) (lower is better)
+        """
+        if isinstance(protein, list) or len(coords) == 0:
+            return super().score_batch(protein, ligand, coords)
+        terms = self.calculate_energy_terms_batch(protein, ligand, coords)
+        return np.array([self.combine_terms({name: value[i] for name, value in terms.items()})
+                         for i in range(len(coords))])
+
+    def combine_terms(self, terms):
+        """
+        Combine unweighted energy components into the final docking score.
+
+        Parameters:
+        -----------
+        terms : dict
+            Energy components as returned by calculate_energy_terms
+
+        Returns:
+        --------
+        float
+            Docking score (lower is better)
+        """
+        total = (
+            self.weights['vdw'] * terms['vdw'] +
+            self.weights['hbond'] * terms['hbond'] +
+            self.weights['elec'] * terms['elec'] +
+            self.weights['desolv'] * terms['desolv'] +
+            self.weights['hydrophobic'] * terms['hydrophobic'] -
+            self.weights['clash'] * (terms['clash'] + terms['backbone_clash']) -
+            self.weights['entropy'] * terms['entropy']
+        )
+
+        # Apply severe penalty for significant backbone clashes
+        if terms['backbone_clash'] > 2.0:
+            total -= terms['backbone_clash'] * 10.0
+
+        if self.verbose:
+            print(f"VDW: {terms['vdw']:.2f}, H-bond: {terms['hbond']:.2f}, Elec: {terms['elec']:.2f}, "
+                f"Desolv: {terms['desolv']:.2f}, Hydrophobic: {terms['hydrophobic']:.2f}, "
+                f"Clash: {terms['clash']:.2f}, Backbone Clash: {terms['backbone_clash']:.2f}, "
+                f"Entropy: {terms['entropy']:.2f}")
+            print(f"Total: {total:.2f}")
+
+        return total * -1.0 * 0.03
+
+    def _score_derivative_weights(self, terms):
+        """
+        Weights turning per-term energy derivatives into score derivatives.
+
+        The score is linear in every term (see combine_terms) except for the
+        extra backbone clash penalty, which applies above a threshold.
+        """
+        weights = {name: -0.03 * self.weights[name]
+                   for name in ('vdw', 'hbond', 'elec', 'desolv', 'hydrophobic')}
+        weights['clash'] = 0.03 * self.weights['clash']
+        weights['backbone_clash'] = weights['clash'] + (0.3 if terms['backbone_clash'] > 2.0 else 0.0)
+        return weights
+
+    def score_gradient(self, protein, ligand):
+        """
+        Score a pose and compute the analytic gradient of the score with
+        respect to the ligand atom coordinates.
+
+        Every pair term contributes dE/dr along the receptor-ligand
+        separation vector, so one evaluation costs about as much as a score
+        evaluation. The entropy term is piecewise constant in the coordinates
+        and contributes no force.
+
+        Parameters:
+        -----------
+        protein : Protein
+        ligand : Ligand
+
+        Returns:
+        --------
+        tuple
+            (score, gradient) with the gradient of shape (N, 3)
+        """
+        p, protein_coords = self._protein_pair_inputs(protein)
+        ligand_atoms = self._get_ligand_atoms(ligand)
+        l = self._atom_parameter_arrays(ligand_atoms, is_protein=False)
+        ligand_coords = self._coords_array(ligand_atoms)
+        n_ligand = len(ligand_coords)
+
+        # Only pairs inside the term cutoffs carry energy or force
+        index, charged, charged_index = self._get_neighbor_index(p, protein_coords)
+        i, j, distances = index.pairs(ligand_coords, self._short_range_cutoff(p, l))
+        elec_i, elec_j, elec_distances = charged_index.pairs(ligand_coords, self.elec_cutoff)
+        elec_i = charged[elec_i]
+
+        pp, lp = self._subset_parameters(p, i), self._subset_parameters(l, j)
+        elec_p, elec_l = self._subset_parameters(p, elec_i), self._subset_parameters(l, elec_j)
+        terms = {
+            'vdw': self._vdw_pairs(pp, lp, distances),
+            'hbond': self._hbond_pairs(pp, lp, distances),
+            'elec': self._electrostatics_pairs(elec_p, elec_l, elec_distances),
+            'desolv': self._desolvation_pairs(pp, lp, distances),
+            'hydrophobic': self._hydrophobic_pairs(pp, lp, distances),
+            'clash': self._clash_pairs(pp, lp, distances),
+            'backbone_clash': self._enhanced_clash_pairs(pp, lp, distances, backbone_factor=3.0),
+        }
+        terms = {name: float(np.sum(energy)) for name, energy in terms.items()}
+        n_buried = len(np.unique(j[distances <= 4.0]))
+        terms['entropy'] = float(self._batch_entropy(protein, ligand, np.array([n_buried]))[0])
+        score = self.combine_terms(terms)
+
+        weights = self._score_derivative_weights(terms)
+        derivative = (
+            weights['vdw'] * self._vdw_pair_derivatives(pp, lp, distances) +
+            weights['hbond'] * self._hbond_pair_derivatives(pp, lp, distances) +
+            weights['desolv'] * self._desolvation_pair_derivatives(pp, lp, distances) +
+            weights['hydrophobic'] * self._hydrophobic_pair_derivatives(pp, lp, distances) +
+            weights['clash'] * self._clash_pair_derivatives(pp, lp, distances) +
+            weights['backbone_clash'] * self._enhanced_clash_pair_derivatives(pp, lp, distances, 3.0)
+        )
+        elec_derivative = weights['elec'] * self._electrostatics_pair_derivatives(elec_p, elec_l, elec_distances)
+
+        gradient = np.zeros((n_ligand, 3))
+        for pair_i, pair_j, pair_distances, pair_derivative in (
+                (i, j, distances, derivative), (elec_i, elec_j, elec_distances, elec_derivative)):
+            # dE/dx_ligand = dE/dr * (x_ligand - x_protein) / r
+            scale = np.divide(pair_derivative, pair_distances,
+                              out=np.zeros_like(pair_distances), where=pair_distances > 0)
+            forces = (ligand_coords[pair_j] - protein_coords[pair_i]) * scale[:, None]
+            for axis in range(3):
+                gradient[:, axis] += np.bincount(pair_j, weights=forces[:, axis], minlength=n_ligand)
+
+        return score, gradient
+
+    def score(self, protein, ligand):
+        """
+        Calculate composite score with enhanced backbone clash detection.
+        """
+        return self.combine_terms(self.calculate_energy_terms(protein, ligand))
+
+
+class EnhancedVectorizedScoringFunction(VectorizedScoringFunction, EnhancedScoringFunction):
+    """
+    Vectorized counterpart of EnhancedScoringFunction.
+    Uses the recalibrated EnhancedScoringFunction weights with the
+    NumPy-vectorized energy terms of VectorizedScoringFunction.
+    """
+    pass
+
+
 class GPUScoringFunction(ScoringFunction):
     """
     Base class for GPU-accelerated scoring functions.
@@ -909,20 +1725,22 @@ class GPUScoringFunction(ScoringFunction):
         ligand_atoms = self._get_ligand_atoms(ligand)
         
         # Calculate energy components
-        vdw = self.calculate_vdw(protein_atoms, ligand_atoms)
-        hbond = self.calculate_hbond(protein_atoms, ligand_atoms)
-        elec = self.calculate_electrostatics(protein_atoms, ligand_atoms)
-        desolv = self.calculate_desolvation(protein_atoms, ligand_atoms)
-        hydrophobic = self.calculate_hydrophobic(protein_atoms, ligand_atoms)
+        vdw = profiling.timed('scoring', 'vdw', self.calculate_vdw, protein_atoms, ligand_atoms)
+        hbond = profiling.timed('scoring', 'hbond', self.calculate_hbond, protein_atoms, ligand_atoms)
+        elec = profiling.timed('scoring', 'elec', self.calculate_electrostatics, protein_atoms, ligand_atoms)
+        desolv = profiling.timed('scoring', 'desolv', self.calculate_desolvation, protein_atoms, ligand_atoms)
+        hydrophobic = profiling.timed('scoring', 'hydrophobic', self.calculate_hydrophobic,
+                                      protein_atoms, ligand_atoms)
         
         # Regular clash detection
-        clash = self.calculate_clashes(protein_atoms, ligand_atoms)
+        clash = profiling.timed('scoring', 'clash', self.calculate_clashes, protein_atoms, ligand_atoms)
         
         # Enhanced backbone-aware clash detection
-        backbone_clash = self.calculate_enhanced_clashes(protein_atoms, ligand_atoms, backbone_factor=3.0)
+        backbone_clash = profiling.timed('scoring', 'backbone_clash', self.calculate_enhanced_clashes,
+                                         protein_atoms, ligand_atoms, backbone_factor=3.0)
         
         # Entropy calculation
-        entropy = self.calculate_entropy(ligand, protein)
+        entropy = profiling.timed('scoring', 'entropy', self.calculate_entropy, ligand, protein)
         
         # Combine scores with special handling for backbone clashes
         total = (
@@ -1660,6 +2478,50 @@ class TetheredScoringFunction:
 
         # Return combined score
         return base_score + rmsd_penalty
+
+    def score_batch(self, protein, ligand, coords):
+        """
+        Calculate tethered scores for a batch of poses.
+
+        Parameters:
+        -----------
+        protein : Protein
+        ligand : Ligand
+            Ligand providing the topology shared by all poses
+        coords : array-like
+            Stacked pose coordinates of shape (P, N, 3)
+
+        Returns:
+        --------
+        numpy.ndarray
+            Scores with RMSD penalty, shape (P,)
+        """
+        coords = np.asarray(coords, dtype=float)
+        base_scores = self.base_scoring_function.score_batch(protein, ligand, coords)
+        if coords.shape[1] != len(self.reference_coordinates):
+            raise ValueError(f"Coordinate mismatch: reference has {len(self.reference_coordinates)} atoms, but current pose has {coords.shape[1]} atoms")
+        rmsd = np.sqrt(np.mean(np.sum((coords - self.reference_coordinates) ** 2, axis=2), axis=1))
+        return base_scores + np.minimum(self.weight * rmsd, self.max_penalty)
+    
+    def score_gradient(self, protein, ligand):
+        """
+        Calculate the tethered score and its gradient with respect to the
+        ligand atom coordinates (requires a base function with score_gradient).
+
+        Returns:
+        --------
+        tuple
+            (score, gradient) with the gradient of shape (N, 3)
+        """
+        base_score, gradient = self.base_scoring_function.score_gradient(protein, ligand)
+        rmsd = self.calculate_rmsd(ligand.xyz)
+        
+        # The penalty is linear in RMSD until it reaches max_penalty
+        if rmsd > 0 and self.weight * rmsd < self.max_penalty:
+            offsets = ligand.xyz - self.reference_coordinates
+            gradient = gradient + self.weight * offsets / (len(offsets) * rmsd)
+        
+        return base_score + min(self.weight * rmsd, self.max_penalty), gradient
     
     def calculate_rmsd(self, coordinates):
         """
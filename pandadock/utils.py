@@ -21,6 +21,9 @@ import json
 from pathlib import Path
 import json
 
+from . import profiling
+from .status_writer import get_status_writer, flush_status_writers
+
 def setup_logging(output_dir=None, log_name="pandadock", log_level=logging.INFO):
     """
     Configure logging system for PandaDock.
@@ -125,6 +128,38 @@ def generate_spherical_grid(center, radius, spacing=0.375):
 
         return np.array(grid)
 
+# Clash checker of the most recently used receptor atom list
+_clash_checker_cache = {'atoms': None, 'n_atoms': 0, 'checker': None}
+
+def get_clash_checker(protein_atoms):
+    """
+    Return the StericClashChecker bound to a receptor atom list.
+    
+    The checker (a KD-tree over the receptor coordinates) is built on first
+    use and reused while the same atom list is passed in, so the receptor
+    is assumed to stay rigid.
+    
+    Parameters:
+    -----------
+    protein_atoms : list
+        Receptor atom dictionaries
+    
+    Returns:
+    --------
+    StericClashChecker
+        Clash checker for the receptor
+    """
+    from .neighbor_search import StericClashChecker
+    
+    cache = _clash_checker_cache
+    if cache['atoms'] is not protein_atoms or cache['n_atoms'] != len(protein_atoms):
+        coords = np.array([atom['coords'] for atom in protein_atoms if 'coords' in atom],
+                          dtype=float).reshape(-1, 3)
+        cache['checker'] = StericClashChecker(coords)
+        cache['atoms'] = protein_atoms
+        cache['n_atoms'] = len(protein_atoms)
+    return cache['checker']
+
 def detect_steric_clash(protein_atoms, ligand_atoms, threshold=1.6):
     """
     Check if any ligand atom is too close to a protein atom (steric clash).
@@ -141,16 +176,28 @@ def detect_steric_clash(protein_atoms, ligand_atoms, threshold=1.6):
     bool
         True if clash detected, False otherwise
     """
-    for p in protein_atoms:
-        if 'coords' not in p:
-            continue
-        for l in ligand_atoms:
-            if 'coords' not in l:
-                continue
-            distance = np.linalg.norm(p['coords'] - l['coords'])
-            if distance < threshold:
-                return True
-    return False
+    coords = np.array([atom['coords'] for atom in ligand_atoms if 'coords' in atom],
+                      dtype=float).reshape(-1, 3)
+    return get_clash_checker(protein_atoms).has_clash(coords, threshold)
+
+def detect_steric_clash_batch(protein_atoms, ligand_coords, threshold=1.6):
+    """
+    Check many candidate poses for steric clashes in one call.
+    
+    Parameters:
+    -----------
+    protein_atoms : list
+    ligand_coords : array-like
+        Stacked ligand coordinates, shape (P, N, 3)
+    threshold : float
+        Minimum allowed distance (Å) between non-bonded atoms
+    
+    Returns:
+    --------
+    numpy.ndarray
+        Boolean array of shape (P,), True for clashing poses
+    """
+    return get_clash_checker(protein_atoms).clash_mask(ligand_coords, threshold)
 
 def generate_cartesian_grid(min_corner, max_corner, spacing=1.0):
     """
@@ -210,8 +257,9 @@ def create_initial_files(output_dir, args, status="running"):
         "top_score": None
     }
     status_path = output_dir / "status.json"
-    with open(status_path, 'w') as f:
-        json.dump(status_data, f, indent=2)
+    status_writer = get_status_writer(output_dir)
+    status_writer.replace(status_data)
+    status_writer.flush()
     logger.info(f"✅ Status file created: {status_path}")
 
     # Detect environment info
@@ -385,6 +433,10 @@ def save_intermediate_result(pose, score, iteration, output_dir, total_iteration
     """
     Save an intermediate result during docking.
     
+    The status is updated in memory and, together with the pose file,
+    written by the output directory's background StatusWriter, so the
+    caller does not wait for the filesystem.
+    
     Parameters:
     -----------
     pose : Ligand
@@ -398,63 +450,8 @@ def save_intermediate_result(pose, score, iteration, output_dir, total_iteration
     total_iterations : int, optional
         Total number of iterations (for progress calculation)
     """
-    output_dir = Path(output_dir)
-    intermediate_dir = output_dir / "intermediate"
-    os.makedirs(intermediate_dir, exist_ok=True)
-    
-    # Save only every 10th pose or best poses to avoid too many files
-    is_milestone = (iteration % 10 == 0)
-    
-    # Get logger
-    logger = logging.getLogger("pandadock")
-    
-    # Update status file
-    status_path = output_dir / "status.json"
-    try:
-        with open(status_path, 'r') as f:
-            status = json.load(f)
-        
-        # Update basic info
-        status["current_iteration"] = iteration
-        status["last_update"] = datetime.now().isoformat()
-        
-        # Calculate progress
-        if total_iterations is None:
-            total_iterations = status.get("total_iterations", 100)
-        status["progress"] = min(1.0, iteration / total_iterations)
-        
-        # Track best score
-        if status["top_score"] is None or score < status["top_score"]:
-            status["top_score"] = score
-            is_milestone = True  # Always save best poses
-            
-        # Update status file
-        with open(status_path, 'w') as f:
-            json.dump(status, f, indent=2)
-            
-    except Exception as e:
-        logger.warning(f"Could not update status file: {e}")
-    
-    # Save PDB file for milestone or best poses
-    if is_milestone:
-        pdb_path = intermediate_dir / f"pose_iter_{iteration}_score_{score:.2f}.pdb"
-        try:
-            with open(pdb_path, 'w') as f:
-                f.write(f"REMARK   1 Iteration: {iteration}, Score: {score:.4f}\n")
-                
-                # Write atoms
-                for j, atom in enumerate(pose.atoms):
-                    coords = atom['coords']
-                    symbol = atom.get('symbol', 'C')
-                    
-                    # PDB ATOM format
-                    f.write(f"HETATM{j+1:5d} {symbol:<4}{'':<1}{'LIG':<3} {'A':1}{1:4d}    "
-                           f"{coords[0]:8.3f}{coords[1]:8.3f}{coords[2]:8.3f}"
-                           f"{1.0:6.2f}{0.0:6.2f}          {symbol:>2}\n")
-                
-            logger.debug(f"Saved intermediate pose at iteration {iteration} to {pdb_path}")
-        except Exception as e:
-            logger.warning(f"Could not save intermediate pose: {e}")
+    with profiling.section('io', 'status_write'):
+        get_status_writer(output_dir).record_result(pose, score, iteration, total_iterations)
 
 def save_complex_to_pdb(protein, ligand, output_path):
     """
@@ -495,6 +492,10 @@ def update_status(output_dir, **kwargs):
     """
     Update the status.json file with new information.
     
+    Updates are coalesced and written by the output directory's background
+    StatusWriter at a bounded rate; call flush_status_writers() to wait
+    for them to reach the disk.
+    
     Parameters:
     -----------
     output_dir : str or Path
@@ -502,29 +503,8 @@ def update_status(output_dir, **kwargs):
     **kwargs : dict
         Key-value pairs to update in the status file
     """
-    output_dir = Path(output_dir)
-    status_path = output_dir / "status.json"
-    
-    # Get logger
-    logger = logging.getLogger("pandadock")
-    
-    try:
-        # Read current status
-        if status_path.exists():
-            with open(status_path, 'r') as f:
-                status = json.load(f)
-        else:
-            status = {"start_time": datetime.now().isoformat()}
-        
-        # Update with new values
-        status.update(kwargs)
-        status["last_update"] = datetime.now().isoformat()
-        
-        # Write updated status
-        with open(status_path, 'w') as f:
-            json.dump(status, f, indent=2)
-    except Exception as e:
-        logger.warning(f"Could not update status file: {e}")
+    with profiling.section('io', 'status_write'):
+        get_status_writer(output_dir).update(**kwargs)
 
 def extract_base_filename(file_path):
     """
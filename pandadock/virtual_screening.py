@@ -15,7 +15,8 @@ from scipy.spatial.transform import Rotation
 from datetime import datetime
 
 from .utils import calculate_rmsd, is_inside_sphere, detect_steric_clash, setup_logging
-from .utils import save_intermediate_result, update_status, save_complex_to_pdb
+from .utils import save_intermediate_result, update_status, save_complex_to_pdb, flush_status_writers
+from .results_store import ScreeningResultsStore, ligand_smiles, pose_energy_terms
 
 
 class VirtualScreeningManager:
@@ -26,7 +27,8 @@ class VirtualScreeningManager:
     
     def __init__(self, scoring_function, output_dir=None, n_cpu_workers=None,
                  exhaustiveness=8, num_modes=9, max_evals=10000, rmsd_thresh=2.0,
-                 grid_spacing=0.375, grid_radius=10.0):
+                 grid_spacing=0.375, grid_radius=10.0, use_grid=False, grid_cache_dir=None,
+                 keep_poses=True, conformer_store=None):
         """
         Initialize virtual screening manager.
         
@@ -50,6 +52,19 @@ class VirtualScreeningManager:
             Spacing between grid points
         grid_radius : float
             Radius of the search sphere
+        use_grid : bool
+            Score poses with precomputed receptor grid maps
+        grid_cache_dir : str or Path
+            Directory of the persistent grid map cache. Defaults to
+            output_dir/grid_cache when an output directory is set.
+        keep_poses : bool
+            Keep every pose in the returned results. When False only the
+            best score is kept in memory; poses are still written to the
+            results store in output_dir.
+        conformer_store : ConformerStore, optional
+            Store of precomputed conformer ensembles. Missing ensembles are
+            embedded in parallel before docking starts, and random poses
+            are drawn from the stored conformers.
         """
         self.scoring_function = scoring_function
         self.output_dir = Path(output_dir) if output_dir else None
@@ -66,6 +81,12 @@ class VirtualScreeningManager:
         # Grid parameters
         self.grid_spacing = grid_spacing
         self.grid_radius = grid_radius
+        self.use_grid = use_grid
+        if grid_cache_dir is None and self.output_dir is not None:
+            grid_cache_dir = self.output_dir / "grid_cache"
+        self.grid_cache_dir = grid_cache_dir
+        self.keep_poses = keep_poses
+        self.conformer_store = conformer_store
         
         # Initialize process pool if needed
         self.process_pool = None
@@ -82,10 +103,11 @@ class VirtualScreeningManager:
         -----------
         protein : Protein
             Protein target
-        ligands : list
-            List of Ligand objects
+        ligands : list or LigandLibrary
+            List of Ligand objects, or a library streamed one ligand at a time
         ligand_names : list
-            Optional list of ligand names/identifiers
+            Optional list of ligand names/identifiers (library records are
+            named by the library)
         
         Returns:
         --------
@@ -100,9 +122,15 @@ class VirtualScreeningManager:
             os.makedirs(self.output_dir / "poses", exist_ok=True)
             os.makedirs(self.output_dir / "complexes", exist_ok=True)
         
-        # Assign names to ligands if not provided
-        if ligand_names is None:
-            ligand_names = [f"ligand_{i+1}" for i in range(len(ligands))]
+        # Libraries are parsed lazily, one record at a time
+        from .ligand_library import LigandLibrary
+        if isinstance(ligands, LigandLibrary):
+            ligand_items = ligands.items()
+        else:
+            # Assign names to ligands if not provided
+            if ligand_names is None:
+                ligand_names = [f"ligand_{i+1}" for i in range(len(ligands))]
+            ligand_items = zip(ligand_names, ligands)
         
         # Check protein active site
         if not protein.active_site:
@@ -116,6 +144,37 @@ class VirtualScreeningManager:
             radius = protein.active_site['radius']
             if self.logger:
                 self.logger.info(f"Using active site at {center} with radius {radius}Å")
+        
+        # Grid maps are built once for the receptor (or memory-mapped from the cache)
+        if self.use_grid:
+            from .grid_scoring import create_grid_scoring_function, GridScoringFunction
+            self.scoring_function = create_grid_scoring_function(
+                self.scoring_function,
+                spacing=self.grid_spacing,
+                cache_dir=self.grid_cache_dir
+            )
+            if isinstance(self.scoring_function, GridScoringFunction):
+                grid_start = time.time()
+                # Streamed libraries get maps for the common organic elements
+                library_atoms = None
+                if not isinstance(ligands, LigandLibrary):
+                    library_atoms = [atom for ligand in ligands for atom in ligand.atoms]
+                self.scoring_function.prepare(protein, library_atoms)
+                if self.logger:
+                    self.logger.info(f"Receptor grid maps ready in {time.time() - grid_start:.2f} seconds")
+        
+        # Conformer ensembles are embedded once, in parallel, and reused by every run
+        if self.conformer_store is not None:
+            conformer_start = time.time()
+            generated = self.conformer_store.populate(
+                ligands if isinstance(ligands, LigandLibrary) else
+                [ligand for ligand in ligands if getattr(ligand, 'rdmol', None) is not None],
+                n_processes=self.n_cpu_workers
+            )
+            if self.logger:
+                self.logger.info(f"Generated {generated} conformer ensembles in "
+                                 f"{time.time() - conformer_start:.2f} seconds")
+        
         from .batch_screening import RapidPandaDock
         # Initialize RapidDock for each ligand
         docking_engine = RapidPandaDock(
@@ -125,7 +184,8 @@ class VirtualScreeningManager:
             max_evals=self.max_evals,
             rmsd_thresh=self.rmsd_thresh,
             grid_spacing=self.grid_spacing,
-            grid_radius=self.grid_radius
+            grid_radius=self.grid_radius,
+            conformer_store=self.conformer_store
         )
         
         # Create process pool if needed and not already provided
@@ -137,6 +197,13 @@ class VirtualScreeningManager:
         total_ligands = len(ligands)
         results = {}
         
+        # Per-ligand results are written in batches to an indexed store; the
+        # store of an earlier run in the same directory is emptied first
+        results_store = None
+        if self.output_dir:
+            results_store = ScreeningResultsStore(self.output_dir / ScreeningResultsStore.filename)
+            results_store.clear()
+        
         if self.logger:
             self.logger.info(f"Starting virtual screening of {total_ligands} ligands")
             self.logger.info(f"Using {self.n_cpu_workers} CPU workers")
@@ -144,40 +211,58 @@ class VirtualScreeningManager:
             self.logger.info(f"Number of binding modes per ligand: {self.num_modes}")
             self.logger.info(f"RMSD threshold for clustering: {self.rmsd_thresh}Å")
         
-        # Process each ligand
-        for i, (ligand, ligand_name) in enumerate(zip(ligands, ligand_names)):
-            if self.logger:
-                self.logger.info(f"Processing ligand {i+1}/{total_ligands}: {ligand_name}")
-            
-            # Update status if output directory exists
-            if self.output_dir:
-                update_status(
-                    self.output_dir,
-                    current_ligand=i+1,
-                    total_ligands=total_ligands,
-                    progress=(i+1)/total_ligands,
-                    ligand_name=ligand_name
-                )
-            
-            # Perform docking
-            ligand_results = docking_engine.search(protein, ligand)
+        try:
+            # Process each ligand
+            for i, (ligand_name, ligand) in enumerate(ligand_items):
+                if self.logger:
+                    self.logger.info(f"Processing ligand {i+1}/{total_ligands}: {ligand_name}")
+                
+                # Update status if output directory exists
+                if self.output_dir:
+                    update_status(
+                        self.output_dir,
+                        current_ligand=i+1,
+                        total_ligands=total_ligands,
+                        progress=(i+1)/total_ligands,
+                        ligand_name=ligand_name
+                    )
+                
+                # Perform docking
+                ligand_start = time.time()
+                ligand_results = docking_engine.search(protein, ligand)
+                best_score = ligand_results[0][1] if ligand_results else None
+                
+                # Store results
+                results[ligand_name] = {
+                    'poses': ligand_results if self.keep_poses else None,
+                    'best_score': best_score
+                }
+                
+                # Save poses if output directory exists
+                if self.output_dir:
+                    self._save_ligand_results(protein, ligand_name, ligand_results)
+                    best_pose = ligand_results[0][0] if ligand_results else None
+                    results_store.add({
+                        'name': ligand_name,
+                        'smiles': ligand_smiles(ligand),
+                        'score': best_score,
+                        'runtime': time.time() - ligand_start,
+                        'status': "Success" if ligand_results else "No poses",
+                        'energy_terms': pose_energy_terms(self.scoring_function, protein, best_pose)
+                                        if best_pose is not None else None,
+                    }, [(score, pose.xyz) for pose, score in ligand_results])
             
-            # Store results
-            results[ligand_name] = {
-                'poses': ligand_results,
-                'best_score': ligand_results[0][1] if ligand_results else None
-            }
+            # Calculate elapsed time
+            elapsed_time = time.time() - start_time
             
-            # Save poses if output directory exists
+            # Generate summary report
             if self.output_dir:
-                self._save_ligand_results(protein, ligand_name, ligand_results)
-        
-        # Calculate elapsed time
-        elapsed_time = time.time() - start_time
-        
-        # Generate summary report
-        if self.output_dir:
-            self._generate_summary_report(results, elapsed_time)
+                self._generate_summary_report(results_store, elapsed_time)
+        finally:
+            # Finished ligands reach the database even if a later one fails
+            if results_store is not None:
+                results_store.close()
+                flush_status_writers()
         
         # Clean up process pool if we created it
         if self.own_pool and self.process_pool:
@@ -237,29 +322,25 @@ class VirtualScreeningManager:
             for i, (_, score) in enumerate(ligand_results):
                 writer.writerow([i+1, score])
     
-    def _generate_summary_report(self, results, elapsed_time):
+    def _generate_summary_report(self, results_store, elapsed_time):
         """
         Generate a summary report of virtual screening results.
         
         Parameters:
         -----------
-        results : dict
-            Dictionary of screening results
+        results_store : ScreeningResultsStore
+            Store holding the per-ligand screening results
         elapsed_time : float
             Elapsed time in seconds
         """
-        # Sort ligands by best score
-        sorted_ligands = sorted(
-            [(name, data['best_score']) for name, data in results.items()],
-            key=lambda x: x[1] if x[1] is not None else float('inf')
-        )
+        n_ligands = len(results_store)
         
-        # Create CSV summary
+        # Create CSV summary from the score index
         csv_file = self.output_dir / "screening_results.csv"
         with open(csv_file, 'w', newline='') as f:
             writer = csv.writer(f)
             writer.writerow(['Rank', 'Ligand', 'Best Score'])
-            for i, (name, score) in enumerate(sorted_ligands):
+            for i, (name, score, _, _) in enumerate(results_store.iter_ranked()):
                 writer.writerow([i+1, name, score])
         
         # Create text summary
@@ -272,19 +353,19 @@ class VirtualScreeningManager:
             f.write("SCREENING INFORMATION\n")
             f.write("----------------------\n")
             f.write(f"Date and Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Number of Ligands: {len(results)}\n")
+            f.write(f"Number of Ligands: {n_ligands}\n")
             f.write(f"CPU Workers: {self.n_cpu_workers}\n")
             f.write(f"Exhaustiveness: {self.exhaustiveness}\n")
             f.write(f"Binding Modes per Ligand: {self.num_modes}\n")
             f.write(f"RMSD Threshold: {self.rmsd_thresh} Å\n")
             f.write(f"Total Runtime: {elapsed_time:.2f} seconds\n")
-            f.write(f"Average Time per Ligand: {elapsed_time/len(results):.2f} seconds\n\n")
+            f.write(f"Average Time per Ligand: {elapsed_time/max(n_ligands, 1):.2f} seconds\n\n")
             
             f.write("TOP 10 LIGANDS\n")
             f.write("-------------\n")
             f.write("Rank  Ligand                   Best Score\n")
             f.write("----  ----------------------   ----------\n")
-            for i, (name, score) in enumerate(sorted_ligands[:10]):
+            for i, (name, score, _, _) in enumerate(results_store.top(10)):
                 f.write(f"{i+1:4d}  {name:22s}   {score:.4f}\n")
             
             f.write("\n\nFull results are available in screening_results.csv\n")
@@ -292,20 +373,20 @@ class VirtualScreeningManager:
         
         # Generate plots if matplotlib is available
         try:
-            self._generate_summary_plots(results)
+            self._generate_summary_plots(results_store)
         except ImportError:
             if self.logger:
                 self.logger.warn("Matplotlib not available. Skipping summary plots.")
 
 
-    def _generate_summary_plots(self, results):
+    def _generate_summary_plots(self, results_store):
         """
         Generate summary plots for virtual screening results.
         
         Parameters:
         -----------
-        results : dict
-            Dictionary of screening results
+        results_store : ScreeningResultsStore
+            Store holding the per-ligand screening results
         """
         import matplotlib.pyplot as plt
         import numpy as np
@@ -314,20 +395,16 @@ class VirtualScreeningManager:
         plots_dir = self.output_dir / "plots"
         os.makedirs(plots_dir, exist_ok=True)
         
-        # Extract scores
-        scores = [data['best_score'] for _, data in results.items() if data['best_score'] is not None]
-        ligand_names = [name for name, data in results.items() if data['best_score'] is not None]
-        
-        # Sort by score for plotting
-        sorted_indices = np.argsort(scores)
-        sorted_scores = [scores[i] for i in sorted_indices]
-        sorted_names = [ligand_names[i] for i in sorted_indices]
+        sorted_scores = np.sort(results_store.scores())
+        sorted_names = [name for name, _, _, _ in results_store.top(20)]
+        if len(sorted_scores) == 0:
+            return
         
         # 1. Histogram of scores
         plt.figure(figsize=(10, 6))
-        plt.hist(scores, bins=min(20, len(scores)//5 + 1), alpha=0.7, color='blue', edgecolor='black')
-        plt.axvline(x=np.mean(scores), color='red', linestyle='--', label=f'Mean: {np.mean(scores):.2f}')
-        plt.axvline(x=np.median(scores), color='green', linestyle=':', label=f'Median: {np.median(scores):.2f}')
+        plt.hist(sorted_scores, bins=min(20, len(sorted_scores)//5 + 1), alpha=0.7, color='blue', edgecolor='black')
+        plt.axvline(x=np.mean(sorted_scores), color='red', linestyle='--', label=f'Mean: {np.mean(sorted_scores):.2f}')
+        plt.axvline(x=np.median(sorted_scores), color='green', linestyle=':', label=f'Median: {np.median(sorted_scores):.2f}')
         plt.xlabel('Docking Score (kcal/mol)')
         plt.ylabel('Frequency')
         plt.title('Distribution of Docking Scores')
@@ -74,6 +74,7 @@ setup(
     entry_points={
         'console_scripts': [
             'pandadock=pandadock.main:main',
+            'pandadock-benchmark=pandadock.benchmarks.__main__:main',
         ],
     },
     extras_require={
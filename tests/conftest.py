@@ -0,0 +1,13 @@
+# conftest.py
+import numpy as np
+import pytest
+from pandadock.protein import Protein
+from pandadock.ligand import Ligand
+
+
+@pytest.fixture(scope="module")
+def complex_pair():
+    ligand = Ligand("tests/ligand.sdf")
+    # Explicit center avoids pocket detection on the full receptor
+    protein = Protein("tests/receptor.pdb", grid_center=tuple(np.mean(ligand.xyz, axis=0)))
+    return protein, ligand
@@ -0,0 +1,108 @@
+# test_batch_screening.py
+import importlib
+import json
+import numpy as np
+import pytest
+from pandadock.batch_screening import ScreeningManifest
+from pandadock.results_store import ScreeningResultsStore
+
+# pandadock re-exports a batch_screening() function under the module name
+batch_screening = importlib.import_module('pandadock.batch_screening')
+
+
+class _Manager:
+    def cleanup(self):
+        pass
+
+
+class _Pose:
+    xyz = np.zeros((3, 3))
+
+
+def test_manifest_drops_partial_record(tmp_path):
+    manifest = ScreeningManifest(tmp_path)
+    manifest.record({'name': 'lig1', 'score': -5.0})
+    with open(manifest.path, 'a') as f:
+        f.write('{"name": "lig2", "sco')
+
+    reopened = ScreeningManifest(tmp_path)
+    assert 'lig1' in reopened and 'lig2' not in reopened
+    assert reopened.pending(['lib/lig1.sdf', 'lib/lig2.sdf']) == ['lib/lig2.sdf']
+    reopened.record({'name': 'lig2', 'score': -4.0})
+    assert [json.loads(line)['name'] for line in open(manifest.path)] == ['lig1', 'lig2']
+
+
+def test_failed_ligands_are_retried_on_resume(tmp_path):
+    manifest = ScreeningManifest(tmp_path)
+    manifest.record_many([{'name': 'lig1', 'score': -5.0, 'status': "Success"},
+                          {'name': 'lig2', 'score': float('inf'), 'status': "Error: timeout"}])
+
+    reopened = ScreeningManifest(tmp_path)
+    assert len(reopened) == 1 and 'lig2' not in reopened
+    assert reopened.pending(['lib/lig1.sdf', 'lib/lig2.sdf']) == ['lib/lig2.sdf']
+
+    reopened.record({'name': 'lig2', 'score': -4.0, 'status': "Success"})
+    assert ScreeningManifest(tmp_path).pending(['lib/lig1.sdf', 'lib/lig2.sdf']) == []
+
+
+def test_interrupted_screening_resumes(tmp_path, monkeypatch):
+    library = tmp_path / "library"
+    library.mkdir()
+    for i in range(4):
+        (library / f"lig{i}.sdf").write_text("")
+    protein_file = tmp_path / "receptor.pdb"
+    protein_file.write_text("")
+
+    docked = []
+
+    def dock(protein, ligand_file, output_dir, hybrid_manager, docking_params, **kwargs):
+        if len(docked) == 2 and not resumed:
+            raise KeyboardInterrupt
+        docked.append(ligand_file)
+        kwargs['search_summary'].update(stop_reason='patience', generations=len(docked), evaluations=10)
+        return [(_Pose(), -float(len(docked)))]
+
+    loads = []
+    monkeypatch.setattr(batch_screening, '_dock_single_ligand', dock)
+    monkeypatch.setattr(batch_screening, '_load_screening_protein', lambda *args: loads.append(args))
+    monkeypatch.setattr(batch_screening, 'setup_hardware_acceleration', lambda hw_config: _Manager())
+    monkeypatch.setattr(batch_screening, '_generate_summary_report', lambda results, path: None)
+
+    output_path = tmp_path / "screen"
+    config = {
+        'protein': str(protein_file),
+        'ligand_library': str(library),
+        'output_dir': str(output_path),
+        'screening_params': {'prepare_molecules': False},
+        'resume': str(output_path),
+    }
+
+    resumed = False
+    with pytest.raises(KeyboardInterrupt):
+        batch_screening.run(config)
+    assert len(ScreeningManifest(output_path)) == 2
+
+    resumed = True
+    results = batch_screening.run(config)
+    assert len(docked) == 4 and len(set(docked)) == 4
+    assert sorted(results) == [f"lig{i}" for i in range(4)]
+    assert len(loads) == 2
+    assert len(open(output_path / "screening_summary.csv").readlines()) == 5
+    with ScreeningResultsStore(output_path / ScreeningResultsStore.filename) as store:
+        assert [row[1] for row in store.top()] == [-4.0, -3.0, -2.0, -1.0]
+        assert store.pose_coords(store.top(1)[0][0]).shape == (3, 3)
+        assert store.search_summary(store.top(1)[0][0]) == {
+            'stop_reason': 'patience', 'generations': 4, 'evaluations': 10}
+    assert ScreeningManifest(output_path).entries['lig0']['stop_reason'] == 'patience'
+
+
+def test_results_store_clear(tmp_path):
+    path = tmp_path / ScreeningResultsStore.filename
+    with ScreeningResultsStore(path) as store:
+        store.add({'name': 'old', 'score': -1.0, 'status': "Success"}, [(-1.0, np.zeros((2, 3)))])
+
+    with ScreeningResultsStore(path) as store:
+        store.clear()
+        store.add({'name': 'new', 'score': -2.0, 'status': "Success"})
+        assert len(store) == 1 and store.top()[0][0] == 'new'
+        assert store.pose_coords('old') is None
@@ -0,0 +1,34 @@
+# test_benchmarks.py
+from pandadock.benchmarks import compare_results, load_results, save_results
+from pandadock.benchmarks.suite import benchmark_scoring, load_fixtures, measurement
+
+
+def test_comparison_flags_slowdowns_in_both_directions():
+    baseline = {'results': {
+        'scoring/A/score': measurement(100.0, 'poses/s'),
+        'pockets/detect_pockets': measurement(2.0, 's', higher_is_better=False),
+        'search/B': measurement(10.0, 'generations/s'),
+    }}
+    current = {'results': {
+        'scoring/A/score': measurement(70.0, 'poses/s'),
+        'pockets/detect_pockets': measurement(2.2, 's', higher_is_better=False),
+    }}
+
+    comparison = {entry['name']: entry for entry in compare_results(current, baseline, tolerance=0.2)}
+    assert comparison['scoring/A/score']['regression']
+    assert not comparison['pockets/detect_pockets']['regression']
+    assert comparison['pockets/detect_pockets']['change'] < 0
+    assert comparison['search/B']['current'] is None
+
+
+def test_scoring_benchmark_report_round_trips(tmp_path):
+    protein, ligand = load_fixtures()
+    results = benchmark_scoring(protein, ligand, n_poses=2, repeat=1,
+                                classes=['VectorizedScoringFunction'])
+    assert set(results) == {'scoring/VectorizedScoringFunction/score',
+                            'scoring/VectorizedScoringFunction/score_batch'}
+    assert all(result['value'] > 0 and result['unit'] == 'poses/s' for result in results.values())
+
+    save_results({'results': results}, tmp_path / "results.json")
+    report = load_results(tmp_path / "results.json")
+    assert not any(entry['regression'] for entry in compare_results(report, report))
@@ -0,0 +1,54 @@
+# test_conformer_store.py
+import numpy as np
+import pytest
+
+pytest.importorskip("rdkit")
+from rdkit import Chem
+
+from pandadock.conformer_store import ConformerStore
+
+
+def _bond_lengths(mol, coords):
+    # Sorted per conformer, since renumbering reorders the bonds
+    return np.sort([
+        np.linalg.norm(coords[:, bond.GetBeginAtomIdx()] - coords[:, bond.GetEndAtomIdx()], axis=1)
+        for bond in mol.GetBonds()
+    ], axis=0)
+
+
+def test_ensemble_is_reused_across_atom_orders(tmp_path):
+    mol = Chem.AddHs(Chem.MolFromSmiles("CCOc1ccccc1C(=O)N"))
+    store = ConformerStore(tmp_path, n_conformers=4)
+
+    assert mol not in store
+    assert store.populate([mol], n_processes=1) == 1
+    assert mol in store
+    assert store.populate([mol], n_processes=1) == 0
+
+    coords = store.ensemble(mol)
+    assert coords.shape[1:] == (mol.GetNumAtoms(), 3)
+    np.testing.assert_allclose(store.get(mol), coords)
+
+    # The same molecule with renumbered atoms maps onto the stored ensemble
+    order = list(np.random.default_rng(0).permutation(mol.GetNumAtoms()))
+    renumbered = Chem.RenumberAtoms(mol, [int(i) for i in order])
+    assert store.key(renumbered) == store.key(mol)
+    np.testing.assert_allclose(_bond_lengths(renumbered, store.get(renumbered)),
+                               _bond_lengths(mol, coords), atol=1e-4)
+
+
+def test_failed_embedding_is_retried(tmp_path, monkeypatch):
+    import pandadock.conformer_store as conformer_store
+    mol = Chem.AddHs(Chem.MolFromSmiles("CCO"))
+    store = ConformerStore(tmp_path, n_conformers=2)
+
+    embed = conformer_store.embed_conformers
+    monkeypatch.setattr(conformer_store, "embed_conformers",
+                        lambda mol, **params: np.zeros((0, mol.GetNumAtoms(), 3)))
+    assert store.populate([mol], n_processes=1) == 0
+    assert len(store.ensemble(mol)) == 0
+    assert mol not in store
+
+    monkeypatch.setattr(conformer_store, "embed_conformers", embed)
+    assert store.populate([mol], n_processes=1) == 1
+    assert len(store.get(mol)) > 0
@@ -0,0 +1,44 @@
+# test_convergence.py
+import json
+import numpy as np
+from pandadock.benchmarks.suite import load_fixtures
+from pandadock.search import ConvergenceMonitor, GeneticAlgorithm
+from pandadock.unified_scoring import VectorizedScoringFunction
+from pandadock.utils import flush_status_writers
+
+
+class _Pose:
+    def __init__(self, xyz):
+        self.xyz = np.asarray(xyz, dtype=float)
+
+
+def test_monitor_criteria():
+    rng = np.random.default_rng(0)
+    diverse = [(_Pose(rng.normal(0, 5, (6, 3))), -5.0 + i) for i in range(8)]
+    collapsed = [(_Pose(np.zeros((6, 3)) + 0.01 * i), -5.0 + i) for i in range(8)]
+
+    monitor = ConvergenceMonitor(patience=3)
+    monitor.start(diverse)
+    assert [monitor.update(diverse, 8) for _ in range(3)] == [None, None, 'no_improvement']
+    assert monitor.summary()['evaluations'] == 32
+
+    assert ConvergenceMonitor(diversity_threshold=0.5).update(diverse) is None
+    assert ConvergenceMonitor(diversity_threshold=0.5).update(collapsed) == 'diversity'
+    assert ConvergenceMonitor(score_variance_threshold=1.0).update(diverse) is None
+    assert ConvergenceMonitor(max_evaluations=10).update(diverse, 10) == 'max_evaluations'
+    assert ConvergenceMonitor().summary()['stop_reason'] == 'max_iterations'
+
+
+def test_genetic_algorithm_stops_early(tmp_path):
+    protein, ligand = load_fixtures()
+    search = GeneticAlgorithm(VectorizedScoringFunction(), max_iterations=50,
+                              population_size=6, output_dir=tmp_path, max_evaluations=20)
+    results = search.search(protein, ligand)
+
+    assert results
+    assert search.search_summary['stop_reason'] == 'max_evaluations'
+    assert search.search_summary['generations'] < 50
+
+    flush_status_writers()
+    status = json.loads((tmp_path / "status.json").read_text())
+    assert status['stop_reason'] == 'max_evaluations'
@@ -0,0 +1,53 @@
+# test_grid_scoring.py
+import numpy as np
+import pytest
+from pandadock.protein import Protein
+from pandadock.ligand import Ligand
+from pandadock.unified_scoring import EnhancedVectorizedScoringFunction
+from pandadock.grid_scoring import GridScoringFunction
+
+
+@pytest.fixture(scope="module")
+def grid_setup():
+    ligand = Ligand("tests/ligand.sdf")
+    center = np.mean(ligand.xyz, axis=0)
+    protein = Protein("tests/receptor.pdb", grid_center=tuple(center))
+    base = EnhancedVectorizedScoringFunction()
+    grid = GridScoringFunction(base, spacing=0.5, center=center, radius=3.0, padding=3.0)
+    return protein, ligand, base, grid
+
+
+def test_grid_nodes_match_direct_terms(grid_setup):
+    protein, ligand, base, grid = grid_setup
+    grid.score(protein, ligand)
+    maps = grid.grid_maps
+
+    # Interpolating exactly on a lattice node must reproduce the direct pair sum
+    atom = dict(ligand.atoms[0])
+    atom['coords'] = maps.origin + np.array([4, 5, 6]) * maps.spacing
+    p, l, distances = base._prepare_pair_data(maps.protein_atoms, [atom])
+    expected = base._pair_energy_matrices(p, l, distances)
+
+    index = maps.class_indices([atom])
+    actual = maps.interpolate(index, atom['coords'][None, :])[0]
+    for value, term in zip(actual, maps.TERMS):
+        assert value == pytest.approx(float(np.sum(expected[term])), rel=1e-4, abs=1e-4), term
+
+
+def test_grid_score_close_to_direct_score(grid_setup):
+    protein, ligand, base, grid = grid_setup
+    direct = base.score(protein, ligand)
+    assert grid.score(protein, ligand) == pytest.approx(direct, rel=0.1, abs=0.5)
+
+
+def test_grid_maps_reused_from_disk_cache(grid_setup, tmp_path):
+    protein, ligand, base, _ = grid_setup
+    first = GridScoringFunction(base, spacing=0.5, radius=2.0, padding=2.0, cache_dir=tmp_path)
+    score = first.score(protein, ligand)
+
+    # A fresh scoring function (e.g. in a worker process) memory-maps the stored maps
+    second = GridScoringFunction(base, spacing=0.5, radius=2.0, padding=2.0, cache_dir=tmp_path)
+    second.grid_maps = None
+    assert second.score(protein, ligand) == pytest.approx(score)
+    assert all(isinstance(grid, np.memmap) for grid in second.grid_maps.maps)
+    assert second.grid_maps.cache_key == first.grid_maps.cache_key
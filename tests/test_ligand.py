@@ -0,0 +1,89 @@
+# tests/test_ligand.py
+import copy
+import os
+import unittest
+import numpy as np
+from pandadock.ligand import Ligand, LigandPose
+
+LIGAND_FILE = os.path.join(os.path.dirname(__file__), 'ligand.sdf')
+
+
+class TestLigandPose(unittest.TestCase):
+    def setUp(self):
+        self.ligand = Ligand(LIGAND_FILE)
+        self.original_xyz = self.ligand.xyz.copy()
+
+    def test_copy_shares_topology(self):
+        pose = copy.deepcopy(self.ligand)
+        self.assertIsInstance(pose, LigandPose)
+        self.assertIs(pose.bonds, self.ligand.bonds)
+        self.assertIs(pose.rdmol, self.ligand.rdmol)
+        self.assertIsNot(pose.xyz, self.ligand.xyz)
+
+    def test_transforms_update_atoms(self):
+        pose = self.ligand.copy()
+        pose.translate([1.0, -2.0, 0.5])
+        angle = np.pi / 3
+        rotation = np.array([[np.cos(angle), -np.sin(angle), 0.0],
+                             [np.sin(angle), np.cos(angle), 0.0],
+                             [0.0, 0.0, 1.0]])
+        pose.rotate(rotation)
+
+        expected = self.original_xyz @ pose.rotation.T + pose.translation
+        np.testing.assert_allclose(pose.xyz, expected)
+        np.testing.assert_allclose(pose.atoms[4]['coords'], pose.xyz[4])
+        np.testing.assert_allclose(self.ligand.xyz, self.original_xyz)
+
+    def test_atom_coords_assignment_updates_xyz(self):
+        pose = self.ligand.copy()
+        pose.atoms[0]['coords'] = np.zeros(3)
+        np.testing.assert_allclose(pose.xyz[0], np.zeros(3))
+
+
+
+class TestLigandTorsions(unittest.TestCase):
+    def setUp(self):
+        self.ligand = Ligand(LIGAND_FILE)
+
+    def bond_lengths(self, coords):
+        return np.array([np.linalg.norm(coords[bond['begin_atom_idx']] - coords[bond['end_atom_idx']])
+                         for bond in self.ligand.bonds])
+
+    def test_torsion_tree_matches_rotatable_bonds(self):
+        tree = self.ligand.torsion_tree
+        self.assertEqual(len(tree), len(self.ligand.rotatable_bonds))
+        self.assertTrue(self.ligand.active_torsions)
+        for atom_a, atom_b, moving in tree:
+            self.assertNotIn(atom_a, moving)
+            self.assertNotIn(atom_b, moving)
+            self.assertLessEqual(2 * len(moving), len(self.ligand.xyz))
+
+    def test_set_torsions_preserves_geometry_and_is_reversible(self):
+        pose = self.ligand.copy()
+        angles = np.zeros(len(pose.torsion_tree))
+        angles[pose.active_torsions] = np.linspace(-2.0, 2.0, len(pose.active_torsions))
+        pose.set_torsions(angles)
+
+        self.assertGreater(np.abs(pose.xyz - self.ligand.xyz).max(), 0.5)
+        np.testing.assert_allclose(self.bond_lengths(pose.xyz), self.bond_lengths(self.ligand.xyz))
+        np.testing.assert_allclose(pose.atoms[3]['coords'], pose.xyz[3])
+
+        pose.set_torsions(np.zeros(len(angles)))
+        np.testing.assert_allclose(pose.xyz, self.ligand.xyz, atol=1e-10)
+
+    def test_rotate_bond_matches_sequential_rotation(self):
+        pose = self.ligand.copy()
+        bond_idx = pose.active_torsions[0]
+        atom_a, atom_b, moving = pose.torsion_tree[bond_idx]
+        pose.rotate_bond(bond_idx, np.pi / 2)
+
+        coords = self.ligand.xyz
+        axis = (coords[atom_b] - coords[atom_a]) / np.linalg.norm(coords[atom_b] - coords[atom_a])
+        offsets = coords[moving] - coords[atom_b]
+        expected = (coords[atom_b] + np.cross(axis, offsets) +
+                    axis * (offsets @ axis)[:, None])
+        np.testing.assert_allclose(pose.xyz[moving], expected, atol=1e-10)
+
+
+if __name__ == '__main__':
+    unittest.main()
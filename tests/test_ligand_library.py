@@ -0,0 +1,57 @@
+# test_ligand_library.py
+import gzip
+import numpy as np
+import pytest
+from pandadock.ligand import Ligand
+from pandadock.ligand_library import LigandLibrary, _UniqueNames
+
+
+@pytest.fixture(scope="module")
+def record():
+    lines = open("tests/ligand.sdf").read().rstrip().split("\n")
+    if lines[-1].strip() != "$$$$":
+        lines.append("$$$$")
+    return lines
+
+
+@pytest.mark.parametrize("suffix", [".sdf", ".sdf.gz"])
+def test_sdf_library_streams_and_seeks(tmp_path, record, suffix):
+    text = "".join("\n".join([f"mol {i % 3}"] + record[1:]) + "\n" for i in range(7))
+    path = tmp_path / f"library{suffix}"
+    if suffix.endswith(".gz"):
+        with gzip.open(path, "wt") as f:
+            f.write(text)
+    else:
+        path.write_text(text)
+
+    reference = Ligand("tests/ligand.sdf")
+    streamed = list(LigandLibrary(path).items())
+    assert len(streamed) == 7
+    for _, ligand in streamed:
+        np.testing.assert_allclose(ligand.xyz, reference.xyz)
+
+    library = LigandLibrary(path)
+    assert library.names == [name for name, _ in streamed]
+    assert len(set(library.names)) == 7
+    np.testing.assert_allclose(library.get(5).xyz, reference.xyz)
+
+    start, stop = library.shard(1, 2)
+    assert [name for name, _ in library.items(start, stop)] == library.names[start:stop]
+    assert LigandLibrary(path).offsets.tolist() == library.offsets.tolist()
+
+
+def test_smiles_library_embeds_records(tmp_path):
+    path = tmp_path / "library.smi"
+    path.write_text("CCO ethanol\nnot_a_smiles broken\nc1ccccc1O phenol\n")
+    names = [name for name, ligand in LigandLibrary(path).items() if ligand.xyz.shape[1] == 3]
+    assert names == ["ethanol", "phenol"]
+
+
+@pytest.mark.parametrize("titles", [
+    ['X', 'X_3', 'X'],
+    ['X', 'X', 'X_2', 'X', 'X_4'],
+    ['', 'lib_1', ''],
+])
+def test_record_names_are_unique(titles):
+    names = _UniqueNames("lib.sdf")
+    assert len({names.add(title) for title in titles}) == len(titles)
@@ -0,0 +1,29 @@
+# test_neighbor_search.py
+import numpy as np
+from pandadock.neighbor_search import ReceptorNeighborIndex, StericClashChecker
+from pandadock.utils import detect_steric_clash, detect_steric_clash_batch
+
+
+def test_pairs_within_cutoff():
+    index = ReceptorNeighborIndex([[0.0, 0.0, 0.0], [5.0, 0.0, 0.0]])
+    receptor, query, distances = index.pairs([[1.0, 0.0, 0.0], [9.0, 0.0, 0.0]], cutoff=4.5)
+    found = sorted(zip(receptor.tolist(), query.tolist(), distances.tolist()))
+    assert found == [(0, 0, 1.0), (1, 0, 4.0), (1, 1, 4.0)]
+
+
+def test_clash_checks_match_pairwise_definition():
+    rng = np.random.default_rng(3)
+    receptor = rng.uniform(0.0, 10.0, size=(200, 3))
+    poses = rng.uniform(0.0, 10.0, size=(20, 6, 3))
+
+    checker = StericClashChecker(receptor, threshold=1.2)
+    distances = np.linalg.norm(poses[:, :, None, :] - receptor[None, None, :, :], axis=-1)
+    expected = (distances < 1.2).any(axis=(1, 2))
+
+    np.testing.assert_array_equal(checker.clash_mask(poses), expected)
+    assert [checker.has_clash(pose) for pose in poses] == expected.tolist()
+
+    protein_atoms = [{'coords': coords} for coords in receptor]
+    ligand_atoms = [{'coords': coords} for coords in poses[0]]
+    assert detect_steric_clash(protein_atoms, ligand_atoms, threshold=1.2) == expected[0]
+    np.testing.assert_array_equal(detect_steric_clash_batch(protein_atoms, poses, threshold=1.2), expected)
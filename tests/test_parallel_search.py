@@ -0,0 +1,98 @@
+# test_parallel_search.py
+import numpy as np
+import pytest
+from pandadock.unified_scoring import EnhancedVectorizedScoringFunction
+from pandadock.benchmarks.suite import load_fixtures
+from pandadock.parallel_search import ParallelGeneticAlgorithm, IslandGeneticAlgorithm, MigrationBroker
+from pandadock.search import ConvergenceMonitor
+
+
+def test_pool_evaluation_matches_serial_scores(complex_pair):
+    protein, ligand = complex_pair
+    scoring_function = EnhancedVectorizedScoringFunction()
+    search = ParallelGeneticAlgorithm(scoring_function, population_size=6, n_processes=2, batch_size=2)
+
+    rng = np.random.default_rng(7)
+    population = []
+    for _ in range(6):
+        pose = ligand.copy()
+        pose.translate(rng.normal(0.0, 1.0, 3))
+        population.append((pose, None))
+
+    try:
+        evaluated = search._evaluate_population(protein, population)
+        assert search.own_pool
+    finally:
+        search._close_process_pool()
+
+    for (pose, _), (evaluated_pose, score) in zip(population, evaluated):
+        assert evaluated_pose is pose
+        assert score == pytest.approx(scoring_function.score(protein, pose), rel=1e-9, abs=1e-9)
+
+
+def test_migration_broker_topologies_and_epochs():
+    ring = MigrationBroker(3, 'ring')
+    assert [ring.targets(i) for i in range(3)] == [[1], [2], [0]]
+    assert ring.sources(0) == [2]
+    full = MigrationBroker(3, 'fully_connected')
+    assert full.sources(0) == [1, 2]
+    with pytest.raises(ValueError):
+        MigrationBroker(3, 'star')
+
+    # Island 1 runs ahead: its migrants of epoch 10 wait until island 0 asks for them
+    coords, torsions, scores = np.zeros((2, 4, 3)), np.zeros((2, 1)), np.array([-2.0, -1.0])
+    full.send(1, 10, coords + 1, torsions, scores)
+    full.send(1, 5, coords, torsions, scores)
+    full.send(2, 5, coords, torsions, scores)
+    full.finish(2)
+    assert len(full.receive(0, 5)) == 2
+    migrants = full.receive(0, 10)
+    assert len(migrants) == 1
+    np.testing.assert_allclose(migrants[0][0], coords + 1)
+
+
+class _RandomStartIslands(IslandGeneticAlgorithm):
+    # Random start poses keep the test fast; clash-free generation is slow
+    def initialize_population(self, protein, ligand):
+        center = protein.active_site['center']
+        return [(self._generate_random_pose(ligand, center, 3.0), None)
+                for _ in range(self.population_size)]
+
+
+def test_island_search_exchanges_migrants():
+    protein, ligand = load_fixtures()
+    search = _RandomStartIslands(EnhancedVectorizedScoringFunction(), max_iterations=4,
+                                 population_size=4, n_islands=2, migration_interval=2,
+                                 n_migrants=1, seed=3)
+    results = search.search(protein, ligand)
+
+    assert len(results) == 8
+    assert [score for _, score in results] == sorted(score for _, score in results)
+    assert len(search.search_summary['islands']) == 2
+    assert search.best_score == results[0][1]
+
+    pose, score = results[0]
+    assert pose.xyz.shape == ligand.xyz.shape
+    assert score == pytest.approx(search.scoring_function.score(protein, pose), rel=1e-6, abs=1e-6)
+
+
+class _OneIslandStopsEarly(_RandomStartIslands):
+    def _evolve_island(self, island, protein, ligand, broker):
+        if island == 0:
+            self.convergence = ConvergenceMonitor(max_evaluations=1)
+        return super()._evolve_island(island, protein, ligand, broker)
+
+
+def test_island_search_finishes_when_an_island_stops_early():
+    # Island 1 keeps sending migrants to the inbox of the stopped island 0,
+    # more than fit in the pipe buffer
+    protein, ligand = load_fixtures()
+    search = _OneIslandStopsEarly(EnhancedVectorizedScoringFunction(), max_iterations=40,
+                                  population_size=4, n_islands=2, migration_interval=1,
+                                  n_migrants=4, migration_timeout=5.0, seed=3)
+    results = search.search(protein, ligand)
+
+    assert len(results) == 8
+    islands = search.search_summary['islands']
+    assert islands[0]['stop_reason'] == 'max_evaluations' and islands[0]['generations'] == 1
+    assert islands[1]['generations'] == 40
@@ -0,0 +1,204 @@
+# test_physics.py
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from pandadock.physics import GeneralizedBornSolvation, ImprovedElectrostatics
+
+
+def _molecules(seed=5):
+    rng = np.random.default_rng(seed)
+    elements = ['C', 'N', 'O', 'S', 'C', 'H']
+    protein_atoms = [{'name': element, 'element': element, 'coords': coords}
+                     for element, coords in zip(rng.choice(elements, 150), rng.uniform(0.0, 14.0, (150, 3)))]
+    ligand_atoms = [{'symbol': symbol, 'coords': coords}
+                    for symbol, coords in zip(rng.choice(elements, 12), rng.uniform(5.0, 9.0, (12, 3)))]
+    protein = SimpleNamespace(atoms=protein_atoms, active_site=None)
+    return protein, SimpleNamespace(atoms=ligand_atoms)
+
+
+def test_incremental_binding_solvation_matches_full_evaluation():
+    gb = GeneralizedBornSolvation()
+    protein, ligand = _molecules()
+
+    # Reference: complex, protein and ligand solvated from scratch
+    complex_atoms = protein.atoms + [{'name': a['symbol'], 'coords': a['coords']} for a in ligand.atoms]
+    complex_total = gb.calculate_solvation_free_energy(SimpleNamespace(atoms=complex_atoms), 'protein')[2]
+    protein_total = gb.calculate_solvation_free_energy(protein, 'protein')[2]
+    ligand_total = gb.calculate_solvation_free_energy(ligand, 'ligand')[2]
+    expected = complex_total - protein_total - ligand_total
+
+    assert np.isclose(gb.calculate_binding_solvation(protein, ligand), expected)
+    # Second pose reuses the cached receptor
+    for atom in ligand.atoms:
+        atom['coords'] = atom['coords'] + 0.5
+    complex_atoms = protein.atoms + [{'name': a['symbol'], 'coords': a['coords']} for a in ligand.atoms]
+    expected = (gb.calculate_solvation_free_energy(SimpleNamespace(atoms=complex_atoms), 'protein')[2] -
+                protein_total - gb.calculate_solvation_free_energy(ligand, 'ligand')[2])
+    assert np.isclose(gb.calculate_binding_solvation(protein, ligand), expected)
+
+
+def test_desolvation_sees_receptor_moved_in_place():
+    gb = GeneralizedBornSolvation()
+    protein, ligand = _molecules()
+    rng = np.random.default_rng(1)
+    for atom in protein.atoms + ligand.atoms:
+        atom['charge'] = rng.uniform(-0.5, 0.5)
+    gb.calculate(protein.atoms, ligand.atoms)
+
+    # Same atom list, new coordinates: the cached receptor arrays must not be reused
+    for atom in protein.atoms:
+        atom['coords'] += 0.7
+    assert np.isclose(gb.calculate(protein.atoms, ligand.atoms),
+                      GeneralizedBornSolvation().calculate(protein.atoms, ligand.atoms))
+
+
+def test_electrostatics_reuses_receptor_descriptors():
+    model = ImprovedElectrostatics()
+    protein, ligand = _molecules()
+    energy = model.calculate_electrostatics(protein, ligand)
+    descriptors = protein.electrostatics_descriptors
+
+    # Reference: explicit double loop over all atom pairs
+    p_sasa = model._calc_approximate_sasa(protein.atoms)
+    l_sasa = model._calc_approximate_sasa(ligand.atoms)
+    expected = 0.0
+    for p_atom, p_exposed in zip(protein.atoms, p_sasa):
+        for l_atom, l_exposed in zip(ligand.atoms, l_sasa):
+            q = model.atom_charges[p_atom['element']] * model.atom_charges[l_atom['symbol']]
+            distance = np.linalg.norm(p_atom['coords'] - l_atom['coords'])
+            if abs(q) < 1e-6 or distance > 15.0 or distance < 0.1:
+                continue
+            burial = (2.0 - min(1.0, p_exposed) - min(1.0, l_exposed)) / 2.0
+            dielectric = model.interior_dielectric + (model.solvent_dielectric - model.interior_dielectric) * (1.0 - burial)
+            expected += 332.0 * q / (dielectric * distance) * np.exp(-model.kappa * distance)
+
+    assert np.isclose(energy, expected)
+    model.calculate_electrostatics(protein, ligand)
+    assert protein.electrostatics_descriptors is descriptors
+
+
+def test_mmff_pose_minimization_updates_pose_in_memory():
+    pytest.importorskip("rdkit")
+    from pandadock.ligand import Ligand
+    from pandadock.physics import MMFFMinimization
+
+    ligand = Ligand("tests/ligand.sdf")
+    center = ligand.xyz.mean(axis=0)
+    protein_atoms = [{'name': 'CA', 'residue_name': 'ALA', 'chain_id': 'A', 'residue_id': 1,
+                      'coords': center + [6.0, 0.0, 0.0]}]
+    protein = SimpleNamespace(atoms=protein_atoms, active_site=None)
+
+    minimizer = MMFFMinimization(max_iterations=50)
+    minimized = minimizer.minimize_pose(protein, ligand)
+
+    assert minimized is not ligand
+    assert minimized.xyz.shape == ligand.xyz.shape
+    assert not np.allclose(minimized.xyz, ligand.xyz)
+    # Topology is kept, so bond lengths stay close to the input
+    for bond in ligand.bonds:
+        i, j = bond['begin_atom_idx'], bond['end_atom_idx']
+        assert abs(np.linalg.norm(minimized.xyz[i] - minimized.xyz[j]) -
+                   np.linalg.norm(ligand.xyz[i] - ligand.xyz[j])) < 0.2
+
+
+def test_mmff_pocket_terms_match_combined_force_field():
+    pytest.importorskip("rdkit")
+    from rdkit import Chem
+    from rdkit.Chem import AllChem
+    from pandadock.ligand import Ligand
+    from pandadock.physics import MMFFMinimization
+
+    ligand = Ligand("tests/ligand.sdf")
+    center = ligand.xyz.mean(axis=0)
+    protein_atoms = [{'name': name, 'residue_name': 'GLY', 'chain_id': 'A', 'residue_id': 1,
+                      'coords': center + offset}
+                     for name, offset in [('N', [3.5, 0.0, 0.0]), ('CA', [4.5, 1.0, 0.0]),
+                                          ('C', [5.8, 0.4, 0.3]), ('O', [6.0, -0.8, 0.3])]]
+    protein = SimpleNamespace(atoms=protein_atoms, active_site=None)
+
+    minimizer = MMFFMinimization(max_iterations=20)
+    system = minimizer._pose_system(protein, ligand, 6.0)
+    assert minimizer._pose_system(protein, ligand.copy(), 6.0) is system
+
+    # Ligand-pocket energy equals the change of the full pocket-ligand force field
+    # when the ligand is pulled away from the pocket
+    pocket = minimizer._pocket_fragment(protein, ligand.xyz, 6.0)['mol']
+    combined = Chem.CombineMols(pocket, minimizer._ligand_mol(ligand))
+    force_field = AllChem.MMFFGetMoleculeForceField(
+        combined, AllChem.MMFFGetMoleculeProperties(combined),
+        nonBondedThresh=1000.0, ignoreInterfragInteractions=False)
+    positions = combined.GetConformer().GetPositions()
+    separated = positions.copy()
+    separated[pocket.GetNumAtoms():] += 500.0
+    expected = (force_field.CalcEnergy(positions.ravel().tolist()) -
+                force_field.CalcEnergy(separated.ravel().tolist()))
+    pairs = minimizer._pocket_pairs(system, ligand.xyz, 1000.0)
+    energy, gradient = minimizer._pocket_interaction(system, ligand.xyz, pairs)
+    assert energy == pytest.approx(expected, rel=1e-6)
+
+    shifted = ligand.xyz.copy()
+    shifted[0, 0] += 1e-5
+    assert (minimizer._pocket_interaction(system, shifted, pairs)[0] - energy) / 1e-5 == \
+        pytest.approx(gradient[0, 0], rel=1e-3, abs=1e-3)
+
+    poses = [ligand.copy() for _ in range(3)]
+    for k, pose in enumerate(poses):
+        pose.translate(np.array([0.0, 0.1 * k, 0.0]))
+    minimized = minimizer.minimize_poses(protein, poses, n_workers=2)
+    for pose, result in zip(poses, minimized):
+        np.testing.assert_allclose(result.xyz, minimizer.minimize_pose(protein, pose).xyz, atol=1e-8)
+
+
+def test_mmff_pocket_pairs_are_fixed_at_the_default_cutoff():
+    pytest.importorskip("rdkit")
+    from rdkit import Chem
+    from rdkit.Chem import AllChem
+    from pandadock.ligand import Ligand
+    from pandadock.physics import MMFFMinimization
+
+    ligand = Ligand("tests/ligand.sdf")
+    # Pocket atoms placed 1.5-2.3 Å from ligand atoms, around the 2 Å cutoff
+    anchor = ligand.xyz[0]
+    protein_atoms = [{'name': name, 'residue_name': 'GLY', 'chain_id': 'A', 'residue_id': 1,
+                      'coords': anchor + offset}
+                     for name, offset in [('N', [1.6, 0.0, 0.0]), ('CA', [2.2, 1.2, 0.0]),
+                                          ('C', [3.5, 1.0, 0.6]), ('O', [4.0, -0.1, 0.8])]]
+    protein = SimpleNamespace(atoms=protein_atoms, active_site=None)
+
+    minimizer = MMFFMinimization(max_iterations=20)
+    system = minimizer._pose_system(protein, ligand, 6.0)
+    pairs = minimizer._pocket_pairs(system, ligand.xyz, 2.0)
+    assert 0 < pairs.sum() < pairs.size
+
+    # RDKit selects the non-bonded pairs of the combined force field once, at build time
+    pocket = minimizer._pocket_fragment(protein, ligand.xyz, 6.0)['mol']
+    combined = Chem.CombineMols(pocket, minimizer._ligand_mol(ligand))
+    properties = AllChem.MMFFGetMoleculeProperties(combined)
+    full = AllChem.MMFFGetMoleculeForceField(combined, properties, nonBondedThresh=2.0,
+                                             ignoreInterfragInteractions=False)
+    intra = AllChem.MMFFGetMoleculeForceField(combined, properties, nonBondedThresh=2.0,
+                                              ignoreInterfragInteractions=True)
+    positions = combined.GetConformer().GetPositions()
+
+    # Moving the ligand changes distances but not which pairs interact
+    for shift in (0.0, 0.8, -0.6):
+        moved = positions.copy()
+        moved[pocket.GetNumAtoms():, 0] += shift
+        expected = full.CalcEnergy(moved.ravel().tolist()) - intra.CalcEnergy(moved.ravel().tolist())
+        coords = moved[pocket.GetNumAtoms():]
+        if shift:
+            # Pairs cross the cutoff, so a per-call mask would differ
+            assert not np.array_equal(minimizer._pocket_pairs(system, coords, 2.0), pairs)
+        energy, gradient = minimizer._pocket_interaction(system, coords, pairs)
+        assert energy == pytest.approx(expected, rel=1e-6, abs=1e-6)
+
+        # Analytic gradient matches central differences
+        step = 1e-5
+        numeric = np.zeros_like(coords)
+        for index in np.ndindex(*coords.shape):
+            plus, minus = coords.copy(), coords.copy()
+            plus[index] += step
+            minus[index] -= step
+            numeric[index] = (minimizer._pocket_interaction(system, plus, pairs)[0] -
+                              minimizer._pocket_interaction(system, minus, pairs)[0]) / (2 * step)
+        np.testing.assert_allclose(gradient, numeric, rtol=1e-4, atol=1e-4)
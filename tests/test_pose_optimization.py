@@ -0,0 +1,53 @@
+# test_pose_optimization.py
+import numpy as np
+import pytest
+from pandadock.unified_scoring import EnhancedVectorizedScoringFunction
+from pandadock.pose_optimization import optimize_pose, rigid_body_gradient
+
+
+@pytest.fixture(scope="module")
+def displaced_pair(complex_pair):
+    protein, ligand = complex_pair
+    ligand = ligand.copy()
+    ligand.translate(np.array([0.7, -0.4, 0.3]))
+    return protein, ligand
+
+
+def test_score_gradient_matches_finite_differences(displaced_pair):
+    protein, ligand = displaced_pair
+    scoring = EnhancedVectorizedScoringFunction()
+    score, gradient = scoring.score_gradient(protein, ligand)
+    assert score == pytest.approx(scoring.score(protein, ligand))
+
+    delta = 1e-5
+    for atom in (0, len(ligand.xyz) // 2, len(ligand.xyz) - 1):
+        for axis in range(3):
+            pose = ligand.copy()
+            pose.xyz[atom, axis] += delta
+            forward = scoring.score(protein, pose)
+            pose.xyz[atom, axis] -= 2 * delta
+            backward = scoring.score(protein, pose)
+            assert gradient[atom, axis] == pytest.approx((forward - backward) / (2 * delta), abs=1e-4)
+
+    rigid = rigid_body_gradient(ligand.xyz, gradient, np.mean(ligand.xyz, axis=0))
+    np.testing.assert_allclose(rigid[:3], gradient.sum(axis=0))
+
+
+def test_optimize_pose_improves_score(displaced_pair):
+    protein, ligand = displaced_pair
+    scoring = EnhancedVectorizedScoringFunction()
+    initial = scoring.score(protein, ligand)
+    optimized_pose, optimized_score = optimize_pose(scoring, protein, ligand, max_iterations=20)
+
+    assert optimized_score <= initial
+    assert optimized_score == pytest.approx(scoring.score(protein, optimized_pose), abs=1e-6)
+
+
+def test_flexible_optimization_keeps_ligand_valid(displaced_pair):
+    protein, ligand = displaced_pair
+    scoring = EnhancedVectorizedScoringFunction()
+    optimized_pose, optimized_score = optimize_pose(scoring, protein, ligand, max_iterations=20, flexible=True)
+
+    assert optimized_score <= scoring.score(protein, ligand)
+    assert optimized_score == pytest.approx(scoring.score(protein, optimized_pose), abs=1e-6)
+    assert not optimized_pose.has_internal_clash()
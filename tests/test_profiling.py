@@ -0,0 +1,47 @@
+# test_profiling.py
+import json
+import pytest
+from pandadock import profiling
+from pandadock.benchmarks.suite import load_fixtures, random_poses
+from pandadock.search import GeneticAlgorithm
+from pandadock.unified_scoring import VectorizedScoringFunction
+from pandadock.utils import update_status
+
+
+@pytest.fixture
+def profiler():
+    profiler = profiling.enable()
+    yield profiler
+    profiling.disable()
+
+
+def test_sections_are_only_recorded_while_enabled(tmp_path):
+    assert profiling.get_profiler() is None
+    assert profiling.timed('scoring', 'vdw', sum, [1, 2]) == 3
+    with profiling.section('io', 'status_write'):
+        pass
+
+    profiler = profiling.enable()
+    try:
+        assert profiling.timed('scoring', 'vdw', sum, [1, 2]) == 3
+        update_status(tmp_path, progress=0.5)
+    finally:
+        assert profiling.disable() is profiler
+
+    report = json.loads(profiler.save(tmp_path).read_text())
+    assert (tmp_path / "profile.json").exists()
+    assert report['categories']['scoring']['sections']['vdw']['calls'] == 1
+    assert report['categories']['io']['sections']['status_write']['calls'] == 1
+
+
+def test_search_records_phases_and_scoring_terms(profiler):
+    protein, ligand = load_fixtures()
+    scoring_function = VectorizedScoringFunction()
+    scoring_function.score_batch(protein, ligand, random_poses(ligand, 4))
+    GeneticAlgorithm(scoring_function, max_iterations=2, population_size=6).search(protein, ligand)
+
+    report = profiler.report()['categories']
+    assert {'init', 'selection', 'crossover', 'mutation', 'evaluation'} <= set(report['search']['sections'])
+    assert {'vdw', 'hbond', 'elec', 'desolv', 'hydrophobic', 'clash', 'backbone_clash', 'entropy'} <= \
+        set(report['scoring']['sections'])
+    assert report['search']['sections']['selection']['calls'] == 2
@@ -2,6 +2,7 @@
 import unittest
 import os
 import tempfile
+import numpy as np
 from pandadock.protein import Protein
 class TestProtein(unittest.TestCase):
     def setUp(self):
@@ -19,3 +20,15 @@ class TestProtein(unittest.TestCase):
         protein = Protein(self.temp_pdb.name)
         self.assertEqual(len(protein.atoms), 3)
         self.assertEqual(protein.atoms[0]['residue_name'], 'ASP')
+
+    def test_atom_table(self):
+        protein = Protein(self.temp_pdb.name)
+        table = protein.atom_table
+        self.assertEqual(len(table), 3)
+        self.assertEqual(list(table.backbone_mask), [True, True, True])
+        self.assertEqual(table.residue_ids[table.residue_index[1]], 30)
+        self.assertEqual(table.chain_ids[table.chain_index[2]], 'A')
+        self.assertEqual(list(table.elements[table.element_codes]), ['N', 'C', 'C'])
+        # Compatibility dictionaries share coordinates with the table
+        self.assertIs(protein.atoms[1], table.record(1))
+        self.assertTrue(np.shares_memory(protein.atoms[1]['coords'], table.coords))
@@ -0,0 +1,21 @@
+# test_replica_exchange.py
+import numpy as np
+import pytest
+from pandadock.advanced_search import ReplicaExchangeDocking
+from pandadock.benchmarks.suite import load_fixtures
+from pandadock.unified_scoring import VectorizedScoringFunction
+
+
+@pytest.mark.parametrize("n_processes", [1, 3])
+def test_replicas_exchange_temperatures(n_processes):
+    protein, ligand = load_fixtures()
+    scoring_function = VectorizedScoringFunction()
+    np.random.seed(0)
+    search = ReplicaExchangeDocking(scoring_function, n_replicas=3, exchange_steps=4,
+                                    steps_per_exchange=5, n_processes=n_processes)
+    [(pose, score)] = search.search(protein, ligand)
+
+    assert pose.xyz.shape == ligand.xyz.shape
+    assert score == pytest.approx(scoring_function.score(protein, pose), rel=1e-9, abs=1e-9)
+    assert list(search.exchange_attempts) == [4, 4]
+    assert np.all(search.exchange_accepted <= search.exchange_attempts)
@@ -0,0 +1,49 @@
+# test_status_writer.py
+import json
+import numpy as np
+from pandadock.status_writer import StatusWriter, get_status_writer
+from pandadock.utils import update_status, save_intermediate_result, flush_status_writers
+
+
+class _Pose:
+    def __init__(self, coords):
+        self.atoms = [{'coords': xyz, 'symbol': 'C'} for xyz in coords]
+
+
+def test_updates_are_coalesced_and_written_atomically(tmp_path, monkeypatch):
+    writes = []
+    monkeypatch.setattr(StatusWriter, '_write_status',
+                        lambda self, text: writes.append(json.loads(text)))
+
+    writer = StatusWriter(tmp_path, min_interval=60.0)
+    for i in range(100):
+        writer.update(current_ligand=i + 1)
+    assert writer.flush(timeout=10)
+    writer.close(timeout=10)
+
+    # The first update is written at once, the rest coalesce until the flush
+    assert len(writes) <= 2
+    assert writes[-1]['current_ligand'] == 100
+
+
+def test_intermediate_poses_are_snapshotted(tmp_path):
+    coords = np.zeros((3, 3))
+    pose = _Pose(coords)
+
+    update_status(tmp_path, total_iterations=50)
+    save_intermediate_result(pose, -5.0, 3, tmp_path)
+    coords += 10.0  # The search keeps modifying its poses
+    save_intermediate_result(pose, -4.0, 4, tmp_path)
+    flush_status_writers()
+
+    status = json.loads((tmp_path / "status.json").read_text())
+    assert status['top_score'] == -5.0
+    assert status['current_iteration'] == 4
+    assert status['progress'] == 4 / 50
+
+    # Only the new top score is saved, with the coordinates it was scored with
+    pdb_files = list((tmp_path / "intermediate").glob("*.pdb"))
+    assert [p.name for p in pdb_files] == ["pose_iter_3_score_-5.00.pdb"]
+    assert "   0.000   0.000   0.000" in pdb_files[0].read_text()
+    assert not list(tmp_path.glob(".*.tmp"))
+    assert get_status_writer(tmp_path) is get_status_writer(str(tmp_path))
@@ -0,0 +1,70 @@
+# test_vectorized_scoring.py
+import numpy as np
+import pytest
+from pandadock.unified_scoring import (
+    CompositeScoringFunction,
+    EnhancedScoringFunction,
+    VectorizedScoringFunction,
+    EnhancedVectorizedScoringFunction,
+)
+
+TERMS = [
+    'calculate_vdw', 'calculate_hbond', 'calculate_electrostatics',
+    'calculate_desolvation', 'calculate_hydrophobic', 'calculate_clashes',
+    'calculate_enhanced_clashes',
+]
+
+
+@pytest.mark.parametrize("reference_cls, vectorized_cls", [
+    (CompositeScoringFunction, VectorizedScoringFunction),
+    (EnhancedScoringFunction, EnhancedVectorizedScoringFunction),
+])
+def test_vectorized_matches_reference(complex_pair, reference_cls, vectorized_cls):
+    protein, ligand = complex_pair
+    reference = reference_cls()
+    vectorized = vectorized_cls()
+    protein_atoms = reference._get_protein_atoms(protein)
+
+    for term in TERMS:
+        expected = getattr(reference, term)(protein_atoms, ligand.atoms)
+        actual = getattr(vectorized, term)(protein_atoms, ligand.atoms)
+        assert actual == pytest.approx(expected, rel=1e-9, abs=1e-9), term
+
+    assert vectorized.score(protein, ligand) == pytest.approx(
+        reference.score(protein, ligand), rel=1e-9, abs=1e-9)
+
+
+@pytest.mark.parametrize("scoring_cls", [CompositeScoringFunction, EnhancedVectorizedScoringFunction])
+def test_score_batch_matches_score(complex_pair, scoring_cls):
+    protein, ligand = complex_pair
+    scoring_function = scoring_cls()
+    offsets = np.array([[0.0, 0.0, 0.0], [1.5, -0.5, 0.0], [0.0, 2.0, 1.0], [25.0, 0.0, 0.0]])
+    coords = ligand.xyz[None, :, :] + offsets[:, None, :]
+
+    pose = ligand.copy()
+    expected = []
+    for pose_coords in coords:
+        pose.xyz[...] = pose_coords
+        expected.append(scoring_function.score(protein, pose))
+
+    actual = scoring_function.score_batch(protein, ligand, coords)
+    np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-9)
+
+
+def test_neighbor_list_matches_dense(complex_pair):
+    protein, ligand = complex_pair
+    dense = EnhancedVectorizedScoringFunction()
+    dense.neighbor_search_min_atoms = float('inf')
+    sparse = EnhancedVectorizedScoringFunction()
+    sparse.neighbor_search_min_atoms = 0
+
+    offsets = np.array([[0.0, 0.0, 0.0], [1.0, 1.0, -1.0], [30.0, 0.0, 0.0]])
+    coords = ligand.xyz[None, :, :] + offsets[:, None, :]
+
+    expected_terms = dense.calculate_energy_terms(protein, ligand)
+    actual_terms = sparse.calculate_energy_terms(protein, ligand)
+    for name, value in expected_terms.items():
+        assert actual_terms[name] == pytest.approx(value, rel=1e-9, abs=1e-9), name
+
+    np.testing.assert_allclose(sparse.score_batch(protein, ligand, coords),
+                               dense.score_batch(protein, ligand, coords), rtol=1e-9, atol=1e-9)